@@ -206,6 +206,16 @@ class JSONEncoder(object):
         '{"foo": ["bar", "baz"]}'
 
         """
+        if (_pypyjson_dumps is not None and self.ensure_ascii and
+                self.encoding == 'utf-8' and not self.skipkeys and
+                type(self.item_separator) is str and
+                type(self.key_separator) is str and
+                (self.indent is None or isinstance(self.indent, (int, long)))):
+            # the interp-level encoder, which produces the same output
+            return _pypyjson_dumps(o, self.sort_keys, self.indent,
+                                   self.item_separator, self.key_separator,
+                                   self.default, self.allow_nan,
+                                   self.check_circular)
         if self.check_circular:
             markers = {}
         else:
@@ -536,3 +546,7 @@ try:
     from _pypyjson import raw_encode_basestring_ascii
 except ImportError:
     pass
+try:
+    from _pypyjson import dumps as _pypyjson_dumps
+except ImportError:
+    _pypyjson_dumps = None
@@ -193,6 +193,8 @@ def purge():
     "Clear the regular expression cache"
     _cache.clear()
     _cache_repl.clear()
+    if _sre_cache_clear is not None:
+        _sre_cache_clear()
 
 def template(pattern, flags=0):
     "Compile a template pattern, returning a pattern object"
@@ -223,15 +225,28 @@ _pattern_type = type(sre_compile.compile("", 0))
 
 _MAXCACHE = 100
 
+# on PyPy, _sre keeps the compiled patterns in a bounded LRU cache
+try:
+    from _sre import getcached as _sre_getcached
+    from _sre import putcached as _sre_putcached
+    from _sre import cache_clear as _sre_cache_clear
+except ImportError:
+    _sre_getcached = _sre_putcached = _sre_cache_clear = None
+
 def _compile(*key):
     # internal: compile pattern
     pattern, flags = key
     bypass_cache = flags & DEBUG
     if not bypass_cache:
-        cachekey = (type(key[0]),) + key
-        p = _cache.get(cachekey)
-        if p is not None:
-            return p
+        if _sre_getcached is not None:
+            p = _sre_getcached(pattern, flags)
+            if p is not None:
+                return p
+        else:
+            cachekey = (type(key[0]),) + key
+            p = _cache.get(cachekey)
+            if p is not None:
+                return p
     if isinstance(pattern, _pattern_type):
         if flags:
             raise ValueError('Cannot process flags argument with a compiled pattern')
@@ -243,9 +258,12 @@ def _compile(*key):
     except error, v:
         raise error, v # invalid expression
     if not bypass_cache:
-        if len(_cache) >= _MAXCACHE:
-            _cache.clear()
-        _cache[cachekey] = p
+        if _sre_putcached is not None:
+            _sre_putcached(pattern, flags, p)
+        else:
+            if len(_cache) >= _MAXCACHE:
+                _cache.clear()
+            _cache[cachekey] = p
     return p
 
 def _compile_repl(*key):
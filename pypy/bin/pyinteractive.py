@@ -104,6 +104,7 @@ def main_(argv=None):
             sys.flags = type(sys.flags)(flags)
             import __pypy__
             __pypy__.set_debug(False)
+            __pypy__.set_optimize(2)
         """)
 
     # call pypy_find_stdlib: the side-effect is that it sets sys.prefix and
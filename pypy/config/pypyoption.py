@@ -35,7 +35,7 @@ working_modules.update([
     "cStringIO", "thread", "itertools", "pyexpat", "_ssl", "cpyext", "array",
     "binascii", "_multiprocessing", '_warnings', "_collections",
     "_multibytecodec", "micronumpy", "_continuation", "_cffi_backend",
-    "_csv", "cppyy", "_pypyjson"
+    "_csv", "cppyy", "_pypyjson", "_codearchive"
 ])
 
 translation_modules = default_modules.copy()
@@ -79,6 +79,7 @@ if sys.platform == "sunos5":
 
 
 module_dependencies = {
+    '_codearchive': [('objspace.usemodules.time', True)],
     '_multiprocessing': [('objspace.usemodules.time', True),
                          ('objspace.usemodules.thread', True)],
     'cpyext': [('objspace.usemodules.array', True)],
@@ -153,6 +154,12 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
               cmdline="--ext",
               default=None),
 
+    StrOption("preimportmodules",
+              "Comma-separated list of app-level modules imported at "
+              "translation time, which become part of the executable",
+              cmdline="--preimport",
+              default=None),
+
     BoolOption("translationmodules",
           "use only those modules that are needed to run translate.py on pypy",
                default=False,
@@ -166,6 +173,10 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
                default=False,
                requires=[("objspace.usepycfiles", True)]),
 
+    BoolOption("lazycodeobjects",
+               "Decode the functions of pyc files only when they are used",
+               default=False),
+
     StrOption("soabi",
               "Tag to differentiate extension modules built for different Python interpreters",
               cmdline="--soabi",
@@ -198,6 +209,12 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
         BoolOption("withstrbuf", "use strings optimized for addition (ver 2)",
                    default=False),
 
+        BoolOption("withrope",
+                   "use ropes for str and unicode objects built by repeated "
+                   "addition or by slicing big ropes",
+                   default=False,
+                   requires=[("objspace.std.withstrbuf", False)]),
+
         BoolOption("withprebuiltchar",
                    "use prebuilt single-character string objects",
                    default=False),
@@ -222,6 +239,11 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
                    requires=[("objspace.std.getattributeshortcut", True),
                              ("objspace.std.withtypeversion", True),
                        ]),
+        BoolOption("withunboxedattrs",
+                   "store int and float attributes of instances unboxed, "
+                   "with 'withmapdict'",
+                   default=False,
+                   requires=[("objspace.std.withmapdict", True)]),
 
         BoolOption("withrangelist",
                    "enable special range list implementation that does not "
@@ -252,6 +274,10 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
         IntOption("methodcachesizeexp",
                   " 2 ** methodcachesizeexp is the size of the of the method cache ",
                   default=11),
+        IntOption("mapdictcacheways",
+                  "number of different maps remembered by each attribute "
+                  "lookup in the bytecode, with 'withmapdict'",
+                  default=4),
         BoolOption("intshortcut",
                    "special case addition and subtraction of two integers in BINARY_ADD/"
                    "/BINARY_SUBTRACT and their inplace counterparts",
@@ -259,6 +285,14 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
         BoolOption("optimized_list_getitem",
                    "special case the 'list[integer]' expressions",
                    default=False),
+        BoolOption("withframepool",
+                   "reuse the frame of a function that returned without "
+                   "its frame escaping",
+                   default=False),
+        BoolOption("withquickening",
+                   "run a copy of the bytecode in which frequent pairs of "
+                   "instructions are fused into superinstructions",
+                   default=False),
         BoolOption("getattributeshortcut",
                    "track types that override __getattribute__",
                    default=False,
@@ -183,6 +183,27 @@ def create_entry_point(space, w_dict):
                          'pypy_setup_home': pypy_setup_home}
 
 
+def preimport_modules(space, modulenames):
+    """NOT_RPYTHON: import the given app-level modules at translation time.
+    They end up in the prebuilt heap of the executable, together with their
+    dicts and code objects, and at run-time 'import' finds them directly in
+    sys.modules without loading or executing anything."""
+    from pypy.module.sys.initpath import pypy_find_stdlib
+    w_path = pypy_find_stdlib(space, pypydir)
+    w_names = space.newlist([space.wrap(name.strip())
+                             for name in modulenames])
+    space.appexec([w_path, w_names], """(path, names):
+        import sys
+        saved_path = sys.path[:]
+        sys.path[:] = path
+        try:
+            for name in names:
+                __import__(name)
+        finally:
+            sys.path[:] = saved_path
+    """)
+
+
 # _____ Define and setup target ___
 
 # for now this will do for option handling
@@ -302,6 +323,8 @@ class PyPyTarget(object):
         app = gateway.applevel(open(filename).read(), 'app_main.py', 'app_main')
         app.hidden_applevel = False
         w_dict = app.getwdict(space)
+        if config.objspace.preimportmodules:
+            preimport_modules(space, config.objspace.preimportmodules.split(','))
         entry_point, _ = create_entry_point(space, w_dict)
 
         return entry_point, None, PyPyAnnotatorPolicy(single_space = space)
@@ -12,7 +12,7 @@ Options and arguments (and corresponding environment variables):
 -i     : inspect interactively after running script; forces a prompt even
          if stdin does not appear to be a terminal; also PYTHONINSPECT=x
 -m mod : run library module as a script (terminates option list)
--O     : skip assert statements
+-O     : skip assert statements and optimize the compiled bytecode
 -OO    : remove docstrings when importing modules in addition to -O
 -R     : ignored (see http://bugs.python.org/issue14621)
 -Q arg : division options: -Qold (default), -Qwarn, -Qwarnall, -Qnew
@@ -481,6 +481,7 @@ def parse_command_line(argv):
         if sys.flags.optimize >= 1:
             import __pypy__
             __pypy__.set_debug(False)
+            __pypy__.set_optimize(sys.flags.optimize)
 
         if sys.py3kwarning:
             print >> sys.stderr, (
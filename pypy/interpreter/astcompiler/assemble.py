@@ -296,6 +296,32 @@ class PythonCodeMaker(ast.ASTVisitor):
             self.lineno = lineno
             self.lineno_set = False
 
+    def _optimize_blocks(self, blocks):
+        """Peephole optimizations done with -O, on the blocks in the order
+        where they will be written."""
+        for block in blocks:
+            _remove_unreachable_instructions(block)
+            _remove_store_load(block)
+        targets = {}
+        for block in blocks:
+            for instr in block.instructions:
+                if instr.has_jump:
+                    target, absolute = instr.jump
+                    if instr.opcode in _threadable_jumps:
+                        target = _thread_jump(target)
+                        instr.jump = (target, absolute)
+                    targets[target] = None
+        # the jumps that were threaded may leave dead blocks behind
+        reachable = True
+        for block in blocks:
+            if block in targets:
+                reachable = True
+            if not reachable:
+                del block.instructions[:]
+            elif (block.instructions and
+                  block.instructions[-1].opcode in _unconditional_exits):
+                reachable = False
+
     def _resolve_block_targets(self, blocks):
         """Compute the arguments of jump instructions."""
         last_extended_arg_count = 0
@@ -478,6 +504,8 @@ class PythonCodeMaker(ast.ASTVisitor):
             else:
                 self.first_lineno = 1
         blocks = self.first_block.post_order()
+        if self.compile_info.optimize >= 1:
+            self._optimize_blocks(blocks)
         self._resolve_block_targets(blocks)
         lnotab = self._build_lnotab(blocks)
         stack_depth = self._stacksize(blocks)
@@ -506,6 +534,78 @@ class PythonCodeMaker(ast.ASTVisitor):
                       self.compile_info.hidden_applevel)
 
 
+_unconditional_exits = {
+    ops.JUMP_ABSOLUTE: None,
+    ops.JUMP_FORWARD: None,
+    ops.RETURN_VALUE: None,
+    ops.RAISE_VARARGS: None,
+    ops.BREAK_LOOP: None,
+    ops.CONTINUE_LOOP: None,
+}
+
+# jumps that can be redirected to another place where the code does the
+# same thing.  The relative jumps are not in the list, except JUMP_FORWARD
+# which is only threaded through other JUMP_FORWARDs.
+_threadable_jumps = {
+    ops.JUMP_FORWARD: None,
+    ops.JUMP_ABSOLUTE: None,
+    ops.POP_JUMP_IF_FALSE: None,
+    ops.POP_JUMP_IF_TRUE: None,
+    ops.JUMP_IF_FALSE_OR_POP: None,
+    ops.JUMP_IF_TRUE_OR_POP: None,
+}
+
+
+def _remove_unreachable_instructions(block):
+    """Remove the instructions after a jump, a return or a raise."""
+    instructions = block.instructions
+    for i in range(len(instructions) - 1):
+        if instructions[i].opcode in _unconditional_exits:
+            del instructions[i + 1:]
+            break
+
+
+def _remove_store_load(block):
+    """Turn 'STORE_FAST x; LOAD_FAST x' into 'DUP_TOP; STORE_FAST x'."""
+    instructions = block.instructions
+    lineno = 0
+    for i in range(len(instructions) - 1):
+        store = instructions[i]
+        load = instructions[i + 1]
+        if store.lineno:
+            lineno = store.lineno
+        # don't move the start of a line
+        if (store.opcode == ops.STORE_FAST and
+                load.opcode == ops.LOAD_FAST and
+                store.arg == load.arg and
+                (load.lineno == 0 or load.lineno == lineno)):
+            load.opcode = ops.DUP_TOP
+            load.arg = 0
+            load.lineno = store.lineno
+            store.lineno = 0
+            instructions[i] = load
+            instructions[i + 1] = store
+
+
+def _thread_jump(target):
+    """Return the block where a jump to 'target' really continues.
+
+    Empty blocks and JUMP_FORWARDs are skipped, but not the JUMP_ABSOLUTEs:
+    they are the backward jumps of the loops, where the JIT looks for
+    loops.  Loops of jumps are stopped by the counter.
+    """
+    for i in range(100):
+        if not target.instructions:
+            if target.next_block is None:
+                break
+            target = target.next_block
+        elif target.instructions[0].opcode == ops.JUMP_FORWARD:
+            target = target.instructions[0].jump[0]
+        else:
+            break
+    return target
+
+
 def _list_from_dict(d, offset=0):
     result = [None] * len(d)
     for obj, index in d.iteritems():
@@ -42,6 +42,10 @@ operator_map = misc.dict_to_switch({
 })
 
 
+def _is_test(node):
+    return node.type >= 256 and node.type != syms.sliceop
+
+
 class ASTBuilder(object):
 
     def __init__(self, space, n, compile_info):
@@ -848,16 +852,17 @@ class ASTBuilder(object):
         # Fold '-' on constant numbers.
         if factor_node.children[0].type == tokens.MINUS and \
                 len(factor_node.children) == 2:
-            factor = factor_node.children[1]
-            if factor.type == syms.factor and len(factor.children) == 1:
-                power = factor.children[0]
-                if power.type == syms.power and len(power.children) == 1:
-                    atom = power.children[0]
-                    if atom.type == syms.atom and \
-                            atom.children[0].type == tokens.NUMBER:
-                        num = atom.children[0]
-                        num.value = "-" + num.value
-                        return self.handle_atom(atom)
+            power = factor_node.children[1]
+            if power.type == syms.factor and len(power.children) == 1:
+                # not in a compact parse tree
+                power = power.children[0]
+            if power.type == syms.power and len(power.children) == 1:
+                atom = power.children[0]
+                if atom.type == syms.atom and \
+                        atom.children[0].type == tokens.NUMBER:
+                    num = atom.children[0]
+                    num.value = "-" + num.value
+                    return self.handle_atom(atom)
         expr = self.handle_expr(factor_node.children[1])
         op_type = factor_node.children[0].type
         if op_type == tokens.PLUS:
@@ -882,32 +887,35 @@ class ASTBuilder(object):
             tmp_atom_expr.lineno = atom_expr.lineno
             tmp_atom_expr.col_offset = atom_expr.col_offset
             atom_expr = tmp_atom_expr
-        if power_node.children[-1].type == syms.factor:
+        if (len(power_node.children) >= 3 and
+                power_node.children[-2].type == tokens.DOUBLESTAR):
             right = self.handle_expr(power_node.children[-1])
             atom_expr = ast.BinOp(atom_expr, ast.Pow, right, power_node.lineno,
                                   power_node.column)
         return atom_expr
 
     def handle_slice(self, slice_node):
+        # the tests are nodes of any of the expression types in a compact
+        # parse tree: tell them from the tokens and the sliceop
         first_child = slice_node.children[0]
         if first_child.type == tokens.DOT:
             return ast.Ellipsis()
-        if len(slice_node.children) == 1 and first_child.type == syms.test:
+        if len(slice_node.children) == 1 and first_child.type >= 256:
             index = self.handle_expr(first_child)
             return ast.Index(index)
         lower = None
         upper = None
         step = None
-        if first_child.type == syms.test:
+        if first_child.type >= 256:
             lower = self.handle_expr(first_child)
         if first_child.type == tokens.COLON:
             if len(slice_node.children) > 1:
                 second_child = slice_node.children[1]
-                if second_child.type == syms.test:
+                if _is_test(second_child):
                     upper = self.handle_expr(second_child)
         elif len(slice_node.children) > 2:
             third_child = slice_node.children[2]
-            if third_child.type == syms.test:
+            if _is_test(third_child):
                 upper = self.handle_expr(third_child)
         last_child = slice_node.children[-1]
         if last_child.type == syms.sliceop:
@@ -916,7 +924,7 @@ class ASTBuilder(object):
                                 last_child.column)
             else:
                 step_child = last_child.children[1]
-                if step_child.type == syms.test:
+                if step_child.type >= 256:
                     step = self.handle_expr(step_child)
         return ast.Slice(lower, upper, step)
 
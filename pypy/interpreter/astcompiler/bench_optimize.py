@@ -0,0 +1,97 @@
+""" Interpreter throughput of the bytecode compiled with and without the
+-O optimizations of the compiler (jump threading, dead code removal,
+STORE_FAST/LOAD_FAST pairs, constant comparisons), and the size of the
+bytecode.  Both are compiled in the same process with
+__pypy__.set_optimize().  Run it with a translated pypy, with and
+without --jit off.
+"""
+
+import time
+import __pypy__
+
+SOURCE = '''
+DEBUG = False
+
+def branches(n):
+    total = 0
+    for i in xrange(n):
+        if i & 1:
+            x = i * 2
+            total += x
+        elif i & 2:
+            total -= 1
+        else:
+            continue
+        while True:
+            if total > 1000:
+                total = 0
+            break
+    return total
+
+def stores(n):
+    total = 0
+    for i in xrange(n):
+        # the pass only applies inside of a line
+        a = i + 1; b = a * 3; c = b - a; total = total + c
+    return total
+
+def folded(n):
+    total = 0
+    for i in xrange(n):
+        if 1 < 2 < 3:
+            total += i
+        x = 'a' if 0 > 1 else 'b'
+        if len(x) == 1:
+            total += 1
+    return total
+
+def dead_code(n):
+    def f(i):
+        if i:
+            return i
+        else:
+            return -i
+        return 0
+    total = 0
+    for i in xrange(n):
+        total += f(i)
+    return total
+'''
+
+def count_operation(name, function, repeat=1):
+    t0 = time.time()
+    for i in xrange(repeat):
+        retval = function()
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    return retval
+
+def compile_functions(optimize):
+    __pypy__.set_optimize(optimize)
+    try:
+        code = compile(SOURCE, 'bench_optimize', 'exec')
+    finally:
+        __pypy__.set_optimize(0)
+    d = {}
+    exec code in d
+    return d
+
+def code_size(func):
+    size = len(func.func_code.co_code)
+    for const in func.func_code.co_consts:
+        if hasattr(const, 'co_code'):
+            size += len(const.co_code)
+    return size
+
+def bench_optimize(N=1000000, REPEAT=5):
+    plain = compile_functions(0)
+    optimized = compile_functions(1)
+    for name in ['branches', 'stores', 'folded', 'dead_code']:
+        print '%s: %d bytes of bytecode without -O, %d with -O' % (
+            name, code_size(plain[name]), code_size(optimized[name]))
+        assert plain[name](1000) == optimized[name](1000)
+        count_operation("  without -O", lambda: plain[name](N), REPEAT)
+        count_operation("  with -O", lambda: optimized[name](N), REPEAT)
+
+if __name__ == '__main__':
+    bench_optimize()
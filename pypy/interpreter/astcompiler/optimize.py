@@ -143,6 +143,41 @@ for folder in binary_folders.values() + unary_folders.values():
     folder._always_inline_ = 'try'
 del folder
 
+def _fold_in(space, left, right):
+    return space.contains(right, left)
+
+def _fold_not_in(space, left, right):
+    return space.wrap(not space.is_true(space.contains(right, left)))
+
+
+def _contains_unicode(space, w_const):
+    if space.isinstance_w(w_const, space.w_unicode):
+        return True
+    if space.isinstance_w(w_const, space.w_tuple):
+        for w_item in space.fixedview(w_const):
+            if _contains_unicode(space, w_item):
+                return True
+    return False
+
+
+# 'is' and 'is not' are not folded: the identity of constants is an
+# implementation detail
+compare_folders = {
+    ast.Eq : _binary_fold("eq"),
+    ast.NotEq : _binary_fold("ne"),
+    ast.Lt : _binary_fold("lt"),
+    ast.LtE : _binary_fold("le"),
+    ast.Gt : _binary_fold("gt"),
+    ast.GtE : _binary_fold("ge"),
+    ast.In : _fold_in,
+    ast.NotIn : _fold_not_in,
+}
+unrolling_compare_folders = unrolling_iterable(compare_folders.items())
+
+for folder in compare_folders.values():
+    folder._always_inline_ = 'try'
+del folder
+
 opposite_compare_operations = misc.dict_to_switch({
     ast.Is : ast.IsNot,
     ast.IsNot : ast.Is,
@@ -152,7 +187,12 @@ opposite_compare_operations = misc.dict_to_switch({
 
 
 class OptimizingVisitor(ast.ASTVisitor):
-    """Constant folds AST."""
+    """Constant folds AST.
+
+    With -O, comparisons of constants and conditional expressions with a
+    constant test are folded too, which lets the code generator drop the
+    dead branches of 'if' and 'while' statements depending on them.
+    """
 
     def __init__(self, space, compile_info):
         self.space = space
@@ -246,6 +286,49 @@ class OptimizingVisitor(ast.ASTVisitor):
             return values[0]
         return bop
 
+    def visit_Compare(self, compare):
+        if self.compile_info.optimize < 1:
+            return compare
+        space = self.space
+        w_left = compare.left.as_constant()
+        if w_left is None:
+            return compare
+        # like at runtime, stop at the first false comparison of a chain:
+        # the remaining operands don't need to be constants
+        w_result = space.w_True
+        for i in range(len(compare.ops)):
+            op = compare.ops[i]
+            w_right = compare.comparators[i].as_constant()
+            if w_right is None:
+                return compare
+            # comparing str and unicode may emit a UnicodeWarning
+            if (_contains_unicode(space, w_left) or
+                    _contains_unicode(space, w_right)):
+                return compare
+            try:
+                for op_kind, folder in unrolling_compare_folders:
+                    if op_kind == op:
+                        w_result = folder(space, w_left, w_right)
+                        break
+                else:
+                    return compare
+            # Let all errors be found at runtime.
+            except OperationError:
+                return compare
+            if not space.is_true(w_result):
+                break
+            w_left = w_right
+        return ast.Const(w_result, compare.lineno, compare.col_offset)
+
+    def visit_IfExp(self, ifexp):
+        if self.compile_info.optimize >= 1:
+            truth = ifexp.test.as_constant_truth(self.space)
+            if truth == CONST_TRUE:
+                return ifexp.body
+            elif truth == CONST_FALSE:
+                return ifexp.orelse
+        return ifexp
+
     def visit_Repr(self, rep):
         w_const = rep.value.as_constant()
         if w_const is not None:
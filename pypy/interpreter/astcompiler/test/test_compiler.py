@@ -6,16 +6,18 @@ from pypy.interpreter.pycode import PyCode
 from pypy.interpreter.pyparser.error import SyntaxError, IndentationError
 from pypy.tool import stdlib_opcode as ops
 
-def compile_with_astcompiler(expr, mode, space):
+def compile_with_astcompiler(expr, mode, space, optimize_level=0):
     p = pyparse.PythonParser(space)
-    info = pyparse.CompileInfo("<test>", mode)
+    info = pyparse.CompileInfo("<test>", mode, optimize=optimize_level)
     cst = p.parse_source(expr, info)
     ast = astbuilder.ast_from_node(space, cst, info)
+    if optimize_level:
+        ast = optimize.optimize_ast(space, ast, info)
     return codegen.compile_ast(space, ast, info)
 
-def generate_function_code(expr, space):
+def generate_function_code(expr, space, optimize_level=0):
     p = pyparse.PythonParser(space)
-    info = pyparse.CompileInfo("<test>", 'exec')
+    info = pyparse.CompileInfo("<test>", 'exec', optimize=optimize_level)
     cst = p.parse_source(expr, info)
     ast = astbuilder.ast_from_node(space, cst, info)
     function_ast = optimize.optimize_ast(space, ast.body[0], info)
@@ -24,6 +26,8 @@ def generate_function_code(expr, space):
     generator = codegen.FunctionCodeGenerator(
         space, 'function', function_ast, 1, symbols, info)
     blocks = generator.first_block.post_order()
+    if optimize_level:
+        generator._optimize_blocks(blocks)
     generator._resolve_block_targets(blocks)
     return generator, blocks
 
@@ -35,11 +39,14 @@ class TestCompiler:
     the compiler.
     """
 
+    optimize_level = 0
+
     def run(self, source):
         import sys
         source = str(py.code.Source(source))
         space = self.space
-        code = compile_with_astcompiler(source, 'exec', space)
+        code = compile_with_astcompiler(source, 'exec', space,
+                                        self.optimize_level)
         # 2.7 bytecode is too different, the standard `dis` module crashes
         # on older cpython versions
         if sys.version_info >= (2, 7):
@@ -865,6 +872,11 @@ class TestCompiler:
             space.call_function(w_set_debug, space.w_True)
 
 
+class TestCompilerOptimized(TestCompiler):
+    """The same tests, compiled with the extra optimizations of -O."""
+    optimize_level = 1
+
+
 class AppTestCompiler:
 
     def setup_class(cls):
@@ -927,8 +939,9 @@ class AppTestCompiler:
 
 
 class TestOptimizations:
-    def count_instructions(self, source):
-        code, blocks = generate_function_code(source, self.space)
+    def count_instructions(self, source, optimize_level=0):
+        code, blocks = generate_function_code(source, self.space,
+                                              optimize_level)
         instrs = []
         for block in blocks:
             instrs.extend(block.instructions)
@@ -1080,3 +1093,95 @@ class TestOptimizations:
             counts = self.count_instructions(source)
             assert ops.BUILD_SET not in counts
             assert ops.LOAD_CONST in counts
+
+    def test_fold_constant_compare(self):
+        source = """def f(x):
+            if 1 < 2 <= 2:
+                return x
+            return 5
+        """
+        counts = self.count_instructions(source)
+        assert ops.COMPARE_OP in counts
+        counts = self.count_instructions(source, optimize_level=1)
+        assert counts == {ops.LOAD_FAST: 1, ops.RETURN_VALUE: 1}
+        for source in ("def f(): return 3 in (1, 2)",
+                       "def f(): return 'a' == 'a' != 'b'",
+                       "def f(): return 1 > 2 < x"):
+            counts = self.count_instructions(source, optimize_level=1)
+            assert ops.COMPARE_OP not in counts
+        for source in ("def f(): return 1 is 1",
+                       "def f(): return 1 < x",
+                       "def f(): return u'a' == 'a'",
+                       "def f(): return 1j < 2j"):
+            counts = self.count_instructions(source, optimize_level=1)
+            assert ops.COMPARE_OP in counts
+
+    def test_fold_constant_ifexp(self):
+        source = """def f(x, y):
+            return x if 1 == 1 else y
+        """
+        counts = self.count_instructions(source, optimize_level=1)
+        assert counts == {ops.LOAD_FAST: 1, ops.RETURN_VALUE: 1}
+
+    def test_thread_jumps(self):
+        source = """def f(x, y):
+            if x:
+                if y:
+                    a = 1
+                else:
+                    a = 2
+            else:
+                a = 3
+            g(a)
+        """
+        code, blocks = generate_function_code(source, self.space,
+                                              optimize_level=1)
+        jumps = [instr for block in blocks for instr in block.instructions
+                 if instr.opcode == ops.JUMP_FORWARD]
+        # the inner 'if' jumps directly to the end, not to the jump
+        # at the end of the outer 'if'
+        assert len(jumps) == 2
+        assert jumps[0].jump[0] is jumps[1].jump[0]
+
+    def test_dont_thread_loop_jumps(self):
+        source = """def f(x):
+            while x:
+                if x:
+                    x -= 1
+            return x
+        """
+        code, blocks = generate_function_code(source, self.space,
+                                              optimize_level=1)
+        # the JIT needs the loops to go back with a JUMP_ABSOLUTE: the
+        # conditional jumps must not be threaded to the start of the loop
+        offset = 0
+        for block in blocks:
+            for instr in block.instructions:
+                offset += instr.size()
+                if instr.opcode == ops.POP_JUMP_IF_FALSE:
+                    assert instr.arg > offset
+
+    def test_remove_dead_code_after_jump(self):
+        source = """def f(x):
+            while x:
+                continue
+                x += 1
+        """
+        counts = self.count_instructions(source)
+        assert ops.INPLACE_ADD in counts
+        counts = self.count_instructions(source, optimize_level=1)
+        assert ops.INPLACE_ADD not in counts
+
+    def test_store_load(self):
+        source = """def f(x):
+            y = x; return y
+        """
+        counts = self.count_instructions(source, optimize_level=1)
+        assert counts == {ops.LOAD_FAST: 1, ops.DUP_TOP: 1,
+                          ops.STORE_FAST: 1, ops.RETURN_VALUE: 1}
+        source = """def f(x):
+            y = x
+            return y
+        """
+        counts = self.count_instructions(source, optimize_level=1)
+        assert ops.DUP_TOP not in counts
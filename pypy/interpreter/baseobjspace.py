@@ -685,6 +685,14 @@ class ObjSpace(object):
 
     def createframe(self, code, w_globals, outer_func=None):
         "Create an empty PyFrame suitable for this code object."
+        if (self.config.objspace.std.withframepool and
+                not jit.we_are_jitted()):
+            from pypy.interpreter.pycode import PyCode
+            assert isinstance(code, PyCode)
+            frame = code.take_free_frame()
+            if frame is not None:
+                frame.reinit(w_globals, outer_func)
+                return frame
         return self.FrameClass(self, code, w_globals, outer_func)
 
     def allocate_lock(self):
@@ -1020,6 +1028,15 @@ class ObjSpace(object):
     def newlist_int(self, list_i):
         return self.newlist([self.wrap(i) for i in list_i])
 
+    def newlist_float(self, list_f):
+        return self.newlist([self.wrap(f) for f in list_f])
+
+    def newdict_unicode_keys(self, list_u, values_w):
+        w_dict = self.newdict()
+        for i in range(len(list_u)):
+            self.setitem(w_dict, self.wrap(list_u[i]), values_w[i])
+        return w_dict
+
     def newlist_hint(self, sizehint):
         from pypy.objspace.std.listobject import make_empty_list_with_size
         return make_empty_list_with_size(self, sizehint)
@@ -6,6 +6,7 @@ from rpython.rlib import jit
 TICK_COUNTER_STEP = 100
 
 def app_profile_call(space, w_callable, frame, event, w_arg):
+    frame.mark_as_escaped()
     space.call_function(w_callable,
                         space.wrap(frame),
                         space.wrap(event), w_arg)
@@ -318,6 +319,7 @@ class ExecutionContext(object):
                                      space.wrap(operr.get_traceback())])
 
             frame.fast2locals()
+            frame.mark_as_escaped()
             self.is_tracing += 1
             try:
                 try:
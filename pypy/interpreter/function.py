@@ -73,6 +73,16 @@ class Function(W_Root):
             return jit.promote(self.code)
         return self.code
 
+    def getcode_decoded(self):
+        """Like getcode(), but decodes a LazyPyCode, for the places where
+        the code object becomes visible at app-level."""
+        from pypy.interpreter.pycode import LazyPyCode
+        code = self.code
+        if isinstance(code, LazyPyCode):
+            code = code.decode()
+            self.code = code
+        return code
+
     def funccall(self, *args_w): # speed hack
         from pypy.interpreter import gateway
         from pypy.interpreter.pycode import PyCode
@@ -272,7 +282,7 @@ class Function(W_Root):
         from pypy.interpreter.mixedmodule import MixedModule
         w_mod = space.getbuiltinmodule('_pickle_support')
         mod = space.interp_w(MixedModule, w_mod)
-        code = self.code
+        code = self.getcode_decoded()
         if isinstance(code, BuiltinCode):
             new_inst = mod.get('builtin_function')
             return space.newtuple([new_inst,
@@ -302,7 +312,7 @@ class Function(W_Root):
         tup_state = [
             w(self.name),
             w_doc,
-            w(self.code),
+            w(code),
             w_func_globals,
             w_closure,
             nt(self.defs_w),
@@ -401,7 +411,7 @@ class Function(W_Root):
         self.w_module = space.w_None
 
     def fget_func_code(self, space):
-        return space.wrap(self.code)
+        return space.wrap(self.getcode_decoded())
 
     def fset_func_code(self, space, w_code):
         from pypy.interpreter.pycode import PyCode
@@ -119,6 +119,8 @@ class PyCode(eval.Code):
             self._args_as_cellvars = []
 
         self._compute_flatcall()
+        self._quickened_code = None
+        self._free_frame = None
 
         if self.space.config.objspace.std.withmapdict:
             from pypy.objspace.std.mapdict import init_mapdict_cache
@@ -134,6 +136,36 @@ class PyCode(eval.Code):
     def signature(self):
         return self._signature
 
+    def get_quickened_code(self):
+        """Return the bytecode run by the interpreter with the
+        'withquickening' option: co_code with superinstructions."""
+        code = self._quickened_code
+        if code is None:
+            code = self._quicken()
+        return code
+
+    @jit.dont_look_inside
+    def _quicken(self):
+        from pypy.interpreter.quickening import quicken
+        code = quicken(self.co_code, self.co_lnotab)
+        self._quickened_code = code
+        return code
+
+    @jit.dont_look_inside
+    def take_free_frame(self):
+        """With the 'withframepool' option: return the frame kept for reuse
+        by release_frame(), or None."""
+        frame = self._free_frame
+        self._free_frame = None
+        return frame
+
+    @jit.dont_look_inside
+    def release_frame(self, frame):
+        """Keep 'frame', a frame of this code object which returned and
+        which nothing references any more, for the next call."""
+        frame.clear_for_reuse()
+        self._free_frame = frame
+
     @classmethod
     def _from_code(cls, space, code, hidden_applevel=False, code_hook=None):
         """
@@ -219,12 +251,29 @@ class PyCode(eval.Code):
         for w_co in self.co_consts_w:
             if isinstance(w_co, PyCode):
                 w_co.remove_docstrings(space)
+            elif isinstance(w_co, LazyPyCode):
+                w_co.remove_docstrings(space)
+
+    def get_consts_w(self):
+        """The constants, with the nested code objects that are still
+        marshalled decoded (see LazyPyCode)."""
+        consts_w = self.co_consts_w
+        result_w = None
+        for i in range(len(consts_w)):
+            w_const = consts_w[i]
+            if isinstance(w_const, LazyPyCode):
+                if result_w is None:
+                    result_w = consts_w[:]
+                result_w[i] = w_const.decode()
+        if result_w is None:
+            return consts_w
+        return result_w
 
     def _to_code(self):
         """For debugging only."""
         consts = [None] * len(self.co_consts_w)
         num = 0
-        for w in self.co_consts_w:
+        for w in self.get_consts_w():
             if isinstance(w, PyCode):
                 consts[num] = w._to_code()
             else:
@@ -258,7 +307,7 @@ class PyCode(eval.Code):
         dis.dis(co)
 
     def fget_co_consts(self, space):
-        return space.newtuple(self.co_consts_w)
+        return space.newtuple(self.get_consts_w())
 
     def fget_co_names(self, space):
         return space.newtuple(self.co_names_w)
@@ -294,8 +343,10 @@ class PyCode(eval.Code):
             if not space.eq_w(self.co_names_w[i], w_other.co_names_w[i]):
                 return space.w_False
 
-        for i in range(len(self.co_consts_w)):
-            if not space.eq_w(self.co_consts_w[i], w_other.co_consts_w[i]):
+        consts_w = self.get_consts_w()
+        other_consts_w = w_other.get_consts_w()
+        for i in range(len(consts_w)):
+            if not space.eq_w(consts_w[i], other_consts_w[i]):
                 return space.w_False
 
         return space.w_True
@@ -314,7 +365,7 @@ class PyCode(eval.Code):
         w_result = space.wrap(intmask(result))
         for w_name in self.co_names_w:
             w_result = space.xor(w_result, space.hash(w_name))
-        for w_const in self.co_consts_w:
+        for w_const in self.get_consts_w():
             w_result = space.xor(w_result, space.hash(w_const))
         return w_result
 
@@ -365,7 +416,7 @@ class PyCode(eval.Code):
             w(self.co_stacksize),
             w(self.co_flags),
             w(self.co_code),
-            space.newtuple(self.co_consts_w),
+            space.newtuple(self.get_consts_w()),
             space.newtuple(self.co_names_w),
             space.newtuple([w(v) for v in self.co_varnames]),
             w(self.co_filename),
@@ -384,3 +435,91 @@ class PyCode(eval.Code):
 
     def repr(self, space):
         return space.wrap(self.get_repr())
+
+
+class LazyPyCodeState(object):
+    # the mutable part of a LazyPyCode
+    def __init__(self, bufstr, pos, stringtable_w, stringcount):
+        self.bufstr = bufstr            # the marshal data
+        self.pos = pos                  # where the code object starts
+        self.stringtable_w = stringtable_w
+        self.stringcount = stringcount  # interned strings seen before pos
+        self.code = None
+        self.remove_docstrings = False
+        self.old_filename = None
+        self.new_filename = None
+
+
+class LazyPyCode(eval.Code):
+    """A code object found in the constants of a code object loaded from
+    a .pyc file with the 'lazycodeobjects' option, and kept marshalled.
+    It is decoded into a PyCode when its function is called for the
+    first time, or when it is inspected.  It is never seen at app-level.
+    """
+
+    def __init__(self, space, name, bufstr, pos, stringtable_w, stringcount):
+        eval.Code.__init__(self, name)
+        self.space = space
+        self.state = LazyPyCodeState(bufstr, pos, stringtable_w, stringcount)
+
+    @jit.dont_look_inside
+    def decode(self):
+        state = self.state
+        code = state.code
+        if code is None:
+            from pypy.objspace.std.marshal_impl import unmarshal_lazy_pycode
+            code = unmarshal_lazy_pycode(self.space, state.bufstr, state.pos,
+                                         state.stringtable_w,
+                                         state.stringcount)
+            if state.remove_docstrings:
+                code.remove_docstrings(self.space)
+            if state.new_filename is not None:
+                from pypy.module.imp.importing import update_code_filenames
+                update_code_filenames(self.space, code, state.new_filename,
+                                      state.old_filename)
+            state.code = code
+            # the marshal data is no longer needed
+            state.bufstr = None
+            state.stringtable_w = None
+        return code
+
+    def remove_docstrings(self, space):
+        state = self.state
+        if state.code is not None:
+            state.code.remove_docstrings(space)
+        else:
+            state.remove_docstrings = True
+
+    def update_filename(self, old_filename, new_filename):
+        state = self.state
+        if state.code is not None:
+            from pypy.module.imp.importing import update_code_filenames
+            update_code_filenames(self.space, state.code, new_filename,
+                                  old_filename)
+        elif state.new_filename is None:
+            state.old_filename = old_filename
+            state.new_filename = new_filename
+        elif state.new_filename == old_filename:
+            state.new_filename = new_filename
+
+    def signature(self):
+        return self.decode().signature()
+
+    def getvarnames(self):
+        return self.decode().getvarnames()
+
+    def getdocstring(self, space):
+        return self.decode().getdocstring(space)
+
+    def funcrun(self, func, args):
+        code = self.decode()
+        func.code = code    # the next calls go directly to the PyCode
+        return code.funcrun(func, args)
+
+    def funcrun_obj(self, func, w_obj, args):
+        code = self.decode()
+        func.code = code
+        return code.funcrun_obj(func, w_obj, args)
+
+    def get_repr(self):
+        return "<undecoded code object %s>" % (self.co_name,)
@@ -102,7 +102,8 @@ class PythonAstCompiler(PyCodeCompiler):
     def __init__(self, space, override_version=None):
         PyCodeCompiler.__init__(self, space)
         self.future_flags = future.futureFlags_2_7
-        self.parser = pyparse.PythonParser(space, self.future_flags)
+        self.parser = pyparse.PythonParser(space, self.future_flags,
+                                           compact_tree=True)
         self.additional_rules = {}
         self.compiler_flags = self.future_flags.allowed_flags
 
@@ -123,7 +124,8 @@ class PythonAstCompiler(PyCodeCompiler):
         f_flags, f_lineno, f_col = fut
         future_pos = f_lineno, f_col
         flags |= f_flags
-        info = pyparse.CompileInfo(filename, mode, flags, future_pos)
+        info = pyparse.CompileInfo(filename, mode, flags, future_pos,
+                                   optimize=self.space.sys.optimize)
         return self._compile_ast(node, info)
 
     def _compile_ast(self, node, info):
@@ -155,6 +157,7 @@ class PythonAstCompiler(PyCodeCompiler):
 
     def compile(self, source, filename, mode, flags, hidden_applevel=False):
         info = pyparse.CompileInfo(filename, mode, flags,
-                                   hidden_applevel=hidden_applevel)
+                                   hidden_applevel=hidden_applevel,
+                                   optimize=self.space.sys.optimize)
         mod = self._compile_to_ast(source, info)
         return self._compile_ast(mod, info)
@@ -80,6 +80,37 @@ class PyFrame(W_Root):
         self.initialize_frame_scopes(outer_func, code)
         self.f_lineno = code.co_firstlineno
 
+    def reinit(self, w_globals, outer_func):
+        """Reset a frame made by a previous call of the same code object,
+        as if it was newly created.  See PyCode.take_free_frame()."""
+        code = self.pycode
+        self.w_globals = w_globals
+        self.w_locals = None
+        self.valuestackdepth = code.co_nlocals
+        self.lastblock = None
+        self.frame_finished_execution = False
+        self.last_instr = -1
+        self.last_exception = None
+        self.f_backref = jit.vref_None
+        self.w_f_trace = None
+        self.instr_lb = 0
+        self.instr_ub = 0
+        self.instr_prev_plus_one = 0
+        self.is_being_profiled = False
+        if self.space.config.objspace.honor__builtins__:
+            self.builtin = self.space.builtin.pick_builtin(w_globals)
+        self.initialize_frame_scopes(outer_func, code)
+        self.f_lineno = code.co_firstlineno
+
+    def clear_for_reuse(self):
+        """Drop the references kept by a frame that will be reused."""
+        locals_stack_w = self.locals_stack_w
+        for i in range(len(locals_stack_w)):
+            locals_stack_w[i] = None
+        self.w_locals = None
+        self.cells = self._NO_CELLS
+        self.f_backref = jit.vref_None
+
     def mark_as_escaped(self):
         """
         Must be called on frames that are exposed to applevel, e.g. by
@@ -175,7 +206,13 @@ class PyFrame(W_Root):
                 from pypy.interpreter.generator import GeneratorIterator
                 return self.space.wrap(GeneratorIterator(self))
         else:
-            return self.execute_frame()
+            w_exitvalue = self.execute_frame()
+            if (self.space.config.objspace.std.withframepool and
+                    not jit.we_are_jitted() and not self.escaped):
+                # the frame returned normally and was never seen by
+                # app-level code: nothing can reference it any more
+                self.pycode.release_frame(self)
+            return w_exitvalue
 
     def execute_frame(self, w_inputvalue=None, operr=None):
         """Execute this frame.  Main entry point to the interpreter.
@@ -11,7 +11,7 @@ from rpython.rlib.rarithmetic import r_uint, intmask
 from rpython.tool.sourcetools import func_with_new_name
 
 from pypy.interpreter import (
-    gateway, function, eval, pyframe, pytraceback, pycode
+    gateway, function, eval, pyframe, pytraceback, pycode, quickening
 )
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
@@ -56,6 +56,8 @@ class __extend__(pyframe.PyFrame):
         # For the sequel, force 'next_instr' to be unsigned for performance
         next_instr = r_uint(next_instr)
         co_code = pycode.co_code
+        if self.space.config.objspace.std.withquickening:
+            co_code = pycode.get_quickened_code()
 
         try:
             while True:
@@ -436,6 +438,41 @@ class __extend__(pyframe.PyFrame):
                 self.WITH_CLEANUP(oparg, next_instr)
             elif opcode == opcodedesc.YIELD_VALUE.index:
                 self.YIELD_VALUE(oparg, next_instr)
+            # superinstructions, only found in the quickened bytecode
+            elif opcode == quickening.LOAD_FAST_LOAD_FAST:
+                self.LOAD_FAST(oparg, next_instr)
+                oparg, next_instr = self.second_instruction(co_code,
+                                                            next_instr)
+                self.LOAD_FAST(oparg, next_instr)
+            elif opcode == quickening.LOAD_FAST_LOAD_ATTR:
+                self.LOAD_FAST(oparg, next_instr)
+                oparg, next_instr = self.second_instruction(co_code,
+                                                            next_instr)
+                self.LOAD_ATTR(oparg, next_instr)
+            elif opcode == quickening.LOAD_FAST_LOAD_CONST:
+                self.LOAD_FAST(oparg, next_instr)
+                oparg, next_instr = self.second_instruction(co_code,
+                                                            next_instr)
+                self.LOAD_CONST(oparg, next_instr)
+            elif opcode == quickening.LOAD_FAST_LOOKUP_METHOD:
+                self.LOAD_FAST(oparg, next_instr)
+                oparg, next_instr = self.second_instruction(co_code,
+                                                            next_instr)
+                self.LOOKUP_METHOD(oparg, next_instr)
+            elif opcode == quickening.STORE_FAST_LOAD_FAST:
+                self.STORE_FAST(oparg, next_instr)
+                oparg, next_instr = self.second_instruction(co_code,
+                                                            next_instr)
+                self.LOAD_FAST(oparg, next_instr)
+            elif opcode == quickening.LOAD_CONST_COMPARE_OP:
+                oparg2, next_instr = self.second_instruction(co_code,
+                                                             next_instr)
+                self.LOAD_CONST_COMPARE_OP(oparg, oparg2, next_instr)
+            elif opcode == quickening.LOAD_GLOBAL_CALL_FUNCTION:
+                self.LOAD_GLOBAL(oparg, next_instr)
+                oparg, next_instr = self.second_instruction(co_code,
+                                                            next_instr)
+                self.CALL_FUNCTION(oparg, next_instr)
             else:
                 self.MISSING_OPCODE(oparg, next_instr)
 
@@ -860,10 +897,16 @@ class __extend__(pyframe.PyFrame):
 
     def STORE_ATTR(self, nameindex, next_instr):
         "obj.attributename = newvalue"
-        w_attributename = self.getname_w(nameindex)
         w_obj = self.popvalue()
         w_newvalue = self.popvalue()
-        self.space.setattr(w_obj, w_attributename, w_newvalue)
+        if (self.space.config.objspace.std.withmapdict
+            and not jit.we_are_jitted()):
+            from pypy.objspace.std.mapdict import STORE_ATTR_caching
+            STORE_ATTR_caching(self.getcode(), w_obj, nameindex, w_newvalue)
+        else:
+            w_attributename = self.getname_w(nameindex)
+            self.space.setattr(w_obj, w_attributename, w_newvalue)
+    STORE_ATTR._always_inline_ = True
 
     def DELETE_ATTR(self, nameindex, next_instr):
         "del obj.attributename"
@@ -1223,7 +1266,7 @@ class __extend__(pyframe.PyFrame):
 
     def MAKE_FUNCTION(self, numdefaults, next_instr):
         w_codeobj = self.popvalue()
-        codeobj = self.space.interp_w(PyCode, w_codeobj)
+        codeobj = self.space.interp_w(eval.Code, w_codeobj)   # or LazyPyCode
         defaultarguments = self.popvalues(numdefaults)
         fn = function.Function(self.space, codeobj, self.w_globals,
                                defaultarguments)
@@ -1232,7 +1275,7 @@ class __extend__(pyframe.PyFrame):
     @jit.unroll_safe
     def MAKE_CLOSURE(self, numdefaults, next_instr):
         w_codeobj = self.popvalue()
-        codeobj = self.space.interp_w(pycode.PyCode, w_codeobj)
+        codeobj = self.space.interp_w(eval.Code, w_codeobj)   # or LazyPyCode
         w_freevarstuple = self.popvalue()
         freevars = [self.space.interp_w(Cell, cell)
                     for cell in self.space.fixedview(w_freevarstuple)]
@@ -1276,6 +1319,21 @@ class __extend__(pyframe.PyFrame):
     LOOKUP_METHOD = LOAD_ATTR
     CALL_METHOD = CALL_FUNCTION
 
+    def second_instruction(self, co_code, next_instr):
+        # decode the second instruction of a superinstruction, which is
+        # never an EXTENDED_ARG and always has an argument.  From now on
+        # the frame looks exactly like it would without quickening.
+        self.last_instr = intmask(next_instr)
+        lo = ord(co_code[next_instr + 1])
+        hi = ord(co_code[next_instr + 2])
+        return (hi * 256) | lo, next_instr + 3
+    second_instruction._always_inline_ = True
+
+    def LOAD_CONST_COMPARE_OP(self, constindex, testnum, next_instr):
+        # overridden by a faster version in the standard object space
+        self.LOAD_CONST(constindex, next_instr)
+        self.COMPARE_OP(testnum, next_instr)
+
     def MISSING_OPCODE(self, oparg, next_instr):
         ofs = self.last_instr
         c = self.pycode.co_code[ofs]
@@ -0,0 +1,49 @@
+""" compile() throughput in lines per second, over the modules of the
+standard library: to an AST only (tokenizer, parser and astbuilder) and
+to code objects.  Run it with a translated pypy, before and after a
+change to the parser or the compiler.
+"""
+
+import os, sys, time, _ast
+
+def load_sources(directory, limit):
+    sources = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.py'):
+            continue
+        with open(os.path.join(directory, name)) as f:
+            source = f.read()
+        try:
+            compile(source, name, 'exec', _ast.PyCF_ONLY_AST)
+        except SyntaxError:
+            continue     # e.g. the test files with bad syntax on purpose
+        sources.append((name, source))
+        if len(sources) == limit:
+            break
+    return sources
+
+def count_lines(name, sources, flags, repeat):
+    lines = 0
+    for filename, source in sources:
+        lines += source.count('\n')
+    t0 = time.time()
+    for i in xrange(repeat):
+        for filename, source in sources:
+            compile(source, filename, 'exec', flags)
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    print '  %d lines/sec' % (lines * repeat / (tk - t0))
+
+def bench_compile(LIMIT=200, REPEAT=5):
+    directory = os.path.dirname(os.__file__)
+    if len(sys.argv) > 1:
+        directory = sys.argv[1]
+    sources = load_sources(directory, LIMIT)
+    # warm up the JIT
+    count_lines("warmup", sources, 0, 1)
+    count_lines("parse to AST, %d modules" % len(sources), sources,
+                _ast.PyCF_ONLY_AST, REPEAT)
+    count_lines("compile, %d modules" % len(sources), sources, 0, REPEAT)
+
+if __name__ == '__main__':
+    bench_compile()
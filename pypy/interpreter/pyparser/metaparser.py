@@ -150,6 +150,7 @@ class ParserGenerator(object):
             gram.dfas.append((states, self.make_first(gram, name)))
             assert len(gram.dfas) - 1 == gram.symbol_ids[name] - 256
         gram.start = gram.symbol_ids[self.start_symbol]
+        gram.make_transitions()
         return gram
 
     def make_label(self, gram, label):
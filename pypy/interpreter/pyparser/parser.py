@@ -17,6 +17,7 @@ class Grammar(object):
         self.symbol_to_label = {}
         self.keyword_ids = {}
         self.dfas = []
+        self.transitions = []
         self.labels = [0]
         self.token_ids = {}
         self.start = -1
@@ -27,10 +28,36 @@ class Grammar(object):
         new.symbols_names = self.symbol_names
         new.keyword_ids = self.keyword_ids
         new.dfas = self.dfas
+        new.transitions = self.transitions
         new.labels = self.labels
         new.token_ids = self.token_ids
         return new
 
+    def make_transitions(self):
+        """Precompute the transition tables of the parser.
+
+        For every state of every dfa, the table maps each token label that
+        can be accepted in this state to the action to take, encoded as
+        'next_state | (symbol << 16)'.  The symbol is 0 if the token is
+        shifted, or the non-terminal to push if the token starts one.
+        """
+        self.transitions = []
+        for states, first in self.dfas:
+            dfa_transitions = []
+            for arcs, is_accepting in states:
+                table = {}
+                # like a walk of the arcs in order: the first arc wins
+                for i, next_state in arcs:
+                    sym_id = self.labels[i]
+                    if sym_id >= 256:
+                        for label in self.dfas[sym_id - 256][1]:
+                            if label not in table:
+                                table[label] = (sym_id << 16) | next_state
+                    elif i not in table:
+                        table[i] = next_state
+                dfa_transitions.append(table)
+            self.transitions.append(dfa_transitions)
+
     def _freeze_(self):
         # Remove some attributes not used in parsing.
         try:
@@ -82,12 +109,47 @@ class ParseError(Exception):
         return "ParserError(%s, %r)" % (self.token_type, self.value)
 
 
+class StackEntry(object):
+    """An entry of the parser stack, for a non-terminal being parsed: its
+    dfa, the current state in it, and its children.  The entries are
+    linked together and updated in place while the parser moves on.
+
+    The node of the non-terminal is only made when a second child is
+    added, or when the entry is popped: a non-terminal with a single child
+    may be replaced by this child (see Parser.passthrough)."""
+
+    def __init__(self, next, dfa, transitions, node_type, lineno, column):
+        self.next = next
+        self.dfa = dfa
+        self.transitions = transitions
+        self.state = 0
+        self.node_type = node_type
+        self.lineno = lineno
+        self.column = column
+        self.node = None
+        self.first_child = None
+
+    def add_child(self, child):
+        if self.node is not None:
+            self.node.children.append(child)
+        elif self.first_child is None:
+            self.first_child = child
+        else:
+            self.node = Node(self.node_type, None, [self.first_child, child],
+                             self.lineno, self.column)
+            self.first_child = None
+
+
 class Parser(object):
 
     def __init__(self, grammar):
         self.grammar = grammar
         self.root = None
         self.stack = None
+        # if not None, a list of flags indexed by the non-terminals: a
+        # flagged node with a single child which is also flagged is
+        # replaced by the child in the parse tree
+        self.passthrough = None
 
     def prepare(self, start=-1):
         """Setup the parser for parsing.
@@ -97,53 +159,50 @@ class Parser(object):
         if start == -1:
             start = self.grammar.start
         self.root = None
-        current_node = Node(start, None, [], 0, 0)
-        self.stack = []
-        self.stack.append((self.grammar.dfas[start - 256], 0, current_node))
+        self.stack = StackEntry(None, self.grammar.dfas[start - 256],
+                                self.grammar.transitions[start - 256],
+                                start, 0, 0)
 
     def add_token(self, token_type, value, lineno, column, line):
         label_index = self.classify(token_type, value, lineno, column, line)
-        sym_id = 0 # for the annotator
         while True:
-            dfa, state_index, node = self.stack[-1]
-            states, first = dfa
-            arcs, is_accepting = states[state_index]
-            for i, next_state in arcs:
-                sym_id = self.grammar.labels[i]
-                if label_index == i:
-                    # We matched a non-terminal.
+            entry = self.stack
+            action = entry.transitions[entry.state].get(label_index, -1)
+            if action >= 0:
+                next_state = action & 0xFFFF
+                sym_id = action >> 16
+                if sym_id == 0:
+                    # We matched a terminal.
                     self.shift(next_state, token_type, value, lineno, column)
-                    state = states[next_state]
+                    state = entry.dfa[0][next_state]
                     # While the only possible action is to accept, pop nodes off
                     # the stack.
                     while state[1] and not state[0]:
                         self.pop()
-                        if not self.stack:
+                        entry = self.stack
+                        if entry is None:
                             # Parsing is done.
                             return True
-                        dfa, state_index, node = self.stack[-1]
-                        state = dfa[0][state_index]
+                        state = entry.dfa[0][entry.state]
                     return False
-                elif sym_id >= 256:
-                    sub_node_dfa = self.grammar.dfas[sym_id - 256]
-                    # Check if this token can start a child node.
-                    if label_index in sub_node_dfa[1]:
-                        self.push(sub_node_dfa, next_state, sym_id, lineno,
-                                  column)
-                        break
+                else:
+                    # This token starts a child node.
+                    self.push(self.grammar.dfas[sym_id - 256], next_state,
+                              sym_id, lineno, column)
             else:
                 # We failed to find any arcs to another state, so unless this
                 # state is accepting, it's invalid input.
+                arcs, is_accepting = entry.dfa[0][entry.state]
                 if is_accepting:
                     self.pop()
-                    if not self.stack:
+                    if self.stack is None:
                         raise ParseError("too much input", token_type, value,
                                          lineno, column, line)
                 else:
                     # If only one possible input would satisfy, attach it to the
                     # error.
                     if len(arcs) == 1:
-                        expected = sym_id
+                        expected = self.grammar.labels[arcs[0][0]]
                     else:
                         expected = -1
                     raise ParseError("bad input", token_type, value, lineno,
@@ -163,22 +222,35 @@ class Parser(object):
 
     def shift(self, next_state, token_type, value, lineno, column):
         """Shift a non-terminal and prepare for the next state."""
-        dfa, state, node = self.stack[-1]
-        new_node = Node(token_type, value, None, lineno, column)
-        node.children.append(new_node)
-        self.stack[-1] = (dfa, next_state, node)
+        entry = self.stack
+        entry.add_child(Node(token_type, value, None, lineno, column))
+        entry.state = next_state
 
     def push(self, next_dfa, next_state, node_type, lineno, column):
         """Push a terminal and adjust the current state."""
-        dfa, state, node = self.stack[-1]
-        new_node = Node(node_type, None, [], lineno, column)
-        self.stack[-1] = (dfa, next_state, node)
-        self.stack.append((next_dfa, 0, new_node))
+        self.stack.state = next_state
+        self.stack = StackEntry(self.stack, next_dfa,
+                                self.grammar.transitions[node_type - 256],
+                                node_type, lineno, column)
 
     def pop(self):
         """Pop an entry off the stack and make its node a child of the last."""
-        dfa, state, node = self.stack.pop()
-        if self.stack:
-            self.stack[-1][2].children.append(node)
+        entry = self.stack
+        self.stack = entry.next
+        node = entry.node
+        if node is None:
+            child = entry.first_child
+            if child is None:
+                node = Node(entry.node_type, None, [], entry.lineno,
+                            entry.column)
+            elif (self.passthrough is not None and child.type >= 256 and
+                  self.passthrough[entry.node_type - 256] and
+                  self.passthrough[child.type - 256]):
+                node = child
+            else:
+                node = Node(entry.node_type, None, [child], entry.lineno,
+                            entry.column)
+        if self.stack is not None:
+            self.stack.add_child(node)
         else:
             self.root = node
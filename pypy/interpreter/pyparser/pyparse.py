@@ -66,16 +66,19 @@ class CompileInfo(object):
       import.
     * hidden_applevel: Will this code unit and sub units be hidden at the
       applevel?
+    * optimize: The optimization level, as given by the -O options.  Above 0
+      the compiler runs extra optimization passes.
     """
 
     def __init__(self, filename, mode="exec", flags=0, future_pos=(0, 0),
-                 hidden_applevel=False):
+                 hidden_applevel=False, optimize=0):
         self.filename = filename
         self.mode = mode
         self.encoding = None
         self.flags = flags
         self.last_future_import = future_pos
         self.hidden_applevel = hidden_applevel
+        self.optimize = optimize
 
 
 _targets = {
@@ -84,13 +87,35 @@ _targets = {
 'exec' : pygram.syms.file_input,
 }
 
+def _make_expression_passthrough():
+    # the levels of precedence of the expressions: in a compact parse tree,
+    # chains of them with a single child each are reduced to their last
+    # node.  The astbuilder accepts any of them as an expression.
+    syms = pygram.syms
+    passthrough = [False] * len(pygram.python_grammar.dfas)
+    for sym in [syms.test, syms.old_test, syms.or_test, syms.and_test,
+                syms.not_test, syms.comparison, syms.expr, syms.xor_expr,
+                syms.and_expr, syms.shift_expr, syms.arith_expr, syms.term,
+                syms.factor, syms.power]:
+        passthrough[sym - 256] = True
+    return passthrough
+
+_expression_passthrough = _make_expression_passthrough()
+
+
 class PythonParser(parser.Parser):
+    """The parser of Python source.  With 'compact_tree', the parse tree
+    is only meant for the astbuilder: the single-child chains of expression
+    nodes are collapsed, which saves most of the nodes.  Otherwise, it is
+    the full concrete tree, as seen by the 'parser' module."""
 
     def __init__(self, space, future_flags=future.futureFlags_2_7,
-                 grammar=pygram.python_grammar):
+                 grammar=pygram.python_grammar, compact_tree=False):
         parser.Parser.__init__(self, grammar)
         self.space = space
         self.future_flags = future_flags
+        if compact_tree:
+            self.passthrough = _expression_passthrough
 
     def parse_source(self, textsrc, compile_info):
         """Main entry point for parsing Python source.
@@ -158,3 +158,34 @@ pass"""
 
     def test_print_function(self):
         self.parse("from __future__ import print_function\nx = print\n")
+
+    def test_compact_tree(self):
+        tree = self.parse("a", "eval")
+        testlist = tree.children[0]
+        assert testlist.type == syms.testlist
+        # the full chain of the expression levels is kept
+        node = testlist.children[0]
+        assert node.type == syms.test
+        while node.type != syms.power:
+            assert len(node.children) == 1
+            node = node.children[0]
+        assert node.children[0].type == syms.atom
+
+        parser = pyparse.PythonParser(self.space, compact_tree=True)
+        info = pyparse.CompileInfo("<string>", "eval")
+        tree = parser.parse_source("a", info)
+        testlist = tree.children[0]
+        assert testlist.type == syms.testlist
+        power = testlist.children[0]
+        assert power.type == syms.power
+        assert power.children[0].type == syms.atom
+        tree = parser.parse_source("lambda: a or b * -c", info)
+        test = tree.children[0].children[0]
+        assert test.type == syms.test
+        assert test.children[0].type == syms.lambdef
+        or_test = test.children[0].children[-1]
+        assert or_test.type == syms.or_test
+        term = or_test.children[2]
+        assert term.type == syms.term
+        assert [child.type for child in term.children] == [
+            syms.power, tokens.STAR, syms.factor]
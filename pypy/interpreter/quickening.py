@@ -0,0 +1,91 @@
+"""
+Quickening of the bytecode, enabled by the 'objspace.std.withquickening'
+option.
+
+The first time a code object runs, a private copy of its co_code is made
+in which the first opcode of some frequent pairs of instructions is
+replaced by a superinstruction doing the work of both.  Nothing else is
+changed: the superinstruction keeps the argument of the first
+instruction, and the second instruction is left in place, so that all
+the offsets (jump targets, f_lasti, co_lnotab) stay valid and jumping
+directly to the second instruction still works.  The superinstructions
+are only used by the interpreter; the JIT always sees the original
+co_code.
+
+A pair is fused only if its second instruction does not start a new line,
+so that tracing sees the same 'line' events.
+"""
+
+from pypy.tool.stdlib_opcode import opcodedesc, HAVE_ARGUMENT
+
+# unused opcode numbers, above HAVE_ARGUMENT: the superinstructions take
+# the argument of their first instruction
+LOAD_FAST_LOAD_FAST = 160
+LOAD_FAST_LOAD_ATTR = 161
+LOAD_FAST_LOAD_CONST = 162
+LOAD_FAST_LOOKUP_METHOD = 163
+STORE_FAST_LOAD_FAST = 164
+LOAD_CONST_COMPARE_OP = 165
+LOAD_GLOBAL_CALL_FUNCTION = 166
+
+SUPERINSTRUCTIONS = [
+    ('LOAD_FAST', 'LOAD_FAST', LOAD_FAST_LOAD_FAST),
+    ('LOAD_FAST', 'LOAD_ATTR', LOAD_FAST_LOAD_ATTR),
+    ('LOAD_FAST', 'LOAD_CONST', LOAD_FAST_LOAD_CONST),
+    ('LOAD_FAST', 'LOOKUP_METHOD', LOAD_FAST_LOOKUP_METHOD),
+    ('STORE_FAST', 'LOAD_FAST', STORE_FAST_LOAD_FAST),
+    ('LOAD_CONST', 'COMPARE_OP', LOAD_CONST_COMPARE_OP),
+    ('LOAD_GLOBAL', 'CALL_FUNCTION', LOAD_GLOBAL_CALL_FUNCTION),
+]
+
+_pairs = {}
+for _first, _second, _opcode in SUPERINSTRUCTIONS:
+    assert _opcode >= HAVE_ARGUMENT
+    assert getattr(opcodedesc, _first).index >= HAVE_ARGUMENT
+    assert getattr(opcodedesc, _second).index >= HAVE_ARGUMENT
+    _pairs[getattr(opcodedesc, _first).index * 256 +
+           getattr(opcodedesc, _second).index] = _opcode
+del _first, _second, _opcode
+
+EXTENDED_ARG = opcodedesc.EXTENDED_ARG.index
+
+
+def line_starts(lnotab):
+    """Return a dict whose keys are the offsets listed in the line number
+    table, i.e. the instructions that may start a new line."""
+    result = {}
+    addr = 0
+    for i in range(0, len(lnotab) - 1, 2):
+        addr += ord(lnotab[i])
+        result[addr] = None
+    return result
+
+
+def quicken(code, lnotab):
+    """Return a copy of the bytecode 'code' with superinstructions."""
+    starts = line_starts(lnotab)
+    result = None
+    n = len(code)
+    i = 0
+    while i < n:
+        opcode = ord(code[i])
+        if opcode == EXTENDED_ARG:
+            # leave the extended instruction alone
+            i += 6
+            continue
+        if opcode < HAVE_ARGUMENT:
+            i += 1
+            continue
+        j = i + 3
+        if j + 3 <= n and j not in starts:
+            superinstruction = _pairs.get(opcode * 256 + ord(code[j]), -1)
+            if superinstruction >= 0:
+                if result is None:
+                    result = list(code)
+                result[i] = chr(superinstruction)
+                i = j + 3
+                continue
+        i = j
+    if result is None:
+        return code
+    return ''.join(result)
@@ -381,3 +381,19 @@ class AppTestInterpreter:
                 sys.exc_clear()
                 raise
         raises(TypeError, f)
+
+
+class TestInterpreterWithQuickening(TestInterpreter):
+    spaceconfig = {"objspace.std.withquickening": True}
+
+
+class AppTestInterpreterWithQuickening(AppTestInterpreter):
+    spaceconfig = {"objspace.std.withquickening": True}
+
+
+class TestInterpreterWithFramePool(TestInterpreter):
+    spaceconfig = {"objspace.std.withframepool": True}
+
+
+class AppTestInterpreterWithFramePool(AppTestInterpreter):
+    spaceconfig = {"objspace.std.withframepool": True}
@@ -534,3 +534,100 @@ class AppTestPyFrame:
         res = f(10).g()
         sys.settrace(None)
         assert res == 10
+
+
+class AppTestPyFrameWithQuickening(AppTestPyFrame):
+    spaceconfig = {"objspace.std.withquickening": True}
+
+
+class AppTestPyFrameWithFramePool(AppTestPyFrame):
+    spaceconfig = {"objspace.std.withframepool": True}
+
+    def test_escaped_frames_are_not_reused(self):
+        import sys
+        def f(x):
+            return sys._getframe(), x
+        frame1, _ = f(1)
+        frame2, _ = f(2)
+        assert frame1 is not frame2
+        assert frame1.f_locals['x'] == 1
+        assert frame2.f_locals['x'] == 2
+
+    def test_traceback_frames_are_not_reused(self):
+        import sys
+        def f(x):
+            try:
+                raise ValueError(x)
+            except ValueError:
+                return sys.exc_info()[2]
+        tb1 = f(1)
+        tb2 = f(2)
+        assert tb1.tb_frame is not tb2.tb_frame
+        assert tb1.tb_frame.f_locals['x'] == 1
+
+
+class TestFramePool:
+    spaceconfig = {"objspace.std.withframepool": True}
+
+    def test_reuse(self):
+        space = self.space
+        w_f = space.appexec([], """():
+            def f(n, m=5):
+                x = [n] * m
+                return len(x)
+            return f
+        """)
+        code = w_f.code
+        assert code._free_frame is None
+        assert space.int_w(space.call_function(w_f, space.wrap(3))) == 5
+        frame = code._free_frame
+        assert frame is not None
+        # the references are dropped
+        assert frame.locals_stack_w == [None] * len(frame.locals_stack_w)
+        assert space.int_w(space.call_function(w_f, space.wrap(3),
+                                               space.wrap(2))) == 2
+        assert code._free_frame is frame
+
+    def test_recursion(self):
+        space = self.space
+        w_res = space.appexec([], """():
+            def fib(n):
+                if n < 2:
+                    return n
+                return fib(n - 1) + fib(n - 2)
+            return fib(15)
+        """)
+        assert space.int_w(w_res) == 610
+
+    def test_no_reuse_of_generator_frames(self):
+        space = self.space
+        w_f = space.appexec([], """():
+            def f():
+                yield 1
+            return f
+        """)
+        space.call_function(w_f)
+        assert w_f.code._free_frame is None
+
+    def test_no_reuse_of_escaped_frames(self):
+        space = self.space
+        w_f = space.appexec([], """():
+            import sys
+            def f():
+                return sys._getframe()
+            return f
+        """)
+        space.call_function(w_f)
+        assert w_f.code._free_frame is None
+
+    def test_closures(self):
+        space = self.space
+        w_res = space.appexec([], """():
+            def make(n):
+                def get():
+                    return n
+                return get
+            getters = [make(i) for i in range(3)]
+            return [g() for g in getters]
+        """)
+        assert space.unwrap(w_res) == [0, 1, 2]
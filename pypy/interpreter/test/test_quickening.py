@@ -0,0 +1,143 @@
+import py
+
+from pypy.interpreter import quickening
+from pypy.interpreter.pycode import PyCode
+from pypy.tool.stdlib_opcode import opcodedesc
+
+
+class TestQuicken:
+    spaceconfig = {"objspace.std.withquickening": True}
+
+    def compile_function(self, source):
+        space = self.space
+        source = str(py.code.Source(source).strip()) + '\n'
+        w_code = space.builtin.call('compile', space.wrap(source),
+                                    space.wrap('<string>'),
+                                    space.wrap('exec'))
+        code = space.interp_w(PyCode, w_code)
+        for w_const in code.co_consts_w:
+            if isinstance(w_const, PyCode):
+                return w_const
+        raise AssertionError("no function found")
+
+    def opcodes(self, code):
+        result = []
+        i = 0
+        while i < len(code):
+            opcode = ord(code[i])
+            result.append(opcode)
+            if opcode >= quickening.HAVE_ARGUMENT:
+                i += 3
+            else:
+                i += 1
+        return result
+
+    def test_superinstructions(self):
+        code = self.compile_function('''
+            def f(a, b):
+                return a.x + b
+        ''')
+        quickened = code.get_quickened_code()
+        assert len(quickened) == len(code.co_code)
+        assert self.opcodes(code.co_code) == [
+            opcodedesc.LOAD_FAST.index, opcodedesc.LOAD_ATTR.index,
+            opcodedesc.LOAD_FAST.index, opcodedesc.BINARY_ADD.index,
+            opcodedesc.RETURN_VALUE.index]
+        # only the first opcode of the pair is changed
+        assert self.opcodes(quickened) == [
+            quickening.LOAD_FAST_LOAD_ATTR, opcodedesc.LOAD_ATTR.index,
+            opcodedesc.LOAD_FAST.index, opcodedesc.BINARY_ADD.index,
+            opcodedesc.RETURN_VALUE.index]
+        assert quickened[1:] == code.co_code[1:]
+        assert code.get_quickened_code() is quickened
+
+    def test_not_across_lines(self):
+        code = self.compile_function('''
+            def f(a):
+                b = a
+                return b
+        ''')
+        assert code.get_quickened_code() == code.co_code
+
+    def test_nothing_to_quicken(self):
+        code = self.compile_function('''
+            def f():
+                pass
+        ''')
+        assert code.get_quickened_code() is code.co_code
+
+    def test_extended_arg(self):
+        EXTENDED_ARG = chr(opcodedesc.EXTENDED_ARG.index)
+        LOAD_FAST = chr(opcodedesc.LOAD_FAST.index)
+        code = (EXTENDED_ARG + '\x01\x00' + LOAD_FAST + '\x00\x00' +
+                LOAD_FAST + '\x00\x00')
+        assert quickening.quicken(code, '') == code
+        code = LOAD_FAST + '\x00\x00' + code
+        assert quickening.quicken(code, '') == code
+        code = LOAD_FAST + '\x00\x00' + LOAD_FAST + '\x01\x00'
+        assert quickening.quicken(code, '') == (
+            chr(quickening.LOAD_FAST_LOAD_FAST) + code[1:])
+        # the line starting at offset 3 prevents the fusion
+        assert quickening.quicken(code, '\x03\x01') == code
+
+
+class AppTestQuickening:
+    spaceconfig = {"objspace.std.withquickening": True}
+
+    def test_compare_int_constant(self):
+        def f(x):
+            return (x < 5, x <= 5, x == 5, x != 5, x > 5, x >= 5)
+        assert f(5) == (False, True, True, False, False, True)
+        assert f(-3) == (True, True, False, True, False, False)
+        assert f(5.5) == (False, False, False, True, True, True)
+        assert f(True) == (True, True, False, True, False, False)
+        class MyInt(int):
+            def __lt__(self, other):
+                return 'lt'
+        assert f(MyInt(7))[0] == 'lt'
+        def g(x):
+            return x in (1, 2), x is None
+        assert g(2) == (True, False)
+        assert g(None) == (False, True)
+
+    def test_traceback_of_second_instruction(self):
+        import sys
+        def f(a):
+            return a.missing
+        try:
+            f(42)
+        except AttributeError:
+            tb = sys.exc_info()[2].tb_next
+        assert tb.tb_frame.f_code is f.func_code
+        assert tb.tb_lineno == f.func_code.co_firstlineno + 1
+        # f_lasti is the one of the LOAD_ATTR, not of the LOAD_FAST
+        assert tb.tb_lasti == 3
+
+    def test_call_global(self):
+        import sys
+        def g():
+            return sys._getframe(1).f_lasti
+        def f():
+            return g()
+        assert f() == 3
+
+    def test_line_events(self):
+        import sys
+        def f(a):
+            b = a
+            c = b.real
+            return c
+        events = []
+        def trace(frame, event, arg):
+            if frame.f_code is f.func_code:
+                events.append((event, frame.f_lineno))
+            return trace
+        sys.settrace(trace)
+        try:
+            f(3)
+        finally:
+            sys.settrace(None)
+        first = f.func_code.co_firstlineno
+        assert events == [('call', first), ('line', first + 1),
+                          ('line', first + 2), ('line', first + 3),
+                          ('return', first + 3)]
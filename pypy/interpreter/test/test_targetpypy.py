@@ -8,6 +8,16 @@ class TestTargetPyPy(object):
         entry_point = get_entry_point(config)[0]
         entry_point(['pypy-c' , '-S', '-c', 'print 3'])
 
+    def test_preimport(self):
+        config = get_pypy_config(translating=False)
+        config.objspace.preimportmodules = 'keyword, stat'
+        entry_point = get_entry_point(config)[0]
+        res = entry_point(['pypy-c', '-S', '-c', 'import sys; '
+                           'assert "keyword" in sys.modules; '
+                           'assert "stat" in sys.modules; '
+                           'import keyword; assert keyword.iskeyword("if")'])
+        assert res == 0
+
 def test_exeucte_source(space):
     _, d = create_entry_point(space, None)
     execute_source = d['pypy_execute_source']
@@ -79,8 +79,10 @@ class Module(MixedModule):
         'add_memory_pressure'       : 'interp_magic.add_memory_pressure',
         'newdict'                   : 'interp_dict.newdict',
         'reversed_dict'             : 'interp_dict.reversed_dict',
+        'dict_from_lists'           : 'interp_dict.dict_from_lists',
         'strategy'                  : 'interp_magic.strategy',  # dict,set,list
         'set_debug'                 : 'interp_magic.set_debug',
+        'set_optimize'              : 'interp_magic.set_optimize',
         'locals_to_fast'            : 'interp_magic.locals_to_fast',
     }
     if sys.platform == 'win32':
@@ -106,6 +108,9 @@ class Module(MixedModule):
             if self.space.config.objspace.std.withmapdict:
                 self.extra_interpdef('mapdict_cache_counter',
                                      'interp_magic.mapdict_cache_counter')
+                self.extra_interpdef(
+                    'mapdict_inline_cache_counter',
+                    'interp_magic.mapdict_inline_cache_counter')
         PYC_MAGIC = get_pyc_magic(self.space)
         self.extra_interpdef('PYC_MAGIC', 'space.wrap(%d)' % PYC_MAGIC)
         #
@@ -6,7 +6,7 @@ from pypy.objspace.std.dictmultiobject import W_DictMultiObject
 from pypy.objspace.std.listobject import W_ListObject
 from pypy.objspace.std.setobject import W_BaseSetObject
 from pypy.objspace.std.typeobject import MethodCache
-from pypy.objspace.std.mapdict import MapAttrCache
+from pypy.objspace.std.mapdict import MapAttrCache, InlineCacheCounter
 from rpython.rlib import rposix, rgc
 
 
@@ -41,6 +41,9 @@ def reset_method_cache_counter(space):
         cache = space.fromcache(MapAttrCache)
         cache.misses = {}
         cache.hits = {}
+        counter = space.fromcache(InlineCacheCounter)
+        counter.misses = {}
+        counter.hits = {}
 
 @unwrap_spec(name=str)
 def mapdict_cache_counter(space, name):
@@ -52,6 +55,17 @@ def mapdict_cache_counter(space, name):
     return space.newtuple([space.newint(cache.hits.get(name, 0)),
                            space.newint(cache.misses.get(name, 0))])
 
+@unwrap_spec(name=str)
+def mapdict_inline_cache_counter(space, name):
+    """Return a tuple (inline_cache_hits, inline_cache_misses) for the
+    attribute lookups and method calls with the given name, done by the
+    caches attached to each code object."""
+    assert space.config.objspace.std.withmethodcachecounter
+    assert space.config.objspace.std.withmapdict
+    counter = space.fromcache(InlineCacheCounter)
+    return space.newtuple([space.newint(counter.hits.get(name, 0)),
+                           space.newint(counter.misses.get(name, 0))])
+
 def builtinify(space, w_func):
     from pypy.interpreter.function import Function, BuiltinFunction
     func = space.interp_w(Function, w_func)
@@ -122,6 +136,10 @@ def set_debug(space, debug):
                   space.wrap('__debug__'),
                   space.wrap(debug))
 
+@unwrap_spec(level=int)
+def set_optimize(space, level):
+    space.sys.optimize = level
+
 @unwrap_spec(estimate=int)
 def add_memory_pressure(estimate):
     rgc.add_memory_pressure(estimate)
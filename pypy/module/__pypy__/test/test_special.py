@@ -27,6 +27,18 @@ class AppTest(object):
         assert A.a is not A.__dict__['a']
         assert A.b is A.__dict__['b']
 
+    def test_set_optimize(self):
+        import __pypy__
+        src = "x = 1 if 1 < 2 else 2"
+        plain = compile(src, "<test>", "exec")
+        __pypy__.set_optimize(1)
+        try:
+            optimized = compile(src, "<test>", "exec")
+        finally:
+            __pypy__.set_optimize(0)
+        assert len(optimized.co_code) < len(plain.co_code)
+        assert compile(src, "<test>", "exec").co_code == plain.co_code
+
     def test_lookup_special(self):
         from __pypy__ import lookup_special
         class X(object):
@@ -0,0 +1,28 @@
+""" Importer for code archives: single files of pre-compiled modules.
+"""
+
+from pypy.interpreter.mixedmodule import MixedModule
+
+class Module(MixedModule):
+
+    interpleveldefs = {
+        'codearchiveimporter': 'interp_codearchive.W_CodeArchiveImporter',
+        'ARCHIVE_EXT': 'space.wrap(interp_codearchive.ARCHIVE_EXT)',
+    }
+
+    appleveldefs = {
+        'build': 'app_codearchive.build',
+        'compile_file': 'app_codearchive.compile_file',
+        'compile_tree': 'app_codearchive.compile_tree',
+        'find_modules': 'app_codearchive.find_modules',
+    }
+
+    def setup_after_space_initialization(self):
+        """NOT_RPYTHON"""
+        space = self.space
+        # install the importer hook, like zipimport
+        w_path_hooks = space.sys.get('path_hooks')
+        from pypy.module._codearchive.interp_codearchive import (
+            W_CodeArchiveImporter)
+        w_importer = space.gettypefor(W_CodeArchiveImporter)
+        space.call_method(w_path_hooks, 'append', w_importer)
@@ -0,0 +1,191 @@
+import os
+
+ARCHIVE_MAGIC = 'PYPYCAR\x00'
+FLAG_PACKAGE = 1
+
+
+def _long(x):
+    return ''.join([chr((x >> shift) & 0xff) for shift in (0, 8, 16, 24)])
+
+
+def _is_identifier(name):
+    if not name or name[0].isdigit():
+        return False
+    return name.replace('_', 'a').isalnum()
+
+
+def _walk(directory, prefix, result):
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    names.sort()
+    for name in names:
+        path = os.path.join(directory, name)
+        if name.endswith('.py'):
+            modname = name[:-3]
+            if modname != '__init__' and _is_identifier(modname):
+                result.append((prefix + modname, path, False))
+        elif _is_identifier(name) and os.path.isdir(path):
+            initpath = os.path.join(path, '__init__.py')
+            if os.path.isfile(initpath):
+                result.append((prefix + name, initpath, True))
+                _walk(path, prefix + name + '.', result)
+
+
+def find_modules(directories):
+    """Return the list of (dotted name, source file, is_package) of the
+    pure Python modules and packages found in the given directories.  The
+    first directory wins when a module is found several times, like on
+    sys.path."""
+    seen = {}
+    result = []
+    for directory in directories:
+        found = []
+        _walk(directory, '', found)
+        for entry in found:
+            if entry[0] not in seen:
+                seen[entry[0]] = None
+                result.append(entry)
+    return result
+
+
+def compile_file(filename):
+    """Compile the source file 'filename'.  Return a tuple (marshalled code,
+    mtime of the source, mode of the source, seconds, error): if the file
+    cannot be compiled, the marshalled code is None and 'error' is the
+    message of the exception."""
+    import marshal, time
+    start = time.time()
+    try:
+        f = open(filename, 'rU')
+        try:
+            st = os.fstat(f.fileno())
+            source = f.read()
+        finally:
+            f.close()
+        if source and not source.endswith('\n'):
+            source += '\n'
+        code = compile(source, filename, 'exec', 0, True)
+        blob = marshal.dumps(code)
+    except (SyntaxError, TypeError, ValueError, IOError, OSError), e:
+        return None, 0, 0, time.time() - start, '%s: %s' % (
+            e.__class__.__name__, e)
+    return blob, int(st.st_mtime), st.st_mode, time.time() - start, None
+
+
+def _cpu_count():
+    try:
+        import multiprocessing
+        return multiprocessing.cpu_count()
+    except (ImportError, NotImplementedError):
+        return 1
+
+
+def _compile_files(filenames, processes):
+    if processes == 0:
+        processes = _cpu_count()
+    if processes > 1 and len(filenames) > 1:
+        try:
+            from multiprocessing import Pool
+        except ImportError:
+            pass
+        else:
+            pool = Pool(processes)
+            try:
+                # map() keeps the order: the output does not depend on
+                # which process compiled what
+                chunksize = max(1, len(filenames) // (processes * 4))
+                return pool.map(compile_file, filenames, chunksize)
+            finally:
+                pool.close()
+                pool.join()
+    return [compile_file(filename) for filename in filenames]
+
+
+def _write_pyc(filename, blob, mtime, mode):
+    import imp
+    cpathname = filename + 'c'
+    tmpname = '%s.%d.tmp' % (cpathname, os.getpid())
+    f = open(tmpname, 'wb')
+    try:
+        f.write(imp.get_magic())
+        f.write(_long(mtime))
+        f.write(blob)
+    finally:
+        f.close()
+    try:
+        os.chmod(tmpname, mode & 0666)
+        # atomic: a concurrent import never sees a partial pyc file
+        os.rename(tmpname, cpathname)
+    except OSError:
+        os.unlink(tmpname)
+        raise
+
+
+def _write_archive(archive, modules, blobs):
+    import imp
+    index = []
+    size = 16
+    for modname, filename, is_package in modules:
+        size += 16 + len(modname)
+    offset = size
+    for i in range(len(modules)):
+        modname, filename, is_package = modules[i]
+        flags = 0
+        if is_package:
+            flags |= FLAG_PACKAGE
+        index.append(_long(len(modname)) + _long(flags) + _long(offset) +
+                     _long(len(blobs[i])) + modname)
+        offset += len(blobs[i])
+    f = open(archive, 'wb')
+    try:
+        f.write(ARCHIVE_MAGIC)
+        f.write(imp.get_magic())
+        f.write(_long(len(modules)))
+        f.write(''.join(index))
+        f.write(''.join(blobs))
+    finally:
+        f.close()
+
+
+def compile_tree(directories, archive=None, processes=0):
+    """Compile all the pure Python modules found in the given directories,
+    either into .pyc files next to their sources or, if 'archive' is
+    given, into this code archive.  The modules are compiled by a pool of
+    'processes' processes, by default one per cpu, or in this process if
+    'processes' is 1; the output is the same in all cases.
+
+    Return a list of (dotted name, source file, seconds, error), in the
+    order of find_modules().  The modules that cannot be compiled are
+    left out of the output, and reported with the error message instead
+    of None."""
+    modules = find_modules(directories)
+    results = _compile_files([filename for modname, filename, is_package
+                              in modules], processes)
+    report = []
+    archived = []
+    blobs = []
+    for i in range(len(modules)):
+        modname, filename, is_package = modules[i]
+        blob, mtime, mode, seconds, error = results[i]
+        if error is None:
+            if archive is None:
+                _write_pyc(filename, blob, mtime, mode)
+            else:
+                archived.append(modules[i])
+                blobs.append(blob)
+        report.append((modname, filename, seconds, error))
+    if archive is not None:
+        _write_archive(archive, archived, blobs)
+    return report
+
+
+def build(archive, directories, processes=1):
+    """Compile all the pure Python modules found in the given directories
+    and write them into the code archive 'archive'.  Putting the archive
+    on sys.path makes them importable without touching the directories.
+    Return the list of the archived module names."""
+    report = compile_tree(directories, archive, processes)
+    return [modname for modname, filename, seconds, error in report
+            if error is None]
@@ -0,0 +1,252 @@
+"""
+A code archive is a single file containing the marshalled code objects of
+many modules, together with an index of their dotted names.  It is mapped
+in memory once, and finding a module in it is a dict lookup: there is no
+stat() or open() per module, like there is for sys.path directories.
+
+Format (all the numbers are 4-byte little-endian integers):
+
+    'PYPYCAR\\0'                 8 bytes
+    pyc magic                   of the interpreter that built the archive
+    number of entries
+    the entries, each one being:
+        length of the name, flags (1 for packages), offset and length of
+        the marshalled code object in the file, the dotted name
+    the marshalled code objects
+
+Archives are built by the app-level function build() of this module.
+"""
+
+import os
+
+from rpython.rlib import rmmap
+
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import OperationError, oefmt, wrap_oserror
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.module import Module
+from pypy.interpreter.typedef import TypeDef, GetSetProperty
+from pypy.module.imp import importing
+
+ARCHIVE_MAGIC = 'PYPYCAR\x00'
+ARCHIVE_EXT = '.pyarchive'
+FLAG_PACKAGE = 1
+HEADER_SIZE = 16
+ENTRY_HEADER_SIZE = 16
+
+
+class ArchiveEntry(object):
+    def __init__(self, is_package, offset, length):
+        self.is_package = is_package
+        self.offset = offset
+        self.length = length
+
+
+class CodeArchive(object):
+    """An opened archive, shared by all the importers for its packages"""
+
+    def __init__(self, filename, mmap, magic, entries):
+        self.filename = filename
+        self.mmap = mmap
+        self.magic = magic
+        self.entries = entries
+
+    def get_entry(self, fullname):
+        return self.entries.get(fullname, None)
+
+    def read(self, entry):
+        return self.mmap.getslice(entry.offset, entry.length)
+
+
+class ArchiveError(Exception):
+    def __init__(self, msg):
+        self.msg = msg
+
+
+def open_archive(filename):
+    fd = os.open(filename, os.O_RDONLY, 0)
+    try:
+        size = os.fstat(fd).st_size
+        if size < HEADER_SIZE:
+            raise ArchiveError("file too short")
+        try:
+            mmap = rmmap.mmap(fd, size, access=rmmap.ACCESS_READ)
+        except rmmap.RMMapError:
+            raise ArchiveError("cannot map the file in memory")
+    finally:
+        os.close(fd)
+    if mmap.getslice(0, 8) != ARCHIVE_MAGIC:
+        mmap.close()
+        raise ArchiveError("bad archive magic")
+    magic = importing._get_long(mmap.getslice(8, 4))
+    count = importing._get_long(mmap.getslice(12, 4))
+    entries = {}
+    pos = HEADER_SIZE
+    for i in range(count):
+        if pos + ENTRY_HEADER_SIZE > size:
+            mmap.close()
+            raise ArchiveError("truncated index")
+        header = mmap.getslice(pos, ENTRY_HEADER_SIZE)
+        namelength = importing._get_long(header[0:4])
+        flags = importing._get_long(header[4:8])
+        offset = importing._get_long(header[8:12])
+        length = importing._get_long(header[12:16])
+        pos += ENTRY_HEADER_SIZE
+        if (namelength < 0 or offset < 0 or length < 0 or
+                pos + namelength > size or offset + length > size):
+            mmap.close()
+            raise ArchiveError("corrupted index")
+        name = mmap.getslice(pos, namelength)
+        pos += namelength
+        entries[name] = ArchiveEntry(bool(flags & FLAG_PACKAGE),
+                                     offset, length)
+    return CodeArchive(filename, mmap, magic, entries)
+
+
+class ArchiveCache:
+    def __init__(self, space):
+        self.w_error = space.new_exception_class(
+            "_codearchive.CodeArchiveError", space.w_ImportError)
+        self.archives = {}
+
+    def get_archive(self, space, filename):
+        try:
+            return self.archives[filename]
+        except KeyError:
+            pass
+        try:
+            archive = open_archive(filename)
+        except OSError as e:
+            raise wrap_oserror(space, e, filename, exception_name='w_IOError')
+        except ArchiveError as e:
+            raise oefmt(self.w_error, "%s is not a valid code archive: %s",
+                        filename, e.msg)
+        if archive.magic != importing.get_pyc_magic(space):
+            # built by another version of the interpreter: ignore it
+            archive.mmap.close()
+            raise oefmt(self.w_error, "bad magic number in %s", filename)
+        self.archives[filename] = archive
+        return archive
+
+
+def get_error(space):
+    return space.fromcache(ArchiveCache).w_error
+
+
+class W_CodeArchiveImporter(W_Root):
+    def __init__(self, space, archive, prefix):
+        self.space = space
+        self.archive = archive
+        self.prefix = prefix      # '' or a dotted package name and a '.'
+
+    def _find_entry(self, fullname):
+        # only the modules directly in the package of this importer
+        if not fullname.startswith(self.prefix):
+            return None
+        if fullname.find('.', len(self.prefix)) >= 0:
+            return None
+        return self.archive.get_entry(fullname)
+
+    def _get_entry(self, space, fullname):
+        entry = self._find_entry(fullname)
+        if entry is None:
+            raise oefmt(get_error(space), "can't find module %s in %s",
+                        fullname, self.archive.filename)
+        return entry
+
+    def _get_filename(self, fullname, entry):
+        path = self.archive.filename + os.sep + fullname.replace('.', os.sep)
+        if entry.is_package:
+            return path + os.sep + '__init__.pyc'
+        return path + '.pyc'
+
+    @unwrap_spec(fullname=str)
+    def find_module(self, space, fullname, w_path=None):
+        if self._find_entry(fullname) is not None:
+            return space.wrap(self)
+        return space.w_None
+
+    @unwrap_spec(fullname=str)
+    def load_module(self, space, fullname):
+        entry = self._get_entry(space, fullname)
+        w = space.wrap
+        w_mod = w(Module(space, w(fullname)))
+        space.setattr(w_mod, w('__loader__'), w(self))
+        filename = self._get_filename(fullname, entry)
+        pkgpath = None
+        if entry.is_package:
+            pkgpath = (self.archive.filename + os.sep +
+                       fullname.replace('.', os.sep))
+        importing._prepare_module(space, w_mod, filename, pkgpath)
+        try:
+            return importing.load_compiled_module(
+                space, w(fullname), w_mod, filename, self.archive.magic, 0,
+                self.archive.read(entry))
+        except OperationError:
+            w_mods = space.sys.get('modules')
+            space.call_method(w_mods, 'pop', w(fullname), space.w_None)
+            raise
+
+    @unwrap_spec(fullname=str)
+    def get_code(self, space, fullname):
+        entry = self._get_entry(space, fullname)
+        return space.wrap(importing.read_compiled_module(
+            space, self._get_filename(fullname, entry),
+            self.archive.read(entry)))
+
+    @unwrap_spec(fullname=str)
+    def get_source(self, space, fullname):
+        self._get_entry(space, fullname)
+        return space.w_None
+
+    @unwrap_spec(fullname=str)
+    def get_filename(self, space, fullname):
+        entry = self._get_entry(space, fullname)
+        return space.wrap(self._get_filename(fullname, entry))
+
+    @unwrap_spec(fullname=str)
+    def is_package(self, space, fullname):
+        entry = self._get_entry(space, fullname)
+        return space.newbool(entry.is_package)
+
+    def getarchive(self, space):
+        return space.wrap(self.archive.filename)
+
+    def getprefix(self, space):
+        return space.wrap(self.prefix)
+
+
+@unwrap_spec(path='str0')
+def descr_new_codearchiveimporter(space, w_type, path):
+    # this is called for every new entry of sys.path: recognize archives
+    # by their name only, without any system call for the other entries
+    end = 0
+    while True:
+        i = path.find(ARCHIVE_EXT, end)
+        if i < 0:
+            raise oefmt(get_error(space), "not a code archive: %s", path)
+        end = i + len(ARCHIVE_EXT)
+        if end == len(path) or path[end] == os.sep:
+            break
+    filename = path[:end]
+    prefix = path[end + 1:]
+    if prefix.endswith(os.sep):
+        prefix = prefix[:-1]
+    if prefix:
+        prefix = prefix.replace(os.sep, '.') + '.'
+    archive = space.fromcache(ArchiveCache).get_archive(space, filename)
+    return space.wrap(W_CodeArchiveImporter(space, archive, prefix))
+
+
+W_CodeArchiveImporter.typedef = TypeDef(
+    'codearchiveimporter',
+    __new__     = interp2app(descr_new_codearchiveimporter),
+    find_module = interp2app(W_CodeArchiveImporter.find_module),
+    load_module = interp2app(W_CodeArchiveImporter.load_module),
+    get_code    = interp2app(W_CodeArchiveImporter.get_code),
+    get_source  = interp2app(W_CodeArchiveImporter.get_source),
+    get_filename = interp2app(W_CodeArchiveImporter.get_filename),
+    is_package  = interp2app(W_CodeArchiveImporter.is_package),
+    archive     = GetSetProperty(W_CodeArchiveImporter.getarchive),
+    prefix      = GetSetProperty(W_CodeArchiveImporter.getprefix),
+)
@@ -0,0 +1,55 @@
+import py
+from rpython.tool.udir import udir
+from pypy.module._codearchive import app_codearchive
+
+# compile_tree() with a pool of processes, run directly on the host: the
+# untranslated interpreter cannot run multiprocessing
+
+def setup_module(mod):
+    try:
+        import multiprocessing, _multiprocessing
+        multiprocessing.Pool(1).terminate()
+    except (ImportError, OSError):
+        py.test.skip("no multiprocessing")
+
+def make_tree(name):
+    src = udir.ensure('codearchive_pool', name, dir=1)
+    for i in range(20):
+        src.join('mod%d.py' % i).write(
+            "def f%d(x):\n"
+            "    return [x + %d for y in range(x) if y %% 3]\n" % (i, i) * 20)
+    pkg = src.ensure('pkg', dir=1)
+    pkg.join('__init__.py').write("x = 1\n")
+    pkg.join('sub.py').write("from pkg import x\n")
+    src.join('broken.py').write("def f(:\n")
+    return src
+
+def test_archive_same_output_with_processes():
+    src = make_tree('archive')
+    archives = []
+    reports = []
+    for processes in [1, 2, 3]:
+        archive = str(src.join('..', 'tree%d.pyarchive' % processes))
+        report = app_codearchive.compile_tree([str(src)], archive, processes)
+        reports.append([(name, error) for name, filename, seconds, error
+                        in report])
+        archives.append(open(archive, 'rb').read())
+    assert len(reports[0]) == 23
+    assert reports[1] == reports[0]
+    assert reports[2] == reports[0]
+    assert archives[1] == archives[0]
+    assert archives[2] == archives[0]
+
+def test_pyc_same_output_with_processes():
+    src = make_tree('pyc')
+    outputs = []
+    for processes in [1, 2]:
+        for pyc in src.visit('*.pyc'):
+            pyc.remove()
+        app_codearchive.compile_tree([str(src)], None, processes)
+        pycs = sorted(src.visit('*.pyc'))
+        outputs.append([(pyc.relto(src), pyc.read('rb')) for pyc in pycs])
+        # no temporary file left behind
+        assert not list(src.visit('*.tmp'))
+    assert len(outputs[0]) == 22
+    assert outputs[1] == outputs[0]
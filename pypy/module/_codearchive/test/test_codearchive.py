@@ -0,0 +1,147 @@
+import os
+
+from rpython.tool.udir import udir
+
+
+class AppTestCodeArchive:
+    spaceconfig = {
+        "usemodules": ['_codearchive'],
+    }
+
+    def setup_class(cls):
+        tmpdir = udir.ensure('codearchive_%s' % (cls.__name__,), dir=1)
+        src = tmpdir.ensure('src', dir=1)
+        src.join('archmod.py').write(
+            "def get_name():\n"
+            "    return __name__\n"
+            "x = 42\n")
+        pkg = src.ensure('archpkg', dir=1)
+        pkg.join('__init__.py').write("y = 'pkg'\n")
+        pkg.join('sub.py').write(
+            "from archpkg import y\n"
+            "z = y * 2\n")
+        src.join('not-a-module.py').write("raise ImportError\n")
+        pycsrc = tmpdir.ensure('pycsrc', dir=1)
+        pycsrc.join('good.py').write("a = 5\n")
+        pycsrc.join('broken.py').write("def f(:\n")
+        cls.w_srcdir = cls.space.wrap(str(src))
+        cls.w_pycsrcdir = cls.space.wrap(str(pycsrc))
+        cls.w_tmpdir = cls.space.wrap(str(tmpdir))
+        cls.w_sep = cls.space.wrap(os.sep)
+
+    def setup_method(self, meth):
+        space = self.space
+        self.w_modules = space.appexec([], """():
+            import sys
+            return sys.modules.copy()
+            """)
+        self.w_path = space.appexec([], """():
+            import sys
+            return sys.path[:]
+            """)
+
+    def teardown_method(self, meth):
+        space = self.space
+        space.appexec([self.w_modules, self.w_path], """(modules, path):
+            import sys
+            sys.modules.clear()
+            sys.modules.update(modules)
+            sys.path[:] = path
+            sys.path_importer_cache.clear()
+            """)
+
+    def w_make_archive(self, name):
+        import _codearchive
+        archive = self.tmpdir + self.sep + name + _codearchive.ARCHIVE_EXT
+        names = _codearchive.build(archive, [self.srcdir])
+        return archive, names
+
+    def test_find_modules(self):
+        import _codearchive
+        names = [name for name, filename, is_package
+                 in _codearchive.find_modules([self.srcdir])]
+        assert names == ['archmod', 'archpkg', 'archpkg.sub']
+
+    def test_import(self):
+        import sys
+        archive, names = self.make_archive('test_import')
+        assert names == ['archmod', 'archpkg', 'archpkg.sub']
+        sys.path.insert(0, archive)
+        import archmod
+        assert archmod.get_name() == 'archmod'
+        assert archmod.x == 42
+        assert archmod.__file__ == archive + self.sep + 'archmod.pyc'
+        assert archmod.__loader__.archive == archive
+        assert archmod.get_name.func_code.co_filename.endswith('archmod.py')
+
+    def test_package(self):
+        import sys
+        archive, names = self.make_archive('test_package')
+        sys.path.insert(0, archive)
+        import archpkg.sub
+        assert archpkg.y == 'pkg'
+        assert archpkg.sub.z == 'pkgpkg'
+        assert archpkg.__path__ == [archive + self.sep + 'archpkg']
+        assert archpkg.__file__ == (archive + self.sep + 'archpkg' +
+                                    self.sep + '__init__.pyc')
+        loader = archpkg.sub.__loader__
+        assert loader.prefix == 'archpkg.'
+        assert loader.is_package('archpkg.sub') is False
+
+    def test_importer_methods(self):
+        import _codearchive
+        archive, names = self.make_archive('test_importer_methods')
+        importer = _codearchive.codearchiveimporter(archive)
+        assert importer.find_module('archmod') is importer
+        assert importer.find_module('archpkg.sub') is None
+        assert importer.find_module('nonexistent') is None
+        assert importer.is_package('archpkg')
+        assert importer.get_source('archmod') is None
+        co = importer.get_code('archmod')
+        d = {}
+        exec co in d
+        assert d['x'] == 42
+        raises(ImportError, importer.get_code, 'nonexistent')
+
+    def test_not_an_archive(self):
+        import _codearchive
+        raises(ImportError, _codearchive.codearchiveimporter, self.srcdir)
+        raises(ImportError, _codearchive.codearchiveimporter,
+               self.srcdir + '.pyarchivex')
+        bad = self.tmpdir + self.sep + 'bad' + _codearchive.ARCHIVE_EXT
+        f = open(bad, 'wb')
+        f.write('this is not an archive')
+        f.close()
+        raises(ImportError, _codearchive.codearchiveimporter, bad)
+
+    def test_compile_tree_archive(self):
+        import _codearchive
+        archive1 = self.tmpdir + self.sep + 'tree1' + _codearchive.ARCHIVE_EXT
+        archive2 = self.tmpdir + self.sep + 'tree2' + _codearchive.ARCHIVE_EXT
+        report = _codearchive.compile_tree([self.srcdir], archive1, 1)
+        assert [name for name, filename, seconds, error
+                in report] == ['archmod', 'archpkg', 'archpkg.sub']
+        for name, filename, seconds, error in report:
+            assert filename.startswith(self.srcdir)
+            assert seconds >= 0.0
+            assert error is None
+        _codearchive.compile_tree([self.srcdir], archive2, 1)
+        # deterministic output
+        assert open(archive1, 'rb').read() == open(archive2, 'rb').read()
+
+    def test_compile_tree_pyc(self):
+        import _codearchive, imp, marshal, sys
+        report = _codearchive.compile_tree([self.pycsrcdir], None, 1)
+        assert [(name, error is None) for name, filename, seconds, error
+                in report] == [('broken', False), ('good', True)]
+        assert report[0][3].startswith('SyntaxError')
+        good = self.pycsrcdir + self.sep + 'good.py'
+        data = open(good + 'c', 'rb').read()
+        assert data[:4] == imp.get_magic()
+        d = {}
+        exec marshal.loads(data[8:]) in d
+        assert d['a'] == 5
+        raises(IOError, open, self.pycsrcdir + self.sep + 'broken.pyc')
+        sys.path.insert(0, self.pycsrcdir)
+        import good
+        assert good.__file__.endswith('good.pyc')
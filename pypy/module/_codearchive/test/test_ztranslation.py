@@ -0,0 +1,26 @@
+from pypy.objspace.fake.checkmodule import checkmodule
+from pypy.module.imp import importing
+
+
+def test_checkmodule():
+    # the fake objspace cannot follow the unmarshalling and the execution
+    # of code objects: replace the helpers of 'imp' that do it
+    def dummy_prepare_module(space, w_mod, filename, pkgdir):
+        pass
+    def dummy_load_compiled_module(space, w_modulename, w_mod, cpathname,
+                                   magic, timestamp, source):
+        return w_mod
+    def dummy_read_compiled_module(space, cpathname, strbuf):
+        return space.wrap(strbuf)
+    old = (importing._prepare_module, importing.load_compiled_module,
+           importing.read_compiled_module)
+    try:
+        importing._prepare_module = dummy_prepare_module
+        importing.load_compiled_module = dummy_load_compiled_module
+        importing.read_compiled_module = dummy_read_compiled_module
+        #
+        checkmodule('_codearchive')
+        #
+    finally:
+        (importing._prepare_module, importing.load_compiled_module,
+         importing.read_compiled_module) = old
@@ -82,6 +82,7 @@ SETTINGS:
 
         'reader': 'interp_reader.csv_reader',
         'field_size_limit': 'interp_reader.csv_field_size_limit',
+        'read_buffer': 'interp_reader.csv_read_buffer',
 
         'writer': 'interp_writer.csv_writer',
         }
@@ -0,0 +1,44 @@
+""" CSV dump throughput: writerow() and writerows() on rows of str, int
+and float, and on rows that need quoting.  Run it with a translated pypy.
+"""
+
+import _csv, random, time
+
+def count_operation(name, function, repeat=1):
+    t0 = time.time()
+    for i in xrange(repeat):
+        retval = function()
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    return retval
+
+class NullFile(object):
+    def __init__(self):
+        self.size = 0
+    def write(self, data):
+        self.size += len(data)
+
+def dump_writerow(rows, **kwds):
+    writer = _csv.writer(NullFile(), **kwds)
+    for row in rows:
+        writer.writerow(row)
+
+def dump_writerows(rows, **kwds):
+    writer = _csv.writer(NullFile(), **kwds)
+    writer.writerows(rows)
+
+def bench_dump(SIZE=200000, REPEAT=10):
+    simple = [(i, 'name %d' % i, random.random()) for i in xrange(SIZE)]
+    quoted = [('a, b', 'a "quoted" text', i) for i in xrange(SIZE)]
+    for rows, kind in [(simple, "str/int/float"), (quoted, "quoted")]:
+        count_operation("writerow, %d %s rows" % (SIZE, kind),
+                        lambda: dump_writerow(rows), REPEAT)
+        count_operation("writerows, %d %s rows" % (SIZE, kind),
+                        lambda: dump_writerows(rows), REPEAT)
+    count_operation("writerows, QUOTE_NONNUMERIC",
+                    lambda: dump_writerows(simple,
+                                           quoting=_csv.QUOTE_NONNUMERIC),
+                    REPEAT)
+
+if __name__ == '__main__':
+    bench_dump()
@@ -0,0 +1,46 @@
+""" CSV load throughput: reader() on the lines of a file, read_buffer()
+on its whole content, and read_buffer() with typed columns.  Run it with
+a translated pypy.
+"""
+
+import _csv, os, random, tempfile, time
+
+def count_operation(name, function, repeat=1):
+    t0 = time.time()
+    for i in xrange(repeat):
+        retval = function()
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    return retval
+
+def write_data(f, SIZE):
+    writer = _csv.writer(f)
+    writer.writerows([(i, 'name %d' % i, random.random(), 'a "quoted" text')
+                      for i in xrange(SIZE)])
+
+def load_reader(filename):
+    with open(filename, 'rb') as f:
+        return list(_csv.reader(f))
+
+def load_buffer(filename, types=None):
+    with open(filename, 'rb') as f:
+        return _csv.read_buffer(f.read(), types=types)
+
+def bench_load(SIZE=200000, REPEAT=10):
+    fd, filename = tempfile.mkstemp()
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write_data(f, SIZE)
+        rows = count_operation("reader, %d rows" % SIZE,
+                               lambda: load_reader(filename), REPEAT)
+        rows2 = count_operation("read_buffer, %d rows" % SIZE,
+                                lambda: load_buffer(filename), REPEAT)
+        assert rows == rows2
+        count_operation("read_buffer, %d rows, typed columns" % SIZE,
+                        lambda: load_buffer(filename, (int, str, float, str)),
+                        REPEAT)
+    finally:
+        os.unlink(filename)
+
+if __name__ == '__main__':
+    bench_load()
@@ -1,6 +1,9 @@
-from rpython.rlib.rstring import StringBuilder
+from rpython.rlib.rarithmetic import string_to_int
+from rpython.rlib.rfloat import string_to_float
+from rpython.rlib.rstring import (StringBuilder, ParseStringError,
+                                  ParseStringOverflowError)
 from pypy.interpreter.baseobjspace import W_Root
-from pypy.interpreter.error import OperationError
+from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.gateway import unwrap_spec
 from pypy.interpreter.typedef import TypeDef, interp2app
 from pypy.interpreter.typedef import interp_attrproperty_w, interp_attrproperty
@@ -43,8 +46,6 @@ class W_Reader(W_Root):
         space = self.space
         field = field_builder.build()
         if self.numeric_field:
-            from rpython.rlib.rstring import ParseStringError
-            from rpython.rlib.rfloat import string_to_float
             self.numeric_field = False
             try:
                 ff = string_to_float(field)
@@ -268,3 +269,318 @@ def csv_field_size_limit(space, new_limit=-1):
     if new_limit >= 0:
         field_limit.limit = new_limit
     return space.wrap(old_limit)
+
+# ____________________________________________________________
+# read_buffer(): parses a whole buffer at once
+
+TYPE_STR, TYPE_INT, TYPE_FLOAT = range(3)
+
+
+class BufferParser(object):
+    """Parses all the records of a buffer of CSV data.  The fields are
+    sliced out of the buffer, or built from slices when they contain
+    quotes or escapes, instead of being built char by char."""
+
+    def __init__(self, space, dialect, data):
+        self.space = space
+        self.dialect = dialect
+        self.data = data
+        self.pos = 0
+        self.fields = None      # the strings of the last record
+        self.numeric = None     # which of them are QUOTE_NONNUMERIC numbers
+        self.record_end = False # set by an escaped newline
+
+    def error(self, msg, pos):
+        space = self.space
+        msg = 'line %d: %s' % (self.line_num(pos), msg)
+        w_module = space.getbuiltinmodule('_csv')
+        w_error = space.getattr(w_module, space.wrap('Error'))
+        raise OperationError(w_error, space.wrap(msg))
+    error._dont_inline_ = True
+
+    def line_num(self, pos):
+        # only computed for the error messages
+        data = self.data
+        line_num = 1
+        for i in range(min(pos, len(data))):
+            if data[i] == '\n' or (data[i] == '\r' and
+                                   (i + 1 == len(data) or data[i + 1] != '\n')):
+                line_num += 1
+        return line_num
+
+    def check_null_bytes(self):
+        pos = self.data.find('\0')
+        if pos >= 0:
+            raise self.error("line contains NULL byte", pos)
+
+    def next_record(self):
+        """Parse the next record into self.fields and self.numeric.
+        Returns False at the end of the buffer."""
+        data = self.data
+        n = len(data)
+        pos = self.pos
+        if pos >= n:
+            return False
+        self.fields = []
+        self.numeric = []
+        self.record_end = False
+        if not (data[pos] == '\n' or data[pos] == '\r'):
+            while True:
+                pos = self.parse_field(pos)
+                if self.record_end:
+                    self.pos = pos
+                    return True
+                if pos < n and data[pos] == self.dialect.delimiter:
+                    pos += 1
+                else:
+                    break
+        # end of the record: '\n', '\r', '\r\n' or the end of the buffer
+        if pos < n and data[pos] == '\r':
+            pos += 1
+            if pos < n and data[pos] == '\n':
+                pos += 1
+        elif pos < n and data[pos] == '\n':
+            pos += 1
+        self.pos = pos
+        return True
+
+    def parse_field(self, pos):
+        """Parse the field starting at 'pos' and return the position just
+        after it, which is a delimiter, a newline or the end."""
+        data = self.data
+        n = len(data)
+        dialect = self.dialect
+        if dialect.skipinitialspace:
+            while pos < n and data[pos] == ' ':
+                pos += 1
+        start_pos = pos
+        builder = None
+        in_quotes = (pos < n and data[pos] == dialect.quotechar and
+                     dialect.quoting != QUOTE_NONE)
+        numeric = (dialect.quoting == QUOTE_NONNUMERIC and not in_quotes and
+                   pos < n and not self.is_field_end(data[pos]) and
+                   data[pos] != dialect.escapechar)
+        if in_quotes:
+            pos += 1
+        while True:
+            if in_quotes:
+                if builder is None:
+                    builder = StringBuilder()
+                end = self.find_quote_end(pos)
+                if end < 0:
+                    if dialect.strict:
+                        raise self.error("newline inside string", n)
+                    builder.append_slice(data, pos, n)
+                    pos = n
+                    break
+                builder.append_slice(data, pos, end)
+                pos = end + 1
+                if data[end] != dialect.quotechar:
+                    # escape character, the next one is kept as it is
+                    pos = self.append_escaped(builder, pos)
+                    continue
+                if dialect.doublequote:
+                    if pos < n and data[pos] == dialect.quotechar:
+                        # save "" as "
+                        builder.append(dialect.quotechar)
+                        pos += 1
+                        continue
+                    if pos < n and not self.is_field_end(data[pos]):
+                        if dialect.strict:
+                            raise self.error("'%s' expected after '%s'" % (
+                                dialect.delimiter, dialect.quotechar), pos)
+                        # like reader(), the character after the closing
+                        # quote is kept as it is, even an escape character
+                        builder.append(data[pos])
+                        pos += 1
+                # the rest of the field is not quoted
+                in_quotes = False
+            else:
+                start = pos
+                while pos < n:
+                    c = data[pos]
+                    if self.is_field_end(c) or c == dialect.escapechar:
+                        break
+                    pos += 1
+                if builder is None and (pos == n or
+                                        data[pos] != dialect.escapechar):
+                    # common case: the field is a slice of the buffer
+                    assert start >= 0
+                    self.save_field(data[start:pos], numeric, start_pos)
+                    return pos
+                if builder is None:
+                    builder = StringBuilder()
+                builder.append_slice(data, start, pos)
+                if pos < n and data[pos] == dialect.escapechar:
+                    if pos + 1 == n and dialect.strict:
+                        raise self.error("newline inside string", n)
+                    pos = self.append_escaped(builder, pos + 1)
+                    c = data[pos - 1]
+                    if c == '\n' or c == '\r':
+                        # like reader(), an escaped newline ends the line,
+                        # and so the record; after an escaped '\r', a '\n'
+                        # is still part of the same line
+                        self.record_end = True
+                        if c == '\r' and pos < n and data[pos] == '\n':
+                            pos += 1
+                        break
+                    continue
+                break
+        self.save_field(builder.build(), numeric, start_pos)
+        return pos
+
+    def append_escaped(self, builder, pos):
+        """Append the character at 'pos', which follows an escape
+        character, and return the position after it."""
+        if pos < len(self.data):
+            builder.append(self.data[pos])
+            return pos + 1
+        # an escape character at the end is a newline, like in reader()
+        builder.append('\n')
+        return pos
+
+    def is_field_end(self, c):
+        return c == self.dialect.delimiter or c == '\n' or c == '\r'
+
+    def find_quote_end(self, pos):
+        """Return the position of the next quote or escape character in
+        a quoted field, or -1."""
+        dialect = self.dialect
+        data = self.data
+        if dialect.escapechar == '\0':
+            return data.find(dialect.quotechar, pos)
+        while pos < len(data):
+            c = data[pos]
+            if c == dialect.quotechar or c == dialect.escapechar:
+                return pos
+            pos += 1
+        return -1
+
+    def save_field(self, field, numeric, pos):
+        if len(field) > field_limit.limit:
+            raise self.error("field larger than field limit", pos)
+        self.fields.append(field)
+        self.numeric.append(numeric)
+
+    def wrap_record(self):
+        space = self.space
+        if True not in self.numeric:
+            return space.newlist_bytes(self.fields)
+        fields_w = [None] * len(self.fields)
+        for i in range(len(self.fields)):
+            field = self.fields[i]
+            if self.numeric[i]:
+                try:
+                    w_obj = space.wrap(string_to_float(field))
+                except ParseStringError as e:
+                    raise wrap_parsestringerror(space, e, space.wrap(field))
+            else:
+                w_obj = space.wrap(field)
+            fields_w[i] = w_obj
+        return space.newlist(fields_w)
+
+    def read_rows(self):
+        rows_w = []
+        while self.next_record():
+            rows_w.append(self.wrap_record())
+        return self.space.newlist(rows_w)
+
+    def read_columns(self, types):
+        space = self.space
+        ncolumns = len(types)
+        columns_s = [[] for i in range(ncolumns)]
+        columns_i = [[] for i in range(ncolumns)]
+        columns_f = [[] for i in range(ncolumns)]
+        while True:
+            pos = self.pos
+            if not self.next_record():
+                break
+            fields = self.fields
+            if not fields:
+                continue    # blank line
+            if len(fields) != ncolumns:
+                raise self.error("expected %d fields, got %d" % (
+                    ncolumns, len(fields)), pos)
+            for i in range(ncolumns):
+                field = fields[i]
+                if types[i] == TYPE_INT:
+                    try:
+                        columns_i[i].append(string_to_int(field))
+                    except ParseStringError:
+                        raise self.value_error(field, "int", pos)
+                    except ParseStringOverflowError:
+                        raise self.value_error(field, "int", pos)
+                elif types[i] == TYPE_FLOAT:
+                    try:
+                        columns_f[i].append(string_to_float(field))
+                    except ParseStringError:
+                        raise self.value_error(field, "float", pos)
+                else:
+                    columns_s[i].append(field)
+        columns_w = [None] * ncolumns
+        for i in range(ncolumns):
+            if types[i] == TYPE_INT:
+                columns_w[i] = space.newlist_int(columns_i[i])
+            elif types[i] == TYPE_FLOAT:
+                columns_w[i] = space.newlist_float(columns_f[i])
+            else:
+                columns_w[i] = space.newlist_bytes(columns_s[i])
+        return space.newlist(columns_w)
+
+    def value_error(self, field, typename, pos):
+        space = self.space
+        return oefmt(space.w_ValueError, "line %d: invalid %s value: %s",
+                     self.line_num(pos), typename,
+                     space.str_w(space.repr(space.wrap(field))))
+
+
+def unwrap_column_types(space, w_types):
+    types = []
+    for w_type in space.listview(w_types):
+        if space.is_w(w_type, space.w_int):
+            types.append(TYPE_INT)
+        elif space.is_w(w_type, space.w_float):
+            types.append(TYPE_FLOAT)
+        elif space.is_w(w_type, space.w_str) or space.is_w(w_type,
+                                                          space.w_None):
+            types.append(TYPE_STR)
+        else:
+            raise oefmt(space.w_TypeError,
+                        "column types must be int, float, str or None, "
+                        "not %R", w_type)
+    return types
+
+@unwrap_spec(data='bufferstr')
+def csv_read_buffer(space, data, w_dialect=None,
+                  w_types            = None,
+                  w_delimiter        = None,
+                  w_doublequote      = None,
+                  w_escapechar       = None,
+                  w_lineterminator   = None,
+                  w_quotechar        = None,
+                  w_quoting          = None,
+                  w_skipinitialspace = None,
+                  w_strict           = None,
+                  ):
+    """
+    rows = read_buffer(data [, dialect='excel'] [, types=None]
+                       [optional keyword args])
+    columns = read_buffer(data, types=(str, int, float))
+
+    Parses all the records of the string 'data' at once, which is
+    faster than reader() on the lines of 'data'.  The records end with
+    '\\n', '\\r' or '\\r\\n'.  Returns a list of rows, like
+    list(reader(data.splitlines(True))).
+
+    With 'types', a sequence of int, float, str or None (meaning str)
+    with an item per column, returns a list of columns instead: each
+    column is a list of the values of one field of all the records,
+    converted to its type.  Blank lines are skipped."""
+    dialect = _build_dialect(space, w_dialect, w_delimiter, w_doublequote,
+                             w_escapechar, w_lineterminator, w_quotechar,
+                             w_quoting, w_skipinitialspace, w_strict)
+    parser = BufferParser(space, dialect, data)
+    parser.check_null_bytes()
+    if space.is_none(w_types):
+        return parser.read_rows()
+    return parser.read_columns(unwrap_column_types(space, w_types))
@@ -6,6 +6,9 @@ from pypy.interpreter.typedef import interp_attrproperty_w
 from pypy.module._csv.interp_csv import _build_dialect
 from pypy.module._csv.interp_csv import (QUOTE_MINIMAL, QUOTE_ALL,
                                          QUOTE_NONNUMERIC, QUOTE_NONE)
+from pypy.objspace.std.floatobject import float2string
+
+WRITEROWS_CHUNK = 8192
 
 
 class W_Writer(W_Root):
@@ -31,40 +34,56 @@ class W_Writer(W_Root):
     def writerow(self, w_fields):
         """Construct and write a CSV record from a sequence of fields.
         Non-string elements will be converted to string."""
+        space = self.space
+        rec = StringBuilder(80)
+        self.join_row(rec, w_fields)
+        line = rec.build()
+        return space.call_function(self.w_filewrite, space.wrap(line))
+
+    def join_row(self, rec, w_fields):
         space = self.space
         fields_w = space.listview(w_fields)
         dialect = self.dialect
-        rec = StringBuilder(80)
         #
         for field_index in range(len(fields_w)):
             w_field = fields_w[field_index]
-            if space.is_w(w_field, space.w_None):
+            # fast paths for the exact types str, int and float
+            w_type = space.type(w_field)
+            if space.is_w(w_type, space.w_str):
+                field = space.str_w(w_field)
+                numeric = False
+            elif space.is_w(w_type, space.w_int):
+                field = str(space.int_w(w_field))
+                numeric = True
+            elif space.is_w(w_type, space.w_float):
+                field = float2string(space.float_w(w_field), 'r', 0)
+                numeric = True
+            elif space.is_w(w_field, space.w_None):
                 field = ""
-            elif space.isinstance_w(w_field, space.w_float):
-                field = space.str_w(space.repr(w_field))
+                numeric = False
             else:
-                field = space.str_w(space.str(w_field))
+                if space.isinstance_w(w_field, space.w_float):
+                    field = space.str_w(space.repr(w_field))
+                else:
+                    field = space.str_w(space.str(w_field))
+                numeric = (dialect.quoting == QUOTE_NONNUMERIC and
+                           self.is_number(w_field))
             #
+            # index of the first special character, or -1
+            special = self.find_special(field)
             if dialect.quoting == QUOTE_NONNUMERIC:
-                try:
-                    space.float_w(w_field)    # is it an int/long/float?
-                    quoted = False
-                except OperationError, e:
-                    if e.async(space):
-                        raise
-                    quoted = True
+                quoted = not numeric
             elif dialect.quoting == QUOTE_ALL:
                 quoted = True
             elif dialect.quoting == QUOTE_MINIMAL:
                 # Find out if we really quoting
-                special_characters = self.special_characters
-                for c in field:
-                    if c in special_characters:
-                        if c != dialect.quotechar or dialect.doublequote:
-                            quoted = True
-                            break
-                else:
-                    quoted = False
+                quoted = False
+                if special >= 0:
+                    for c in field:
+                        if c in self.special_characters:
+                            if c != dialect.quotechar or dialect.doublequote:
+                                quoted = True
+                                break
             else:
                 quoted = False
 
@@ -83,28 +102,12 @@ class W_Writer(W_Root):
             if quoted:
                 rec.append(dialect.quotechar)
 
-            # Copy field data
-            special_characters = self.special_characters
-            for c in field:
-                if c in special_characters:
-                    if dialect.quoting == QUOTE_NONE:
-                        want_escape = True
-                    else:
-                        want_escape = False
-                        if c == dialect.quotechar:
-                            if dialect.doublequote:
-                                rec.append(dialect.quotechar)
-                            else:
-                                want_escape = True
-                    if want_escape:
-                        if dialect.escapechar == '\0':
-                            raise self.error("need to escape, "
-                                             "but no escapechar set")
-                        rec.append(dialect.escapechar)
-                    else:
-                        assert quoted
-                # Copy field character into record buffer
-                rec.append(c)
+            # Copy field data, in one piece up to the first special character
+            if special < 0:
+                rec.append(field)
+            else:
+                rec.append_slice(field, 0, special)
+                self.copy_escaped(rec, field, special, quoted)
 
             # Handle final quote
             if quoted:
@@ -113,22 +116,79 @@ class W_Writer(W_Root):
         # Add line terminator
         rec.append(dialect.lineterminator)
 
-        line = rec.build()
-        return space.call_function(self.w_filewrite, space.wrap(line))
+    def is_number(self, w_field):
+        space = self.space
+        try:
+            space.float_w(w_field)    # is it an int/long/float?
+        except OperationError, e:
+            if e.async(space):
+                raise
+            return False
+        return True
+
+    def find_special(self, field):
+        special_characters = self.special_characters
+        for i in range(len(field)):
+            if field[i] in special_characters:
+                return i
+        return -1
+
+    def copy_escaped(self, rec, field, start, quoted):
+        dialect = self.dialect
+        special_characters = self.special_characters
+        for i in range(start, len(field)):
+            c = field[i]
+            if c in special_characters:
+                if dialect.quoting == QUOTE_NONE:
+                    want_escape = True
+                else:
+                    want_escape = False
+                    if c == dialect.quotechar:
+                        if dialect.doublequote:
+                            rec.append(dialect.quotechar)
+                        else:
+                            want_escape = True
+                if want_escape:
+                    if dialect.escapechar == '\0':
+                        raise self.error("need to escape, "
+                                         "but no escapechar set")
+                    rec.append(dialect.escapechar)
+                else:
+                    assert quoted
+            # Copy field character into record buffer
+            rec.append(c)
 
     def writerows(self, w_seqseq):
         """Construct and write a series of sequences to a csv file.
         Non-string elements will be converted to string."""
+        # the rows are joined and written in chunks of about
+        # WRITEROWS_CHUNK bytes, instead of one write() call per row
         space = self.space
         w_iter = space.iter(w_seqseq)
+        rec = StringBuilder(WRITEROWS_CHUNK)
         while True:
             try:
                 w_seq = space.next(w_iter)
             except OperationError, e:
+                self.write_chunk(rec.build())
                 if e.match(space, space.w_StopIteration):
                     break
                 raise
-            self.writerow(w_seq)
+            complete = rec.getlength()
+            try:
+                self.join_row(rec, w_seq)
+            except OperationError:
+                # write the rows before the one that failed
+                self.write_chunk(rec.build()[:complete])
+                raise
+            if rec.getlength() >= WRITEROWS_CHUNK:
+                self.write_chunk(rec.build())
+                rec = StringBuilder(WRITEROWS_CHUNK)
+
+    def write_chunk(self, data):
+        if data:
+            space = self.space
+            space.call_function(self.w_filewrite, space.wrap(data))
 
 
 def csv_writer(space, w_fileobj, w_dialect=None,
@@ -104,3 +104,114 @@ class AppTestReader(object):
         self._read_test(['a,"'], 'Error', strict=True)
         self._read_test(['"a'], 'Error', strict=True)
         self._read_test(['^'], 'Error', escapechar='^', strict=True)
+
+
+class AppTestReadBuffer(object):
+    spaceconfig = dict(usemodules=['_csv', '__pypy__'])
+
+    def setup_class(cls):
+        w__compare = cls.space.appexec([], r"""():
+            import _csv
+            def _compare(data, **kwargs):
+                # read_buffer() gives the same as reader() on the lines
+                try:
+                    expected = list(_csv.reader(data.splitlines(True),
+                                                **kwargs))
+                except _csv.Error:
+                    raises(_csv.Error, _csv.read_buffer, data, **kwargs)
+                    return
+                result = _csv.read_buffer(data, **kwargs)
+                assert result == expected, 'result: %r\nexpect: %r' % (
+                    result, expected)
+            return _compare
+        """)
+        if type(w__compare) is type(lambda:0):
+            w__compare = staticmethod(w__compare)
+        cls.w__compare = w__compare
+
+    def test_simple(self):
+        import _csv
+        assert _csv.read_buffer('a,b\r\nc,d\n') == [['a', 'b'], ['c', 'd']]
+        for data in ['', 'a', 'a,b', 'a,b\n', 'a,b\r\nc,d\re,f\ng', '\n',
+                     'a\n\nb\r\n\r\nc', 'a,', ',', ',\n,', 'a,b,c,d\n' * 5]:
+            self._compare(data)
+            self._compare(data, delimiter=';')
+
+    def test_quotes(self):
+        for data in ['"a,b",c', '"a""b",c', '"a\nb",c\nd', '"a\r\nb"',
+                     '12,12,1",', '"ab"c', '"a', 'a,"', '"a"', '""',
+                     '"a"""', '"a" ,b', '"a"\n"b"', 'a"b"c,"d']:
+            self._compare(data)
+            self._compare(data, strict=True)
+            self._compare(data, doublequote=False)
+            self._compare(data, quotechar="'")
+            self._compare(data, quoting=3)      # QUOTE_NONE
+
+    def test_escape(self):
+        for data in ['a^,b,c', '"a^"b",c', 'a^', '"a^', 'a^\nb,c',
+                     'a^\n,c', '^^a', '"^\nb"', 'a^b^']:
+            self._compare(data, escapechar='^')
+            self._compare(data, escapechar='^', strict=True)
+            self._compare(data, escapechar='^', doublequote=False)
+
+    def test_escaped_cr(self):
+        import _csv
+        for data in ['a^\rb', 'a^\r\nb', 'a^\r\n\nb', 'a,^\r,b\n',
+                     '"a"^\rb', '"a"^^\rb', '"a^\rb"', 'a^\r^\r']:
+            self._compare(data, escapechar='^')
+            self._compare(data, escapechar='^', quoting=_csv.QUOTE_NONE)
+        self._compare('b\\\r\\ \r"', escapechar='\\',
+                      quoting=_csv.QUOTE_NONE)
+        self._compare('..  \\\r,;,.\n', escapechar='\\',
+                      doublequote=False)
+
+    def test_options(self):
+        import _csv
+        self._compare('a, b,  "c d"', skipinitialspace=True)
+        self._compare('1,"a",2.5,\n', quoting=_csv.QUOTE_NONNUMERIC)
+        raises(ValueError, _csv.read_buffer, '1,x',
+               quoting=_csv.QUOTE_NONNUMERIC)
+        self._compare('a:b', dialect='excel', delimiter=':')
+
+    def test_errors(self):
+        import _csv
+        exc = raises(_csv.Error, _csv.read_buffer, 'a\nb\0c')
+        assert str(exc.value) == 'line 2: line contains NULL byte'
+        exc = raises(_csv.Error, _csv.read_buffer, 'a\n"b"c', strict=True)
+        assert str(exc.value) == "line 2: ',' expected after '\"'"
+        limit = _csv.field_size_limit(10)
+        try:
+            assert _csv.read_buffer('x' * 10) == [['x' * 10]]
+            raises(_csv.Error, _csv.read_buffer, 'x' * 11)
+            raises(_csv.Error, _csv.read_buffer, '"%s"' % ('x' * 11))
+        finally:
+            _csv.field_size_limit(limit)
+
+    def test_buffer(self):
+        import _csv
+        assert _csv.read_buffer(buffer('xa,b', 1)) == [['a', 'b']]
+
+    def test_columns(self):
+        import _csv
+        from __pypy__ import strategy
+        data = 'a,1,2.5\r\n"b,c", -2 ,1e3\n\nd,3,4\n'
+        columns = _csv.read_buffer(data, types=(str, int, float))
+        assert columns == [['a', 'b,c', 'd'], [1, -2, 3], [2.5, 1000.0, 4.0]]
+        assert [strategy(c) for c in columns] == [
+            'BytesListStrategy', 'IntegerListStrategy', 'FloatListStrategy']
+        assert _csv.read_buffer(data, types=[None, None, None]) == [
+            ['a', 'b,c', 'd'], ['1', ' -2 ', '3'], ['2.5', '1e3', '4']]
+        assert _csv.read_buffer('', types=(int,)) == [[]]
+
+    def test_columns_errors(self):
+        import _csv
+        exc = raises(_csv.Error, _csv.read_buffer, 'a,1\nb\n',
+                     types=(str, int))
+        assert str(exc.value) == 'line 2: expected 2 fields, got 1'
+        exc = raises(ValueError, _csv.read_buffer, 'a,1\nb,x\n',
+                     types=(str, int))
+        assert str(exc.value) == "line 2: invalid int value: 'x'"
+        raises(ValueError, _csv.read_buffer, 'a,%d' % (2 ** 70,),
+               types=(str, int))
+        raises(ValueError, _csv.read_buffer, '1.5x', types=(float,))
+        raises(TypeError, _csv.read_buffer, '1', types=(list,))
@@ -85,3 +85,44 @@ class AppTestWriter(object):
 
     def test_writerows(self):
         self._write_test([['a'],['b','c']], 'a\r\nb,c')
+
+    def test_write_types(self):
+        import _csv as csv
+        class MyInt(int):
+            pass
+        self._write_test([1, -2L, 0.1, 1e100, True, None, MyInt(3)],
+                         '1,-2,0.1,1e+100,True,,3')
+        self._write_test([1, 2.5, True, 'a', None], '1,2.5,True,"a",""',
+                         quoting = csv.QUOTE_NONNUMERIC)
+
+    def test_writerows_chunks(self):
+        import _csv
+        writes = []
+        class File(object):
+            def write(self, data):
+                writes.append(data)
+        writer = _csv.writer(File())
+        rows = [['row', i, 'p,q'] for i in range(10000)]
+        writer.writerows(rows)
+        assert 1 < len(writes) < 100
+        assert ''.join(writes) == ''.join(
+            ['row,%d,"p,q"\r\n' % i for i in range(10000)])
+
+    def test_writerows_error(self):
+        import _csv
+        writes = []
+        class File(object):
+            def write(self, data):
+                writes.append(data)
+        class BadItem:
+            def __str__(self):
+                raise IOError
+        writer = _csv.writer(File())
+        raises(IOError, writer.writerows, [['a', 1], ['b', BadItem()]])
+        assert writes == ['a,1\r\n']
+        def rows():
+            yield ['c', 2]
+            raise IOError
+        del writes[:]
+        raises(IOError, writer.writerows, rows())
+        assert writes == ['c,2\r\n']
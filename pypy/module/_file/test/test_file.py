@@ -293,6 +293,23 @@ Delivered-To: gkj@sundance.gregorykjohnson.com'''
         raises(IOError, f.read)
         f.close()
 
+    def test_mmap_buffering(self):
+        import sys
+        if '__pypy__' not in sys.builtin_module_names:
+            skip('MMAP_BUFFERING is specific to PyPy')
+        with self.file(self.temppath, "wb") as f:
+            f.write("foo\nbar\nbaz")
+        # -2 is _io.MMAP_BUFFERING
+        with self.file(self.temppath, "rb", -2) as f:
+            assert f.readline() == "foo\n"
+            assert f.tell() == 4
+            assert list(f) == ["bar\n", "baz"]
+            f.seek(1)
+            assert f.read(2) == "oo"
+            assert f.read() == "\nbar\nbaz"
+        with self.file(self.temppath, "rU", -2) as f:
+            assert f.readlines() == ["foo\n", "bar\n", "baz"]
+
 
 class AppTestNonblocking(object):
     def setup_class(cls):
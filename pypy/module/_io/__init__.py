@@ -7,6 +7,7 @@ class Module(MixedModule):
 
     interpleveldefs = {
         'DEFAULT_BUFFER_SIZE': 'space.wrap(interp_iobase.DEFAULT_BUFFER_SIZE)',
+        'MMAP_BUFFERING': 'space.wrap(interp_io.MMAP_BUFFERING)',
         'BlockingIOError': 'interp_io.W_BlockingIOError',
         'UnsupportedOperation':
             'space.fromcache(interp_io.Cache).w_unsupportedoperation',
@@ -0,0 +1,59 @@
+""" BufferedReader throughput: readinto() with a destination larger than
+the buffer, readline(), iteration and readlines() on a file of short
+lines, with the default buffering and with MMAP_BUFFERING.  Run it with
+a translated pypy, before and after a change.
+"""
+
+import _io, os, tempfile, time
+
+def count_operation(name, function, repeat=1):
+    t0 = time.time()
+    for i in xrange(repeat):
+        retval = function()
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    return retval
+
+def read_all_into(filename, size, buffering):
+    buf = bytearray(size)
+    with _io.open(filename, 'rb', buffering) as f:
+        while f.readinto(buf):
+            pass
+
+def readline_all(filename, buffering):
+    with _io.open(filename, 'rb', buffering) as f:
+        while f.readline():
+            pass
+
+def iterate_all(filename, buffering):
+    with _io.open(filename, 'rb', buffering) as f:
+        for line in f:
+            pass
+
+def readlines_all(filename, buffering):
+    with _io.open(filename, 'rb', buffering) as f:
+        return len(f.readlines())
+
+def bench_bufferedio(SIZE=1000000, REPEAT=10):
+    fd, filename = tempfile.mkstemp()
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for i in xrange(SIZE):
+                f.write('%d some log line, with a timestamp\n' % i)
+        for buffering, kind in [(-1, "buffered"),
+                                (_io.MMAP_BUFFERING, "mmap")]:
+            count_operation("%s readinto, 1MB destination" % kind,
+                lambda: read_all_into(filename, 1 << 20, buffering), REPEAT)
+            count_operation("%s readinto, 1KB destination" % kind,
+                lambda: read_all_into(filename, 1 << 10, buffering), REPEAT)
+            count_operation("%s readline, %d lines" % (kind, SIZE),
+                lambda: readline_all(filename, buffering), REPEAT)
+            count_operation("%s iteration, %d lines" % (kind, SIZE),
+                lambda: iterate_all(filename, buffering), REPEAT)
+            count_operation("%s readlines, %d lines" % (kind, SIZE),
+                lambda: readlines_all(filename, buffering), REPEAT)
+    finally:
+        os.unlink(filename)
+
+if __name__ == '__main__':
+    bench_bufferedio()
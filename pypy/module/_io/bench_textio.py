@@ -0,0 +1,48 @@
+""" TextIOWrapper line iteration, compared with the same iteration in
+binary mode, for the encodings that have a builtin decoder and one that
+does not.  Run it with a translated pypy.
+"""
+
+import _io, os, tempfile, time
+
+def count_operation(name, function, repeat=1):
+    t0 = time.time()
+    for i in xrange(repeat):
+        retval = function()
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    return retval
+
+def iterate_binary(filename):
+    with _io.open(filename, 'rb') as f:
+        for line in f:
+            pass
+
+def iterate_text(filename, encoding):
+    with _io.open(filename, 'r', encoding=encoding) as f:
+        for line in f:
+            pass
+
+def readline_tell(filename, encoding):
+    with _io.open(filename, 'r', encoding=encoding) as f:
+        while f.readline():
+            f.tell()
+
+def bench_textio(SIZE=1000000, REPEAT=5):
+    fd, filename = tempfile.mkstemp()
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for i in xrange(SIZE):
+                f.write('%d some log line, with a timestamp\n' % i)
+        count_operation("binary iteration, %d lines" % SIZE,
+                        lambda: iterate_binary(filename), REPEAT)
+        for encoding in ['utf-8', 'latin-1', 'ascii', 'cp1252']:
+            count_operation("%s iteration, %d lines" % (encoding, SIZE),
+                            lambda: iterate_text(filename, encoding), REPEAT)
+        count_operation("utf-8 readline and tell, %d lines" % SIZE,
+                        lambda: readline_tell(filename, 'utf-8'), REPEAT)
+    finally:
+        os.unlink(filename)
+
+if __name__ == '__main__':
+    bench_textio()
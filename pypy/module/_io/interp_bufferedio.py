@@ -1,13 +1,15 @@
 from __future__ import with_statement
 
 from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.streamutil import wrap_streamerror
 from pypy.interpreter.typedef import (
     TypeDef, GetSetProperty, generic_new_descr, interp_attrproperty_w)
 from pypy.interpreter.gateway import interp2app, unwrap_spec, WrappedDefault
-from rpython.rlib.buffer import Buffer
+from rpython.rlib.buffer import Buffer, SubBuffer
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib.rarithmetic import r_longlong, intmask
-from rpython.rlib import rposix
+from rpython.rlib import rposix, streamio
+from rpython.rlib.streamio import StreamErrors
 from rpython.tool.sourcetools import func_renamer
 from pypy.module._io.interp_iobase import (
     W_IOBase, DEFAULT_BUFFER_SIZE, convert_size, trap_eintr,
@@ -519,7 +521,11 @@ class BufferedMixin:
 
     def _raw_read(self, space, buffer, start, length):
         length = intmask(length)
-        w_buf = space.newbuffer(RawBuffer(buffer, start, length))
+        return self._raw_readinto(space, RawBuffer(buffer, start, length))
+
+    def _raw_readinto(self, space, rwbuffer):
+        length = rwbuffer.getlength()
+        w_buf = space.newbuffer(rwbuffer)
         while True:
             try:
                 w_size = space.call_method(self.w_raw, "readinto", w_buf)
@@ -628,39 +634,104 @@ class BufferedMixin:
             return res
         return None
 
+    def readinto_w(self, space, w_buffer):
+        self._check_init(space)
+        self._check_closed(space, "readinto of closed file")
+        rwbuffer = space.getarg_w('w*', w_buffer)
+        with self.lock:
+            written = self._readinto_generic(space, rwbuffer)
+        if written < 0:
+            return space.w_None
+        return space.wrap(written)
+
+    def _copy_into(self, rwbuffer, start, length):
+        # copy 'length' bytes from the current position of the buffer
+        # without building an intermediate string
+        assert length >= 0
+        for i in range(length):
+            rwbuffer.setitem(start + i, self.buffer[self.pos + i])
+        self.pos += length
+
+    def _readinto_generic(self, space, rwbuffer):
+        """Fill 'rwbuffer' from the stream until it is full, or until an EOF
+           occurs or until read() would block; returns -1 if nothing could
+           be read without blocking.  The blocks that are larger than our
+           buffer go directly from the raw stream into 'rwbuffer'."""
+        # Must run with the lock held!
+        length = rwbuffer.getlength()
+        written = self._readahead()
+        if written > length:
+            written = length
+        self._copy_into(rwbuffer, 0, written)
+        if written == length:
+            return written
+
+        # Flush the write buffer if necessary
+        if self.writable:
+            self._flush_and_rewind_unlocked(space)
+        self._reader_reset_buf()
+        self.pos = 0
+
+        while written < length:
+            remaining = length - written
+            r = self.buffer_size * (remaining // self.buffer_size)
+            try:
+                if r > 0:
+                    size = self._raw_readinto(
+                        space, SubBuffer(rwbuffer, written, r))
+                else:
+                    self.pos = 0
+                    self.read_end = 0
+                    size = self._fill_buffer(space)
+                    if size > remaining:
+                        size = remaining
+                    self._copy_into(rwbuffer, written, size)
+            except BlockingIOError:
+                if written == 0:
+                    return -1
+                break
+            if size == 0:
+                break
+            written += size
+        return written
+
+    def _find_newline(self, end):
+        """Return the position just after the first newline between the
+           current position and 'end', or -1."""
+        pos = self.pos
+        while pos < end:
+            if self.buffer[pos] == '\n':
+                return pos + 1
+            pos += 1
+        return -1
+
     def readline_w(self, space, w_limit=None):
         self._check_init(space)
         self._check_closed(space, "readline of closed file")
 
         limit = convert_size(space, w_limit)
+        return space.wrap(self._readline(space, limit))
 
+    def _readline(self, space, limit):
         # First, try to find a line in the buffer. This can run
         # unlocked because the calls to the C API are simple enough
         # that they can't trigger any thread switch.
         have = self._readahead()
         if limit >= 0 and have > limit:
             have = limit
-        for pos in range(self.pos, self.pos+have):
-            if self.buffer[pos] == '\n':
-                break
-        else:
-            pos = -1
-        if pos >= 0:
-            w_res = space.wrap(''.join(self.buffer[self.pos:pos+1]))
-            self.pos = pos + 1
-            return w_res
-        if have == limit:
-            w_res = space.wrap(''.join(self.buffer[self.pos:self.pos+have]))
-            self.pos += have
-            return w_res
+        end = self._find_newline(self.pos + have)
+        if end < 0 and have == limit:
+            end = self.pos + have
+        if end >= 0:
+            res = ''.join(self.buffer[self.pos:end])
+            self.pos = end
+            return res
 
-        written = 0
         with self.lock:
             # Now we try to get some more from the raw stream
-            chunks = []
+            builder = StringBuilder()
             if have > 0:
-                chunks.extend(self.buffer[self.pos:self.pos+have])
-                written += have
+                builder.append(''.join(self.buffer[self.pos:self.pos+have]))
                 self.pos += have
                 if limit >= 0:
                     limit -= have
@@ -669,30 +740,62 @@ class BufferedMixin:
 
             while True:
                 self._reader_reset_buf()
+                self.pos = 0
                 have = self._fill_buffer(space)
                 if have == 0:
                     break
                 if limit >= 0 and have > limit:
                     have = limit
-                pos = 0
-                found = False
-                while pos < have:
-                    c = self.buffer[pos]
-                    pos += 1
-                    if c == '\n':
-                        self.pos = pos
-                        found = True
-                        break
-                chunks.extend(self.buffer[0:pos])
-                if found:
+                end = self._find_newline(have)
+                if end < 0:
+                    end = have
+                assert end >= 0
+                builder.append(''.join(self.buffer[0:end]))
+                self.pos = end
+                if end < have or have == limit:
                     break
-                if have == limit:
-                    self.pos = have
+                if self.buffer[end - 1] == '\n':
                     break
-                written += have
                 if limit >= 0:
                     limit -= have
-            return space.wrap(''.join(chunks))
+            return builder.build()
+
+    def _readline_is_builtin(self, space):
+        # like CPython, skip the lookup of the 'readline' method for the
+        # exact types: subclasses may override it
+        w_type = space.type(self)
+        return (space.is_w(w_type,
+                    space.gettypeobject(W_BufferedReader.typedef)) or
+                space.is_w(w_type,
+                    space.gettypeobject(W_BufferedRandom.typedef)))
+
+    def next_w(self, space):
+        if not self._readline_is_builtin(space):
+            return W_IOBase.next_w(self, space)
+        self._check_init(space)
+        self._check_closed(space, "readline of closed file")
+        line = self._readline(space, -1)
+        if not line:
+            raise OperationError(space.w_StopIteration, space.w_None)
+        return space.wrap(line)
+
+    def readlines_w(self, space, w_hint=None):
+        if not self._readline_is_builtin(space):
+            return W_IOBase.readlines_w(self, space, w_hint)
+        self._check_init(space)
+        self._check_closed(space, "readline of closed file")
+        hint = convert_size(space, w_hint)
+        lines_w = []
+        length = 0
+        while True:
+            line = self._readline(space, -1)
+            if not line:
+                break
+            lines_w.append(space.wrap(line))
+            length += len(line)
+            if hint > 0 and length > hint:
+                break
+        return space.newlist(lines_w)
 
     # ____________________________________________________
     # Write methods
@@ -853,6 +956,9 @@ W_BufferedReader.typedef = TypeDef(
     read1 = interp2app(W_BufferedReader.read1_w),
     raw = interp_attrproperty_w("w_raw", cls=W_BufferedReader),
     readline = interp2app(W_BufferedReader.readline_w),
+    readinto = interp2app(W_BufferedReader.readinto_w),
+    readlines = interp2app(W_BufferedReader.readlines_w),
+    next = interp2app(W_BufferedReader.next_w),
 
     # from the mixin class
     __repr__ = interp2app(W_BufferedReader.repr_w),
@@ -1027,6 +1133,9 @@ W_BufferedRandom.typedef = TypeDef(
     peek = interp2app(W_BufferedRandom.peek_w),
     read1 = interp2app(W_BufferedRandom.read1_w),
     readline = interp2app(W_BufferedRandom.readline_w),
+    readinto = interp2app(W_BufferedRandom.readinto_w),
+    readlines = interp2app(W_BufferedRandom.readlines_w),
+    next = interp2app(W_BufferedRandom.next_w),
 
     write = interp2app(W_BufferedRandom.write_w),
     flush = interp2app(W_BufferedRandom.flush_w),
@@ -1048,3 +1157,223 @@ W_BufferedRandom.typedef = TypeDef(
     name = GetSetProperty(W_BufferedRandom.name_get_w),
     mode = GetSetProperty(W_BufferedRandom.mode_get_w),
 )
+
+
+class W_MMapReader(W_BufferedIOBase):
+    """Reader of a regular file through an mmap of it, returned by
+    open(..., 'rb', buffering=MMAP_BUFFERING).  Reads and readline()
+    slice the mapping directly instead of copying blocks to a buffer.
+    The position of the raw stream is only updated by detach()."""
+
+    def __init__(self, space, w_raw, stream):
+        W_BufferedIOBase.__init__(self, space)
+        self.w_raw = w_raw
+        self.stream = stream    # a streamio.MMapFile, None once detached
+
+    def _check_init(self, space):
+        if self.stream is None:
+            raise OperationError(space.w_ValueError, space.wrap(
+                "raw stream has been detached"))
+
+    def _check_closed(self, space, message=None):
+        self._check_init(space)
+        W_BufferedIOBase._check_closed(self, space, message)
+
+    def _closed(self, space):
+        return space.is_true(space.getattr(self.w_raw, space.wrap("closed")))
+
+    def closed_get_w(self, space):
+        self._check_init(space)
+        return space.getattr(self.w_raw, space.wrap("closed"))
+
+    def name_get_w(self, space):
+        return space.getattr(self.w_raw, space.wrap("name"))
+
+    def mode_get_w(self, space):
+        return space.getattr(self.w_raw, space.wrap("mode"))
+
+    def readable_w(self, space):
+        self._check_init(space)
+        return space.w_True
+
+    def writable_w(self, space):
+        self._check_init(space)
+        return space.w_False
+
+    def seekable_w(self, space):
+        self._check_init(space)
+        return space.w_True
+
+    def isatty_w(self, space):
+        return space.w_False
+
+    def fileno_w(self, space):
+        self._check_init(space)
+        return space.call_method(self.w_raw, "fileno")
+
+    def repr_w(self, space):
+        name_repr = space.str_w(space.repr(space.getattr(self,
+                                                        space.wrap("name"))))
+        return space.wrap("<_io.MMapReader name=%s>" % (name_repr,))
+
+    def flush_w(self, space):
+        self._check_init(space)
+        return space.call_method(self.w_raw, "flush")
+
+    def close_w(self, space):
+        self._check_init(space)
+        if self._closed(space):
+            return
+        try:
+            self.stream.close1(False)
+        finally:
+            space.call_method(self.w_raw, "close")
+
+    def detach_w(self, space):
+        self._check_init(space)
+        self._check_closed(space, "detach of closed file")
+        # the raw stream continues from where we stopped
+        stream = self.stream
+        space.call_method(self.w_raw, "seek", space.wrap(stream.tell()))
+        stream.close1(False)
+        self.stream = None
+        return self.w_raw
+
+    def tell_w(self, space):
+        self._check_closed(space, "tell of closed file")
+        return space.wrap(self.stream.tell())
+
+    @unwrap_spec(pos=r_longlong, whence=int)
+    def seek_w(self, space, pos, whence=0):
+        if whence not in (0, 1, 2):
+            raise oefmt(space.w_ValueError,
+                        "whence must be between 0 and 2, not %d", whence)
+        self._check_closed(space, "seek of closed file")
+        if whence == 0 and pos < 0:
+            raise oefmt(space.w_ValueError, "negative seek position %d", pos)
+        try:
+            self.stream.seek(pos, whence)
+        except StreamErrors, e:
+            raise wrap_streamerror(space, e)
+        return space.wrap(self.stream.tell())
+
+    # ____________________________________________________
+    # Read methods, all slicing the mapping
+
+    def read_w(self, space, w_size=None):
+        self._check_closed(space, "read of closed file")
+        size = convert_size(space, w_size)
+        if size < -1:
+            raise OperationError(space.w_ValueError, space.wrap(
+                "read length must be positive or -1"))
+        try:
+            if size == -1:
+                return space.wrap(self.stream.readall())
+            return space.wrap(self.stream.read(size))
+        except StreamErrors, e:
+            raise wrap_streamerror(space, e)
+
+    @unwrap_spec(size=int)
+    def read1_w(self, space, size):
+        self._check_closed(space, "read of closed file")
+        if size < 0:
+            raise OperationError(space.w_ValueError, space.wrap(
+                "read length must be positive"))
+        try:
+            return space.wrap(self.stream.read(size))
+        except StreamErrors, e:
+            raise wrap_streamerror(space, e)
+
+    @unwrap_spec(size=int)
+    def peek_w(self, space, size=0):
+        self._check_closed(space, "peek of closed file")
+        stream = self.stream
+        if size < DEFAULT_BUFFER_SIZE:
+            size = DEFAULT_BUFFER_SIZE
+        pos = stream.tell()
+        try:
+            data = stream.read(size)
+        except StreamErrors, e:
+            raise wrap_streamerror(space, e)
+        stream.seek(pos, 0)
+        return space.wrap(data)
+
+    def readinto_w(self, space, w_buffer):
+        self._check_closed(space, "readinto of closed file")
+        rwbuffer = space.getarg_w('w*', w_buffer)
+        try:
+            data = self.stream.read(rwbuffer.getlength())
+        except StreamErrors, e:
+            raise wrap_streamerror(space, e)
+        rwbuffer.setslice(0, data)
+        return space.wrap(len(data))
+
+    def _readline(self, space, limit):
+        try:
+            return self.stream.readline_limit(limit)
+        except StreamErrors, e:
+            raise wrap_streamerror(space, e)
+
+    def readline_w(self, space, w_limit=None):
+        self._check_closed(space, "readline of closed file")
+        limit = convert_size(space, w_limit)
+        return space.wrap(self._readline(space, limit))
+
+    def next_w(self, space):
+        self._check_closed(space, "readline of closed file")
+        line = self._readline(space, -1)
+        if not line:
+            raise OperationError(space.w_StopIteration, space.w_None)
+        return space.wrap(line)
+
+    def readlines_w(self, space, w_hint=None):
+        self._check_closed(space, "readline of closed file")
+        hint = convert_size(space, w_hint)
+        lines_w = []
+        length = 0
+        while True:
+            line = self._readline(space, -1)
+            if not line:
+                break
+            lines_w.append(space.wrap(line))
+            length += len(line)
+            if hint > 0 and length > hint:
+                break
+        return space.newlist(lines_w)
+
+W_MMapReader.typedef = TypeDef(
+    '_io.MMapReader', W_BufferedIOBase.typedef,
+    read = interp2app(W_MMapReader.read_w),
+    peek = interp2app(W_MMapReader.peek_w),
+    read1 = interp2app(W_MMapReader.read1_w),
+    raw = interp_attrproperty_w("w_raw", cls=W_MMapReader),
+    readline = interp2app(W_MMapReader.readline_w),
+    readinto = interp2app(W_MMapReader.readinto_w),
+    readlines = interp2app(W_MMapReader.readlines_w),
+    next = interp2app(W_MMapReader.next_w),
+
+    __repr__ = interp2app(W_MMapReader.repr_w),
+    readable = interp2app(W_MMapReader.readable_w),
+    writable = interp2app(W_MMapReader.writable_w),
+    seekable = interp2app(W_MMapReader.seekable_w),
+    seek = interp2app(W_MMapReader.seek_w),
+    tell = interp2app(W_MMapReader.tell_w),
+    close = interp2app(W_MMapReader.close_w),
+    flush = interp2app(W_MMapReader.flush_w),
+    detach = interp2app(W_MMapReader.detach_w),
+    fileno = interp2app(W_MMapReader.fileno_w),
+    isatty = interp2app(W_MMapReader.isatty_w),
+    closed = GetSetProperty(W_MMapReader.closed_get_w),
+    name = GetSetProperty(W_MMapReader.name_get_w),
+    mode = GetSetProperty(W_MMapReader.mode_get_w),
+)
+W_MMapReader.typedef.acceptable_as_base_class = False
+
+def open_mmap_reader(space, w_raw):
+    """Return a W_MMapReader for the FileIO 'w_raw', or None if its file
+    cannot be mapped."""
+    fd = space.c_int_w(space.call_method(w_raw, "fileno"))
+    stream = streamio.mmap_fd(fd)
+    if stream is None:
+        return None
+    return W_MMapReader(space, w_raw, stream)
@@ -7,6 +7,7 @@ from pypy.interpreter.typedef import (
 from pypy.module.exceptions.interp_exceptions import W_IOError
 from pypy.module._io.interp_fileio import W_FileIO
 from pypy.module._io.interp_textio import W_TextIOWrapper
+from rpython.rlib.streamio import MMAP_BUFFERING
 from rpython.rtyper.module.ll_os_stat import STAT_FIELD_TYPES
 
 
@@ -43,7 +44,7 @@ DEFAULT_BUFFER_SIZE = 8 * 1024
 def open(space, w_file, mode="r", buffering=-1, encoding=None, errors=None,
     newline=None, closefd=True):
     from pypy.module._io.interp_bufferedio import (W_BufferedRandom,
-        W_BufferedWriter, W_BufferedReader)
+        W_BufferedWriter, W_BufferedReader, open_mmap_reader)
 
     if not (space.isinstance_w(w_file, space.w_basestring) or
         space.isinstance_w(w_file, space.w_int) or
@@ -114,6 +115,9 @@ def open(space, w_file, mode="r", buffering=-1, encoding=None, errors=None,
     line_buffering = buffering == 1 or (buffering < 0 and isatty)
     if line_buffering:
         buffering = -1
+    use_mmap = buffering == MMAP_BUFFERING and reading and not updating
+    if buffering == MMAP_BUFFERING:
+        buffering = -1
 
     if buffering < 0:
         buffering = DEFAULT_BUFFER_SIZE
@@ -149,9 +153,13 @@ def open(space, w_file, mode="r", buffering=-1, encoding=None, errors=None,
         buffer_cls = W_BufferedReader
     else:
         raise oefmt(space.w_ValueError, "unknown mode: '%s'", mode)
-    w_buffer = space.call_function(
-        space.gettypefor(buffer_cls), w_raw, space.wrap(buffering)
-    )
+    w_buffer = None
+    if use_mmap:
+        w_buffer = open_mmap_reader(space, w_raw)
+    if w_buffer is None:
+        w_buffer = space.call_function(
+            space.gettypefor(buffer_cls), w_raw, space.wrap(buffering)
+        )
     if binary:
         return w_buffer
 
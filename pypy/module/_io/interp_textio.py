@@ -8,6 +8,7 @@ from pypy.interpreter.typedef import (
     interp_attrproperty_w)
 from pypy.module._codecs import interp_codecs
 from pypy.module._io.interp_iobase import W_IOBase, convert_size, trap_eintr
+from rpython.rlib import runicode
 from rpython.rlib.rarithmetic import intmask, r_uint, r_ulonglong
 from rpython.rlib.rbigint import rbigint
 from rpython.rlib.rstring import UnicodeBuilder
@@ -22,12 +23,10 @@ SEEN_ALL  = SEEN_CR | SEEN_LF | SEEN_CRLF
 
 _WINDOWS = sys.platform == 'win32'
 
-class W_IncrementalNewlineDecoder(W_Root):
-    seennl = 0
-    pendingcr = False
-    w_decoder = None
+class NewlineDecoderMixin(object):
+    _mixin_ = True
 
-    def __init__(self, space):
+    def _init_newlines_dict(self, space):
         self.w_newlines_dict = {
             SEEN_CR: space.wrap(u"\r"),
             SEEN_LF: space.wrap(u"\n"),
@@ -42,38 +41,10 @@ class W_IncrementalNewlineDecoder(W_Root):
                 [space.wrap(u"\r"), space.wrap(u"\n"), space.wrap(u"\r\n")]),
             }
 
-    @unwrap_spec(translate=int)
-    def descr_init(self, space, w_decoder, translate, w_errors=None):
-        self.w_decoder = w_decoder
-        self.translate = translate
-        if space.is_none(w_errors):
-            self.w_errors = space.wrap("strict")
-        else:
-            self.w_errors = w_errors
-
-        self.seennl = 0
-
     def newlines_get_w(self, space):
         return self.w_newlines_dict.get(self.seennl, space.w_None)
 
-    @unwrap_spec(final=int)
-    def decode_w(self, space, w_input, final=False):
-        if self.w_decoder is None:
-            raise OperationError(space.w_ValueError, space.wrap(
-                "IncrementalNewlineDecoder.__init__ not called"))
-
-        # decode input (with the eventual \r from a previous pass)
-        if not space.is_w(self.w_decoder, space.w_None):
-            w_output = space.call_method(self.w_decoder, "decode",
-                                         w_input, space.wrap(final))
-        else:
-            w_output = w_input
-
-        if not space.isinstance_w(w_output, space.w_unicode):
-            raise OperationError(space.w_TypeError, space.wrap(
-                "decoder should return a string result"))
-
-        output = space.unicode_w(w_output)
+    def _decode_newlines(self, output, final):
         output_len = len(output)
         if self.pendingcr and (final or output_len):
             output = u'\r' + output
@@ -91,7 +62,7 @@ class W_IncrementalNewlineDecoder(W_Root):
                 output_len -= 1
 
         if output_len == 0:
-            return space.wrap(u"")
+            return u""
 
         # Record which newlines are read and do newline translation if
         # desired, all in one pass.
@@ -146,7 +117,47 @@ class W_IncrementalNewlineDecoder(W_Root):
             output = builder.build()
 
         self.seennl |= seennl
-        return space.wrap(output)
+        return output
+
+
+class W_IncrementalNewlineDecoder(NewlineDecoderMixin, W_Root):
+    seennl = 0
+    pendingcr = False
+    w_decoder = None
+
+    def __init__(self, space):
+        self._init_newlines_dict(space)
+
+    @unwrap_spec(translate=int)
+    def descr_init(self, space, w_decoder, translate, w_errors=None):
+        self.w_decoder = w_decoder
+        self.translate = translate
+        if space.is_none(w_errors):
+            self.w_errors = space.wrap("strict")
+        else:
+            self.w_errors = w_errors
+
+        self.seennl = 0
+
+    @unwrap_spec(final=int)
+    def decode_w(self, space, w_input, final=False):
+        if self.w_decoder is None:
+            raise OperationError(space.w_ValueError, space.wrap(
+                "IncrementalNewlineDecoder.__init__ not called"))
+
+        # decode input (with the eventual \r from a previous pass)
+        if not space.is_w(self.w_decoder, space.w_None):
+            w_output = space.call_method(self.w_decoder, "decode",
+                                         w_input, space.wrap(final))
+        else:
+            w_output = w_input
+
+        if not space.isinstance_w(w_output, space.w_unicode):
+            raise OperationError(space.w_TypeError, space.wrap(
+                "decoder should return a string result"))
+
+        output = space.unicode_w(w_output)
+        return space.wrap(self._decode_newlines(output, final))
 
     def reset_w(self, space):
         self.seennl = 0
@@ -190,6 +201,99 @@ W_IncrementalNewlineDecoder.typedef = TypeDef(
     newlines = GetSetProperty(W_IncrementalNewlineDecoder.newlines_get_w),
 )
 
+# the codecs that BuiltinDecoder implements, by the name of their CodecInfo
+BUILTIN_DECODERS = {'utf-8': 'utf-8', 'iso8859-1': 'latin-1', 'ascii': 'ascii'}
+
+class BuiltinDecoder(NewlineDecoderMixin):
+    """The decoder of a TextIOWrapper reading utf-8, latin-1 or ascii:
+    it decodes with runicode, then handles the newlines like an
+    IncrementalNewlineDecoder if 'universal' is set, without calling
+    any app-level method.  Its state is the same as the one of these
+    decoders: the bytes of an incomplete utf-8 character, and the
+    pending \\r as a flag."""
+
+    def __init__(self, space, encoding, errors, universal, translate):
+        self.space = space
+        self.encoding = encoding
+        self.errors = errors
+        self.universal = universal
+        self.translate = translate
+        self.pending = ''
+        self.seennl = 0
+        self.pendingcr = False
+        self._init_newlines_dict(space)
+
+    def decode(self, input, final):
+        state = self.space.fromcache(interp_codecs.CodecState)
+        if self.pending:
+            input = self.pending + input
+            self.pending = ''
+        size = len(input)
+        if self.encoding == 'utf-8':
+            output, consumed = runicode.str_decode_utf_8(
+                input, size, self.errors, final, state.decode_error_handler,
+                allow_surrogates=True)
+            if consumed < size:
+                assert consumed >= 0
+                self.pending = input[consumed:]
+        elif self.encoding == 'latin-1':
+            output, _ = runicode.str_decode_latin_1(
+                input, size, self.errors, True, state.decode_error_handler)
+        else:
+            output, _ = runicode.str_decode_ascii(
+                input, size, self.errors, True, state.decode_error_handler)
+        if self.universal:
+            output = self._decode_newlines(output, final)
+        return output
+
+    def getstate(self):
+        flag = 0
+        if self.pendingcr:
+            flag = 1
+        return self.pending, flag
+
+    def setstate(self, pending, flag):
+        self.pending = pending
+        self.pendingcr = bool(flag & 1)
+
+    def reset(self):
+        self.pending = ''
+        self.seennl = 0
+        self.pendingcr = False
+
+    def count_bytes(self, input, chars):
+        """Return the length of the start of 'input' that a fresh decoder
+        turns into 'chars' characters, or -1 if it cannot be known
+        without decoding again."""
+        if self.errors != 'strict':
+            return -1
+        i = 0
+        n = len(input)
+        while chars > 0:
+            if i >= n:
+                return -1
+            size = 1
+            if self.encoding == 'utf-8':
+                c = ord(input[i])
+                if c >= 0xf0:
+                    size = 4
+                    if runicode.MAXUNICODE < 0x10000:
+                        chars -= 1      # a surrogate pair
+                        if chars == 0:
+                            return -1
+                elif c >= 0xe0:
+                    size = 3
+                elif c >= 0x80:
+                    size = 2
+            if (self.translate and input[i] == '\r' and
+                    i + 1 < n and input[i + 1] == '\n'):
+                size = 2        # translated into a single \n
+            i += size
+            chars -= 1
+        if i > n:
+            return -1
+        return i
+
 class W_TextIOBase(W_IOBase):
     w_encoding = None
 
@@ -238,7 +342,7 @@ class W_TextIOBase(W_IOBase):
                 if ch == '\n':
                     return i, 0
                 if ch == '\r':
-                    if line[start + i] == '\n':
+                    if i < size and line[start + i] == '\n':
                         return i + 1, 0
                     else:
                         return i, 0
@@ -340,6 +444,7 @@ class W_TextIOWrapper(W_TextIOBase):
         self.state = STATE_ZERO
         self.w_encoder = None
         self.w_decoder = None
+        self.builtin_decoder = None # a BuiltinDecoder, instead of w_decoder
 
         self.decoded_chars = None   # buffer for text returned from decoder
         self.decoded_chars_used = 0 # offset into _decoded_chars for read()
@@ -393,15 +498,21 @@ class W_TextIOWrapper(W_TextIOBase):
             self.writenl = None
 
         # build the decoder object
+        self.w_decoder = None
+        self.builtin_decoder = None
         if space.is_true(space.call_method(w_buffer, "readable")):
             w_codec = interp_codecs.lookup_codec(space,
                                                  space.str_w(self.w_encoding))
-            self.w_decoder = space.call_method(w_codec,
-                                               "incrementaldecoder", w_errors)
-            if self.readuniversal:
-                self.w_decoder = space.call_function(
-                    space.gettypeobject(W_IncrementalNewlineDecoder.typedef),
-                    self.w_decoder, space.wrap(self.readtranslate))
+            self.builtin_decoder = self._make_builtin_decoder(space, w_codec,
+                                                              w_errors)
+            if self.builtin_decoder is None:
+                self.w_decoder = space.call_method(
+                    w_codec, "incrementaldecoder", w_errors)
+                if self.readuniversal:
+                    self.w_decoder = space.call_function(
+                        space.gettypeobject(
+                            W_IncrementalNewlineDecoder.typedef),
+                        self.w_decoder, space.wrap(self.readtranslate))
 
         # build the encoder object
         if space.is_true(space.call_method(w_buffer, "writable")):
@@ -423,6 +534,16 @@ class W_TextIOWrapper(W_TextIOBase):
 
         self.state = STATE_OK
 
+    def _make_builtin_decoder(self, space, w_codec, w_errors):
+        w_name = space.findattr(w_codec, space.wrap("name"))
+        if w_name is None or not space.isinstance_w(w_name, space.w_str):
+            return None
+        encoding = BUILTIN_DECODERS.get(space.str_w(w_name), None)
+        if encoding is None or not space.isinstance_w(w_errors, space.w_str):
+            return None
+        return BuiltinDecoder(space, encoding, space.str_w(w_errors),
+                              self.readuniversal, self.readtranslate)
+
     def _check_init(self, space):
         if self.state == STATE_ZERO:
             raise OperationError(space.w_ValueError, space.wrap(
@@ -472,6 +593,10 @@ class W_TextIOWrapper(W_TextIOBase):
 
     def newlines_get_w(self, space):
         self._check_init(space)
+        if self.builtin_decoder is not None:
+            if not self.builtin_decoder.universal:
+                return space.w_None
+            return self.builtin_decoder.newlines_get_w(space)
         if self.w_decoder is None:
             return space.w_None
         return space.findattr(self.w_decoder, space.wrap("newlines"))
@@ -503,6 +628,41 @@ class W_TextIOWrapper(W_TextIOBase):
                 ret = space.call_method(self.w_buffer, "close")
             return ret
 
+    # _____________________________________________________________
+    # decoder
+
+    def _has_decoder(self):
+        return self.w_decoder is not None or self.builtin_decoder is not None
+
+    def _decode(self, space, input, final):
+        if self.builtin_decoder is not None:
+            return self.builtin_decoder.decode(input, final)
+        w_decoded = space.call_method(self.w_decoder, "decode",
+                                      space.wrap(input), space.wrap(final))
+        check_decoded(space, w_decoded)
+        return space.unicode_w(w_decoded)
+
+    def _decoder_getstate(self, space):
+        if self.builtin_decoder is not None:
+            return self.builtin_decoder.getstate()
+        w_state = space.call_method(self.w_decoder, "getstate")
+        w_dec_buffer, w_dec_flags = space.unpackiterable(w_state, 2)
+        return space.str_w(w_dec_buffer), space.int_w(w_dec_flags)
+
+    def _decoder_setstate_raw(self, space, dec_buffer, dec_flags):
+        if self.builtin_decoder is not None:
+            self.builtin_decoder.setstate(dec_buffer, dec_flags)
+        else:
+            space.call_method(self.w_decoder, "setstate",
+                              space.newtuple([space.wrap(dec_buffer),
+                                              space.wrap(dec_flags)]))
+
+    def _decoder_reset(self, space):
+        if self.builtin_decoder is not None:
+            self.builtin_decoder.reset()
+        elif self.w_decoder is not None:
+            space.call_method(self.w_decoder, "reset")
+
     # _____________________________________________________________
     # read methods
 
@@ -538,18 +698,15 @@ class W_TextIOWrapper(W_TextIOBase):
         The entire input chunk is sent to the decoder, though some of it may
         remain buffered in the decoder, yet to be converted."""
 
-        if not self.w_decoder:
+        if not self._has_decoder():
             raise OperationError(space.w_IOError, space.wrap("not readable"))
 
         if self.telling:
             # To prepare for tell(), we need to snapshot a point in the file
             # where the decoder's input buffer is empty.
-            w_state = space.call_method(self.w_decoder, "getstate")
             # Given this, we know there was a valid snapshot point
             # len(dec_buffer) bytes ago with decoder state (b'', dec_flags).
-            w_dec_buffer, w_dec_flags = space.unpackiterable(w_state, 2)
-            dec_buffer = space.str_w(w_dec_buffer)
-            dec_flags = space.int_w(w_dec_flags)
+            dec_buffer, dec_flags = self._decoder_getstate(space)
         else:
             dec_buffer = None
             dec_flags = 0
@@ -563,34 +720,44 @@ class W_TextIOWrapper(W_TextIOBase):
                   "object not '%T'"
             raise oefmt(space.w_TypeError, msg, w_input)
 
-        eof = space.len_w(w_input) == 0
-        w_decoded = space.call_method(self.w_decoder, "decode",
-                                      w_input, space.wrap(eof))
-        check_decoded(space, w_decoded)
-        self._set_decoded_chars(space.unicode_w(w_decoded))
-        if space.len_w(w_decoded) > 0:
+        input = space.str_w(w_input)
+        eof = len(input) == 0
+        decoded = self._decode(space, input, eof)
+        self._set_decoded_chars(decoded)
+        if len(decoded) > 0:
             eof = False
 
         if self.telling:
             # At the snapshot point, len(dec_buffer) bytes before the read,
             # the next input to be decoded is dec_buffer + input_chunk.
-            next_input = dec_buffer + space.str_w(w_input)
+            next_input = dec_buffer + input
             self.snapshot = PositionSnapshot(dec_flags, next_input)
 
         return not eof
 
     def next_w(self, space):
         self.telling = False
-        try:
-            return W_TextIOBase.next_w(self, space)
-        except OperationError, e:
-            if e.match(space, space.w_StopIteration):
-                self.telling = self.seekable
-            raise
+        if not space.is_w(space.type(self),
+                          space.gettypeobject(W_TextIOWrapper.typedef)):
+            try:
+                return W_TextIOBase.next_w(self, space)
+            except OperationError, e:
+                if e.match(space, space.w_StopIteration):
+                    self.telling = self.seekable
+                raise
+        # skip the lookup of the 'readline' method, which subclasses
+        # may override
+        self._check_closed(space)
+        self._writeflush(space)
+        line = self._readline(space, -1)
+        if not line:
+            self.telling = self.seekable
+            raise OperationError(space.w_StopIteration, space.w_None)
+        return space.wrap(line)
 
     def read_w(self, space, w_size=None):
         self._check_closed(space)
-        if not self.w_decoder:
+        if not self._has_decoder():
             raise OperationError(space.w_IOError, space.wrap("not readable"))
 
         size = convert_size(space, w_size)
@@ -599,7 +766,13 @@ class W_TextIOWrapper(W_TextIOBase):
         if size < 0:
             # Read everything
             w_bytes = space.call_method(self.w_buffer, "read")
-            w_decoded = space.call_method(self.w_decoder, "decode", w_bytes, space.w_True)
+            if self.builtin_decoder is not None:
+                decoded = self.builtin_decoder.decode(space.str_w(w_bytes),
+                                                      True)
+                w_decoded = space.wrap(decoded)
+            else:
+                w_decoded = space.call_method(self.w_decoder, "decode",
+                                              w_bytes, space.w_True)
             check_decoded(space, w_decoded)
             w_result = space.wrap(self._get_decoded_chars(-1))
             w_final = space.add(w_result, w_decoded)
@@ -634,6 +807,9 @@ class W_TextIOWrapper(W_TextIOBase):
         self._writeflush(space)
 
         limit = convert_size(space, w_limit)
+        return space.wrap(self._readline(space, limit))
+
+    def _readline(self, space, limit):
         chunked = 0
 
         line = None
@@ -717,9 +893,9 @@ class W_TextIOWrapper(W_TextIOBase):
             line = u''.join(chunks)
 
         if line:
-            return space.wrap(line)
+            return line
         else:
-            return space.wrap(u'')
+            return u''
 
     # _____________________________________________________________
     # write methods
@@ -772,9 +948,7 @@ class W_TextIOWrapper(W_TextIOBase):
             space.call_method(self.w_buffer, "flush")
 
         self.snapshot = None
-
-        if self.w_decoder:
-            space.call_method(self.w_decoder, "reset")
+        self._decoder_reset(space)
 
         return space.wrap(textlen)
 
@@ -814,11 +988,9 @@ class W_TextIOWrapper(W_TextIOBase):
         # at start is not (b"", 0) but e.g. (b"", 2) (meaning, in the case of
         # utf-16, that we are expecting a BOM).
         if cookie.start_pos == 0 and cookie.dec_flags == 0:
-            space.call_method(self.w_decoder, "reset")
+            self._decoder_reset(space)
         else:
-            space.call_method(self.w_decoder, "setstate",
-                              space.newtuple([space.wrap(""),
-                                              space.wrap(cookie.dec_flags)]))
+            self._decoder_setstate_raw(space, "", cookie.dec_flags)
 
     def _encoder_setstate(self, space, cookie):
         if cookie.start_pos == 0 and cookie.dec_flags == 0:
@@ -853,8 +1025,7 @@ class W_TextIOWrapper(W_TextIOBase):
             space.call_method(self, "flush")
             self._set_decoded_chars(None)
             self.snapshot = None
-            if self.w_decoder:
-                space.call_method(self.w_decoder, "reset")
+            self._decoder_reset(space)
             return space.call_method(self.w_buffer, "seek",
                                      w_pos, space.wrap(whence))
 
@@ -880,7 +1051,7 @@ class W_TextIOWrapper(W_TextIOBase):
         self.snapshot = None
 
         # Restore the decoder to its state from the safe start point.
-        if self.w_decoder:
+        if self._has_decoder():
             self._decoder_setstate(space, cookie)
 
         if cookie.chars_to_skip:
@@ -892,13 +1063,11 @@ class W_TextIOWrapper(W_TextIOBase):
                       "a bytes object, not '%T'"
                 raise oefmt(space.w_TypeError, msg, w_chunk)
 
-            self.snapshot = PositionSnapshot(cookie.dec_flags,
-                                             space.str_w(w_chunk))
+            chunk = space.str_w(w_chunk)
+            self.snapshot = PositionSnapshot(cookie.dec_flags, chunk)
 
-            w_decoded = space.call_method(self.w_decoder, "decode",
-                                          w_chunk, space.wrap(cookie.need_eof))
-            check_decoded(space, w_decoded)
-            self._set_decoded_chars(space.unicode_w(w_decoded))
+            self._set_decoded_chars(self._decode(space, chunk,
+                                                 bool(cookie.need_eof)))
 
             # Skip chars_to_skip of the decoded characters
             if len(self.decoded_chars) < cookie.chars_to_skip:
@@ -930,7 +1099,7 @@ class W_TextIOWrapper(W_TextIOBase):
 
         w_pos = space.call_method(self.w_buffer, "tell")
 
-        if self.w_decoder is None or self.snapshot is None:
+        if not self._has_decoder() or self.snapshot is None:
             assert not self.decoded_chars
             return w_pos
 
@@ -948,9 +1117,16 @@ class W_TextIOWrapper(W_TextIOBase):
 
         chars_to_skip = self.decoded_chars_used
 
+        if self.builtin_decoder is not None and cookie.dec_flags == 0:
+            # Most of the time, the position is simply a byte offset
+            skip = self.builtin_decoder.count_bytes(input, chars_to_skip)
+            if skip >= 0:
+                cookie.start_pos += skip
+                return space.newlong_from_rbigint(cookie.pack())
+
         # Starting from the snapshot position, we will walk the decoder
         # forward until it gives us enough decoded characters.
-        w_saved_state = space.call_method(self.w_decoder, "getstate")
+        saved_buffer, saved_flags = self._decoder_getstate(space)
 
         try:
             # Note our initial start point
@@ -964,23 +1140,18 @@ class W_TextIOWrapper(W_TextIOBase):
             chars_decoded = 0
             i = 0
             while i < len(input):
-                w_decoded = space.call_method(self.w_decoder, "decode",
-                                              space.wrap(input[i]))
-                check_decoded(space, w_decoded)
-                chars_decoded += len(space.unicode_w(w_decoded))
+                chars_decoded += len(self._decode(space, input[i], False))
 
                 cookie.bytes_to_feed += 1
 
-                w_state = space.call_method(self.w_decoder, "getstate")
-                w_dec_buffer, w_flags = space.unpackiterable(w_state, 2)
-                dec_buffer_len = len(space.str_w(w_dec_buffer))
+                dec_buffer, dec_flags = self._decoder_getstate(space)
 
-                if dec_buffer_len == 0 and chars_decoded <= chars_to_skip:
+                if len(dec_buffer) == 0 and chars_decoded <= chars_to_skip:
                     # Decoder buffer is empty, so this is a safe start point.
                     cookie.start_pos += cookie.bytes_to_feed
                     chars_to_skip -= chars_decoded
                     assert chars_to_skip >= 0
-                    cookie.dec_flags = space.int_w(w_flags)
+                    cookie.dec_flags = dec_flags
                     cookie.bytes_to_feed = 0
                     chars_decoded = 0
                 if chars_decoded >= chars_to_skip:
@@ -988,18 +1159,14 @@ class W_TextIOWrapper(W_TextIOBase):
                 i += 1
             else:
                 # We didn't get enough decoded data; signal EOF to get more.
-                w_decoded = space.call_method(self.w_decoder, "decode",
-                                              space.wrap(""),
-                                              space.wrap(1)) # final=1
-                check_decoded(space, w_decoded)
-                chars_decoded += len(space.unicode_w(w_decoded))
+                chars_decoded += len(self._decode(space, "", True))
                 cookie.need_eof = 1
 
                 if chars_decoded < chars_to_skip:
                     raise OperationError(space.w_IOError, space.wrap(
                         "can't reconstruct logical file position"))
         finally:
-            space.call_method(self.w_decoder, "setstate", w_saved_state)
+            self._decoder_setstate_raw(space, saved_buffer, saved_flags)
 
         # The returned cookie corresponds to the last safe start point.
         cookie.chars_to_skip = chars_to_skip
@@ -6,7 +6,7 @@ from pypy.interpreter.error import OperationError
 import py.test
 
 class AppTestBufferedReader:
-    spaceconfig = dict(usemodules=['_io'])
+    spaceconfig = dict(usemodules=['_io', 'array'])
 
     def setup_class(cls):
         tmpfile = udir.join('tmpfile')
@@ -167,6 +167,74 @@ class AppTestBufferedReader:
         f = _io.BufferedReader(raw)
         assert f.readlines() == ['a\n', 'b\n', 'c']
 
+    def test_readinto_large(self):
+        import _io
+        class MockRawIO(_io._RawIOBase):
+            def __init__(self, data):
+                self.data = data
+                self.sizes = []
+            def readable(self):
+                return True
+            def readinto(self, buf):
+                self.sizes.append(len(buf))
+                n = min(len(buf), len(self.data))
+                buf[:n] = self.data[:n]
+                self.data = self.data[n:]
+                return n
+        data = ''.join([chr(i % 256) for i in range(100)])
+        rawio = MockRawIO(data)
+        f = _io.BufferedReader(rawio, buffer_size=16)
+        assert f.read(3) == data[:3]
+        a = bytearray(50)
+        assert f.readinto(a) == 50
+        assert a == data[3:53]
+        # the 13 buffered bytes, then 32 bytes directly into 'a', then
+        # the last 5 bytes through the buffer
+        assert rawio.sizes == [16, 32, 16]
+        a = bytearray(100)
+        assert f.readinto(a) == 47
+        assert a[:47] == data[53:]
+        assert f.readinto(a) == 0
+        assert f.readinto(bytearray()) == 0
+
+    def test_readinto_array(self):
+        import _io, array
+        raw = _io.FileIO(self.tmpfile)
+        f = _io.BufferedReader(raw, buffer_size=2)
+        a = array.array('c', 'x' * 4)
+        assert f.readinto(a) == 4
+        assert a.tostring() == 'a\nb\n'
+        assert f.read() == 'c'
+        f.close()
+
+    def test_readline_small_buffer(self):
+        import _io
+        raw = _io.BytesIO("first line\n\nthird line is longer\nend")
+        f = _io.BufferedReader(raw, buffer_size=4)
+        assert f.readline() == "first line\n"
+        assert f.readline() == "\n"
+        assert f.readline(5) == "third"
+        assert f.readline(4) == " lin"
+        assert f.readline() == "e is longer\n"
+        assert f.readline() == "end"
+        assert f.readline() == ""
+        f = _io.BufferedReader(_io.BytesIO("abc\n" * 10), buffer_size=4)
+        assert list(f) == ["abc\n"] * 10
+        f = _io.BufferedReader(_io.BytesIO("abc\n" * 10), buffer_size=4)
+        assert f.readlines(6) == ["abc\n", "abc\n"]
+        assert len(f.readlines()) == 8
+
+    def test_readline_overridden(self):
+        import _io
+        class MyReader(_io.BufferedReader):
+            def readline(self, limit=-1):
+                line = _io.BufferedReader.readline(self, limit)
+                return line.upper()
+        f = MyReader(_io.BytesIO("a\nb\n"))
+        assert list(f) == ["A\n", "B\n"]
+        f = MyReader(_io.BytesIO("a\nb\n"))
+        assert f.readlines() == ["A\n", "B\n"]
+
     def test_detach(self):
         import _io
         raw = _io.FileIO(self.tmpfile)
@@ -223,7 +291,7 @@ class AppTestBufferedReader:
         assert rawio.count == 4
 
 class AppTestBufferedReaderWithThreads(AppTestBufferedReader):
-    spaceconfig = dict(usemodules=['_io', 'thread'])
+    spaceconfig = dict(usemodules=['_io', 'array', 'thread'])
 
 
 class AppTestBufferedWriter:
@@ -682,6 +750,96 @@ class AppTestBufferedRandom:
                 raises(TypeError, f.readline, 5.3)
 
 
+class AppTestMMapReader:
+    spaceconfig = dict(usemodules=['_io', 'array'])
+
+    def setup_class(cls):
+        tmpfile = udir.join('tmpfile_mmap')
+        tmpfile.write("hello\nworld\n\nlast", mode='wb')
+        cls.w_tmpfile = cls.space.wrap(str(tmpfile))
+        emptyfile = udir.join('tmpfile_mmap_empty')
+        emptyfile.write("", mode='wb')
+        cls.w_emptyfile = cls.space.wrap(str(emptyfile))
+
+    def test_read(self):
+        import _io
+        with _io.open(self.tmpfile, 'rb',
+                      buffering=_io.MMAP_BUFFERING) as f:
+            assert type(f).__name__ == 'MMapReader'
+            assert isinstance(f, _io._BufferedIOBase)
+            assert f.read(3) == "hel"
+            assert f.tell() == 3
+            assert f.peek(2).startswith("lo\nworld")
+            assert f.tell() == 3
+            assert f.read1(2) == "lo"
+            assert f.read() == "\nworld\n\nlast"
+            assert f.read() == ""
+            assert f.seek(-4, 2) == 13
+            assert f.read(100) == "last"
+            assert f.seek(0) == 0
+            raises(ValueError, f.seek, -1)
+            raises(ValueError, f.read, -2)
+            assert f.readable() and f.seekable() and not f.writable()
+            raises(_io.UnsupportedOperation, f.write, "x")
+        assert f.closed
+        assert f.raw.closed
+        raises(ValueError, f.read)
+
+    def test_readline(self):
+        import _io
+        f = _io.open(self.tmpfile, 'rb', buffering=_io.MMAP_BUFFERING)
+        assert f.readline() == "hello\n"
+        assert f.readline(3) == "wor"
+        assert f.readline() == "ld\n"
+        assert list(f) == ["\n", "last"]
+        assert f.readline() == ""
+        f.seek(0)
+        assert f.readlines() == ["hello\n", "world\n", "\n", "last"]
+        f.close()
+
+    def test_readinto(self):
+        import _io, array
+        f = _io.open(self.tmpfile, 'rb', buffering=_io.MMAP_BUFFERING)
+        a = array.array('c', 'x' * 8)
+        assert f.readinto(a) == 8
+        assert a.tostring() == "hello\nwo"
+        f.seek(-2, 2)
+        assert f.readinto(a) == 2
+        assert a.tostring() == "stllo\nwo"
+        f.close()
+
+    def test_text(self):
+        import _io
+        with _io.open(self.tmpfile, 'r', encoding='ascii',
+                      buffering=_io.MMAP_BUFFERING) as f:
+            assert type(f.buffer).__name__ == 'MMapReader'
+            assert f.readline() == u"hello\n"
+            assert f.read() == u"world\n\nlast"
+
+    def test_detach(self):
+        import _io
+        f = _io.open(self.tmpfile, 'rb', buffering=_io.MMAP_BUFFERING)
+        assert f.read(6) == "hello\n"
+        raw = f.detach()
+        assert raw.read() == "world\n\nlast"
+        raises(ValueError, f.read)
+        raw.close()
+
+    def test_empty(self):
+        import _io
+        f = _io.open(self.emptyfile, 'rb', buffering=_io.MMAP_BUFFERING)
+        assert f.read() == ""
+        assert f.readline() == ""
+        assert f.seek(0, 2) == 0
+        f.close()
+
+    def test_fallback(self):
+        import _io
+        f = _io.open(self.tmpfile, 'r+b', buffering=_io.MMAP_BUFFERING)
+        assert type(f) is _io.BufferedRandom
+        f.close()
+
+
 class TestNonReentrantLock:
     spaceconfig = dict(usemodules=['thread'])
 
@@ -253,6 +253,78 @@ class AppTestTextIO:
         t.read() == u'a'
 
 
+    def test_builtin_decoders_seek_tell(self):
+        import _io
+        text = u"h\xe9llo\r\nw\u20acrld\n\rsp\U00010400m\r\r\n\u20ac"
+        for encoding in ["utf-8", "latin-1", "ascii", "utf-16"]:
+            if encoding == "ascii":
+                data = text.encode("ascii", "replace")
+            else:
+                data = text.encode(encoding, "replace")
+            for newline in [None, "", "\n", "\r", "\r\n"]:
+                for chunk_size in [1, 2, 3, 5, 8192]:
+                    t = _io.TextIOWrapper(_io.BytesIO(data), encoding,
+                                          newline=newline)
+                    t._CHUNK_SIZE = chunk_size
+                    expected = t.read()
+                    t.seek(0)
+                    positions = []
+                    while True:
+                        positions.append(t.tell())
+                        line = t.readline()
+                        if not line:
+                            break
+                    t.seek(0)
+                    lines = t.readlines()
+                    assert u"".join(lines) == expected
+                    for i, cookie in enumerate(positions):
+                        t.seek(cookie)
+                        assert t.read() == u"".join(lines[i:]), (
+                            encoding, newline, chunk_size, i)
+                    t.seek(0)
+                    t.read(4)
+                    cookie = t.tell()
+                    rest = t.read()
+                    t.seek(cookie)
+                    assert t.read() == rest
+
+    def test_builtin_decoders(self):
+        import _io
+        t = _io.TextIOWrapper(_io.BytesIO(b"a\xc3\xa9\xe2\x82\xacb\r\nc"),
+                              "utf-8")
+        t._CHUNK_SIZE = 2
+        assert t.read() == u"a\xe9\u20acb\nc"
+        assert t.newlines == u"\r\n"
+        t = _io.TextIOWrapper(_io.BytesIO(b"a\xffb\n"), "utf-8")
+        raises(UnicodeDecodeError, t.read)
+        t = _io.TextIOWrapper(_io.BytesIO(b"a\xffb\n"), "utf-8",
+                              errors="replace")
+        assert t.readline() == u"a\ufffdb\n"
+        t = _io.TextIOWrapper(_io.BytesIO(b"a\xffb\xc3"), "ascii",
+                              errors="ignore")
+        assert t.read() == u"ab"
+        t = _io.TextIOWrapper(_io.BytesIO(b"a\xffb\r\n"), "latin-1",
+                              newline="")
+        assert list(t) == [u"a\xffb\r\n"]
+        assert t.newlines == u"\r\n"
+        t = _io.TextIOWrapper(_io.BytesIO(b"abc\xc3"), "utf-8")
+        raises(UnicodeDecodeError, t.read)
+
+    def test_iter_readline_overridden(self):
+        import _io
+        class MyText(_io.TextIOWrapper):
+            def readline(self):
+                return _io.TextIOWrapper.readline(self).upper()
+        t = MyText(_io.BytesIO(b"a\nb\n"), "ascii")
+        assert list(t) == [u"A\n", u"B\n"]
+        t = _io.TextIOWrapper(_io.BytesIO(b"a\nb\n"), "ascii")
+        assert list(t) == [u"a\n", u"b\n"]
+        assert t.tell() == 4
+        t.seek(0)
+        assert t.next() == u"a\n"
+        raises(IOError, t.tell)
+
+
 class AppTestIncrementalNewlineDecoder:
     def test_newline_decoder(self):
         import _io
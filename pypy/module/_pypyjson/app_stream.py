@@ -0,0 +1,16 @@
+def iterload(fileobj, items=False, chunksize=65536):
+    """Yield the JSON values read from 'fileobj' one after the other: a
+    sequence of values separated by whitespace, like newline-delimited
+    JSON, or with items=True the items of a single array.  The file is
+    read by chunks of 'chunksize' bytes and is never held whole in
+    memory."""
+    from _pypyjson import IncrementalDecoder
+    decoder = IncrementalDecoder(items)
+    while True:
+        data = fileobj.read(chunksize)
+        if not data:
+            break
+        for value in decoder.feed(data):
+            yield value
+    for value in decoder.close():
+        yield value
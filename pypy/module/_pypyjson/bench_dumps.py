@@ -0,0 +1,42 @@
+""" json.dumps() throughput, with the interp-level encoder of _pypyjson
+and with the pure Python one.  Run it with a translated pypy.
+"""
+
+import json, json.encoder, random, time
+
+def count_operation(name, function, repeat=1):
+    t0 = time.time()
+    for i in xrange(repeat):
+        retval = function()
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    return retval
+
+def make_data(SIZE):
+    return {
+        'ints': range(SIZE),
+        'floats': [random.random() for i in xrange(SIZE)],
+        'strings': [str(i) * 3 for i in xrange(SIZE)],
+        'unicode': [u'\xe9t\xe9 %d' % i for i in xrange(SIZE // 10)],
+        'records': [{'id': i, 'name': 'user%d' % i, 'score': i * 0.5,
+                     'tags': ['a', 'b'], 'active': i % 2 == 0}
+                    for i in xrange(SIZE // 10)],
+    }
+
+def bench_dumps(SIZE=100000, REPEAT=10):
+    data = make_data(SIZE)
+    saved = json.encoder._pypyjson_dumps
+    for kwds in [{}, {'sort_keys': True, 'indent': 2}]:
+        s = count_operation("dumps %r, interp-level" % (kwds,),
+                            lambda: json.dumps(data, **kwds), REPEAT)
+        print '  %d bytes' % len(s)
+        json.encoder._pypyjson_dumps = None
+        try:
+            s2 = count_operation("dumps %r, pure Python" % (kwds,),
+                                 lambda: json.dumps(data, **kwds), REPEAT)
+        finally:
+            json.encoder._pypyjson_dumps = saved
+        assert s == s2
+
+if __name__ == '__main__':
+    bench_dumps()
@@ -0,0 +1,27 @@
+""" json.loads() throughput on a large array of objects with the same keys,
+and on objects whose keys are all different.  Run it with a translated pypy.
+"""
+
+import json, time
+
+def count_operation(name, function, repeat=1):
+    t0 = time.time()
+    for i in xrange(repeat):
+        retval = function()
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    return retval
+
+def bench_loads(SIZE=100000, REPEAT=10):
+    records = json.dumps([{'id': i, 'name': 'user%d' % i, 'score': i * 0.5,
+                           'tags': ['a', 'b'], 'active': i % 2 == 0}
+                          for i in xrange(SIZE)])
+    count_operation("loads, %d objects with the same keys" % SIZE,
+                    lambda: json.loads(records), REPEAT)
+    mixed = json.dumps([{'key%d' % i: i, 'other%d' % (i % 7): None}
+                        for i in xrange(SIZE)])
+    count_operation("loads, %d objects with different keys" % SIZE,
+                    lambda: json.loads(mixed), REPEAT)
+
+if __name__ == '__main__':
+    bench_loads()
@@ -42,6 +42,24 @@ def strslice2unicode_latin1(s, start, end):
         ll_res.chars[i] = cast_primitive(UniChar, ch)
     return hlunicode(ll_res)
 
+# maximum number of different keys following the same sequence of keys;
+# above it, objects are decoded without going through the maps
+MAX_MAP_FANOUT = 64
+
+class JSONMap(object):
+    """A node in the tree of the sequences of keys seen in the objects of
+    a document: the path from the root spells the keys of an object, in
+    order.  The objects with the same keys share the nodes and thus the
+    unicode strings of their keys, which are hashed only once.  The
+    successor that was used last is remembered, and is checked in place
+    against the next key, without taking a slice of the input.
+    """
+    def __init__(self, utf8, key):
+        self.utf8 = utf8
+        self.key = key
+        self.nexts = {}       # utf-8 key -> JSONMap
+        self.last_next = None
+
 TYPE_UNKNOWN = 0
 TYPE_STRING = 1
 class JSONDecoder(object):
@@ -56,6 +74,7 @@ class JSONDecoder(object):
         self.end_ptr = lltype.malloc(rffi.CCHARPP.TO, 1, flavor='raw')
         self.pos = 0
         self.last_type = TYPE_UNKNOWN
+        self.root_map = JSONMap('', u'')
 
     def close(self):
         rffi.free_charp(self.ll_chars)
@@ -248,19 +267,26 @@ class JSONDecoder(object):
 
     def decode_object(self, i):
         start = i
-        w_dict = self.space.newdict()
-        #
         i = self.skip_whitespace(i)
         if self.ll_chars[i] == '}':
             self.pos = i+1
-            return w_dict
+            return self.space.newdict()
         #
+        keys = []
+        values_w = []
+        jsonmap = self.root_map
         while True:
             # parse a key: value
-            self.last_type = TYPE_UNKNOWN
-            w_name = self.decode_any(i)
-            if self.last_type != TYPE_STRING:
+            i = self.skip_whitespace(i)
+            if self.ll_chars[i] != '"':
                 self._raise("Key name must be string for object starting at char %d", start)
+            i += 1
+            if jsonmap is not None:
+                jsonmap = self.decode_key_map(i, jsonmap)
+            if jsonmap is not None:
+                keys.append(jsonmap.key)
+            else:
+                keys.append(self.decode_unicode(i))
             i = self.skip_whitespace(self.pos)
             ch = self.ll_chars[i]
             if ch != ':':
@@ -268,14 +294,13 @@ class JSONDecoder(object):
             i += 1
             i = self.skip_whitespace(i)
             #
-            w_value = self.decode_any(i)
-            self.space.setitem(w_dict, w_name, w_value)
+            values_w.append(self.decode_any(i))
             i = self.skip_whitespace(self.pos)
             ch = self.ll_chars[i]
             i += 1
             if ch == '}':
                 self.pos = i
-                return w_dict
+                return self.space.newdict_unicode_keys(keys, values_w)
             elif ch == ',':
                 pass
             elif ch == '\0':
@@ -284,8 +309,55 @@ class JSONDecoder(object):
                 self._raise("Unexpected '%s' when decoding object (char %d)",
                             ch, self.pos)
 
+    def decode_key_map(self, i, jsonmap):
+        """Decode the key starting at 'i', which follows the keys leading
+        to 'jsonmap', and return its node.  Return None if the key
+        contains escapes or if there are already too many different keys
+        after 'jsonmap'; the caller must then decode it with
+        decode_unicode()."""
+        nextmap = jsonmap.last_next
+        if nextmap is not None and self.match_key(i, nextmap.utf8):
+            self.pos = i + len(nextmap.utf8) + 1
+            return nextmap
+        end = self.scan_key(i)
+        if end < 0:
+            return None
+        utf8 = self.getslice(i, end)
+        nextmap = jsonmap.nexts.get(utf8, None)
+        if nextmap is None:
+            if len(jsonmap.nexts) >= MAX_MAP_FANOUT:
+                return None
+            key = unicodehelper.decode_utf8(self.space, utf8)
+            nextmap = JSONMap(utf8, key)
+            jsonmap.nexts[utf8] = nextmap
+        jsonmap.last_next = nextmap
+        self.pos = end + 1
+        return nextmap
+
+    def match_key(self, i, utf8):
+        """Check if the string starting at 'i' is exactly 'utf8'."""
+        for j in range(len(utf8)):
+            if self.ll_chars[i+j] != utf8[j]:
+                return False
+        return self.ll_chars[i+len(utf8)] == '"'
+
+    def scan_key(self, i):
+        """Return the position of the '"' ending the string starting at
+        'i', or -1 if it contains escapes."""
+        while True:
+            ch = self.ll_chars[i]
+            if ch == '"':
+                return i
+            elif ch == '\\':
+                return -1
+            elif ch < '\x20':
+                self._raise("Invalid control character at char %d", i)
+            i += 1
 
     def decode_string(self, i):
+        return self.space.wrap(self.decode_unicode(i))
+
+    def decode_unicode(self, i):
         start = i
         bits = 0
         while True:
@@ -306,7 +378,7 @@ class JSONDecoder(object):
                     content_unicode = strslice2unicode_latin1(self.s, start, i-1)
                 self.last_type = TYPE_STRING
                 self.pos = i
-                return self.space.wrap(content_unicode)
+                return content_unicode
             elif ch == '\\':
                 content_so_far = self.getslice(start, i-1)
                 self.pos = i-1
@@ -327,7 +399,7 @@ class JSONDecoder(object):
                 content_unicode = unicodehelper.decode_utf8(self.space, content_utf8)
                 self.last_type = TYPE_STRING
                 self.pos = i
-                return self.space.wrap(content_unicode)
+                return content_unicode
             elif ch == '\\':
                 i = self.decode_escape_sequence(i, builder)
             elif ch == '\0':
@@ -387,7 +459,15 @@ def loads(space, w_s):
         raise OperationError(space.w_TypeError,
                              space.wrap("Expected utf8-encoded str, got unicode"))
     s = space.str_w(w_s)
+    return decode_document(space, s, None)
+
+def decode_document(space, s, root_map):
+    """Decode the JSON value that makes up the whole of 's'.  If
+    'root_map' is not None, the maps of the keys are shared with the
+    previous calls that were given it."""
     decoder = JSONDecoder(space, s)
+    if root_map is not None:
+        decoder.root_map = root_map
     try:
         w_res = decoder.decode_any(0)
         i = decoder.skip_whitespace(decoder.pos)
@@ -1,6 +1,11 @@
+from rpython.rlib.listsort import make_timsort_class
+from rpython.rlib.rfloat import isfinite, isnan
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib.runicode import str_decode_utf_8
 from pypy.interpreter import unicodehelper
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.objspace.std.floatobject import float2string
 
 
 HEX = '0123456789abcdef'
@@ -16,38 +21,19 @@ ESCAPE_BEFORE_SPACE = [ESCAPE_DICT.get(chr(_i), '\\u%04x' % _i)
                        for _i in range(32)]
 
 
-def raw_encode_basestring_ascii(space, w_string):
-    if space.isinstance_w(w_string, space.w_str):
-        s = space.str_w(w_string)
-        for i in range(len(s)):
-            c = s[i]
-            if c >= ' ' and c <= '~' and c != '"' and c != '\\':
-                pass
-            else:
-                first = i
-                break
+def _first_special(s):
+    """Return the index of the first character of 's' which must be escaped
+    or is not ascii, or -1."""
+    for i in range(len(s)):
+        c = s[i]
+        if c >= ' ' and c <= '~' and c != '"' and c != '\\':
+            pass
         else:
-            # the input is a string with only non-special ascii chars
-            return w_string
+            return i
+    return -1
 
-        eh = unicodehelper.decode_error_handler(space)
-        u = str_decode_utf_8(
-                s, len(s), None, final=True, errorhandler=eh,
-                allow_surrogates=True)[0]
-        sb = StringBuilder(len(u))
-        sb.append_slice(s, 0, first)
-    else:
-        # We used to check if 'u' contains only safe characters, and return
-        # 'w_string' directly.  But this requires an extra pass over all
-        # characters, and the expected use case of this function, from
-        # json.encoder, will anyway re-encode a unicode result back to
-        # a string (with the ascii encoding).  This requires two passes
-        # over the characters.  So we may as well directly turn it into a
-        # string here --- only one pass.
-        u = space.unicode_w(w_string)
-        sb = StringBuilder(len(u))
-        first = 0
 
+def _escape_unicode_ascii(sb, u, first):
     for i in range(first, len(u)):
         c = u[i]
         if c <= u'~':
@@ -78,5 +64,321 @@ def raw_encode_basestring_ascii(space, w_string):
                 sb.append(HEX[(s2 >> 4) & 0x0f])
                 sb.append(HEX[s2 & 0x0f])
 
+
+def _escape_str_ascii(space, sb, s, first):
+    # 's' is utf-8 encoded, and s[:first] is only made of safe characters
+    eh = unicodehelper.decode_error_handler(space)
+    u = str_decode_utf_8(
+            s, len(s), None, final=True, errorhandler=eh,
+            allow_surrogates=True)[0]
+    sb.append_slice(s, 0, first)
+    _escape_unicode_ascii(sb, u, first)
+
+
+def raw_encode_basestring_ascii(space, w_string):
+    if space.isinstance_w(w_string, space.w_str):
+        s = space.str_w(w_string)
+        first = _first_special(s)
+        if first < 0:
+            # the input is a string with only non-special ascii chars
+            return w_string
+        sb = StringBuilder(len(s))
+        _escape_str_ascii(space, sb, s, first)
+    else:
+        # We used to check if 'u' contains only safe characters, and return
+        # 'w_string' directly.  But this requires an extra pass over all
+        # characters, and the expected use case of this function, from
+        # json.encoder, will anyway re-encode a unicode result back to
+        # a string (with the ascii encoding).  This requires two passes
+        # over the characters.  So we may as well directly turn it into a
+        # string here --- only one pass.
+        u = space.unicode_w(w_string)
+        sb = StringBuilder(len(u))
+        _escape_unicode_ascii(sb, u, 0)
+
     res = sb.build()
     return space.wrap(res)
+
+
+StrKeySort = make_timsort_class()
+ItemSortBase = make_timsort_class()
+
+class ItemSort(ItemSortBase):
+    """Sort a list of (w_key, w_value) by keys, like
+    sorted(items, key=lambda kv: kv[0])."""
+
+    def __init__(self, space, items):
+        ItemSortBase.__init__(self, items, len(items))
+        self.space = space
+
+    def lt(self, a, b):
+        space = self.space
+        return space.is_true(space.lt(a[0], b[0]))
+
+
+class JSONEncoder(object):
+    """Encode an object as ascii JSON into a single StringBuilder, like
+    json.JSONEncoder(ensure_ascii=True, encoding='utf-8', skipkeys=False).
+    The lists and dicts of strings, ints and floats are walked directly
+    through their strategies, without wrapping their items."""
+
+    def __init__(self, space, sort_keys, indent, item_separator,
+                 key_separator, w_default, allow_nan, check_circular):
+        self.space = space
+        self.sort_keys = sort_keys
+        self.indent = indent     # -1 for None
+        self.item_separator = item_separator
+        self.key_separator = key_separator
+        self.w_default = w_default
+        self.allow_nan = allow_nan
+        self.check_circular = check_circular
+        self.markers = {}
+        self.builder = StringBuilder()
+
+    def build(self):
+        return self.builder.build()
+
+    def mark(self, w_obj):
+        if self.check_circular:
+            if w_obj in self.markers:
+                raise oefmt(self.space.w_ValueError,
+                            "Circular reference detected")
+            self.markers[w_obj] = None
+
+    def unmark(self, w_obj):
+        if self.check_circular:
+            del self.markers[w_obj]
+
+    def emit_indent(self, level):
+        """Start the items of a list or a dict.  Return the separator to
+        put between them and the new indentation level."""
+        if self.indent < 0:
+            return self.item_separator, level
+        level += 1
+        newline_indent = '\n' + ' ' * (self.indent * level)
+        self.builder.append(newline_indent)
+        return self.item_separator + newline_indent, level
+
+    def emit_unindent(self, level):
+        if self.indent >= 0:
+            self.builder.append('\n')
+            self.builder.append(' ' * (self.indent * (level - 1)))
+
+    def floatstr(self, x, w_float):
+        if isfinite(x):
+            if w_float is None:
+                return float2string(x, 'r', 0)
+            return self.space.str_w(self.space.repr(w_float))
+        if isnan(x):
+            text = 'NaN'
+        elif x > 0.0:
+            text = 'Infinity'
+        else:
+            text = '-Infinity'
+        if not self.allow_nan:
+            raise oefmt(self.space.w_ValueError,
+                        "Out of range float values are not JSON compliant: "
+                        "%s", float2string(x, 'r', 0))
+        return text
+
+    def append_str(self, s):
+        first = _first_special(s)
+        self.builder.append('"')
+        if first < 0:
+            self.builder.append(s)
+        else:
+            _escape_str_ascii(self.space, self.builder, s, first)
+        self.builder.append('"')
+
+    def append_unicode(self, u):
+        self.builder.append('"')
+        _escape_unicode_ascii(self.builder, u, 0)
+        self.builder.append('"')
+
+    def encode(self, w_obj, level):
+        space = self.space
+        w_type = space.type(w_obj)
+        if space.is_w(w_type, space.w_str):
+            self.append_str(space.str_w(w_obj))
+        elif space.is_w(w_type, space.w_unicode):
+            self.append_unicode(space.unicode_w(w_obj))
+        elif space.is_w(w_type, space.w_int):
+            self.builder.append(str(space.int_w(w_obj)))
+        elif space.is_w(w_type, space.w_float):
+            self.builder.append(self.floatstr(space.float_w(w_obj), None))
+        elif space.is_w(w_type, space.w_list):
+            self.encode_list(w_obj, level)
+        elif space.is_w(w_type, space.w_dict):
+            self.encode_dict(w_obj, level)
+        elif space.is_w(w_obj, space.w_None):
+            self.builder.append('null')
+        elif space.is_w(w_obj, space.w_True):
+            self.builder.append('true')
+        elif space.is_w(w_obj, space.w_False):
+            self.builder.append('false')
+        elif space.isinstance_w(w_obj, space.w_str):
+            self.append_str(space.str_w(w_obj))
+        elif space.isinstance_w(w_obj, space.w_unicode):
+            self.append_unicode(space.unicode_w(w_obj))
+        elif (space.isinstance_w(w_obj, space.w_int) or
+              space.isinstance_w(w_obj, space.w_long)):
+            self.builder.append(space.str_w(space.str(w_obj)))
+        elif space.isinstance_w(w_obj, space.w_float):
+            self.builder.append(self.floatstr(space.float_w(w_obj), w_obj))
+        elif (space.isinstance_w(w_obj, space.w_list) or
+              space.isinstance_w(w_obj, space.w_tuple)):
+            self.encode_list(w_obj, level)
+        elif space.isinstance_w(w_obj, space.w_dict):
+            self.encode_dict(w_obj, level)
+        else:
+            self.mark(w_obj)
+            if self.w_default is None:
+                raise oefmt(space.w_TypeError, "%s is not JSON serializable",
+                            space.str_w(space.repr(w_obj)))
+            w_res = space.call_function(self.w_default, w_obj)
+            self.encode(w_res, level)
+            self.unmark(w_obj)
+
+    def encode_list(self, w_list, level):
+        space = self.space
+        if not space.is_true(w_list):
+            self.builder.append('[]')
+            return
+        self.mark(w_list)
+        self.builder.append('[')
+        separator, level = self.emit_indent(level)
+        # fast paths for the lists with a strategy: no wrapping
+        ints = space.listview_int(w_list)
+        if ints is not None:
+            for i in range(len(ints)):
+                if i > 0:
+                    self.builder.append(separator)
+                self.builder.append(str(ints[i]))
+        else:
+            floats = space.listview_float(w_list)
+            if floats is not None:
+                for i in range(len(floats)):
+                    if i > 0:
+                        self.builder.append(separator)
+                    self.builder.append(self.floatstr(floats[i], None))
+            else:
+                strings = space.listview_bytes(w_list)
+                if strings is not None:
+                    for i in range(len(strings)):
+                        if i > 0:
+                            self.builder.append(separator)
+                        self.append_str(strings[i])
+                else:
+                    items_w = space.fixedview(w_list)
+                    for i in range(len(items_w)):
+                        if i > 0:
+                            self.builder.append(separator)
+                        self.encode(items_w[i], level)
+        self.emit_unindent(level)
+        self.builder.append(']')
+        self.unmark(w_list)
+
+    def encode_dict(self, w_dict, level):
+        space = self.space
+        if not space.is_true(w_dict):
+            self.builder.append('{}')
+            return
+        self.mark(w_dict)
+        self.builder.append('{')
+        separator, level = self.emit_indent(level)
+        keys = space.listview_bytes(w_dict)
+        if keys is not None:
+            # a dict of strings: only the values are wrapped
+            if self.sort_keys:
+                StrKeySort(keys).sort()
+            for i in range(len(keys)):
+                key = keys[i]
+                w_value = space.finditem_str(w_dict, key)
+                if w_value is None:
+                    raise oefmt(space.w_RuntimeError,
+                                "dictionary changed size during iteration")
+                if i > 0:
+                    self.builder.append(separator)
+                self.append_str(key)
+                self.builder.append(self.key_separator)
+                self.encode(w_value, level)
+        else:
+            items = self.get_items(w_dict)
+            if self.sort_keys:
+                ItemSort(space, items).sort()
+            for i in range(len(items)):
+                w_key, w_value = items[i]
+                if i > 0:
+                    self.builder.append(separator)
+                self.encode_key(w_key)
+                self.builder.append(self.key_separator)
+                self.encode(w_value, level)
+        self.emit_unindent(level)
+        self.builder.append('}')
+        self.unmark(w_dict)
+
+    def get_items(self, w_dict):
+        space = self.space
+        items = []
+        w_iter = space.iter(space.call_method(w_dict, 'iteritems'))
+        while True:
+            try:
+                w_item = space.next(w_iter)
+            except OperationError, e:
+                if not e.match(space, space.w_StopIteration):
+                    raise
+                break
+            w_key, w_value = space.fixedview(w_item, 2)
+            items.append((w_key, w_value))
+        return items
+
+    def encode_key(self, w_key):
+        space = self.space
+        if space.isinstance_w(w_key, space.w_str):
+            self.append_str(space.str_w(w_key))
+        elif space.isinstance_w(w_key, space.w_unicode):
+            self.append_unicode(space.unicode_w(w_key))
+        elif space.isinstance_w(w_key, space.w_float):
+            if space.is_w(space.type(w_key), space.w_float):
+                w_float = None
+            else:
+                w_float = w_key
+            self.append_str(self.floatstr(space.float_w(w_key), w_float))
+        elif space.is_w(w_key, space.w_True):
+            self.append_str('true')
+        elif space.is_w(w_key, space.w_False):
+            self.append_str('false')
+        elif space.is_w(w_key, space.w_None):
+            self.append_str('null')
+        elif space.is_w(space.type(w_key), space.w_int):
+            self.append_str(str(space.int_w(w_key)))
+        elif (space.isinstance_w(w_key, space.w_int) or
+              space.isinstance_w(w_key, space.w_long)):
+            self.append_str(space.str_w(space.str(w_key)))
+        else:
+            raise oefmt(space.w_TypeError, "key %s is not a string",
+                        space.str_w(space.repr(w_key)))
+
+
+@unwrap_spec(sort_keys=bool, item_separator=str, key_separator=str,
+             allow_nan=bool, check_circular=bool)
+def dumps(space, w_obj, sort_keys=False, w_indent=None, item_separator=', ',
+          key_separator=': ', w_default=None, allow_nan=True,
+          check_circular=True):
+    """dumps(obj, sort_keys=False, indent=None, item_separator=', ',
+    key_separator=': ', default=None, allow_nan=True, check_circular=True)
+
+    Serialize 'obj' to an ascii JSON str, like json.dumps() with the
+    same arguments and the default ensure_ascii, encoding and skipkeys."""
+    if space.is_none(w_indent):
+        indent = -1
+    else:
+        indent = space.int_w(w_indent)
+        if indent < 0:
+            indent = 0
+    if space.is_none(w_default):
+        w_default = None
+    encoder = JSONEncoder(space, sort_keys, indent, item_separator,
+                          key_separator, w_default, allow_nan, check_circular)
+    encoder.encode(w_obj, 0)
+    return space.wrap(encoder.build())
@@ -0,0 +1,190 @@
+from rpython.rlib.rstring import StringBuilder
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.typedef import TypeDef
+from pypy.module._pypyjson.interp_decoder import (JSONMap, decode_document,
+                                                   is_whitespace)
+
+# where we are in the top-level array, with items=True
+(ITEMS_START, ITEMS_FIRST, ITEMS_NEXT, ITEMS_AFTER, ITEMS_END) = range(5)
+
+
+def is_scalar_end(ch):
+    return (is_whitespace(ch) or ch == ',' or ch == ']' or ch == '}' or
+            ch == '"' or ch == '[' or ch == '{')
+
+
+class W_IncrementalDecoder(W_Root):
+    """Splits a stream of chunks into complete JSON values, each of them
+    decoded as soon as its last byte arrives.  Only the bytes of the
+    value that is not complete yet are kept between two chunks.  The
+    scanner only follows the nesting of the brackets and the strings;
+    the values are checked when they are decoded.
+
+    When a chunk contains an error, the values that it completed before
+    the error are still returned, and the error is raised by the next
+    call; every later call raises it again.
+    """
+
+    def __init__(self, space, items):
+        self.space = space
+        self.items = items
+        self.state = ITEMS_START
+        self.offset = 0         # position of the current chunk in the stream
+        self.pending = None     # the start of the value, from previous chunks
+        self.in_value = False
+        self.scalar = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.closed = False
+        self.error = None       # the OperationError that stopped the stream
+        self.root_map = JSONMap('', u'')
+
+    @unwrap_spec(data='bufferstr')
+    def feed_w(self, data):
+        """feed(data) -> list of the values completed by 'data'"""
+        if self.error is not None:
+            raise self.error
+        if self.closed:
+            raise oefmt(self.space.w_ValueError, "feed() after close()")
+        values_w = []
+        try:
+            start = self.scan(data, values_w)
+        except OperationError, e:
+            self.error = e
+            if not values_w:
+                raise
+            return self.space.newlist(values_w)
+        if self.in_value:
+            if self.pending is None:
+                self.pending = StringBuilder()
+            self.pending.append_slice(data, start, len(data))
+        self.offset += len(data)
+        return self.space.newlist(values_w)
+
+    def close_w(self):
+        """close() -> list of the values completed by the end of the stream
+
+Raises ValueError if the stream stops in the middle of a value."""
+        values_w = []
+        if self.error is not None:
+            raise self.error
+        if self.closed:
+            return self.space.newlist(values_w)
+        self.closed = True
+        if self.in_value and self.scalar:
+            try:
+                self.complete('', 0, 0, values_w)
+            except OperationError, e:
+                self.error = e
+                raise
+        if self.in_value:
+            raise oefmt(self.space.w_ValueError,
+                        "Unterminated value at the end of the stream")
+        if self.items and self.state != ITEMS_END:
+            raise oefmt(self.space.w_ValueError,
+                        "Unterminated array at the end of the stream")
+        return self.space.newlist(values_w)
+
+    def scan(self, data, values_w):
+        """Scan 'data', appending the completed values to 'values_w', and
+        return the start in 'data' of the value that is not complete."""
+        start = 0
+        i = 0
+        n = len(data)
+        while i < n:
+            ch = data[i]
+            if not self.in_value:
+                if is_whitespace(ch):
+                    i += 1
+                    continue
+                if self.items and self.state != ITEMS_NEXT:
+                    if self.state != ITEMS_FIRST or ch == ']':
+                        self.scan_items_punctuation(ch, i)
+                        i += 1
+                        continue
+                if ch == ']' or ch == '}' or ch == ',' or ch == ':':
+                    raise oefmt(self.space.w_ValueError,
+                                "Unexpected '%s' at char %d",
+                                ch, self.offset + i)
+                self.in_value = True
+                self.scalar = not (ch == '"' or ch == '[' or ch == '{')
+                self.depth = 0
+                start = i
+            if self.scalar:
+                if is_scalar_end(ch):
+                    # 'ch' is scanned again, as the start of what follows
+                    self.complete(data, start, i, values_w)
+                    continue
+            elif self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 0:
+                        self.complete(data, start, i + 1, values_w)
+            elif ch == '"':
+                self.in_string = True
+            elif ch == '[' or ch == '{':
+                self.depth += 1
+            elif ch == ']' or ch == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete(data, start, i + 1, values_w)
+            i += 1
+        return start
+
+    def scan_items_punctuation(self, ch, i):
+        if self.state == ITEMS_START and ch == '[':
+            self.state = ITEMS_FIRST
+        elif self.state == ITEMS_FIRST and ch == ']':
+            self.state = ITEMS_END
+        elif self.state == ITEMS_AFTER and ch == ',':
+            self.state = ITEMS_NEXT
+        elif self.state == ITEMS_AFTER and ch == ']':
+            self.state = ITEMS_END
+        elif self.state == ITEMS_START:
+            raise oefmt(self.space.w_ValueError,
+                        "Expected '[' at char %d", self.offset + i)
+        elif self.state == ITEMS_END:
+            raise oefmt(self.space.w_ValueError,
+                        "Extra data at char %d", self.offset + i)
+        else:
+            raise oefmt(self.space.w_ValueError,
+                        "Unexpected '%s' when decoding array (char %d)",
+                        ch, self.offset + i)
+
+    def complete(self, data, start, end, values_w):
+        if self.pending is not None:
+            self.pending.append_slice(data, start, end)
+            s = self.pending.build()
+            self.pending = None
+        else:
+            assert start >= 0
+            assert end >= start
+            s = data[start:end]
+        values_w.append(decode_document(self.space, s, self.root_map))
+        self.in_value = False
+        if self.items:
+            self.state = ITEMS_AFTER
+
+
+@unwrap_spec(items=bool)
+def descr_new(space, w_subtype, items=False):
+    return W_IncrementalDecoder(space, items)
+
+W_IncrementalDecoder.typedef = TypeDef(
+    '_pypyjson.IncrementalDecoder',
+    __new__ = interp2app(descr_new),
+    feed = interp2app(W_IncrementalDecoder.feed_w),
+    close = interp2app(W_IncrementalDecoder.close_w),
+    __doc__ = """IncrementalDecoder(items=False)
+
+Decodes a JSON stream given in chunks of bytes: a sequence of values
+separated by whitespace, like newline-delimited JSON, or with
+items=True a single array whose items are returned one by one.""")
+W_IncrementalDecoder.typedef.acceptable_as_base_class = False
@@ -10,7 +10,27 @@ def test_skip_whitespace():
     assert dec.skip_whitespace(8) == len(s)
     dec.close()
 
-    
+class TestJSONMap(object):
+    def test_keys_are_shared(self):
+        space = self.space
+        s = '[{"a": 1, "b": 2}, {"a": 3, "b": 4}, {"b": 5, "a": 6}]'
+        dec = JSONDecoder(space, s)
+        try:
+            w_res = dec.decode_any(0)
+        finally:
+            dec.close()
+        w_d0, w_d1, w_d2 = space.fixedview(w_res)
+        keys0 = [space.unicode_w(w_k) for w_k in space.listview(w_d0)]
+        keys1 = [space.unicode_w(w_k) for w_k in space.listview(w_d1)]
+        assert keys0 == [u'a', u'b']
+        assert keys0[0] is keys1[0]
+        assert keys0[1] is keys1[1]
+        assert space.int_w(space.getitem(w_d1, space.wrap(u'b'))) == 4
+        map_a = dec.root_map.nexts['a']
+        assert map_a.nexts.keys() == ['b']
+        assert dec.root_map.nexts['b'].nexts.keys() == ['a']
+        assert dec.root_map.last_next is dec.root_map.nexts['b']
+
 
 class AppTest(object):
     spaceconfig = {"objspace.usemodules._pypyjson": True}
@@ -164,6 +184,31 @@ class AppTest(object):
         raises(ValueError, _pypyjson.loads, '{"key"')
         raises(ValueError, _pypyjson.loads, '{"key": 42')
 
+    def test_decode_object_same_keys(self):
+        import _pypyjson
+        s = '[%s]' % ', '.join(['{"id": %d, "name": "x%d", "sub": {"id": 0}}'
+                                % (i, i) for i in range(10)])
+        res = _pypyjson.loads(s)
+        assert res == [{u'id': i, u'name': u'x%d' % i, u'sub': {u'id': 0}}
+                       for i in range(10)]
+        assert type(res[3].keys()[0]) is unicode
+        #
+        s = '[{"a": 1, "ab": 2}, {"ab": 3, "a": 4}, {"a": 5, "abc": 6}]'
+        assert _pypyjson.loads(s) == [{'a': 1, 'ab': 2}, {'ab': 3, 'a': 4},
+                                      {'a': 5, 'abc': 6}]
+        s = '[{"a\\u00e9": 1, "b": 2}, {"a\xc3\xa9": 3, "b": 4}]'
+        assert _pypyjson.loads(s) == [{u'a\xe9': 1, u'b': 2},
+                                      {u'a\xe9': 3, u'b': 4}]
+        assert _pypyjson.loads('{"a": 1, "a": 2}') == {'a': 2}
+        raises(ValueError, _pypyjson.loads, '[{"a": 1}, {"a\x01": 2}]')
+
+    def test_decode_object_many_keys(self):
+        import _pypyjson
+        s = '[%s]' % ', '.join(['{"k%d": %d, "v": 0}' % (i, i)
+                                for i in range(200)])
+        assert _pypyjson.loads(s) == [{'k%d' % i: i, 'v': 0}
+                                      for i in range(200)]
+
     def test_decode_object_nonstring_key(self):
         import _pypyjson
         raises(ValueError, "_pypyjson.loads('{42: 43}')")
@@ -208,3 +253,214 @@ class AppTest(object):
         assert check("a\"c") == "a\\\"c"
         assert check("\\\"\b\f\n\r\t") == '\\\\\\"\\b\\f\\n\\r\\t'
         assert check("\x07") == "\\u0007"
+
+    def test_dumps_constants(self):
+        import _pypyjson
+        assert _pypyjson.dumps(None) == 'null'
+        assert _pypyjson.dumps(True) == 'true'
+        assert _pypyjson.dumps(False) == 'false'
+        assert _pypyjson.dumps(42) == '42'
+        assert _pypyjson.dumps(-42L) == '-42'
+        assert _pypyjson.dumps(10 ** 30) == '1' + '0' * 30
+        assert _pypyjson.dumps(1.5) == '1.5'
+        assert _pypyjson.dumps(1e100) == '1e+100'
+        assert _pypyjson.dumps(float('nan')) == 'NaN'
+        assert _pypyjson.dumps(float('-inf')) == '-Infinity'
+        raises(ValueError, _pypyjson.dumps, float('inf'), allow_nan=False)
+        assert _pypyjson.dumps("a\"b\xc2\x84") == '"a\\"b\\u0084"'
+        assert _pypyjson.dumps(u"\u1234") == '"\\u1234"'
+        assert type(_pypyjson.dumps(u"x")) is str
+
+    def test_dumps_containers(self):
+        import _pypyjson
+        assert _pypyjson.dumps([]) == '[]'
+        assert _pypyjson.dumps({}) == '{}'
+        assert _pypyjson.dumps(()) == '[]'
+        assert _pypyjson.dumps([1, 2, 3]) == '[1, 2, 3]'
+        assert _pypyjson.dumps([1.5, 2.0]) == '[1.5, 2.0]'
+        assert _pypyjson.dumps(["a", "b\n"]) == '["a", "b\\n"]'
+        assert _pypyjson.dumps((1, "a", None, [{}])) == '[1, "a", null, [{}]]'
+        assert _pypyjson.dumps({"a": 1}) == '{"a": 1}'
+        assert _pypyjson.dumps({1: 2}) == '{"1": 2}'
+        assert _pypyjson.dumps({1.5: 2}) == '{"1.5": 2}'
+        assert _pypyjson.dumps({None: True}) == '{"null": true}'
+        assert _pypyjson.dumps({u"\xe9": [u"x"]}) == '{"\\u00e9": ["x"]}'
+        raises(TypeError, _pypyjson.dumps, {(1, 2): 3})
+
+    def test_dumps_options(self):
+        import _pypyjson
+        d = {"b": [1, 2], "a": {"c": None}, "d": []}
+        assert _pypyjson.dumps(d, sort_keys=True) == (
+            '{"a": {"c": null}, "b": [1, 2], "d": []}')
+        assert _pypyjson.dumps({3: 1, 1: 2}, sort_keys=True) == (
+            '{"1": 2, "3": 1}')
+        assert _pypyjson.dumps(d, True, 2) == (
+            '{\n  "a": {\n    "c": null\n  }, \n  "b": [\n    1, \n    2\n'
+            '  ], \n  "d": []\n}')
+        assert _pypyjson.dumps(d, True, 0, ',', ':') == (
+            '{\n"a":{\n"c":null\n},\n"b":[\n1,\n2\n],\n"d":[]\n}')
+        assert _pypyjson.dumps(d, sort_keys=True, item_separator=',',
+                               key_separator=':') == (
+            '{"a":{"c":null},"b":[1,2],"d":[]}')
+
+    def test_dumps_default(self):
+        import _pypyjson
+        class A(object):
+            pass
+        raises(TypeError, _pypyjson.dumps, [A()])
+        res = _pypyjson.dumps([A()], default=lambda a: {"A": 1})
+        assert res == '[{"A": 1}]'
+        class Int(int):
+            def __str__(self):
+                return 'five'
+        assert _pypyjson.dumps(Int(5)) == 'five'
+
+    def test_dumps_circular(self):
+        import _pypyjson
+        l = [1]
+        l.append(l)
+        raises(ValueError, _pypyjson.dumps, l)
+        d = {}
+        d["d"] = [d]
+        raises(ValueError, _pypyjson.dumps, d)
+        a = []
+        assert _pypyjson.dumps([a, a]) == '[[], []]'
+        b = [1]
+        assert _pypyjson.dumps([b, b]) == '[[1], [1]]'
+
+    def test_incremental_decoder(self):
+        import _pypyjson
+        s = ('{"a": [1, "x]}\\"", {"b": null}]}\n42 "s" [] -1.5e3\n'
+             'true{"a": []}\n')
+        expected = [{u'a': [1, u'x]}"', {u'b': None}]}, 42, u's', [],
+                    -1.5e3, True, {u'a': []}]
+        for size in range(1, len(s) + 1):
+            dec = _pypyjson.IncrementalDecoder()
+            res = []
+            for i in range(0, len(s), size):
+                res += dec.feed(s[i:i+size])
+            res += dec.close()
+            assert res == expected
+        dec = _pypyjson.IncrementalDecoder()
+        assert dec.feed('12') == []
+        assert dec.feed('3 4') == [123]
+        assert dec.close() == [4]
+        assert dec.close() == []
+        raises(ValueError, dec.feed, '5')
+
+    def test_incremental_decoder_items(self):
+        import _pypyjson
+        s = ' [ {"a": 1}, 2 ,"x,]", [3, [4]] ]  '
+        for size in range(1, len(s) + 1):
+            dec = _pypyjson.IncrementalDecoder(items=True)
+            res = []
+            for i in range(0, len(s), size):
+                res += dec.feed(s[i:i+size])
+            res += dec.close()
+            assert res == [{u'a': 1}, 2, u'x,]', [3, [4]]]
+        dec = _pypyjson.IncrementalDecoder(True)
+        assert dec.feed(memoryview('[1, 2')) == [1]
+        assert dec.feed(bytearray(']')) == [2]
+        assert dec.close() == []
+        dec = _pypyjson.IncrementalDecoder(True)
+        assert dec.feed('[]') == []
+        raises(ValueError, dec.feed, '[]')
+
+    def test_incremental_decoder_errors(self):
+        import _pypyjson
+        def error(s, items=False):
+            dec = _pypyjson.IncrementalDecoder(items)
+            exc = raises(ValueError, "dec.feed(s); dec.close()")
+            return str(exc.value)
+        error('{"a": 1')
+        error('{"a" 1}')
+        error('1 2x')
+        error('"abc')
+        assert error('1 ]') == "Unexpected ']' at char 2"
+        assert error('{}', items=True) == "Expected '[' at char 0"
+        error('[1 2]', items=True)
+        error('[1,,2]', items=True)
+        error('[1, 2', items=True)
+        error('[1, 2] 3', items=True)
+
+    def test_incremental_decoder_values_before_error(self):
+        import _pypyjson
+        dec = _pypyjson.IncrementalDecoder(items=True)
+        assert dec.feed('[1,2') == [1]
+        assert dec.feed(',3]  [4]') == [2, 3]
+        exc = raises(ValueError, dec.feed, '')
+        assert str(exc.value) == "Extra data at char 9"
+        raises(ValueError, dec.close)
+        raises(ValueError, dec.feed, '5')
+        dec = _pypyjson.IncrementalDecoder()
+        raises(ValueError, dec.feed, '}')
+        raises(ValueError, dec.close)
+
+    def test_iterload(self):
+        import _pypyjson
+        class File(object):
+            def __init__(self, data):
+                self.data = data
+                self.reads = 0
+            def read(self, size):
+                self.reads += 1
+                result = self.data[:size]
+                self.data = self.data[size:]
+                return result
+        lines = ['{"id": %d, "name": "n%d"}' % (i, i) for i in range(100)]
+        f = File('\n'.join(lines) + '\n')
+        it = _pypyjson.iterload(f, chunksize=50)
+        assert it.next() == {u'id': 0, u'name': u'n0'}
+        assert f.reads == 1
+        assert list(it) == [{u'id': i, u'name': u'n%d' % i}
+                            for i in range(1, 100)]
+        f = File('[%s]' % ', '.join(lines))
+        assert list(_pypyjson.iterload(f, items=True, chunksize=7)) == [
+            {u'id': i, u'name': u'n%d' % i} for i in range(100)]
+
+
+class AppTestJson(object):
+    spaceconfig = {"usemodules": ['_pypyjson', 'struct', 'binascii']}
+
+    def test_json_dumps(self):
+        import json
+        d = {"a": [1, 2.5, u"\xe9", None], "b": {"c": True}}
+        assert json.dumps(d, sort_keys=True) == (
+            '{"a": [1, 2.5, "\\u00e9", null], "b": {"c": true}}')
+        assert json.dumps(d, sort_keys=True, indent=1,
+                          separators=(',', ': ')) == (
+            '{\n "a": [\n  1,\n  2.5,\n  "\\u00e9",\n  null\n ],\n'
+            ' "b": {\n  "c": true\n }\n}')
+        assert json.dumps(d, ensure_ascii=False, sort_keys=True) == (
+            u'{"a": [1, 2.5, "\xe9", null], "b": {"c": true}}')
+
+    def test_same_as_pure_python(self):
+        import json, json.encoder
+        class A(object):
+            pass
+        values = [
+            {"a": [1, 2.5, -3L, u"ሴ\xe9", "\xc3\xa9", None, (True,)],
+             "b": {"c": {}, "d": [[]], 5: 1e-7, 2.5: -0.0, None: False}},
+            [{"x": 1, "y": 2.0}, {"x": 3, "y": 4.0}, ["\x00\x1f"]],
+            [A(), {"k": A()}],
+        ]
+        options = [
+            {},
+            {"sort_keys": True},
+            {"indent": 2},
+            {"indent": 0, "separators": (",", ":"), "sort_keys": True},
+            {"default": lambda a: "A", "check_circular": False},
+        ]
+        for value in values:
+            for kwds in options:
+                kwds = kwds.copy()
+                kwds.setdefault("default", lambda a: ["A", 1])
+                expected = json.encoder.JSONEncoder(**kwds)
+                encoder = json.encoder.JSONEncoder(**kwds)
+                saved = json.encoder._pypyjson_dumps
+                json.encoder._pypyjson_dumps = None
+                try:
+                    expected = expected.encode(value)
+                finally:
+                    json.encoder._pypyjson_dumps = saved
+                assert encoder.encode(value) == expected
@@ -12,4 +12,9 @@ class Module(MixedModule):
         'compile':        'interp_sre.W_SRE_Pattern',
         'getlower':       'interp_sre.w_getlower',
         'getcodesize':    'interp_sre.w_getcodesize',
+        'getcached':      'interp_sre.w_getcached',
+        'putcached':      'interp_sre.w_putcached',
+        'cache_info':     'interp_sre.w_cache_info',
+        'cache_clear':    'interp_sre.w_cache_clear',
+        'set_cache_size': 'interp_sre.w_set_cache_size',
     }
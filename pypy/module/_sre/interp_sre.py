@@ -1,4 +1,6 @@
 import sys
+from collections import OrderedDict
+from pypy.interpreter import unicodehelper
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.typedef import GetSetProperty, TypeDef
 from pypy.interpreter.typedef import interp_attrproperty, interp_attrproperty_w
@@ -12,7 +14,7 @@ from rpython.rlib import jit
 #
 # Constants and exposed functions
 
-from rpython.rlib.rsre import rsre_core
+from rpython.rlib.rsre import rsre_core, rsre_pikevm
 from rpython.rlib.rsre.rsre_char import MAGIC, CODESIZE, MAXREPEAT, getlower, set_unicode_db
 
 
@@ -75,12 +77,16 @@ def import_re(space):
 
 def matchcontext(space, ctx):
     try:
+        if ctx.program is not None:
+            return rsre_pikevm.match_context(ctx, ctx.program)
         return rsre_core.match_context(ctx)
     except rsre_core.Error, e:
         raise OperationError(space.w_RuntimeError, space.wrap(e.msg))
 
 def searchcontext(space, ctx):
     try:
+        if ctx.program is not None:
+            return rsre_pikevm.search_context(ctx, ctx.program)
         return rsre_core.search_context(ctx)
     except rsre_core.Error, e:
         raise OperationError(space.w_RuntimeError, space.wrap(e.msg))
@@ -90,7 +96,8 @@ def searchcontext(space, ctx):
 # SRE_Pattern class
 
 class W_SRE_Pattern(W_Root):
-    _immutable_fields_ = ["code", "flags", "num_groups", "w_groupindex"]
+    _immutable_fields_ = ["code", "flags", "num_groups", "w_groupindex",
+                          "required", "program"]
 
     def cannot_copy_w(self):
         space = self.space
@@ -111,8 +118,8 @@ class W_SRE_Pattern(W_Root):
                 pos = len(unicodestr)
             if endpos > len(unicodestr):
                 endpos = len(unicodestr)
-            return rsre_core.UnicodeMatchContext(self.code, unicodestr,
-                                                 pos, endpos, self.flags)
+            ctx = rsre_core.UnicodeMatchContext(self.code, unicodestr,
+                                                pos, endpos, self.flags)
         else:
             buf = space.readbuf_w(w_string)
             size = buf.getlength()
@@ -121,8 +128,11 @@ class W_SRE_Pattern(W_Root):
                 pos = size
             if endpos > size:
                 endpos = size
-            return rsre_core.BufMatchContext(self.code, buf,
-                                             pos, endpos, self.flags)
+            ctx = rsre_core.BufMatchContext(self.code, buf,
+                                            pos, endpos, self.flags)
+        ctx.required = self.required
+        ctx.program = self.program
+        return ctx
 
     def getmatch(self, ctx, found):
         if found:
@@ -297,12 +307,120 @@ def SRE_Pattern__new__(space, w_subtype, w_pattern, flags, w_code,
     srepat.space = space
     srepat.w_pattern = w_pattern      # the original uncompiled pattern
     srepat.flags = flags
-    srepat.code = code
+    cache = space.fromcache(PatternCache)
+    key = cache.make_key(w_pattern, flags)
+    cached = cache.peek(key)
+    if cached is not None and cached.code == code:
+        # share the code with the pattern compiled before: it is a green
+        # variable of the JIT drivers, which can then reuse their loops
+        srepat.code = cached.code
+        srepat.required = cached.required
+        srepat.program = cached.program
+    else:
+        srepat.code = code
+        srepat.required = rsre_core.find_required_literal(code)
+        srepat.program = rsre_pikevm.compile_program(code)
     srepat.num_groups = groups
     srepat.w_groupindex = w_groupindex
     srepat.w_indexgroup = w_indexgroup
     return w_srepat
 
+# ____________________________________________________________
+#
+# Cache of the compiled patterns
+
+class PatternCache(object):
+    """The patterns compiled by the re module from a str or unicode, keyed
+    by their source and flags, with the least recently used first."""
+
+    def __init__(self, space):
+        self.space = space
+        self.patterns = OrderedDict()
+        self.maxsize = 1024
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, w_pattern, flags):
+        space = self.space
+        w_type = space.type(w_pattern)
+        if space.is_w(w_type, space.w_str):
+            return 'b%d:%s' % (flags, space.str_w(w_pattern))
+        if space.is_w(w_type, space.w_unicode):
+            utf8 = unicodehelper.encode_utf8(space, space.unicode_w(w_pattern))
+            return 'u%d:%s' % (flags, utf8)
+        return None
+
+    def peek(self, key):
+        if key is None:
+            return None
+        return self.patterns.get(key, None)
+
+    def get(self, key):
+        srepat = self.peek(key)
+        if srepat is not None:
+            self.hits += 1
+            del self.patterns[key]
+            self.patterns[key] = srepat
+        elif key is not None:
+            self.misses += 1
+        return srepat
+
+    def put(self, key, srepat):
+        if key is None or self.maxsize <= 0:
+            return
+        if key in self.patterns:
+            del self.patterns[key]
+        self.patterns[key] = srepat
+        self.shrink(self.maxsize)
+
+    def shrink(self, size):
+        while len(self.patterns) > size:
+            key = None
+            for key in self.patterns.iterkeys():
+                break
+            del self.patterns[key]
+
+@unwrap_spec(flags=int)
+def w_getcached(space, w_pattern, flags):
+    """getcached(pattern, flags) -> the pattern compiled from the same
+pattern and flags, or None"""
+    cache = space.fromcache(PatternCache)
+    srepat = cache.get(cache.make_key(w_pattern, flags))
+    if srepat is None:
+        return space.w_None
+    return srepat
+
+@unwrap_spec(flags=int)
+def w_putcached(space, w_pattern, flags, w_srepat):
+    """putcached(pattern, flags, compiled) -> add a compiled pattern to the
+cache"""
+    srepat = space.interp_w(W_SRE_Pattern, w_srepat)
+    cache = space.fromcache(PatternCache)
+    cache.put(cache.make_key(w_pattern, flags), srepat)
+
+def w_cache_info(space):
+    """cache_info() -> (hits, misses, size, maxsize) of the cache of the
+compiled patterns"""
+    cache = space.fromcache(PatternCache)
+    return space.newtuple([space.wrap(cache.hits), space.wrap(cache.misses),
+                           space.wrap(len(cache.patterns)),
+                           space.wrap(cache.maxsize)])
+
+def w_cache_clear(space):
+    """cache_clear() -> empty the cache of the compiled patterns"""
+    cache = space.fromcache(PatternCache)
+    cache.patterns.clear()
+    cache.hits = 0
+    cache.misses = 0
+
+@unwrap_spec(maxsize=int)
+def w_set_cache_size(space, maxsize):
+    """set_cache_size(maxsize) -> set the number of compiled patterns that
+are kept in the cache"""
+    cache = space.fromcache(PatternCache)
+    cache.maxsize = maxsize
+    cache.shrink(max(maxsize, 0))
+
 
 W_SRE_Pattern.typedef = TypeDef(
     'SRE_Pattern',
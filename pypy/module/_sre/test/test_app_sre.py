@@ -988,3 +988,75 @@ class AppTestOptimizations:
         import re
         assert re.search(".+ab", "wowowowawoabwowo")
         assert None == re.search(".+ab", "wowowaowowo")
+
+    def test_required_literal(self):
+        import re
+        r = re.compile(r".*ERROR: (\d+)")
+        assert r.search("info: ok\n") is None
+        assert r.search("x ERROR: 42 ERROR: 3").group(1) == "3"
+        assert r.findall("a ERROR: 1\nb ERROR: 2\nc\n") == ["1", "2"]
+        r = re.compile(r"\w+@example\.com")
+        assert r.findall(u"bob@example.com, eve@example.org, x@example.com"
+                         ) == [u"bob@example.com", u"x@example.com"]
+        r = re.compile(r"[ab]x?(cd)ef")
+        assert [m.span() for m in r.finditer("bcdef axcdef xcdef acdefbcdef")
+                ] == [(0, 5), (6, 12), (19, 24), (24, 29)]
+        assert r.sub("-", "acdacdef") == "acd-"
+        assert r.search(buffer("..bxcdef"), 3) is None
+
+
+class AppTestPatternCache:
+
+    def test_compile_is_cached(self):
+        import re, _sre
+        re.purge()
+        r = re.compile(r"(a+)b")
+        assert re.compile(r"(a+)b") is r
+        assert re.compile(u"(a+)b") is not r
+        assert re.compile(r"(a+)b", re.I) is not r
+        assert re.compile(r"(?i)x") is re.compile(r"(?i)x")
+        hits, misses, size, maxsize = _sre.cache_info()
+        assert (hits, misses, size) == (2, 4, 4)
+        assert maxsize == 1024
+        assert re.match(r"(a+)b", "aab").group(1) == "aa"
+        assert _sre.cache_info()[0] == 3
+
+    def test_lru_eviction(self):
+        import re, _sre
+        re.purge()
+        _sre.set_cache_size(2)
+        try:
+            r1 = re.compile("x1")
+            r2 = re.compile("x2")
+            assert re.compile("x1") is r1
+            re.compile("x3")        # evicts "x2"
+            assert _sre.cache_info()[2] == 2
+            assert _sre.getcached("x1", 0) is r1
+            assert _sre.getcached("x2", 0) is None
+            assert re.compile("x2") is not r2
+        finally:
+            _sre.set_cache_size(1024)
+
+    def test_purge(self):
+        import re, _sre
+        r = re.compile("purge")
+        re.purge()
+        assert _sre.cache_info()[:3] == (0, 0, 0)
+        assert re.compile("purge") is not r
+
+    def test_debug_is_not_cached(self):
+        import re, _sre, sys, StringIO
+        re.purge()
+        saved, sys.stdout = sys.stdout, StringIO.StringIO()
+        try:
+            re.compile("debug", re.DEBUG)
+        finally:
+            sys.stdout = saved
+        assert _sre.cache_info()[2] == 0
+
+    def test_getcached_other_types(self):
+        import _sre
+        class S(str):
+            pass
+        assert _sre.getcached(S("abc"), 0) is None
+        assert _sre.getcached(42, 0) is None
@@ -84,7 +84,7 @@ def code_dealloc(space, py_obj):
 def PyFunction_GetCode(space, w_func):
     """Return the code object associated with the function object op."""
     func = space.interp_w(Function, w_func)
-    w_code = space.wrap(func.code)
+    w_code = space.wrap(func.getcode_decoded())
     return borrow_from(w_func, w_code)
 
 @cpython_api([PyObject, PyObject, PyObject], PyObject)
@@ -36,6 +36,8 @@ class Module(MixedModule):
         'lock_held':       'interp_imp.lock_held',
         'acquire_lock':    'interp_imp.acquire_lock',
         'release_lock':    'interp_imp.release_lock',
+
+        'invalidate_caches': 'interp_imp.invalidate_caches',
         }
 
     appleveldefs = {
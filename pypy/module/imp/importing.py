@@ -2,7 +2,7 @@
 Implementation of the interpreter-level default import logic.
 """
 
-import sys, os, stat
+import sys, os, stat, time
 
 from pypy.interpreter.module import Module
 from pypy.interpreter.gateway import interp2app, unwrap_spec
@@ -10,7 +10,7 @@ from pypy.interpreter.typedef import TypeDef, generic_new_descr
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.baseobjspace import W_Root, CannotHaveLock
 from pypy.interpreter.eval import Code
-from pypy.interpreter.pycode import PyCode
+from pypy.interpreter.pycode import PyCode, LazyPyCode
 from rpython.rlib import streamio, jit
 from rpython.rlib.streamio import StreamErrors
 from rpython.rlib.objectmodel import we_are_translated, specialize
@@ -521,6 +521,8 @@ def find_module(space, modulename, w_modulename, partname, w_path,
                     return FindInfo.fromLoader(w_loader)
 
             path = space.str0_w(w_pathitem)
+            if not getdircache(space).may_contain(path, partname):
+                continue
             filepart = os.path.join(path, partname)
             if os.path.isdir(filepart) and case_ok(filepart):
                 initfile = os.path.join(filepart, '__init__')
@@ -549,6 +551,71 @@ def find_module(space, modulename, w_modulename, partname, w_path,
     # not found
     return delayed_builtin
 
+# a directory modified less than this number of seconds before it was
+# listed may still change without its mtime changing
+RACY_DELAY = 2.0
+
+class DirectoryListing:
+    def __init__(self, mtime, stems):
+        self.mtime = mtime
+        self.stems = stems
+
+class DirectoryCache:
+    """Remembers the listings of the directories of sys.path, to find out
+    without any stat() when a module is not in a directory.  A listing is
+    valid as long as the mtime of its directory does not change; only the
+    absolute paths are cached, and imp.invalidate_caches() forgets all
+    the listings.
+    """
+
+    def __init__(self, space):
+        self.listings = {}     # {absolute path: DirectoryListing}
+
+    def invalidate(self):
+        self.listings.clear()
+
+    def get_stems(self, path):
+        """Return a dict whose keys are the names found in the directory
+        'path' up to their first dot, or None if it is not known."""
+        if not os.path.isabs(path):
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        mtime = st.st_mtime
+        listing = self.listings.get(path, None)
+        if listing is not None:
+            if listing.mtime == mtime:
+                return listing.stems
+            del self.listings[path]
+        if not stat.S_ISDIR(st.st_mode):
+            return None
+        try:
+            names = os.listdir(path)
+        except OSError:
+            return None
+        stems = {}
+        for name in names:
+            dot = name.find('.')
+            if dot >= 0:
+                name = name[:dot]
+            stems[name] = None
+        if time.time() - mtime < RACY_DELAY:
+            # files can still be added with the same mtime
+            return stems
+        self.listings[path] = DirectoryListing(mtime, stems)
+        return stems
+
+    def may_contain(self, path, partname):
+        """False if the directory 'path' is known to have no file or
+        subdirectory for the module 'partname'."""
+        stems = self.get_stems(path)
+        return stems is None or partname in stems
+
+def getdircache(space):
+    return space.fromcache(DirectoryCache)
+
 def _prepare_module(space, w_mod, filename, pkgdir):
     w = space.wrap
     space.sys.setmodule(w_mod)
@@ -907,6 +974,8 @@ def update_code_filenames(space, code_w, pathname, oldname=None):
     assert isinstance(code_w, PyCode)
     if oldname is None:
         oldname = code_w.co_filename
+        if oldname == pathname:
+            return    # nothing to update
     elif code_w.co_filename != oldname:
         return
 
@@ -915,6 +984,8 @@ def update_code_filenames(space, code_w, pathname, oldname=None):
     for const in constants:
         if const is not None and isinstance(const, PyCode):
             update_code_filenames(space, const, pathname, oldname)
+        elif isinstance(const, LazyPyCode):
+            const.update_filename(oldname, pathname)
 
 def _get_long(s):
     a = ord(s[0])
@@ -973,8 +1044,13 @@ def check_compiled_module(space, pycfilename, expected_mtime):
 def read_compiled_module(space, cpathname, strbuf):
     """ Read a code object from a file and check it for validity """
 
-    w_marshal = space.getbuiltinmodule('marshal')
-    w_code = space.call_method(w_marshal, 'loads', space.wrap(strbuf))
+    if space.config.objspace.lazycodeobjects:
+        from pypy.module.marshal.interp_marshal import CodeUnmarshaller
+        u = CodeUnmarshaller(space, strbuf, lazy_code=True)
+        w_code = u.load_w_obj()
+    else:
+        w_marshal = space.getbuiltinmodule('marshal')
+        w_code = space.call_method(w_marshal, 'loads', space.wrap(strbuf))
     if not isinstance(w_code, Code):
         raise oefmt(space.w_ImportError, "Non-code object in %s", cpathname)
     return w_code
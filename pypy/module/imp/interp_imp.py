@@ -180,3 +180,17 @@ def release_lock(space):
 def reinit_lock(space):
     if space.config.objspace.usemodules.thread:
         importing.getimportlock(space).reinit_lock()
+
+#__________________________________________________________________
+
+def invalidate_caches(space):
+    """Forget the directory listings used to find modules, and call the
+    invalidate_caches() method of the finders of sys.meta_path which
+    have one.  Call it after creating a module file in a directory that
+    was already searched less than a few seconds before."""
+    importing.getdircache(space).invalidate()
+    w_name = space.wrap('invalidate_caches')
+    for w_finder in space.unpackiterable(space.sys.get('meta_path')):
+        w_method = space.findattr(w_finder, w_name)
+        if w_method is not None:
+            space.call_function(w_method)
@@ -677,6 +677,22 @@ class AppTestImport:
         import imp
         raises(ValueError, imp.load_module, "", "", "", [1, 2, 3, 4])
 
+    def test_invalidate_caches(self):
+        import imp, sys
+        class Finder(object):
+            called = 0
+            def find_module(self, fullname, path=None):
+                return None
+            def invalidate_caches(self):
+                self.called += 1
+        finder = Finder()
+        sys.meta_path.append(finder)
+        try:
+            assert imp.invalidate_caches() is None
+        finally:
+            sys.meta_path.remove(finder)
+        assert finder.called == 1
+
 
 class TestAbi:
     def test_abi_tag(self):
@@ -689,6 +705,44 @@ class TestAbi:
             assert importing.get_so_extension(space1) == '.TESTi.so'
             assert importing.get_so_extension(space2) == '.so'
 
+class TestDirectoryCache:
+    def test_listing(self):
+        cache = importing.DirectoryCache(None)
+        p = udir.ensure('dircache', dir=1)
+        p.join('foo.py').write('')
+        p.ensure('pkg', dir=1)
+        past = p.mtime() - 100
+        os.utime(str(p), (past, past))
+        assert cache.may_contain(str(p), 'foo')
+        assert cache.may_contain(str(p), 'pkg')
+        assert not cache.may_contain(str(p), 'bar')
+        assert not cache.may_contain(str(p), 'Foo')
+        assert str(p) in cache.listings
+        # a new file with the same mtime is not seen...
+        p.join('bar.py').write('')
+        os.utime(str(p), (past, past))
+        assert not cache.may_contain(str(p), 'bar')
+        # ...until the caches are invalidated
+        cache.invalidate()
+        assert cache.may_contain(str(p), 'bar')
+        # a change of mtime is seen
+        p.join('baz.py').write('')
+        os.utime(str(p), (past + 1, past + 1))
+        assert cache.may_contain(str(p), 'baz')
+
+    def test_not_cached(self):
+        cache = importing.DirectoryCache(None)
+        p = udir.ensure('dircache_recent', dir=1)
+        # recently modified directories and relative paths are listed
+        # every time
+        assert not cache.may_contain(str(p), 'foo')
+        assert str(p) not in cache.listings
+        p.join('foo.py').write('')
+        assert cache.may_contain(str(p), 'foo')
+        assert cache.may_contain('', 'foo')
+        assert cache.may_contain(str(p.join('nonexistent')), 'foo')
+        assert cache.listings == {}
+
 def _getlong(data):
     x = marshal.dumps(data)
     return x[-4:]
@@ -797,6 +851,54 @@ class TestPycStuff:
         ret = space.int_w(w_ret)
         assert ret == 42
 
+    def test_load_compiled_module_lazily(self):
+        from pypy.interpreter.pycode import PyCode, LazyPyCode
+        from pypy.interpreter.function import Function
+        space = maketestobjspace(make_config(None, lazycodeobjects=True))
+        w_modulename = space.wrap('somemodule')
+        w_mod = space.wrap(Module(space, w_modulename))
+        w_co = space.appexec([], '''():
+            return compile("""
+x = 'interned'
+def f(a, b=(1, 2.5, 10**30, u'u', None)):
+    "doc"
+    def g():
+        return (a, b, x)
+    return g
+def h():
+    return x + 'h'
+""", '?', 'exec')''')
+        data = space.str_w(space.appexec([w_co], '''(co):
+            import marshal
+            return marshal.dumps(co)'''))
+        importing.load_compiled_module(space, w_modulename, w_mod, 'x.pyc',
+                                       importing.get_pyc_magic(space), 0,
+                                       data)
+        w_f = space.getattr(w_mod, space.wrap('f'))
+        w_h = space.getattr(w_mod, space.wrap('h'))
+        assert isinstance(w_f, Function) and isinstance(w_h, Function)
+        assert isinstance(w_f.code, LazyPyCode)
+        assert isinstance(w_h.code, LazyPyCode)
+        assert w_f.name == 'f'
+        # calling the function decodes its code
+        w_g = space.call_function(w_f, space.wrap(5))
+        assert isinstance(w_f.code, PyCode)
+        assert isinstance(w_g.code, LazyPyCode)
+        w_res = space.call_function(w_g)
+        assert space.unwrap(w_res) == (5, (1, 2.5, 10**30, u'u', None),
+                                       'interned')
+        # inspecting it too
+        assert space.str_w(space.getattr(w_h, space.wrap('__name__'))) == 'h'
+        assert isinstance(w_h.code, LazyPyCode)
+        w_code = space.getattr(w_h, space.wrap('func_code'))
+        assert isinstance(w_code, PyCode)
+        assert w_h.code is w_code
+        assert space.str_w(space.call_function(w_h)) == 'internedh'
+        # the constants of the module code are decoded when inspected
+        w_res = space.appexec([w_co, w_mod], '''(co, mod):
+            return mod.f.func_code == co.co_consts[2]''')
+        assert space.is_true(w_res)
+
     def test_parse_source_module(self):
         space = self.space
         pathname = _testfilesource()
@@ -1,6 +1,7 @@
 from pypy.interpreter.error import OperationError
 from pypy.interpreter.gateway import WrappedDefault, unwrap_spec
 from rpython.rlib.rarithmetic import intmask
+from rpython.rlib.rstring import StringBuilder
 from rpython.rlib import rstackovf
 from pypy.module._file.interp_file import W_File
 from pypy.objspace.std.marshal_impl import marshal, get_unmarshallers
@@ -17,11 +18,10 @@ def dump(space, w_data, w_f, w_version):
     else:
         writer = FileWriter(space, w_f)
     try:
-        # note: bound methods are currently not supported,
-        # so we have to pass the instance in, instead.
-        ##m = Marshaller(space, writer.write, space.int_w(w_version))
-        m = Marshaller(space, writer, space.int_w(w_version))
+        # the data is built in memory and written in one call
+        m = StringMarshaller(space, space.int_w(w_version))
         m.dump_w_obj(w_data)
+        writer.write(m.get_value())
     finally:
         writer.finished()
 
@@ -37,9 +37,12 @@ def load(space, w_f):
     """Read one value from the file 'f' and return it."""
     # special case real files for performance
     if isinstance(w_f, W_File):
-        reader = DirectStreamReader(space, w_f)
-    else:
-        reader = FileReader(space, w_f)
+        u = StreamUnmarshaller(space, w_f)
+        try:
+            return u.load_w_obj()
+        finally:
+            u.finished()
+    reader = FileReader(space, w_f)
     try:
         u = Unmarshaller(space, reader)
         return u.load_w_obj()
@@ -123,12 +126,6 @@ class DirectStreamWriter(StreamReaderWriter):
     def write(self, data):
         self.file.do_direct_write(data)
 
-class DirectStreamReader(StreamReaderWriter):
-    def read(self, n):
-        data = self.file.direct_read(n)
-        if len(data) < n:
-            self.raise_eof()
-        return data
 
 
 class _Base(object):
@@ -261,80 +258,32 @@ class Marshaller(_Base):
 class StringMarshaller(Marshaller):
     def __init__(self, space, version):
         Marshaller.__init__(self, space, None, version)
-        self.buflis = [chr(0)] * 128
-        self.bufpos = 0
+        self.builder = StringBuilder(128)
 
     def put(self, s):
-        pos = self.bufpos
-        lng = len(s)
-        newpos = pos + lng
-        while len(self.buflis) < newpos:
-            self.buflis *= 2
-        idx = 0
-        while idx < lng:
-            self.buflis[pos + idx] = s[idx]
-            idx += 1
-        self.bufpos = newpos
+        self.builder.append(s)
 
     def put1(self, c):
-        pos = self.bufpos
-        newpos = pos + 1
-        if len(self.buflis) < newpos:
-            self.buflis *= 2
-        self.buflis[pos] = c
-        self.bufpos = newpos
+        self.builder.append(c)
 
     def atom_int(self, typecode, x):
-        a = chr(x & 0xff)
-        x >>= 8
-        b = chr(x & 0xff)
-        x >>= 8
-        c = chr(x & 0xff)
-        x >>= 8
-        d = chr(x & 0xff)
-        pos = self.bufpos
-        newpos = pos + 5
-        if len(self.buflis) < newpos:
-            self.buflis *= 2
-        self.buflis[pos] = typecode
-        self.buflis[pos+1] = a
-        self.buflis[pos+2] = b
-        self.buflis[pos+3] = c
-        self.buflis[pos+4] = d
-        self.bufpos = newpos
+        self.builder.append(typecode)
+        self.put_int(x)
 
     def put_short(self, x):
-        a = chr(x & 0xff)
-        x >>= 8
-        b = chr(x & 0xff)
-        pos = self.bufpos
-        newpos = pos + 2
-        if len(self.buflis) < newpos:
-            self.buflis *= 2
-        self.buflis[pos]   = a
-        self.buflis[pos+1] = b
-        self.bufpos = newpos
+        builder = self.builder
+        builder.append(chr(x & 0xff))
+        builder.append(chr((x >> 8) & 0xff))
 
     def put_int(self, x):
-        a = chr(x & 0xff)
-        x >>= 8
-        b = chr(x & 0xff)
-        x >>= 8
-        c = chr(x & 0xff)
-        x >>= 8
-        d = chr(x & 0xff)
-        pos = self.bufpos
-        newpos = pos + 4
-        if len(self.buflis) < newpos:
-            self.buflis *= 2
-        self.buflis[pos]   = a
-        self.buflis[pos+1] = b
-        self.buflis[pos+2] = c
-        self.buflis[pos+3] = d
-        self.bufpos = newpos
+        builder = self.builder
+        builder.append(chr(x & 0xff))
+        builder.append(chr((x >> 8) & 0xff))
+        builder.append(chr((x >> 16) & 0xff))
+        builder.append(chr((x >> 24) & 0xff))
 
     def get_value(self):
-        return ''.join(self.buflis[:self.bufpos])
+        return self.builder.build()
 
 
 def invalid_typecode(space, u, tc):
@@ -347,15 +296,29 @@ class Unmarshaller(_Base):
     for tc, func in get_unmarshallers():
         _dispatch[ord(tc)] = func
 
+    # if True, the code objects nested in other code objects are
+    # not decoded, but returned as LazyPyCode
+    lazy_code = False
+
     def __init__(self, space, reader):
         self.space = space
         self.reader = reader
         self.stringtable_w = []
+        self.code_depth = 0
 
     def get(self, n):
         assert n >= 0
         return self.reader.read(n)
 
+    def skip(self, n):
+        self.get(n)
+
+    def get_position(self):
+        raise NotImplementedError
+
+    def get_buffer(self):
+        raise NotImplementedError
+
     def get1(self):
         # the [0] is used to convince the annotator to return a char
         return self.get(1)[0]
@@ -450,7 +413,21 @@ class Unmarshaller(_Base):
         return res_w
 
     def get_list_w(self):
-        return self.get_tuple_w()[:]
+        # like get_tuple_w(), but builds a separate list which can be
+        # resized, instead of copying the result of get_tuple_w()
+        lng = self.get_lng()
+        res_w = [None] * lng
+        idx = 0
+        space = self.space
+        while idx < lng:
+            tc = self.get1()
+            w_ret = self._dispatch[ord(tc)](space, self, tc)
+            if w_ret is None:
+                raise OperationError(space.w_TypeError, space.wrap(
+                    'NULL object in marshal data'))
+            res_w[idx] = w_ret
+            idx += 1
+        return res_w
 
     def _overflow(self):
         self.raise_exc('object too deeply nested to unmarshal')
@@ -469,18 +446,40 @@ class StringUnmarshaller(Unmarshaller):
         raise OperationError(space.w_EOFError, space.wrap(
             'EOF read where object expected'))
 
+    def fill(self, n):
+        """Called when there are less than n bytes left in the buffer:
+        get more data, or raise EOFError."""
+        self.raise_eof()
+
     def get(self, n):
         pos = self.bufpos
         newpos = pos + n
         if newpos > self.limit:
-            self.raise_eof()
+            self.fill(n)
+            pos = self.bufpos
+            newpos = pos + n
         self.bufpos = newpos
         return self.bufstr[pos : newpos]
 
+    def skip(self, n):
+        assert n >= 0
+        newpos = self.bufpos + n
+        if newpos > self.limit:
+            self.fill(n)
+            newpos = self.bufpos + n
+        self.bufpos = newpos
+
+    def get_position(self):
+        return self.bufpos
+
+    def get_buffer(self):
+        return self.bufstr
+
     def get1(self):
         pos = self.bufpos
         if pos >= self.limit:
-            self.raise_eof()
+            self.fill(1)
+            pos = self.bufpos
         self.bufpos = pos + 1
         return self.bufstr[pos]
 
@@ -488,7 +487,9 @@ class StringUnmarshaller(Unmarshaller):
         pos = self.bufpos
         newpos = pos + 4
         if newpos > self.limit:
-            self.raise_eof()
+            self.fill(4)
+            pos = self.bufpos
+            newpos = pos + 4
         self.bufpos = newpos
         a = ord(self.bufstr[pos])
         b = ord(self.bufstr[pos+1])
@@ -503,7 +504,9 @@ class StringUnmarshaller(Unmarshaller):
         pos = self.bufpos
         newpos = pos + 4
         if newpos > self.limit:
-            self.raise_eof()
+            self.fill(4)
+            pos = self.bufpos
+            newpos = pos + 4
         self.bufpos = newpos
         a = ord(self.bufstr[pos])
         b = ord(self.bufstr[pos+1])
@@ -514,3 +517,67 @@ class StringUnmarshaller(Unmarshaller):
             return x
         else:
             self.raise_exc('bad marshal data')
+
+
+class StreamUnmarshaller(StringUnmarshaller):
+    """Unmarshaller for real files.  It decodes directly from the data
+    already buffered by the stream, and only consumes from the stream
+    what it has decoded, so that the file is left just after the object.
+    """
+
+    def __init__(self, space, w_file):
+        Unmarshaller.__init__(self, space, None)
+        self.file = w_file
+        self.bufstr = ''
+        self.bufpos = 0
+        self.limit = 0
+        self.peeked = False   # True if bufstr was not consumed yet
+        self.peekstart = 0
+        w_file.lock()
+
+    def _consume(self):
+        if self.peeked:
+            consumed = self.bufpos - self.peekstart
+            if consumed > 0:
+                self.file.getstream().read(consumed)
+            self.peeked = False
+        self.bufstr = ''
+        self.bufpos = 0
+        self.limit = 0
+
+    def fill(self, n):
+        self._consume()
+        pos, buf = self.file.getstream().peek()
+        if len(buf) - pos >= n:
+            self.bufstr = buf
+            self.bufpos = pos
+            self.limit = len(buf)
+            self.peeked = True
+            self.peekstart = pos
+        else:
+            data = self.file.direct_read(n)
+            if len(data) < n:
+                self.raise_eof()
+            self.bufstr = data
+            self.limit = n
+
+    def finished(self):
+        try:
+            self._consume()
+        finally:
+            self.file.unlock()
+
+
+class CodeUnmarshaller(StringUnmarshaller):
+    """Unmarshaller for the content of .pyc files, which can leave the
+    nested code objects marshalled until they are needed."""
+
+    def __init__(self, space, bufstr, pos=0, stringtable_w=None,
+                 lazy_code=False):
+        Unmarshaller.__init__(self, space, None)
+        self.bufstr = bufstr
+        self.bufpos = pos
+        self.limit = len(bufstr)
+        if stringtable_w is not None:
+            self.stringtable_w = stringtable_w
+        self.lazy_code = lazy_code
@@ -168,6 +168,43 @@ class AppTestMarshal:
         assert obj2b == obj2
         assert tail == 'END'
 
+    def test_stream_reader_big(self):
+        # objects bigger than the buffer of the file, or spanning
+        # several buffers
+        import marshal
+        objs = [range(5000), "x" * 100000, [str(i) for i in range(3000)],
+                ("end", 1.5)]
+        f = open(self.tmpfile, 'wb')
+        for obj in objs:
+            marshal.dump(obj, f)
+        f.write('END')
+        f.close()
+        f = open(self.tmpfile, 'rb')
+        for obj in objs:
+            assert marshal.load(f) == obj
+        assert f.read() == 'END'
+        f.close()
+        f = open(self.tmpfile, 'rb')
+        f.seek(-2, 2)
+        assert marshal.load(f) is None      # 'N'
+        assert f.read() == 'D'
+        raises(EOFError, marshal.load, f)
+        f.close()
+
+    def test_dump_single_write(self):
+        import marshal
+        class FileLike(object):
+            def __init__(self):
+                self.writes = []
+            def write(self, data):
+                self.writes.append(data)
+        f = FileLike()
+        obj = {"a": [1, 2.5, ("b", u"c")], "d": None}
+        marshal.dump(obj, f)
+        assert len(f.writes) == 1
+        assert marshal.loads(f.writes[0]) == obj
+        raises(TypeError, marshal.dump, obj, object())
+
     def test_unicode(self):
         import marshal, sys
         self.marshal_check(u'\uFFFF')
@@ -61,6 +61,10 @@ class __extend__(PyFrame):
                     frame=self, next_instr=next_instr, pycode=pycode,
                     is_being_profiled=is_being_profiled)
                 co_code = pycode.co_code
+                if (self.space.config.objspace.std.withquickening and
+                        not we_are_jitted()):
+                    # the JIT only sees the original bytecode
+                    co_code = pycode.get_quickened_code()
                 self.valuestackdepth = hint(self.valuestackdepth, promote=True)
                 next_instr = self.handle_bytecode(co_code, next_instr, ec)
                 is_being_profiled = self.is_being_profiled
@@ -139,7 +139,10 @@ def report_signal(space, n):
     pypysig_reinstall(n)
     # invoke the app-level handler
     ec = space.getexecutioncontext()
-    w_frame = space.wrap(ec.gettopframe_nohidden())
+    frame = ec.gettopframe_nohidden()
+    if frame is not None:
+        frame.mark_as_escaped()
+    w_frame = space.wrap(frame)
     space.call_function(w_handler, space.wrap(n), w_frame)
 
 
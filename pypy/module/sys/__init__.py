@@ -7,7 +7,7 @@ _WIN = sys.platform == 'win32'
 
 class Module(MixedModule):
     """Sys Builtin Module. """
-    _immutable_fields_ = ["defaultencoding?", "debug?"]
+    _immutable_fields_ = ["defaultencoding?", "debug?", "optimize?"]
 
     def __init__(self, space, w_name):
         """NOT_RPYTHON""" # because parent __init__ isn't
@@ -19,6 +19,7 @@ class Module(MixedModule):
         self.defaultencoding = "ascii"
         self.filesystemencoding = None
         self.debug = True
+        self.optimize = 0
 
     interpleveldefs = {
         '__name__'              : '(space.wrap("sys"))',
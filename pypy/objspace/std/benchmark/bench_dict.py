@@ -45,8 +45,39 @@ def bench_simple_dict(SIZE = 10000):
     count_operation("Existing key access", lambda : rand_keys(lookup_keys))
     return test_d
 
+def bench_bulk_dict(SIZE = 100000):
+    keys = [get_random_string(20) for i in xrange(SIZE)]
+    values = [random.random() for i in xrange(SIZE)]
+    int_keys = range(SIZE)
+    pairs = zip(keys, values)
+    small_d = dict(zip(keys[:100], values[:100]))
+
+    test_d = count_operation("Creation from pairs", lambda : dict(pairs))
+    count_operation("Creation from int pairs",
+                    lambda : dict(zip(int_keys, values)))
+    try:
+        from __pypy__ import dict_from_lists
+    except ImportError:
+        pass
+    else:
+        count_operation("Creation from two lists",
+                        lambda : dict_from_lists(keys, values))
+    count_operation("Copy", lambda : test_d.copy())
+    count_operation("Copy via dict()", lambda : dict(test_d))
+
+    def merge(d1, d2):
+        d = d1.copy()
+        d.update(d2)
+        return d
+
+    count_operation("Merge into a big dict", lambda : merge(test_d, small_d))
+    count_operation("Merge a big dict", lambda : merge(small_d, test_d))
+    count_operation("Update with kwargs", lambda : dict(small_d, a=1, b=2))
+    return test_d
+
 if __name__ == '__main__':
     test_d = bench_simple_dict()
+    bench_bulk_dict()
     import __pypy__
     print __pypy__.internal_repr(test_d)
     print __pypy__.internal_repr(test_d.iterkeys())
@@ -0,0 +1,51 @@
+
+""" marshal.dumps()/loads() and dump()/load() throughput
+"""
+
+import marshal, os, random, tempfile, time
+
+def count_operation(name, function, repeat=1):
+    t0 = time.time()
+    for i in xrange(repeat):
+        retval = function()
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    return retval
+
+def make_data(SIZE):
+    return {
+        'ints': range(SIZE),
+        'floats': [random.random() for i in xrange(SIZE)],
+        'strings': [str(i) * 3 for i in xrange(SIZE)],
+        'tuples': [(i, str(i), None) for i in xrange(SIZE)],
+        'dicts': [{'a': i, 'b': [i]} for i in xrange(SIZE // 10)],
+    }
+
+def make_code():
+    # the code of a big module
+    import inspect
+    source = inspect.getsource(inspect)
+    return compile(source * 4, 'big_module.py', 'exec')
+
+def bench_marshal(SIZE=100000, REPEAT=10):
+    for name, obj in [('data', make_data(SIZE)), ('code', make_code())]:
+        s = count_operation("dumps %s" % name,
+                            lambda: marshal.dumps(obj), REPEAT)
+        print '  %d bytes' % len(s)
+        count_operation("loads %s" % name, lambda: marshal.loads(s), REPEAT)
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            def dump():
+                with open(filename, 'wb') as f:
+                    marshal.dump(obj, f)
+            def load():
+                with open(filename, 'rb') as f:
+                    return marshal.load(f)
+            count_operation("dump %s" % name, dump, REPEAT)
+            count_operation("load %s" % name, load, REPEAT)
+        finally:
+            os.unlink(filename)
+
+if __name__ == '__main__':
+    bench_marshal()
@@ -593,6 +593,10 @@ class W_BytesObject(W_AbstractBytesObject):
             from pypy.objspace.std.strbufobject import W_StringBufferObject
             if isinstance(w_other, W_StringBufferObject):
                 return space.newbool(self._value == w_other.force())
+        if space.config.objspace.std.withrope:
+            from pypy.objspace.std.ropeobject import W_RopeBytesObject
+            if isinstance(w_other, W_RopeBytesObject):
+                return space.newbool(self._value == w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value == w_other._value)
@@ -602,6 +606,10 @@ class W_BytesObject(W_AbstractBytesObject):
             from pypy.objspace.std.strbufobject import W_StringBufferObject
             if isinstance(w_other, W_StringBufferObject):
                 return space.newbool(self._value != w_other.force())
+        if space.config.objspace.std.withrope:
+            from pypy.objspace.std.ropeobject import W_RopeBytesObject
+            if isinstance(w_other, W_RopeBytesObject):
+                return space.newbool(self._value != w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value != w_other._value)
@@ -611,6 +619,10 @@ class W_BytesObject(W_AbstractBytesObject):
             from pypy.objspace.std.strbufobject import W_StringBufferObject
             if isinstance(w_other, W_StringBufferObject):
                 return space.newbool(self._value < w_other.force())
+        if space.config.objspace.std.withrope:
+            from pypy.objspace.std.ropeobject import W_RopeBytesObject
+            if isinstance(w_other, W_RopeBytesObject):
+                return space.newbool(self._value < w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value < w_other._value)
@@ -620,6 +632,10 @@ class W_BytesObject(W_AbstractBytesObject):
             from pypy.objspace.std.strbufobject import W_StringBufferObject
             if isinstance(w_other, W_StringBufferObject):
                 return space.newbool(self._value <= w_other.force())
+        if space.config.objspace.std.withrope:
+            from pypy.objspace.std.ropeobject import W_RopeBytesObject
+            if isinstance(w_other, W_RopeBytesObject):
+                return space.newbool(self._value <= w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value <= w_other._value)
@@ -629,6 +645,10 @@ class W_BytesObject(W_AbstractBytesObject):
             from pypy.objspace.std.strbufobject import W_StringBufferObject
             if isinstance(w_other, W_StringBufferObject):
                 return space.newbool(self._value > w_other.force())
+        if space.config.objspace.std.withrope:
+            from pypy.objspace.std.ropeobject import W_RopeBytesObject
+            if isinstance(w_other, W_RopeBytesObject):
+                return space.newbool(self._value > w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value > w_other._value)
@@ -638,6 +658,10 @@ class W_BytesObject(W_AbstractBytesObject):
             from pypy.objspace.std.strbufobject import W_StringBufferObject
             if isinstance(w_other, W_StringBufferObject):
                 return space.newbool(self._value >= w_other.force())
+        if space.config.objspace.std.withrope:
+            from pypy.objspace.std.ropeobject import W_RopeBytesObject
+            if isinstance(w_other, W_RopeBytesObject):
+                return space.newbool(self._value >= w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value >= w_other._value)
@@ -667,6 +691,9 @@ class W_BytesObject(W_AbstractBytesObject):
             builder.append(self._value)
             builder.append(other)
             return W_StringBufferObject(builder)
+        if space.config.objspace.std.withrope:
+            from pypy.objspace.std.ropeobject import bytes_add
+            return bytes_add(space, self, w_other)
         return self._StringMethods_descr_add(space, w_other)
 
     _StringMethods__startswith = _startswith
@@ -692,12 +719,10 @@ class W_BytesObject(W_AbstractBytesObject):
     _StringMethods_descr_contains = descr_contains
     def descr_contains(self, space, w_sub):
         if space.isinstance_w(w_sub, space.w_unicode):
-            from pypy.objspace.std.unicodeobject import W_UnicodeObject
-            assert isinstance(w_sub, W_UnicodeObject)
             self_as_unicode = unicode_from_encoded_object(space, self, None,
                                                           None)
             return space.newbool(
-                self_as_unicode._value.find(w_sub._value) >= 0)
+                self_as_unicode._value.find(space.unicode_w(w_sub)) >= 0)
         return self._StringMethods_descr_contains(space, w_sub)
 
     _StringMethods_descr_replace = descr_replace
@@ -720,12 +720,12 @@ def create_iterator_classes(dictimpl, override_next_item=None):
         wrapvalue = lambda space, value: value
     else:
         wrapvalue = dictimpl.wrapvalue.im_func
-    if not hasattr(dictimpl, 'setitem_untyped'):
-        setitem_untyped = None
+    if not hasattr(dictimpl, 'update_untyped'):
+        update_untyped = None
     else:
-        setitem_untyped = dictimpl.setitem_untyped.im_func
-        setitem_untyped = func_with_new_name(setitem_untyped,
-            'setitem_untyped_%s' % dictimpl.__name__)
+        update_untyped = dictimpl.update_untyped.im_func
+        update_untyped = func_with_new_name(update_untyped,
+            'update_untyped_%s' % dictimpl.__name__)
 
     class IterClassKeys(BaseKeyIterator):
         def __init__(self, space, strategy, impl):
@@ -811,9 +811,16 @@ def create_iterator_classes(dictimpl, override_next_item=None):
                     return
                 w_updatedict.setitem(w_key, w_value)
         else:
-            iteritems = self.getiteritems(w_dict)
-            if not same_strategy(self, w_updatedict):
+            if (update_untyped is not None and
+                    w_updatedict.strategy is
+                        self.space.fromcache(EmptyDictStrategy)):
+                # Copying into an empty dict, e.g. for copy(): it gets
+                # the same strategy as w_dict.
+                w_updatedict.strategy = self
+                w_updatedict.dstorage = self.get_empty_storage()
+            elif not same_strategy(self, w_updatedict):
                 # Different strategy.  Try to copy one item of w_dict
+                iteritems = self.getiteritems(w_dict)
                 for key, value in iteritems:
                     w_key = wrapkey(self.space, key)
                     w_value = wrapvalue(self.space, value)
@@ -830,19 +837,16 @@ def create_iterator_classes(dictimpl, override_next_item=None):
                         w_value = wrapvalue(self.space, value)
                         w_updatedict.setitem(w_key, w_value)
                     return     # done
-            else:
-                # Same strategy.
-                self.prepare_update(w_updatedict, w_dict.length())
             #
-            # Use setitem_untyped() to speed up copying without
-            # wrapping/unwrapping the key.
-            assert setitem_untyped is not None
-            dstorage = w_updatedict.dstorage
-            for key, value in iteritems:
-                setitem_untyped(self, dstorage, key, value)
+            # Same strategy: use update_untyped() to copy everything at
+            # once, without wrapping/unwrapping the keys and reusing the
+            # hashes stored in w_dict.  The item that was maybe copied
+            # above is simply overwritten.
+            assert update_untyped is not None
+            update_untyped(self, w_dict.dstorage, w_updatedict.dstorage)
 
     def same_strategy(self, w_otherdict):
-        return (setitem_untyped is not None and
+        return (update_untyped is not None and
                 w_otherdict.strategy is self)
 
     dictimpl.iterkeys = iterkeys
@@ -973,8 +977,10 @@ class AbstractTypedStrategy(object):
         objectmodel.prepare_dict_update(self.unerase(w_dict.dstorage),
                                         num_extra)
 
-    def setitem_untyped(self, dstorage, key, w_value):
-        self.unerase(dstorage)[key] = w_value
+    def update_untyped(self, dstorage, updatedstorage):
+        # the RPython dict.update() presizes the dict and reuses the
+        # hashes of 'dstorage'
+        self.unerase(updatedstorage).update(self.unerase(dstorage))
 
 
 class ObjectDictStrategy(AbstractTypedStrategy, DictStrategy):
@@ -1199,12 +1205,65 @@ def update1_dict_dict(space, w_dict, w_data):
 
 
 def update1_pairs(space, w_dict, data_w):
-    for w_pair in data_w:
-        pair = space.fixedview(w_pair)
+    for i in range(len(data_w)):
+        pair = space.fixedview(data_w[i])
         if len(pair) != 2:
             raise oefmt(space.w_ValueError, "sequence of pairs expected")
         w_key, w_value = pair
         w_dict.setitem(w_key, w_value)
+        if i == 0:
+            # after the first setitem(), which picks the strategy
+            w_dict.strategy.prepare_update(w_dict, len(data_w) - 1)
+
+
+def update1_lists(space, w_dict, w_keys, w_values):
+    """Like update1_pairs() with the pairs of zip(keys, values), but
+    without building them.  The two sequences must have the same length."""
+    values_w = space.listview(w_values)
+    if w_dict.strategy is space.fromcache(EmptyDictStrategy):
+        # directly build the storage of a dict with string or int keys
+        byteslist = space.listview_bytes(w_keys)
+        if byteslist is not None:
+            _check_same_length(space, len(byteslist), len(values_w))
+            strategy = space.fromcache(BytesDictStrategy)
+            _fill_empty_dict(w_dict, strategy, byteslist, values_w)
+            return
+        intlist = space.listview_int(w_keys)
+        if intlist is not None:
+            _check_same_length(space, len(intlist), len(values_w))
+            strategy = space.fromcache(IntDictStrategy)
+            _fill_empty_dict(w_dict, strategy, intlist, values_w)
+            return
+    keys_w = space.listview(w_keys)
+    _check_same_length(space, len(keys_w), len(values_w))
+    for i in range(len(keys_w)):
+        w_dict.setitem(keys_w[i], values_w[i])
+        if i == 0:
+            w_dict.strategy.prepare_update(w_dict, len(keys_w) - 1)
+
+def _check_same_length(space, len_keys, len_values):
+    if len_keys != len_values:
+        raise oefmt(space.w_ValueError,
+                    "keys and values must have the same length")
+
+def newdict_from_unicode_keys(space, keys, values_w):
+    """Make a dict mapping the unwrapped unicode strings 'keys' to
+    'values_w', building a presized storage directly."""
+    w_dict = W_DictMultiObject.allocate_and_init_instance(space)
+    if keys:
+        strategy = space.fromcache(UnicodeDictStrategy)
+        _fill_empty_dict(w_dict, strategy, keys, values_w)
+    return w_dict
+
+@specialize.argtype(1)
+def _fill_empty_dict(w_dict, strategy, keys, values_w):
+    storage = strategy.get_empty_storage()
+    d = strategy.unerase(storage)
+    objectmodel.prepare_dict_update(d, len(keys))
+    for i in range(len(keys)):
+        d[keys[i]] = values_w[i]
+    w_dict.strategy = strategy
+    w_dict.dstorage = storage
 
 
 def update1_keys(space, w_dict, w_data, data_w):
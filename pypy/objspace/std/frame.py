@@ -74,6 +74,33 @@ def list_BINARY_SUBSCR(self, oparg, next_instr):
     self.pushvalue(w_result)
 
 
+def int_LOAD_CONST_COMPARE_OP(self, constindex, testnum, next_instr):
+    # the superinstruction for 'x < 10' and similar, special-cased
+    # for comparing two integers
+    w_2 = self.getconstant_w(constindex)
+    w_1 = self.peekvalue()
+    if (type(w_1) is W_IntObject and type(w_2) is W_IntObject and
+            testnum <= 5):
+        i = w_1.intval
+        j = w_2.intval
+        if testnum == 0:
+            result = i < j
+        elif testnum == 1:
+            result = i <= j
+        elif testnum == 2:
+            result = i == j
+        elif testnum == 3:
+            result = i != j
+        elif testnum == 4:
+            result = i > j
+        else:
+            result = i >= j
+        self.settopvalue(self.space.newbool(result))
+    else:
+        self.pushvalue(w_2)
+        self.COMPARE_OP(testnum, next_instr)
+
+
 def build_frame(space):
     """Consider the objspace config and return a patched frame object."""
     class StdObjSpaceFrame(BaseFrame):
@@ -85,6 +112,8 @@ def build_frame(space):
         StdObjSpaceFrame.INPLACE_SUBTRACT = int_INPLACE_SUBTRACT
     if space.config.objspace.std.optimized_list_getitem:
         StdObjSpaceFrame.BINARY_SUBSCR = list_BINARY_SUBSCR
+    if space.config.objspace.std.withquickening:
+        StdObjSpaceFrame.LOAD_CONST_COMPARE_OP = int_LOAD_CONST_COMPARE_OP
     from pypy.objspace.std.callmethod import LOOKUP_METHOD, CALL_METHOD
     StdObjSpaceFrame.LOOKUP_METHOD = LOOKUP_METHOD
     StdObjSpaceFrame.CALL_METHOD = CALL_METHOD
@@ -182,6 +182,12 @@ class W_ListObject(W_Root):
         storage = strategy.erase(list_i)
         return W_ListObject.from_storage_and_strategy(space, storage, strategy)
 
+    @staticmethod
+    def newlist_float(space, list_f):
+        strategy = space.fromcache(FloatListStrategy)
+        storage = strategy.erase(list_f)
+        return W_ListObject.from_storage_and_strategy(space, storage, strategy)
+
     def __repr__(self):
         """ representation for debugging purposes """
         return "%s(%s, %s)" % (self.__class__.__name__, self.strategy,
@@ -677,24 +683,35 @@ class W_ListObject(W_Root):
             # core-dump factory, since the storage may change).
             self.__init__(space, [])
 
-            # wrap each item in a KeyContainer if needed
+            sorted_by_keys = False
             if has_key:
+                keys_w = [None] * sorter.listlength
                 for i in range(sorter.listlength):
-                    w_item = sorter.list[i]
-                    w_keyitem = space.call_function(w_key, w_item)
-                    sorter.list[i] = KeyContainer(w_keyitem, w_item)
-
-            # Reverse sort stability achieved by initially reversing the list,
-            # applying a stable forward sort, then reversing the final result.
-            if reverse:
-                sorter.list.reverse()
-
-            # perform the sort
-            sorter.sort()
-
-            # reverse again
-            if reverse:
-                sorter.list.reverse()
+                    keys_w[i] = space.call_function(w_key, sorter.list[i])
+                if not has_cmp:
+                    # if the keys are all ints, floats, strs or unicodes,
+                    # sort them unboxed without any KeyContainer
+                    sorted_by_keys = sort_by_unboxed_keys(
+                        space, sorter.list, keys_w, reverse)
+                if not sorted_by_keys:
+                    # wrap each item in a KeyContainer
+                    for i in range(sorter.listlength):
+                        sorter.list[i] = KeyContainer(keys_w[i],
+                                                      sorter.list[i])
+
+            if not sorted_by_keys:
+                # Reverse sort stability achieved by initially reversing the
+                # list, applying a stable forward sort, then reversing the
+                # final result.
+                if reverse:
+                    sorter.list.reverse()
+
+                # perform the sort
+                sorter.sort()
+
+                # reverse again
+                if reverse:
+                    sorter.list.reverse()
 
         finally:
             # unwrap each item if needed
@@ -1768,6 +1785,7 @@ IntBaseTimSort = make_timsort_class()
 FloatBaseTimSort = make_timsort_class()
 StringBaseTimSort = make_timsort_class()
 UnicodeBaseTimSort = make_timsort_class()
+KeyIndexBaseTimSort = make_timsort_class()
 
 
 class KeyContainer(W_Root):
@@ -1836,6 +1854,74 @@ class CustomKeyCompareSort(CustomCompareSort):
         return CustomCompareSort.lt(self, a.w_key, b.w_key)
 
 
+# Sorting with key=... when all the keys are of the same primitive type:
+# a list of indices is sorted by the unboxed keys they refer to, and the
+# items are then permuted accordingly.
+
+class KeyIndexSort(KeyIndexBaseTimSort):
+    def lt(self, a, b):
+        raise NotImplementedError("abstract base class")
+
+
+class IntKeyIndexSort(KeyIndexSort):
+    def lt(self, a, b):
+        return self.int_keys[a] < self.int_keys[b]
+
+
+class FloatKeyIndexSort(KeyIndexSort):
+    def lt(self, a, b):
+        return self.float_keys[a] < self.float_keys[b]
+
+
+class StringKeyIndexSort(KeyIndexSort):
+    def lt(self, a, b):
+        return self.str_keys[a] < self.str_keys[b]
+
+
+class UnicodeKeyIndexSort(KeyIndexSort):
+    def lt(self, a, b):
+        return self.unicode_keys[a] < self.unicode_keys[b]
+
+
+def sort_by_unboxed_keys(space, items_w, keys_w, reverse):
+    """Sort 'items_w' in place according to 'keys_w', if the keys can all
+    be stored unboxed by a list strategy.  Returns False if they cannot."""
+    length = len(items_w)
+    if length < 2 or not space.config.objspace.std.withliststrategies:
+        return False
+    w_keys = W_ListObject(space, keys_w)
+    int_keys = w_keys.getitems_int()
+    if int_keys is not None:
+        sorter = IntKeyIndexSort(range(length), length)
+        sorter.int_keys = int_keys
+    else:
+        float_keys = w_keys.getitems_float()
+        if float_keys is not None:
+            sorter = FloatKeyIndexSort(range(length), length)
+            sorter.float_keys = float_keys
+        else:
+            str_keys = w_keys.getitems_bytes()
+            if str_keys is not None:
+                sorter = StringKeyIndexSort(range(length), length)
+                sorter.str_keys = str_keys
+            else:
+                unicode_keys = w_keys.getitems_unicode()
+                if unicode_keys is None:
+                    return False
+                sorter = UnicodeKeyIndexSort(range(length), length)
+                sorter.unicode_keys = unicode_keys
+    # same trick as in descr_sort() for a stable reverse sort
+    if reverse:
+        sorter.list.reverse()
+    sorter.sort()
+    if reverse:
+        sorter.list.reverse()
+    sorted_w = [items_w[i] for i in sorter.list]
+    for i in range(length):
+        items_w[i] = sorted_w[i]
+    return True
+
+
 W_ListObject.typedef = TypeDef("list",
     __doc__ = """list() -> new empty list
 list(iterable) -> new list initialized from iterable's items""",
@@ -1,13 +1,16 @@
 import weakref
 
 from rpython.rlib import jit, objectmodel, debug, rerased
-from rpython.rlib.rarithmetic import intmask, r_uint
+from rpython.rlib.longlong2float import float2longlong, longlong2float
+from rpython.rlib.rarithmetic import intmask, r_uint, r_longlong
 
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.objspace.std.dictmultiobject import (
     W_DictMultiObject, DictStrategy, ObjectDictStrategy, BaseKeyIterator,
     BaseValueIterator, BaseItemIterator, _never_equal_to_string
 )
+from pypy.objspace.std.floatobject import W_FloatObject
+from pypy.objspace.std.intobject import W_IntObject
 from pypy.objspace.std.typeobject import MutableCell
 
 
@@ -19,15 +22,31 @@ NUM_DIGITS_POW2 = 1 << NUM_DIGITS
 # note: we use "x * NUM_DIGITS_POW2" instead of "x << NUM_DIGITS" because
 # we want to propagate knowledge that the result cannot be negative
 
+# the kinds of values an attribute can store; only KIND_OBJECT attributes
+# are boxed, see UnboxedPlainAttribute
+KIND_OBJECT = 0
+KIND_INT = 1
+KIND_FLOAT = 2
+
+class NewAttrVersion(object):
+    pass
+
 class AbstractAttribute(object):
-    _immutable_fields_ = ['terminator']
+    _immutable_fields_ = ['terminator', 'new_attr_version?']
     cache_attrs = None
     _size_estimate = 0
+    # the storage index of the _UnboxedValues of the instances, if any
+    # attribute of the map is unboxed, and the number of unboxed attributes
+    _unboxed_storageindex = -1
+    _unboxed_length = 0
 
     def __init__(self, space, terminator):
         self.space = space
         assert isinstance(terminator, Terminator)
         self.terminator = terminator
+        # replaced when a transition is deoptimized, which invalidates
+        # the traces that constant-folded _get_new_attr()
+        self.new_attr_version = NewAttrVersion()
 
     def read(self, obj, selector):
         attr = self.find_map_attr(selector)
@@ -36,11 +55,12 @@ class AbstractAttribute(object):
         if (
             jit.isconstant(attr.storageindex) and
             jit.isconstant(obj) and
-            not attr.ever_mutated
+            not attr.ever_mutated and
+            attr.kind == KIND_OBJECT
         ):
             return self._pure_mapdict_read_storage(obj, attr.storageindex)
         else:
-            return obj._mapdict_read_storage(attr.storageindex)
+            return attr._direct_read(obj)
 
     @jit.elidable
     def _pure_mapdict_read_storage(self, obj, storageindex):
@@ -52,7 +72,7 @@ class AbstractAttribute(object):
             return self.terminator._write_terminator(obj, selector, w_value)
         if not attr.ever_mutated:
             attr.ever_mutated = True
-        obj._mapdict_write_storage(attr.storageindex, w_value)
+        attr._direct_write(obj, w_value)
         return True
 
     def delete(self, obj, selector):
@@ -90,19 +110,23 @@ class AbstractAttribute(object):
         product = intmask(attrs_as_int * hash_selector)
         attr_hash = (r_uint(product) ^ (r_uint(product) << SHIFT1)) >> SHIFT2
         # ^^^Note2: same comment too
-        cached_attr = cache.attrs[attr_hash]
-        if cached_attr is self:
-            cached_selector = cache.selectors[attr_hash]
-            if cached_selector == selector:
-                attr = cache.cached_attrs[attr_hash]
+        # the cache is 2-way set associative, like the method cache
+        index = intmask(attr_hash & ~r_uint(1))
+        for way in range(2):
+            i = index + way
+            if cache.attrs[i] is self and cache.selectors[i] == selector:
+                attr = cache.cached_attrs[i]
+                if way:
+                    cache.move_to_front(index)
                 if space.config.objspace.std.withmethodcachecounter:
                     name = selector[0]
                     cache.hits[name] = cache.hits.get(name, 0) + 1
                 return attr
         attr = self._find_map_attr(selector)
-        cache.attrs[attr_hash] = self
-        cache.selectors[attr_hash] = selector
-        cache.cached_attrs[attr_hash] = attr
+        cache.move_to_front(index)
+        cache.attrs[index] = self
+        cache.selectors[index] = selector
+        cache.cached_attrs[index] = attr
         if space.config.objspace.std.withmethodcachecounter:
             name = selector[0]
             cache.misses[name] = cache.misses.get(name, 0) + 1
@@ -118,6 +142,9 @@ class AbstractAttribute(object):
     def copy(self, obj):
         raise NotImplementedError("abstract base class")
 
+    def _replace_value(self, obj, selector, w_value):
+        raise NotImplementedError("abstract base class")
+
     def length(self):
         raise NotImplementedError("abstract base class")
 
@@ -135,15 +162,32 @@ class AbstractAttribute(object):
         return None
 
     @jit.elidable
-    def _get_new_attr(self, name, index):
+    def _get_new_attr(self, name, index, kind, version):
+        # 'version' is self.new_attr_version, only there to make the
+        # result depend on it
         selector = name, index
         cache = self.cache_attrs
         if cache is None:
             cache = self.cache_attrs = {}
         attr = cache.get(selector, None)
         if attr is None:
-            attr = PlainAttribute(selector, self)
+            if kind == KIND_OBJECT:
+                attr = PlainAttribute(selector, self)
+            else:
+                attr = UnboxedPlainAttribute(selector, self, kind)
             cache[selector] = attr
+        elif attr.kind != KIND_OBJECT and attr.kind != kind:
+            attr = self._deoptimize_new_attr(selector)
+        return attr
+
+    def _deoptimize_new_attr(self, selector):
+        # a value of another type was stored into an unboxed attribute:
+        # from now on, adding this attribute gives a boxed one
+        attr = self.cache_attrs[selector]
+        if attr.kind != KIND_OBJECT:
+            attr = PlainAttribute(selector, self)
+            self.cache_attrs[selector] = attr
+            self.new_attr_version = NewAttrVersion()
         return attr
 
     @jit.look_inside_iff(lambda self, obj, selector, w_value:
@@ -152,7 +196,12 @@ class AbstractAttribute(object):
             jit.isconstant(selector[1]))
     def add_attr(self, obj, selector, w_value):
         # grumble, jit needs this
-        attr = self._get_new_attr(selector[0], selector[1])
+        kind = KIND_OBJECT
+        if (self.space.config.objspace.std.withunboxedattrs and
+                selector[1] != SPECIAL):
+            kind = _value_kind(w_value)
+        attr = self._get_new_attr(selector[0], selector[1], kind,
+                                  self.new_attr_version)
         oldattr = obj._get_mapdict_map()
         if not jit.we_are_jitted():
             size_est = (oldattr._size_estimate + attr.size_estimate()
@@ -169,7 +218,7 @@ class AbstractAttribute(object):
         # the order is important here: first change the map, then the storage,
         # for the benefit of the special subclasses
         obj._set_mapdict_map(attr)
-        obj._mapdict_write_storage(attr.storageindex, w_value)
+        attr._write_new(obj, w_value)
 
     def materialize_r_dict(self, space, obj, dict_w):
         raise NotImplementedError("abstract base class")
@@ -275,20 +324,43 @@ class DevolvedDictTerminator(Terminator):
         return Terminator.set_terminator(self, obj, terminator)
 
 class PlainAttribute(AbstractAttribute):
-    _immutable_fields_ = ['selector', 'storageindex', 'back', 'ever_mutated?']
+    _immutable_fields_ = ['selector', 'storageindex', 'back', 'ever_mutated?',
+                          'kind', 'listindex']
 
     def __init__(self, selector, back):
         AbstractAttribute.__init__(self, back.space, back.terminator)
         self.selector = selector
+        self.kind = KIND_OBJECT
+        self.listindex = -1
         self.storageindex = back.length()
         self.back = back
+        self._unboxed_storageindex = back._unboxed_storageindex
+        self._unboxed_length = back._unboxed_length
         self._size_estimate = self.length() * NUM_DIGITS_POW2
         self.ever_mutated = False
 
+    def _direct_read(self, obj):
+        return obj._mapdict_read_storage(self.storageindex)
+
+    def _direct_write(self, obj, w_value):
+        obj._mapdict_write_storage(self.storageindex, w_value)
+
+    def _write_new(self, obj, w_value):
+        obj._mapdict_write_storage(self.storageindex, w_value)
+
     def _copy_attr(self, obj, new_obj):
         w_value = self.read(obj, self.selector)
         new_obj._get_mapdict_map().add_attr(new_obj, self.selector, w_value)
 
+    def _replace_value(self, obj, selector, w_value):
+        if selector == self.selector:
+            new_obj = self.back.copy(obj)
+            new_obj._get_mapdict_map().add_attr(new_obj, selector, w_value)
+            return new_obj
+        new_obj = self.back._replace_value(obj, selector, w_value)
+        self._copy_attr(obj, new_obj)
+        return new_obj
+
     def delete(self, obj, selector):
         if selector == self.selector:
             # ok, attribute is deleted
@@ -322,7 +394,7 @@ class PlainAttribute(AbstractAttribute):
         new_obj = self.back.materialize_r_dict(space, obj, dict_w)
         if self.selector[1] == DICT:
             w_attr = space.wrap(self.selector[0])
-            dict_w[w_attr] = obj._mapdict_read_storage(self.storageindex)
+            dict_w[w_attr] = self._direct_read(obj)
         else:
             self._copy_attr(obj, new_obj)
         return new_obj
@@ -336,6 +408,96 @@ class PlainAttribute(AbstractAttribute):
     def __repr__(self):
         return "<PlainAttribute %s %s %r>" % (self.selector, self.storageindex, self.back)
 
+class UnboxedPlainAttribute(PlainAttribute):
+    """An attribute whose values are all ints or all floats.  They are
+    stored unboxed in the _UnboxedValues found in the storage of the
+    instances, which is shared by all the unboxed attributes of a map."""
+    _immutable_fields_ = ['_length']
+
+    def __init__(self, selector, back, kind):
+        if back._unboxed_storageindex >= 0:
+            self._length = back.length()
+        else:
+            self._length = back.length() + 1
+        PlainAttribute.__init__(self, selector, back)
+        self.kind = kind
+        if back._unboxed_storageindex >= 0:
+            self.storageindex = back._unboxed_storageindex
+        else:
+            self._unboxed_storageindex = self.storageindex
+        self.listindex = back._unboxed_length
+        self._unboxed_length = self.listindex + 1
+
+    def length(self):
+        return self._length
+
+    def _direct_read(self, obj):
+        unboxed = _get_unboxed_values(obj, self.storageindex)
+        return _box(self.space, self.kind, unboxed.values[self.listindex])
+
+    def _direct_write(self, obj, w_value):
+        if _value_kind(w_value) == self.kind:
+            unboxed = _get_unboxed_values(obj, self.storageindex)
+            unboxed.values[self.listindex] = _unbox(self.kind, w_value)
+        else:
+            self._switch_to_boxed(obj, w_value)
+
+    def _write_new(self, obj, w_value):
+        if self.listindex == 0:
+            unboxed = _UnboxedValues()
+            obj._mapdict_write_storage(self.storageindex, unboxed)
+        else:
+            unboxed = _get_unboxed_values(obj, self.storageindex)
+        unboxed.append(self.listindex, _unbox(self.kind, w_value))
+
+    @jit.dont_look_inside
+    def _switch_to_boxed(self, obj, w_value):
+        self.back._deoptimize_new_attr(self.selector)
+        map = obj._get_mapdict_map()
+        new_obj = map._replace_value(obj, self.selector, w_value)
+        _become(obj, new_obj)
+
+    def __repr__(self):
+        return "<UnboxedPlainAttribute %s %s %s %s %r>" % (
+            self.selector, self.kind, self.storageindex, self.listindex,
+            self.back)
+
+def _value_kind(w_value):
+    if w_value is not None:
+        if type(w_value) is W_IntObject:
+            return KIND_INT
+        if type(w_value) is W_FloatObject:
+            return KIND_FLOAT
+    return KIND_OBJECT
+
+def _unbox(kind, w_value):
+    if kind == KIND_INT:
+        assert isinstance(w_value, W_IntObject)
+        return r_longlong(w_value.intval)
+    else:
+        assert isinstance(w_value, W_FloatObject)
+        return float2longlong(w_value.floatval)
+
+def _box(space, kind, value):
+    if kind == KIND_INT:
+        return space.newint(intmask(value))
+    else:
+        return space.newfloat(longlong2float(value))
+
+def _get_unboxed_values(obj, storageindex):
+    unboxed = obj._mapdict_read_storage(storageindex)
+    assert isinstance(unboxed, _UnboxedValues)
+    return unboxed
+
+class _UnboxedValues(W_Root):
+    """The values of the unboxed attributes of an instance, as longlongs"""
+    def __init__(self):
+        self.values = []
+
+    def append(self, listindex, value):
+        assert listindex == len(self.values)
+        self.values.append(value)
+
 def _become(w_obj, new_obj):
     # this is like the _become method, really, but we cannot use that due to
     # RPython reasons
@@ -353,6 +515,15 @@ class MapAttrCache(object):
             self.hits = {}
             self.misses = {}
 
+    def move_to_front(self, index):
+        # swap the two entries of the set starting at 'index'
+        j = index + 1
+        self.attrs[index], self.attrs[j] = self.attrs[j], self.attrs[index]
+        self.selectors[index], self.selectors[j] = (
+            self.selectors[j], self.selectors[index])
+        self.cached_attrs[index], self.cached_attrs[j] = (
+            self.cached_attrs[j], self.cached_attrs[index])
+
     def clear(self):
         for i in range(len(self.attrs)):
             self.attrs[i] = None
@@ -807,7 +978,11 @@ class MapDictIteratorItems(BaseItemIterator):
 class CacheEntry(object):
     version_tag = None
     storageindex = 0
+    kind = KIND_OBJECT
+    listindex = -1  # for unboxed attributes
     w_method = None # for callmethod
+    can_store = False # for STORE_ATTR: the class uses object.__setattr__
+    next = None     # the next, less recently used, entry for the same name
     success_counter = 0
     failure_counter = 0
 
@@ -834,37 +1009,125 @@ INVALID_CACHE_ENTRY = CacheEntry()
 INVALID_CACHE_ENTRY.map_wref = weakref.ref(_invalid_cache_entry_map)
                                  # different from any real map ^^^
 
+class InlineCacheCounter(object):
+    """Hits and misses of the per-code inline caches, by attribute name.
+    Only used with the 'withmethodcachecounter' option."""
+    def __init__(self, space):
+        assert space.config.objspace.std.withmethodcachecounter
+        self.hits = {}
+        self.misses = {}
+
+def _count_inline_cache(pycode, nameindex, hit):
+    space = pycode.space
+    counter = space.fromcache(InlineCacheCounter)
+    name = space.str_w(pycode.co_names_w[nameindex])
+    if hit:
+        counter.hits[name] = counter.hits.get(name, 0) + 1
+    else:
+        counter.misses[name] = counter.misses.get(name, 0) + 1
+
 def init_mapdict_cache(pycode):
+    # each entry is the head of a short linked list of CacheEntry objects,
+    # for up to 'mapdictcacheways' different maps seen at the same place
     num_entries = len(pycode.co_names_w)
     pycode._mapdict_caches = [INVALID_CACHE_ENTRY] * num_entries
 
-@jit.dont_look_inside
-def _fill_cache(pycode, nameindex, map, version_tag, storageindex, w_method=None):
+def _find_cache_entry(pycode, nameindex, map):
     entry = pycode._mapdict_caches[nameindex]
-    if entry is INVALID_CACHE_ENTRY:
-        entry = CacheEntry()
-        pycode._mapdict_caches[nameindex] = entry
+    if entry.is_valid_for_map(map):
+        return entry
+    return _find_cache_entry_polymorphic(pycode, nameindex, map, entry)
+_find_cache_entry._always_inline_ = True
+
+@jit.dont_look_inside
+def _find_cache_entry_polymorphic(pycode, nameindex, map, first):
+    prev = first
+    entry = first.next
+    while entry is not None:
+        if entry.is_valid_for_map(map):
+            # move it to the front of the list
+            prev.next = entry.next
+            entry.next = first
+            pycode._mapdict_caches[nameindex] = entry
+            return entry
+        prev = entry
+        entry = entry.next
+    return None
+
+@jit.dont_look_inside
+def _fill_cache(pycode, nameindex, map, version_tag, attr,
+                w_method=None, can_store=False):
+    entry = CacheEntry()
     entry.map_wref = weakref.ref(map)
     entry.version_tag = version_tag
-    entry.storageindex = storageindex
+    if attr is not None:
+        entry.storageindex = attr.storageindex
+        entry.kind = attr.kind
+        entry.listindex = attr.listindex
+    else:
+        entry.storageindex = -1
     entry.w_method = w_method
+    entry.can_store = can_store
     if pycode.space.config.objspace.std.withmethodcachecounter:
         entry.failure_counter += 1
+    # keep the other entries, dropping the ones that are for the same map
+    # or whose map died, and the least recently used ones
+    maxlength = pycode.space.config.objspace.std.mapdictcacheways
+    length = 1
+    last = entry
+    old = pycode._mapdict_caches[nameindex]
+    while old is not None and length < maxlength:
+        oldmap = old.map_wref()
+        if oldmap is not None and oldmap is not map:
+            last.next = old
+            last = old
+            length += 1
+        old = old.next
+    last.next = None
+    pycode._mapdict_caches[nameindex] = entry
+
+def _get_selector(space, name, w_descr):
+    selector = ("", INVALID)
+    if w_descr is None:
+        selector = (name, DICT) # common case: no such attr in the class
+    elif isinstance(w_descr, MutableCell):
+        pass              # we have a MutableCell in the class: give up
+    elif space.is_data_descr(w_descr):
+        # we have a data descriptor, which means the dictionary value
+        # (if any) has no relevance.
+        from pypy.interpreter.typedef import Member
+        if isinstance(w_descr, Member):    # it is a slot -- easy case
+            selector = ("slot", SLOTS_STARTING_FROM + w_descr.index)
+    else:
+        # There is a non-data descriptor in the class.  If there is
+        # also a dict attribute, use the latter, caching its storageindex.
+        # If not, we loose.  We could do better in this case too,
+        # but we don't care too much; the common case of a method
+        # invocation is handled by LOOKUP_METHOD_xxx below.
+        selector = (name, DICT)
+    return selector
 
 def LOAD_ATTR_caching(pycode, w_obj, nameindex):
     # this whole mess is to make the interpreter quite a bit faster; it's not
     # used if we_are_jitted().
-    entry = pycode._mapdict_caches[nameindex]
     map = w_obj._get_mapdict_map()
-    if entry.is_valid_for_map(map) and entry.w_method is None:
+    entry = _find_cache_entry(pycode, nameindex, map)
+    if entry is not None and entry.w_method is None:
         # everything matches, it's incredibly fast
-        return w_obj._mapdict_read_storage(entry.storageindex)
+        if pycode.space.config.objspace.std.withmethodcachecounter:
+            _count_inline_cache(pycode, nameindex, True)
+        if entry.kind == KIND_OBJECT:
+            return w_obj._mapdict_read_storage(entry.storageindex)
+        unboxed = _get_unboxed_values(w_obj, entry.storageindex)
+        return _box(pycode.space, entry.kind, unboxed.values[entry.listindex])
     return LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map)
 LOAD_ATTR_caching._always_inline_ = True
 
 def LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map):
     space = pycode.space
     w_name = pycode.co_names_w[nameindex]
+    if space.config.objspace.std.withmethodcachecounter:
+        _count_inline_cache(pycode, nameindex, False)
     if map is not None:
         w_type = map.terminator.w_cls
         w_descr = w_type.getattribute_if_not_from_object()
@@ -877,47 +1140,90 @@ def LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map):
             # a MutableCell, which may change without changing the version_tag
             _, w_descr = w_type._pure_lookup_where_possibly_with_method_cache(
                 name, version_tag)
-            #
-            selector = ("", INVALID)
-            if w_descr is None:
-                selector = (name, DICT) # common case: no such attr in the class
-            elif isinstance(w_descr, MutableCell):
-                pass              # we have a MutableCell in the class: give up
-            elif space.is_data_descr(w_descr):
-                # we have a data descriptor, which means the dictionary value
-                # (if any) has no relevance.
-                from pypy.interpreter.typedef import Member
-                if isinstance(w_descr, Member):    # it is a slot -- easy case
-                    selector = ("slot", SLOTS_STARTING_FROM + w_descr.index)
-            else:
-                # There is a non-data descriptor in the class.  If there is
-                # also a dict attribute, use the latter, caching its storageindex.
-                # If not, we loose.  We could do better in this case too,
-                # but we don't care too much; the common case of a method
-                # invocation is handled by LOOKUP_METHOD_xxx below.
-                selector = (name, DICT)
-            #
+            selector = _get_selector(space, name, w_descr)
             if selector[1] != INVALID:
                 attr = map.find_map_attr(selector)
                 if attr is not None:
                     # Note that if map.terminator is a DevolvedDictTerminator,
                     # map.find_map_attr will always return None if selector[1]==DICT.
-                    _fill_cache(pycode, nameindex, map, version_tag, attr.storageindex)
-                    return w_obj._mapdict_read_storage(attr.storageindex)
+                    _fill_cache(pycode, nameindex, map, version_tag, attr)
+                    return attr._direct_read(w_obj)
     if space.config.objspace.std.withmethodcachecounter:
         INVALID_CACHE_ENTRY.failure_counter += 1
     return space.getattr(w_obj, w_name)
 LOAD_ATTR_slowpath._dont_inline_ = True
 
+def STORE_ATTR_caching(pycode, w_obj, nameindex, w_value):
+    # only the common case of writing an attribute that the instance
+    # already has is cached; adding new attributes changes the map
+    map = w_obj._get_mapdict_map()
+    entry = _find_cache_entry(pycode, nameindex, map)
+    if entry is not None and entry.can_store:
+        if entry.kind == KIND_OBJECT:
+            if pycode.space.config.objspace.std.withmethodcachecounter:
+                _count_inline_cache(pycode, nameindex, True)
+            w_obj._mapdict_write_storage(entry.storageindex, w_value)
+            return
+        if _value_kind(w_value) == entry.kind:
+            if pycode.space.config.objspace.std.withmethodcachecounter:
+                _count_inline_cache(pycode, nameindex, True)
+            unboxed = _get_unboxed_values(w_obj, entry.storageindex)
+            unboxed.values[entry.listindex] = _unbox(entry.kind, w_value)
+            return
+        # else the attribute needs to be boxed now
+    STORE_ATTR_slowpath(pycode, w_obj, nameindex, w_value, map)
+STORE_ATTR_caching._always_inline_ = True
+
+def STORE_ATTR_slowpath(pycode, w_obj, nameindex, w_value, map):
+    space = pycode.space
+    w_name = pycode.co_names_w[nameindex]
+    if space.config.objspace.std.withmethodcachecounter:
+        _count_inline_cache(pycode, nameindex, False)
+    if map is not None:
+        w_type = map.terminator.w_cls
+        version_tag = w_type.version_tag()
+        # LOAD_ATTR_caching trusts the same entries, so they must not be
+        # filled for a class with a custom __getattribute__ either
+        if (version_tag is not None and
+                w_type.getattribute_if_not_from_object() is None and
+                _uses_object_setattr(space, w_type, version_tag)):
+            name = space.str_w(w_name)
+            _, w_descr = w_type._pure_lookup_where_possibly_with_method_cache(
+                name, version_tag)
+            selector = _get_selector(space, name, w_descr)
+            if selector[1] != INVALID:
+                attr = map.find_map_attr(selector)
+                if attr is not None:
+                    # this write sets 'attr.ever_mutated', so later writes
+                    # can go directly to the storage
+                    space.setattr(w_obj, w_name, w_value)
+                    _fill_cache(pycode, nameindex, map, version_tag, attr,
+                                can_store=True)
+                    return
+    if space.config.objspace.std.withmethodcachecounter:
+        INVALID_CACHE_ENTRY.failure_counter += 1
+    space.setattr(w_obj, w_name, w_value)
+STORE_ATTR_slowpath._dont_inline_ = True
+
+def _uses_object_setattr(space, w_type, version_tag):
+    from pypy.objspace.descroperation import object_setattr
+    _, w_setattr = w_type._pure_lookup_where_possibly_with_method_cache(
+        '__setattr__', version_tag)
+    return w_setattr is object_setattr(space)
+
 def LOOKUP_METHOD_mapdict(f, nameindex, w_obj):
     pycode = f.getcode()
-    entry = pycode._mapdict_caches[nameindex]
-    if entry.is_valid_for_obj(w_obj):
+    entry = _find_cache_entry(pycode, nameindex, w_obj._get_mapdict_map())
+    if entry is not None:
         w_method = entry.w_method
         if w_method is not None:
+            if pycode.space.config.objspace.std.withmethodcachecounter:
+                _count_inline_cache(pycode, nameindex, True)
             f.pushvalue(w_method)
             f.pushvalue(w_obj)
             return True
+    if pycode.space.config.objspace.std.withmethodcachecounter:
+        _count_inline_cache(pycode, nameindex, False)
     return False
 
 def LOOKUP_METHOD_mapdict_fill_cache_method(space, pycode, name, nameindex,
@@ -937,8 +1243,4 @@ def LOOKUP_METHOD_mapdict_fill_cache_method(space, pycode, name, nameindex,
         name, version_tag)
     if w_method is None or isinstance(w_method, MutableCell):
         return
-    _fill_cache(pycode, nameindex, map, version_tag, -1, w_method)
-
-# XXX fix me: if a function contains a loop with both LOAD_ATTR and
-# XXX LOOKUP_METHOD on the same attribute name, it keeps trashing and
-# XXX rebuilding the cache
+    _fill_cache(pycode, nameindex, map, version_tag, None, w_method)
@@ -5,10 +5,10 @@ from rpython.rlib.unroll import unrolling_iterable
 
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.special import Ellipsis
-from pypy.interpreter.pycode import PyCode
+from pypy.interpreter.pycode import PyCode, LazyPyCode
 from pypy.interpreter import unicodehelper
 from pypy.objspace.std.boolobject import W_BoolObject
-from pypy.objspace.std.bytesobject import W_BytesObject
+from pypy.objspace.std.bytesobject import W_AbstractBytesObject
 from pypy.objspace.std.complexobject import W_ComplexObject
 from pypy.objspace.std.dictmultiobject import W_DictMultiObject
 from pypy.objspace.std.intobject import W_IntObject
@@ -19,7 +19,7 @@ from pypy.objspace.std.noneobject import W_NoneObject
 from pypy.objspace.std.setobject import W_FrozensetObject, W_SetObject
 from pypy.objspace.std.tupleobject import W_AbstractTupleObject
 from pypy.objspace.std.typeobject import W_TypeObject
-from pypy.objspace.std.unicodeobject import W_UnicodeObject
+from pypy.objspace.std.unicodeobject import W_AbstractUnicodeObject
 
 
 TYPE_NULL      = '0'
@@ -244,7 +244,7 @@ def unmarshal_complex_bin(space, u, tc):
     return space.newcomplex(real, imag)
 
 
-@marshaller(W_BytesObject)
+@marshaller(W_AbstractBytesObject)
 def marshal_bytes(space, w_str, m):
     s = space.str_w(w_str)
     if m.version >= 1 and space.is_interned_str(s):
@@ -345,7 +345,7 @@ def marshal_pycode(space, w_pycode, m):
     m.put_int(x.co_stacksize)
     m.put_int(x.co_flags)
     m.atom_str(TYPE_STRING, x.co_code)
-    m.put_tuple_w(TYPE_TUPLE, x.co_consts_w)
+    m.put_tuple_w(TYPE_TUPLE, x.get_consts_w())
     m.put_tuple_w(TYPE_TUPLE, x.co_names_w)
     _put_interned_str_list(space, m, x.co_varnames)
     _put_interned_str_list(space, m, x.co_freevars)
@@ -373,13 +373,17 @@ def unmarshal_strlist(u, tc):
 
 @unmarshaller(TYPE_CODE)
 def unmarshal_pycode(space, u, tc):
+    if u.lazy_code and u.code_depth > 0:
+        return unmarshal_pycode_lazily(space, u)
     argcount    = u.get_int()
     nlocals     = u.get_int()
     stacksize   = u.get_int()
     flags       = u.get_int()
     code        = unmarshal_str(u)
     u.start(TYPE_TUPLE)
+    u.code_depth += 1
     consts_w    = u.get_tuple_w()
+    u.code_depth -= 1
     # copy in order not to merge it with anything else
     names       = unmarshal_strlist(u, TYPE_TUPLE)
     varnames    = unmarshal_strlist(u, TYPE_TUPLE)
@@ -393,8 +397,77 @@ def unmarshal_pycode(space, u, tc):
                   code, consts_w[:], names, varnames, filename,
                   name, firstlineno, lnotab, freevars, cellvars)
 
-
-@marshaller(W_UnicodeObject)
+# lazy code objects: only the name of the nested code objects is decoded,
+# the rest of their data is skipped and decoded when they are needed.
+# The interned strings must still be recorded in the string table, in
+# order to decode the string references that follow.
+
+def unmarshal_pycode_lazily(space, u):
+    pos = u.get_position()
+    stringcount = len(u.stringtable_w)
+    u.skip(16)              # argcount, nlocals, stacksize, flags
+    for i in range(7):      # code, consts, names, varnames, freevars,
+        skip_w_obj(space, u)    # cellvars, filename
+    name = unmarshal_str(u)
+    u.skip(4)               # firstlineno
+    skip_w_obj(space, u)    # lnotab
+    return LazyPyCode(space, name, u.get_buffer(), pos, u.stringtable_w,
+                      stringcount)
+
+def unmarshal_lazy_pycode(space, bufstr, pos, stringtable_w, stringcount):
+    from pypy.module.marshal.interp_marshal import CodeUnmarshaller
+    u = CodeUnmarshaller(space, bufstr, pos, stringtable_w[:stringcount],
+                         lazy_code=True)
+    w_code = unmarshal_pycode(space, u, TYPE_CODE)
+    assert isinstance(w_code, PyCode)
+    return w_code
+
+def skip_w_obj(space, u):
+    """Skip over the next object of the marshal data.  Return its type
+    code."""
+    tc = u.get1()
+    if tc == TYPE_INT:
+        u.skip(4)
+    elif tc == TYPE_INT64 or tc == TYPE_BINARY_FLOAT:
+        u.skip(8)
+    elif tc == TYPE_BINARY_COMPLEX:
+        u.skip(16)
+    elif tc == TYPE_FLOAT:
+        u.skip(ord(u.get1()))
+    elif tc == TYPE_COMPLEX:
+        u.skip(ord(u.get1()))
+        u.skip(ord(u.get1()))
+    elif tc == TYPE_LONG:
+        lng = u.get_int()
+        if lng < 0:
+            lng = -lng
+        u.skip(lng * 2)
+    elif tc == TYPE_STRING or tc == TYPE_UNICODE:
+        u.skip(u.get_lng())
+    elif tc == TYPE_INTERNED:
+        unmarshal_interned(space, u, tc)
+    elif tc == TYPE_STRINGREF:
+        u.skip(4)
+    elif (tc == TYPE_TUPLE or tc == TYPE_LIST or tc == TYPE_SET or
+          tc == TYPE_FROZENSET):
+        for i in range(u.get_lng()):
+            skip_w_obj(space, u)
+    elif tc == TYPE_DICT:
+        while skip_w_obj(space, u) != TYPE_NULL:
+            skip_w_obj(space, u)
+    elif tc == TYPE_CODE:
+        u.skip(16)
+        for i in range(8):
+            skip_w_obj(space, u)
+        u.skip(4)
+        skip_w_obj(space, u)
+    elif (tc != TYPE_NULL and tc != TYPE_NONE and tc != TYPE_TRUE and
+          tc != TYPE_FALSE and tc != TYPE_STOPITER and tc != TYPE_ELLIPSIS):
+        u.raise_exc("bad marshal data (unknown type code)")
+    return tc
+
+
+@marshaller(W_AbstractUnicodeObject)
 def marshal_unicode(space, w_unicode, m):
     s = unicodehelper.encode_utf8(space, space.unicode_w(w_unicode))
     m.atom_str(TYPE_UNICODE, s)
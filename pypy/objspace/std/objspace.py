@@ -18,7 +18,8 @@ from pypy.objspace.std.bufferobject import W_Buffer
 from pypy.objspace.std.bytearrayobject import W_BytearrayObject
 from pypy.objspace.std.bytesobject import W_AbstractBytesObject, W_BytesObject, wrapstr
 from pypy.objspace.std.complexobject import W_ComplexObject
-from pypy.objspace.std.dictmultiobject import W_DictMultiObject
+from pypy.objspace.std.dictmultiobject import (
+    W_DictMultiObject, newdict_from_unicode_keys)
 from pypy.objspace.std.floatobject import W_FloatObject
 from pypy.objspace.std.intobject import W_IntObject, setup_prebuilt, wrapint
 from pypy.objspace.std.iterobject import W_AbstractSeqIterObject, W_SeqIterObject
@@ -31,7 +32,8 @@ from pypy.objspace.std.setobject import W_SetObject, W_FrozensetObject
 from pypy.objspace.std.sliceobject import W_SliceObject
 from pypy.objspace.std.tupleobject import W_AbstractTupleObject, W_TupleObject
 from pypy.objspace.std.typeobject import W_TypeObject, TypeCache
-from pypy.objspace.std.unicodeobject import W_UnicodeObject, wrapunicode
+from pypy.objspace.std.unicodeobject import (
+    W_AbstractUnicodeObject, W_UnicodeObject, wrapunicode)
 
 
 class StdObjSpace(ObjSpace):
@@ -82,6 +84,10 @@ class StdObjSpace(ObjSpace):
         }
         if self.config.objspace.std.withstrbuf:
             builtin_type_classes[W_BytesObject.typedef] = W_AbstractBytesObject
+        if self.config.objspace.std.withrope:
+            builtin_type_classes[W_BytesObject.typedef] = W_AbstractBytesObject
+            builtin_type_classes[W_UnicodeObject.typedef] = \
+                W_AbstractUnicodeObject
 
         self.builtin_types = {}
         self._interplevel_classes = {}
@@ -291,12 +297,18 @@ class StdObjSpace(ObjSpace):
     def newlist_int(self, list_i):
         return W_ListObject.newlist_int(self, list_i)
 
+    def newlist_float(self, list_f):
+        return W_ListObject.newlist_float(self, list_f)
+
     def newdict(self, module=False, instance=False, kwargs=False,
                 strdict=False):
         return W_DictMultiObject.allocate_and_init_instance(
                 self, module=module, instance=instance,
                 strdict=strdict, kwargs=kwargs)
 
+    def newdict_unicode_keys(self, list_u, values_w):
+        return newdict_from_unicode_keys(self, list_u, values_w)
+
     def newset(self, iterable_w=None):
         if iterable_w is None:
             return W_SetObject(self, None)
@@ -0,0 +1,256 @@
+"""Lazily flattened str and unicode objects, represented as ropes.
+
+They are created by adding or slicing big strings when the 'withrope'
+option is enabled.  Concatenation and slicing work directly on the tree
+of string pieces; every other operation flattens the rope once into a
+normal W_BytesObject or W_UnicodeObject and delegates to it.
+"""
+
+import inspect
+
+import py
+
+from rpython.rlib import rope
+
+from pypy.interpreter.error import OperationError
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.objspace.std.bytesobject import (
+    W_AbstractBytesObject, W_BytesObject, StringBuffer)
+from pypy.objspace.std.sliceobject import W_SliceObject, normalize_simple_slice
+from pypy.objspace.std.unicodeobject import (
+    W_AbstractUnicodeObject, W_UnicodeObject)
+
+# results shorter than this are built as flat strings
+ROPE_THRESHOLD = 256
+
+
+class W_RopeBytesObject(W_AbstractBytesObject):
+    w_str = None
+
+    def __init__(self, node):
+        self.node = node
+
+    def force(self):
+        if self.w_str is None:
+            s = self.node.flatten_string()
+            self.w_str = W_BytesObject(s)
+            return s
+        else:
+            return self.w_str._value
+
+    def __repr__(w_self):
+        """ representation for debugging purposes """
+        return "%s(%d chars, depth %d)" % (
+            w_self.__class__.__name__, w_self.node.length(),
+            w_self.node.depth())
+
+    def unwrap(self, space):
+        return self.force()
+
+    def str_w(self, space):
+        return self.force()
+
+    def buffer_w(self, space, flags):
+        return StringBuffer(self.force())
+
+    def readbuf_w(self, space):
+        return StringBuffer(self.force())
+
+    def descr_len(self, space):
+        return space.wrap(self.node.length())
+
+    def descr_add(self, space, w_other):
+        if isinstance(w_other, W_RopeBytesObject):
+            other = w_other.node
+        elif type(w_other) is W_BytesObject:
+            other = rope.LiteralStringNode(w_other._value)
+        else:
+            self.force()
+            return self.w_str.descr_add(space, w_other)
+        return newrope_bytes(self.node, other)
+
+    def descr_getitem(self, space, w_index):
+        if isinstance(w_index, W_SliceObject):
+            length = self.node.length()
+            start, stop, step, sl = w_index.indices4(space, length)
+            if step == 1 and sl > 0:
+                return getslice_bytes(self.node, start, stop)
+        self.force()
+        return self.w_str.descr_getitem(space, w_index)
+
+    def descr_getslice(self, space, w_start, w_stop):
+        start, stop = normalize_simple_slice(space, self.node.length(),
+                                             w_start, w_stop)
+        if start < stop:
+            return getslice_bytes(self.node, start, stop)
+        self.force()
+        return self.w_str.descr_getslice(space, w_start, w_stop)
+
+    def descr_str(self, space):
+        # you cannot get subclasses of W_RopeBytesObject here
+        assert type(self) is W_RopeBytesObject
+        return self
+
+
+class W_RopeUnicodeObject(W_AbstractUnicodeObject):
+    w_uni = None
+
+    def __init__(self, node):
+        self.node = node
+
+    def force(self):
+        if self.w_uni is None:
+            u = self.node.flatten_unicode()
+            self.w_uni = W_UnicodeObject(u)
+            return u
+        else:
+            return self.w_uni._value
+
+    def __repr__(w_self):
+        """ representation for debugging purposes """
+        return "%s(%d chars, depth %d)" % (
+            w_self.__class__.__name__, w_self.node.length(),
+            w_self.node.depth())
+
+    def unwrap(self, space):
+        return self.force()
+
+    def unicode_w(self, space):
+        return self.force()
+
+    def readbuf_w(self, space):
+        self.force()
+        return self.w_uni.readbuf_w(space)
+
+    def ord(self, space):
+        self.force()
+        return self.w_uni.ord(space)
+
+    def descr_len(self, space):
+        return space.wrap(self.node.length())
+
+    def descr_add(self, space, w_other):
+        if isinstance(w_other, W_RopeUnicodeObject):
+            other = w_other.node
+        else:
+            try:
+                other = rope.LiteralUnicodeNode(
+                    W_UnicodeObject._op_val(space, w_other))
+            except OperationError as e:
+                if e.match(space, space.w_TypeError):
+                    return space.w_NotImplemented
+                raise
+        return newrope_unicode(self.node, other)
+
+    def descr_getitem(self, space, w_index):
+        if isinstance(w_index, W_SliceObject):
+            length = self.node.length()
+            start, stop, step, sl = w_index.indices4(space, length)
+            if step == 1 and sl > 0:
+                return getslice_unicode(self.node, start, stop)
+        self.force()
+        return self.w_uni.descr_getitem(space, w_index)
+
+    def descr_getslice(self, space, w_start, w_stop):
+        start, stop = normalize_simple_slice(space, self.node.length(),
+                                             w_start, w_stop)
+        if start < stop:
+            return getslice_unicode(self.node, start, stop)
+        self.force()
+        return self.w_uni.descr_getslice(space, w_start, w_stop)
+
+
+def newrope_bytes(left, right):
+    if left.length() + right.length() < ROPE_THRESHOLD:
+        return W_BytesObject(left.flatten_string() + right.flatten_string())
+    return W_RopeBytesObject(rope.concatenate(left, right))
+
+def newrope_unicode(left, right):
+    if left.length() + right.length() < ROPE_THRESHOLD:
+        return W_UnicodeObject(left.flatten_unicode() +
+                               right.flatten_unicode())
+    return W_RopeUnicodeObject(rope.concatenate(left, right))
+
+def getslice_bytes(node, start, stop):
+    node = rope.getslice_one(node, start, stop)
+    if node.length() < ROPE_THRESHOLD:
+        return W_BytesObject(node.flatten_string())
+    return W_RopeBytesObject(node)
+
+def getslice_unicode(node, start, stop):
+    node = rope.getslice_one(node, start, stop)
+    if node.length() < ROPE_THRESHOLD:
+        return W_UnicodeObject(node.flatten_unicode())
+    return W_RopeUnicodeObject(node)
+
+
+def bytes_add(space, w_self, w_other):
+    """str.__add__() of a flat string when 'withrope' is enabled"""
+    if isinstance(w_other, W_RopeBytesObject):
+        other = w_other.node
+    elif type(w_other) is W_BytesObject:
+        if len(w_self._value) + len(w_other._value) < ROPE_THRESHOLD:
+            return W_BytesObject(w_self._value + w_other._value)
+        other = rope.LiteralStringNode(w_other._value)
+    else:
+        return w_self._StringMethods_descr_add(space, w_other)
+    return newrope_bytes(rope.LiteralStringNode(w_self._value), other)
+
+def unicode_add(space, w_self, w_other):
+    """unicode.__add__() of a flat unicode when 'withrope' is enabled"""
+    if isinstance(w_other, W_RopeUnicodeObject):
+        other = w_other.node
+    else:
+        try:
+            other_value = w_self._op_val(space, w_other)
+        except OperationError as e:
+            if e.match(space, space.w_TypeError):
+                return space.w_NotImplemented
+            raise
+        if len(w_self._value) + len(other_value) < ROPE_THRESHOLD:
+            return W_UnicodeObject(w_self._value + other_value)
+        other = rope.LiteralUnicodeNode(other_value)
+    return newrope_unicode(rope.LiteralUnicodeNode(w_self._value), other)
+
+
+def _delegate_to_flat(cls, base_typedef, attrname, overridden):
+    # all the other methods flatten the rope and call the method of the
+    # resulting flat string
+    for key, value in base_typedef.rawdict.iteritems():
+        if not isinstance(value, interp2app):
+            continue
+        if key in overridden or key == '__new__':
+            continue
+
+        func = value._code._bltin
+        args = inspect.getargs(func.func_code)
+        if args.varargs or args.keywords:
+            raise TypeError("Varargs and keywords not supported in "
+                            "unwrap_spec")
+        argspec = ', '.join([arg for arg in args.args[1:]])
+        func_code = py.code.Source("""
+        def f(self, %(args)s):
+            self.force()
+            return self.%(attrname)s.%(func_name)s(%(args)s)
+        """ % {'args': argspec, 'attrname': attrname,
+               'func_name': func.func_name})
+        d = {}
+        exec func_code.compile() in d
+        f = d['f']
+        f.func_defaults = func.func_defaults
+        f.__module__ = func.__module__
+        # necessary for unique identifiers for pickling
+        f.func_name = func.func_name
+        unwrap_spec_ = getattr(func, 'unwrap_spec', None)
+        if unwrap_spec_ is not None:
+            f = unwrap_spec(**unwrap_spec_)(f)
+        setattr(cls, func.func_name, f)
+
+_delegate_to_flat(W_RopeBytesObject, W_BytesObject.typedef, 'w_str',
+                  ('__len__', '__add__', '__getitem__', '__getslice__',
+                   '__str__'))
+_delegate_to_flat(W_RopeUnicodeObject, W_UnicodeObject.typedef, 'w_uni',
+                  ('__len__', '__add__', '__getitem__', '__getslice__'))
+
+W_RopeBytesObject.typedef = W_BytesObject.typedef
+W_RopeUnicodeObject.typedef = W_UnicodeObject.typedef
@@ -152,6 +152,16 @@ class TestW_DictObject(object):
         w_d.initialize_content([(w(1), w("a")), (w(2), w("b"))])
         assert self.space.listview_int(w_d) == [1, 2]
 
+    def test_newdict_unicode_keys(self):
+        space = self.space
+        w = space.wrap
+        w_d = space.newdict_unicode_keys([u"a", u"b"], [w(1), w(2)])
+        assert isinstance(w_d, W_DictMultiObject)
+        assert space.listview_unicode(w_d) == [u"a", u"b"]
+        assert space.int_w(space.getitem(w_d, w(u"b"))) == 2
+        w_d = space.newdict_unicode_keys([], [])
+        assert space.len_w(w_d) == 0
+
     def test_keys_on_string_unicode_int_dict(self, monkeypatch):
         w = self.space.wrap
         
@@ -986,6 +996,46 @@ class AppTestStrategies(object):
         assert "IntDictStrategy" in self.get_strategy(d)
         assert d[1L] == "hi"
 
+    def test_copy_keeps_strategy(self):
+        d = {1: 2, 3: 4}
+        d2 = d.copy()
+        assert "IntDictStrategy" in self.get_strategy(d2)
+        assert d2 == {1: 2, 3: 4}
+        d = {"a": 1, "b": 2}
+        assert "BytesDictStrategy" in self.get_strategy(dict(d))
+        d = {1: 2, "a": 3}
+        d2 = d.copy()
+        assert "ObjectDictStrategy" in self.get_strategy(d2)
+        assert d2 == d
+        assert d2.keys() == d.keys()
+
+    def test_update_same_strategy(self):
+        d = {"a": 1, "b": 2}
+        d.update({"b": 3, "c": 4})
+        assert "BytesDictStrategy" in self.get_strategy(d)
+        assert d == {"a": 1, "b": 3, "c": 4}
+        d.update(d)
+        assert d == {"a": 1, "b": 3, "c": 4}
+        d = {1: 2}
+        d.update({"a": 3, "b": 4})
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d == {1: 2, "a": 3, "b": 4}
+
+    def test_dict_from_lists(self):
+        from __pypy__ import dict_from_lists
+        d = dict_from_lists(["a", "b", "c"], [1, 2, 3])
+        assert "BytesDictStrategy" in self.get_strategy(d)
+        assert d == {"a": 1, "b": 2, "c": 3}
+        d = dict_from_lists([5, 6, 5], [1, 2, 3])
+        assert "IntDictStrategy" in self.get_strategy(d)
+        assert d == {5: 3, 6: 2}
+        d = dict_from_lists((1.5, "x"), iter([1, 2]))
+        assert d == {1.5: 1, "x": 2}
+        assert dict_from_lists([], []) == {}
+        raises(ValueError, dict_from_lists, ["a"], [])
+        raises(ValueError, dict_from_lists, [1, 2], [3])
+        raises(ValueError, dict_from_lists, [None], [])
+
     def test_iter_dict_length_change(self):
         d = {1: 2, 3: 4, 5: 6}
         it = d.iteritems()
@@ -1118,6 +1168,7 @@ class Config:
             withmethodcache = False
             withidentitydict = False
             withmapdict = False
+            withunboxedattrs = False
 
 FakeSpace.config = Config()
 
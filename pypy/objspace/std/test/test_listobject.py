@@ -656,6 +656,46 @@ class AppTestListObject(object):
         l.sort(reverse = True, key = lower)
         assert l == ['C', 'b', 'a']
 
+    def test_sort_key_unboxed(self):
+        from operator import itemgetter, attrgetter
+        l = [(3, 'c', 1.5), (1, 'a', 0.5), (2, 'b', -1.0), (1, 'z', 0.5)]
+        assert sorted(l, key=itemgetter(0)) == [
+            (1, 'a', 0.5), (1, 'z', 0.5), (2, 'b', -1.0), (3, 'c', 1.5)]
+        assert sorted(l, key=itemgetter(0), reverse=True) == [
+            (3, 'c', 1.5), (2, 'b', -1.0), (1, 'a', 0.5), (1, 'z', 0.5)]
+        assert sorted(l, key=itemgetter(1), reverse=True) == [
+            (1, 'z', 0.5), (3, 'c', 1.5), (2, 'b', -1.0), (1, 'a', 0.5)]
+        assert sorted(l, key=itemgetter(2)) == [
+            (2, 'b', -1.0), (1, 'a', 0.5), (1, 'z', 0.5), (3, 'c', 1.5)]
+        assert sorted([u'bb', u'a', u'ccc'], key=lambda s: s[::-1]) == [
+            u'a', u'bb', u'ccc']
+        assert sorted(['bb', 'a', 'ccc', ''], key=len) == [
+            '', 'a', 'bb', 'ccc']
+        class A(object):
+            def __init__(self, x):
+                self.x = x
+        l = [A(3), A(-2), A(7)]
+        assert [a.x for a in sorted(l, key=attrgetter('x'))] == [-2, 3, 7]
+        # mixed types of keys
+        assert sorted([1.5, 1, 2], key=lambda x: x) == [1, 1.5, 2]
+        assert sorted([3, 'a', 1], key=lambda x: x) == [1, 3, 'a']
+        l = [1.0, 2.0, 0.0]
+        assert sorted(l, key=lambda x: -x) == [2.0, 1.0, 0.0]
+
+    def test_sort_key_mutates_list(self):
+        l = range(10)
+        def key(x):
+            l.append(x)
+            return x
+        raises(ValueError, l.sort, key=key)
+        l = range(10)
+        def key(x):
+            if x == 5:
+                raise KeyError
+            return -x
+        raises(KeyError, l.sort, key=key)
+        assert l == range(10)
+
     def test_sort_simple_string(self):
         l = ["a", "d", "c", "b"]
         l.sort()
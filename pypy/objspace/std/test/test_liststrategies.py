@@ -638,6 +638,17 @@ class TestW_ListStrategies(TestW_ListObject):
         assert isinstance(w_l.strategy, BytesListStrategy)
         assert space.listview_bytes(w_l) is l
 
+    def test_newlist_int_float(self):
+        space = self.space
+        l = [1, 2]
+        w_l = self.space.newlist_int(l)
+        assert isinstance(w_l.strategy, IntegerListStrategy)
+        assert space.listview_int(w_l) is l
+        l = [1.5, 2.0]
+        w_l = self.space.newlist_float(l)
+        assert isinstance(w_l.strategy, FloatListStrategy)
+        assert space.listview_float(w_l) is l
+
     def test_string_uses_newlist_bytes(self):
         space = self.space
         w_s = space.wrap("a b c")
@@ -9,6 +9,7 @@ class Config:
             withmethodcache = False
             withidentitydict = False
             withmapdict = True
+            withunboxedattrs = False
 
 space = FakeSpace()
 space.config = Config
@@ -709,6 +710,143 @@ class AppTestWithMapDict(object):
         assert list(__pypy__.reversed_dict(d)) == d.keys()[::-1]
 
 
+class AppTestWithMapDictAndUnboxedAttrs(AppTestWithMapDict):
+    spaceconfig = {"objspace.std.withmapdict": True,
+                   "objspace.std.withunboxedattrs": True}
+
+    def test_unboxed_values(self):
+        class P(object):
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+        p = P(1, 2.5)
+        assert p.x == 1
+        assert type(p.x) is int
+        assert p.y == 2.5
+        assert type(p.y) is float
+        p.x += 41
+        p.y *= 2
+        assert p.x == 42
+        assert p.y == 5.0
+        assert p.__dict__ == {'x': 42, 'y': 5.0}
+        p.z = -0.0
+        assert str(p.z) == '-0.0'
+        p.n = float('nan')
+        assert p.n != p.n
+        import sys
+        p.x = sys.maxint
+        assert p.x == sys.maxint
+        p.x = -sys.maxint - 1
+        assert p.x == -sys.maxint - 1
+
+    def test_change_type(self):
+        class P(object):
+            pass
+        p = P()
+        p.x = 1
+        p.y = 2
+        p.x = 1.5
+        assert p.x == 1.5
+        assert p.y == 2
+        p.y = "abc"
+        assert p.y == "abc"
+        p2 = P()
+        p2.x = 3
+        p2.y = None
+        assert (p2.x, p2.y) == (3, None)
+        class I(int):
+            pass
+        p2.x = I(5)
+        assert type(p2.x) is I
+        p2.x = True
+        assert p2.x is True
+
+    def test_store_attr_change_type(self):
+        class P(object):
+            def __init__(self, x):
+                self.x = x
+        l = [P(i) for i in range(5)]
+        for i, p in enumerate(l):
+            if i == 3:
+                p.x = "three"
+            else:
+                p.x = float(i)
+        assert [p.x for p in l] == [0.0, 1.0, 2.0, "three", 4.0]
+
+
+class TestUnboxedAttrs(object):
+    spaceconfig = {"objspace.std.withmapdict": True,
+                   "objspace.std.withunboxedattrs": True}
+
+    def test_maps(self):
+        space = self.space
+        w_p1, w_p2 = space.unpackiterable(space.appexec([], """():
+            class P(object):
+                pass
+            p1 = P()
+            p1.x = 1
+            p1.y = 2.0
+            p1.name = "p1"
+            p1.z = 3
+            p2 = P()
+            p2.x = 4
+            p2.y = 5
+            return p1, p2
+        """))
+        map1 = w_p1._get_mapdict_map()
+        attr_x = map1.find_map_attr(("x", DICT))
+        attr_y = map1.find_map_attr(("y", DICT))
+        attr_z = map1.find_map_attr(("z", DICT))
+        assert attr_x.kind == KIND_INT
+        assert attr_y.kind == KIND_FLOAT
+        assert map1.find_map_attr(("name", DICT)).kind == KIND_OBJECT
+        assert attr_z.kind == KIND_INT
+        # all unboxed values share one storage slot
+        assert attr_x.storageindex == attr_y.storageindex
+        assert attr_x.storageindex == attr_z.storageindex
+        assert (attr_x.listindex, attr_y.listindex, attr_z.listindex) == (
+            0, 1, 2)
+        assert map1.length() == 2
+        # p2.y was an int: the float attribute was turned back into a
+        # normal one, which new instances get too
+        map2 = w_p2._get_mapdict_map()
+        assert map2.find_map_attr(("x", DICT)) is attr_x
+        assert map2.find_map_attr(("y", DICT)).kind == KIND_OBJECT
+        assert space.int_w(space.getattr(w_p2, space.wrap("y"))) == 5
+        w_p3 = space.appexec([w_p1], """(p1):
+            p3 = type(p1)()
+            p3.x = 7
+            p3.y = 8.5
+            return p3
+        """)
+        map3 = w_p3._get_mapdict_map()
+        assert map3.find_map_attr(("y", DICT)).kind == KIND_OBJECT
+        assert space.float_w(space.getattr(w_p1, space.wrap("y"))) == 2.0
+
+    def test_deoptimize_changes_version(self):
+        # _get_new_attr() is elidable: its result may only change together
+        # with the quasi-immutable new_attr_version argument
+        space = self.space
+        w_p1 = space.appexec([], """():
+            class P(object):
+                pass
+            p1 = P()
+            p1.x = 1
+            return p1
+        """)
+        map1 = w_p1._get_mapdict_map()
+        back = map1.back
+        version = back.new_attr_version
+        assert back._get_new_attr("x", DICT, KIND_INT, version) is map1
+        space.appexec([w_p1], """(p1):
+            p1.x = 'boxed'
+        """)
+        assert back.new_attr_version is not version
+        attr = back._get_new_attr("x", DICT, KIND_INT,
+                                  back.new_attr_version)
+        assert attr.kind == KIND_OBJECT
+
+
 class AppTestWithMapDictAndCounters(object):
     spaceconfig = {"objspace.std.withmapdict": True,
                    "objspace.std.withmethodcachecounter": True}
@@ -1076,8 +1214,10 @@ class AppTestGlobalCaching(AppTestWithMapDict):
             exec """for i, a in enumerate(l):
                         assert a.f() == 42 + i % 3
             """ in locals()
+            # the inline cache of 'a.f' is polymorphic, so the global
+            # cache is only used for the first lookup of each class
             cache_counter = __pypy__.mapdict_cache_counter("f")
-            if cache_counter == (27, 3):
+            if cache_counter == (0, 3):
                 break
             # keep them alive, to make sure that on the
             # next try they have difference addresses
@@ -1103,7 +1243,7 @@ class AppTestGlobalCaching(AppTestWithMapDict):
             for i, a in enumerate(l):
                 assert a.x == 42 + i % 3
             cache_counter = __pypy__.mapdict_cache_counter("x")
-            if cache_counter == (27, 3):
+            if cache_counter == (0, 3):
                 break
             # keep them alive, to make sure that on the
             # next try they have difference addresses
@@ -1111,6 +1251,88 @@ class AppTestGlobalCaching(AppTestWithMapDict):
         else:
             assert 0, "failed: got %r" % ([got[1] for got in seen],)
 
+    def test_polymorphic_inline_cache(self):
+        import __pypy__
+        class A(object):
+            def __init__(self):
+                self.x = 42
+        class B(object):
+            def __init__(self):
+                self.y = 0
+                self.x = 43
+        class C(A):
+            pass
+        l = [A(), B(), C()] * 10
+        __pypy__.reset_method_cache_counter()
+        for i, a in enumerate(l):
+            assert a.x == 42 + (i % 3 == 1)
+        assert __pypy__.mapdict_inline_cache_counter("x") == (27, 3)
+
+    def test_store_attr_inline_cache(self):
+        import __pypy__
+        class A(object):
+            def __init__(self):
+                self.x = 0
+        class B(object):
+            def __init__(self):
+                self.y = 0
+                self.x = 0
+        l = [A(), B()] * 10
+        __pypy__.reset_method_cache_counter()
+        for i, a in enumerate(l):
+            a.x = i
+        assert __pypy__.mapdict_inline_cache_counter("x") == (18, 2)
+        assert l[0].x == 18
+        assert l[1].x == 19
+        assert l[1].y == 0
+
+    def test_store_attr_custom_setattr(self):
+        seen = []
+        class A(object):
+            def __init__(self):
+                self.x = 0
+        l = [A() for i in range(5)]
+        def f():
+            for a in l:
+                a.x = 1
+        f()
+        def __setattr__(self, name, value):
+            seen.append((name, value))
+        A.__setattr__ = __setattr__
+        f()
+        assert seen == [('x', 1)] * 5
+        assert [a.x for a in l] == [1] * 5
+
+    def test_store_attr_data_descriptor(self):
+        class A(object):
+            def __init__(self):
+                self.__dict__['x'] = 0
+        l = [A() for i in range(5)]
+        def f():
+            for i, a in enumerate(l):
+                a.x = i
+        f()
+        assert [a.x for a in l] == range(5)
+        seen = []
+        A.x = property(lambda self: 42, lambda self, value: seen.append(value))
+        f()
+        assert seen == range(5)
+        assert [a.__dict__['x'] for a in l] == range(5)
+
+    def test_store_attr_custom_getattribute(self):
+        class A(object):
+            def __init__(self):
+                self.x = 0
+            def __getattribute__(self, name):
+                return 'hooked'
+        l = [A() for i in range(3)]
+        result = []
+        for a in l:
+            a.x = 5
+            result.append(a.x)
+        assert result == ['hooked'] * 3
+
+
 class TestDictSubclassShortcutBug(object):
     spaceconfig = {"objspace.std.withmapdict": True,
                    "objspace.std.withmethodcachecounter": True}
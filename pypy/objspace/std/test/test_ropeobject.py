@@ -0,0 +1,120 @@
+from pypy.objspace.std.test import test_bytesobject, test_unicodeobject
+
+
+class AppTestRopeBytesObject(test_bytesobject.AppTestBytesObject):
+    spaceconfig = {"objspace.std.withrope": True}
+
+    def test_basic(self):
+        import __pypy__
+        s = ("a" * 200).__add__("b" * 100)
+        assert type(s) is str
+        assert 'W_RopeBytesObject' in __pypy__.internal_repr(s)
+        assert len(s) == 300
+        assert s == "a" * 200 + "b" * 100
+
+    def test_small_stays_flat(self):
+        import __pypy__
+        s = "Hello, ".__add__("World!")
+        assert 'W_BytesObject' in __pypy__.internal_repr(s)
+
+    def test_add_loop(self):
+        import __pypy__
+        all = ""
+        for i in range(1000):
+            all += str(i)
+        assert 'W_RopeBytesObject' in __pypy__.internal_repr(all)
+        assert all == "".join([str(i) for i in range(1000)])
+
+    def test_slice_stays_rope(self):
+        import __pypy__
+        s = ("a" * 300).__add__("b" * 300)
+        t = s[100:500]
+        assert 'W_RopeBytesObject' in __pypy__.internal_repr(t)
+        assert t == "a" * 200 + "b" * 200
+        u = s[250:350]
+        assert 'W_BytesObject' in __pypy__.internal_repr(u)
+        assert u == "a" * 50 + "b" * 50
+        assert s[::2] == "a" * 150 + "b" * 150
+        assert s[500:100] == ""
+
+    def test_index_and_methods(self):
+        s = ("x" * 300).__add__("yz" * 150)
+        assert s[0] == "x"
+        assert s[-1] == "z"
+        assert s.count("y") == 150
+        assert s.upper() == "X" * 300 + "YZ" * 150
+
+    def test_compare_and_hash(self):
+        t = "a" * 301
+        s = t[:150].__add__(t[150:])
+        r = t[:100].__add__(t[100:])
+        assert s == r
+        assert s == t
+        assert t == s
+        assert not (s != r)
+        assert s <= r
+        assert hash(s) == hash(t)
+        assert {t: 1}[s] == 1
+
+    def test_add_unicode(self):
+        s = ("a" * 300).__add__("b")
+        u = s + u"c"
+        assert type(u) is unicode
+        assert u == u"a" * 300 + u"bc"
+
+    def test_marshal(self):
+        import marshal
+        s = ("a" * 300).__add__("b")
+        assert marshal.loads(marshal.dumps(s)) == s
+
+
+class AppTestRopeUnicodeObject(test_unicodeobject.AppTestUnicodeString):
+    spaceconfig = {"usemodules": ('unicodedata',),
+                   "objspace.std.withrope": True}
+
+    def test_basic(self):
+        import __pypy__
+        s = (u"a" * 200).__add__(u"\u1234" * 100)
+        assert type(s) is unicode
+        assert 'W_RopeUnicodeObject' in __pypy__.internal_repr(s)
+        assert len(s) == 300
+        assert s == u"a" * 200 + u"\u1234" * 100
+
+    def test_add_loop(self):
+        import __pypy__
+        all = u""
+        for i in range(1000):
+            all += unicode(i)
+        assert 'W_RopeUnicodeObject' in __pypy__.internal_repr(all)
+        assert all == u"".join([unicode(i) for i in range(1000)])
+
+    def test_add_str(self):
+        s = (u"a" * 300).__add__(u"b")
+        assert s + "c" == u"a" * 300 + u"bc"
+        assert "c" + s == u"c" + u"a" * 300 + u"b"
+
+    def test_slice_stays_rope(self):
+        import __pypy__
+        s = (u"a" * 300).__add__(u"b" * 300)
+        t = s[100:500]
+        assert 'W_RopeUnicodeObject' in __pypy__.internal_repr(t)
+        assert t == u"a" * 200 + u"b" * 200
+        assert s.__getslice__(250, 350) == u"a" * 50 + u"b" * 50
+
+    def test_methods_and_hash(self):
+        t = u"\xe9" * 301
+        s = t[:150].__add__(t[150:])
+        assert s == t
+        assert t == s
+        assert hash(s) == hash(t)
+        assert s.encode('utf-8') == t.encode('utf-8')
+        assert unicode(s) == t
+        assert u"%s" % (s,) == t
+        assert s[3] == u"\xe9"
+
+    def test_subclass(self):
+        class U(unicode):
+            pass
+        s = (u"a" * 300).__add__(u"b")
+        assert U(s) == s
+        assert type(U(s)) is U
@@ -78,6 +78,15 @@ class MethodCache(object):
             self.hits = {}
             self.misses = {}
 
+    def move_to_front(self, index):
+        # swap the two entries of the set starting at 'index'
+        j = index + 1
+        self.versions[index], self.versions[j] = (
+            self.versions[j], self.versions[index])
+        self.names[index], self.names[j] = self.names[j], self.names[index]
+        self.lookup_where[index], self.lookup_where[j] = (
+            self.lookup_where[j], self.lookup_where[index])
+
     def clear(self):
         None_None = (None, None)
         for i in range(len(self.versions)):
@@ -436,22 +445,27 @@ class W_TypeObject(W_Root):
         # platforms SHIFT2 is really large, and we loose too much information
         # that way (as shown by failures of the tests that typically have
         # method names like 'f' who hash to a number that has only ~33 bits).
-        cached_version_tag = cache.versions[method_hash]
-        if cached_version_tag is version_tag:
-            cached_name = cache.names[method_hash]
-            if cached_name is name:
-                tup = cache.lookup_where[method_hash]
+        #
+        # The cache is 2-way set associative: the entries 'index' and
+        # 'index + 1' form a set, with the most recently used one first.
+        index = intmask(method_hash & ~r_uint(1))
+        for way in range(2):
+            i = index + way
+            if (cache.versions[i] is version_tag and
+                    cache.names[i] is name):
+                tup = cache.lookup_where[i]
+                if way:
+                    cache.move_to_front(index)
                 if space.config.objspace.std.withmethodcachecounter:
                     cache.hits[name] = cache.hits.get(name, 0) + 1
-#                print "hit", w_self, name
                 return tup
         tup = w_self._lookup_where_all_typeobjects(name)
-        cache.versions[method_hash] = version_tag
-        cache.names[method_hash] = name
-        cache.lookup_where[method_hash] = tup
+        cache.move_to_front(index)
+        cache.versions[index] = version_tag
+        cache.names[index] = name
+        cache.lookup_where[index] = tup
         if space.config.objspace.std.withmethodcachecounter:
             cache.misses[name] = cache.misses.get(name, 0) + 1
-#        print "miss", w_self, name
         return tup
 
     def check_user_subclass(w_self, w_subtype):
@@ -11,7 +11,8 @@ from rpython.rlib.runicode import (
 from pypy.interpreter import unicodehelper
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
-from pypy.interpreter.gateway import WrappedDefault, interp2app, unwrap_spec
+from pypy.interpreter.gateway import (
+    WrappedDefault, interp2app, interpindirect2app, unwrap_spec)
 from pypy.interpreter.typedef import TypeDef
 from pypy.module.unicodedata import unicodedb
 from pypy.objspace.std import newformat
@@ -19,12 +20,224 @@ from pypy.objspace.std.basestringtype import basestring_typedef
 from pypy.objspace.std.formatting import mod_format
 from pypy.objspace.std.stringmethods import StringMethods
 
-__all__ = ['W_UnicodeObject', 'wrapunicode', 'plain_str2unicode',
-           'encode_object', 'decode_object', 'unicode_from_object',
-           'unicode_from_string', 'unicode_to_decimal_w']
+__all__ = ['W_AbstractUnicodeObject', 'W_UnicodeObject', 'wrapunicode',
+           'plain_str2unicode', 'encode_object', 'decode_object',
+           'unicode_from_object', 'unicode_from_string', 'unicode_to_decimal_w']
 
 
-class W_UnicodeObject(W_Root):
+class W_AbstractUnicodeObject(W_Root):
+    __slots__ = ()
+
+    def is_w(self, space, w_other):
+        if not isinstance(w_other, W_AbstractUnicodeObject):
+            return False
+        if self is w_other:
+            return True
+        if self.user_overridden_class or w_other.user_overridden_class:
+            return False
+        return space.unicode_w(self) is space.unicode_w(w_other)
+
+    def immutable_unique_id(self, space):
+        if self.user_overridden_class:
+            return None
+        return space.wrap(compute_unique_id(space.unicode_w(self)))
+
+    def str_w(self, space):
+        return space.str_w(space.str(self))
+
+    charbuf_w = str_w
+
+    def descr__format__(self, space, w_format_spec):
+        raise NotImplementedError
+
+    def descr_add(self, space, w_other):
+        raise NotImplementedError
+
+    def descr_capitalize(self, space):
+        raise NotImplementedError
+
+    @unwrap_spec(width=int, w_fillchar=WrappedDefault(' '))
+    def descr_center(self, space, width, w_fillchar):
+        raise NotImplementedError
+
+    def descr_contains(self, space, w_sub):
+        raise NotImplementedError
+
+    def descr_count(self, space, w_sub, w_start=None, w_end=None):
+        raise NotImplementedError
+
+    def descr_decode(self, space, w_encoding=None, w_errors=None):
+        raise NotImplementedError
+
+    def descr_encode(self, space, w_encoding=None, w_errors=None):
+        raise NotImplementedError
+
+    def descr_endswith(self, space, w_suffix, w_start=None, w_end=None):
+        raise NotImplementedError
+
+    def descr_eq(self, space, w_other):
+        raise NotImplementedError
+
+    @unwrap_spec(tabsize=int)
+    def descr_expandtabs(self, space, tabsize=8):
+        raise NotImplementedError
+
+    def descr_find(self, space, w_sub, w_start=None, w_end=None):
+        raise NotImplementedError
+
+    def descr_format(self, space, __args__):
+        raise NotImplementedError
+
+    def descr_formatter_field_name_split(self, space):
+        raise NotImplementedError
+
+    def descr_formatter_parser(self, space):
+        raise NotImplementedError
+
+    def descr_ge(self, space, w_other):
+        raise NotImplementedError
+
+    def descr_getitem(self, space, w_index):
+        raise NotImplementedError
+
+    def descr_getnewargs(self, space):
+        raise NotImplementedError
+
+    def descr_getslice(self, space, w_start, w_stop):
+        raise NotImplementedError
+
+    def descr_gt(self, space, w_other):
+        raise NotImplementedError
+
+    def descr_hash(self, space):
+        raise NotImplementedError
+
+    def descr_index(self, space, w_sub, w_start=None, w_end=None):
+        raise NotImplementedError
+
+    def descr_isalnum(self, space):
+        raise NotImplementedError
+
+    def descr_isalpha(self, space):
+        raise NotImplementedError
+
+    def descr_isdecimal(self, space):
+        raise NotImplementedError
+
+    def descr_isdigit(self, space):
+        raise NotImplementedError
+
+    def descr_islower(self, space):
+        raise NotImplementedError
+
+    def descr_isnumeric(self, space):
+        raise NotImplementedError
+
+    def descr_isspace(self, space):
+        raise NotImplementedError
+
+    def descr_istitle(self, space):
+        raise NotImplementedError
+
+    def descr_isupper(self, space):
+        raise NotImplementedError
+
+    def descr_join(self, space, w_list):
+        raise NotImplementedError
+
+    def descr_le(self, space, w_other):
+        raise NotImplementedError
+
+    def descr_len(self, space):
+        raise NotImplementedError
+
+    @unwrap_spec(width=int, w_fillchar=WrappedDefault(' '))
+    def descr_ljust(self, space, width, w_fillchar):
+        raise NotImplementedError
+
+    def descr_lower(self, space):
+        raise NotImplementedError
+
+    def descr_lstrip(self, space, w_chars=None):
+        raise NotImplementedError
+
+    def descr_lt(self, space, w_other):
+        raise NotImplementedError
+
+    def descr_mod(self, space, w_values):
+        raise NotImplementedError
+
+    def descr_mul(self, space, w_times):
+        raise NotImplementedError
+
+    def descr_ne(self, space, w_other):
+        raise NotImplementedError
+
+    def descr_partition(self, space, w_sub):
+        raise NotImplementedError
+
+    @unwrap_spec(count=int)
+    def descr_replace(self, space, w_old, w_new, count=-1):
+        raise NotImplementedError
+
+    def descr_repr(self, space):
+        raise NotImplementedError
+
+    def descr_rfind(self, space, w_sub, w_start=None, w_end=None):
+        raise NotImplementedError
+
+    def descr_rindex(self, space, w_sub, w_start=None, w_end=None):
+        raise NotImplementedError
+
+    @unwrap_spec(width=int, w_fillchar=WrappedDefault(' '))
+    def descr_rjust(self, space, width, w_fillchar):
+        raise NotImplementedError
+
+    def descr_rpartition(self, space, w_sub):
+        raise NotImplementedError
+
+    @unwrap_spec(maxsplit=int)
+    def descr_rsplit(self, space, w_sep=None, maxsplit=-1):
+        raise NotImplementedError
+
+    def descr_rstrip(self, space, w_chars=None):
+        raise NotImplementedError
+
+    @unwrap_spec(maxsplit=int)
+    def descr_split(self, space, w_sep=None, maxsplit=-1):
+        raise NotImplementedError
+
+    @unwrap_spec(keepends=bool)
+    def descr_splitlines(self, space, keepends=False):
+        raise NotImplementedError
+
+    def descr_startswith(self, space, w_prefix, w_start=None, w_end=None):
+        raise NotImplementedError
+
+    def descr_str(self, space):
+        raise NotImplementedError
+
+    def descr_strip(self, space, w_chars=None):
+        raise NotImplementedError
+
+    def descr_swapcase(self, space):
+        raise NotImplementedError
+
+    def descr_title(self, space):
+        raise NotImplementedError
+
+    def descr_translate(self, space, w_table):
+        raise NotImplementedError
+
+    def descr_upper(self, space):
+        raise NotImplementedError
+
+    @unwrap_spec(width=int)
+    def descr_zfill(self, space, width):
+        raise NotImplementedError
+
+
+class W_UnicodeObject(W_AbstractUnicodeObject):
     import_from_mixin(StringMethods)
     _immutable_fields_ = ['_value']
 
@@ -45,23 +258,6 @@ class W_UnicodeObject(W_Root):
             return w_self
         return W_UnicodeObject(w_self._value)
 
-    def is_w(self, space, w_other):
-        if not isinstance(w_other, W_UnicodeObject):
-            return False
-        if self is w_other:
-            return True
-        if self.user_overridden_class or w_other.user_overridden_class:
-            return False
-        return space.unicode_w(self) is space.unicode_w(w_other)
-
-    def immutable_unique_id(self, space):
-        if self.user_overridden_class:
-            return None
-        return space.wrap(compute_unique_id(space.unicode_w(self)))
-
-    def str_w(self, space):
-        return space.str_w(space.str(self))
-
     def unicode_w(self, space):
         return self._value
 
@@ -76,8 +272,6 @@ class W_UnicodeObject(W_Root):
         raise OperationError(space.w_TypeError, space.wrap(
             "cannot use unicode as modifiable buffer"))
 
-    charbuf_w = str_w
-
     def listview_unicode(w_self):
         return _create_list_from_unicode(w_self._value)
 
@@ -112,6 +306,8 @@ class W_UnicodeObject(W_Root):
     def _op_val(space, w_other):
         if isinstance(w_other, W_UnicodeObject):
             return w_other._value
+        if isinstance(w_other, W_AbstractUnicodeObject):
+            return space.unicode_w(w_other)
         if space.isinstance_w(w_other, space.w_str):
             return unicode_from_string(space, w_other)._value
         return unicode_from_encoded_object(
@@ -200,9 +396,9 @@ class W_UnicodeObject(W_Root):
             if space.is_w(w_unicodetype, space.w_unicode):
                 return w_value
 
-        assert isinstance(w_value, W_UnicodeObject)
+        assert isinstance(w_value, W_AbstractUnicodeObject)
         w_newobj = space.allocate_instance(W_UnicodeObject, w_unicodetype)
-        W_UnicodeObject.__init__(w_newobj, w_value._value)
+        W_UnicodeObject.__init__(w_newobj, space.unicode_w(w_value))
         return w_newobj
 
     def descr_repr(self, space):
@@ -295,8 +491,7 @@ class W_UnicodeObject(W_Root):
         spec = space.unicode_w(w_format_spec)
         formatter = newformat.unicode_formatter(space, spec)
         self2 = unicode_from_object(space, self)
-        assert isinstance(self2, W_UnicodeObject)
-        return formatter.format_string(self2._value)
+        return formatter.format_string(space.unicode_w(self2))
 
     def descr_mod(self, space, w_values):
         return mod_format(space, self, w_values, do_unicode=True)
@@ -338,6 +533,13 @@ class W_UnicodeObject(W_Root):
                                                     w_errors)
         return encode_object(space, self, encoding, errors)
 
+    _StringMethods_descr_add = descr_add
+    def descr_add(self, space, w_other):
+        if space.config.objspace.std.withrope:
+            from pypy.objspace.std.ropeobject import unicode_add
+            return unicode_add(space, self, w_other)
+        return self._StringMethods_descr_add(space, w_other)
+
     _StringMethods_descr_join = descr_join
     def descr_join(self, space, w_list):
         l = space.listview_unicode(w_list)
@@ -499,7 +701,9 @@ def unicode_from_encoded_object(space, w_obj, encoding, errors):
         raise oefmt(space.w_TypeError,
                     "decoder did not return an unicode object (type '%T')",
                     w_retval)
-    assert isinstance(w_retval, W_UnicodeObject)
+    if not isinstance(w_retval, W_UnicodeObject):
+        # e.g. a rope built by an app-level codec
+        w_retval = W_UnicodeObject(space.unicode_w(w_retval))
     return w_retval
 
 
@@ -940,133 +1144,138 @@ W_UnicodeObject.typedef = TypeDef(
     __new__ = interp2app(W_UnicodeObject.descr_new),
     __doc__ = UnicodeDocstrings.__doc__,
 
-    __repr__ = interp2app(W_UnicodeObject.descr_repr,
-                          doc=UnicodeDocstrings.__repr__.__doc__),
-    __str__ = interp2app(W_UnicodeObject.descr_str,
-                         doc=UnicodeDocstrings.__str__.__doc__),
-    __hash__ = interp2app(W_UnicodeObject.descr_hash,
-                          doc=UnicodeDocstrings.__hash__.__doc__),
-
-    __eq__ = interp2app(W_UnicodeObject.descr_eq,
-                        doc=UnicodeDocstrings.__eq__.__doc__),
-    __ne__ = interp2app(W_UnicodeObject.descr_ne,
-                        doc=UnicodeDocstrings.__ne__.__doc__),
-    __lt__ = interp2app(W_UnicodeObject.descr_lt,
-                        doc=UnicodeDocstrings.__lt__.__doc__),
-    __le__ = interp2app(W_UnicodeObject.descr_le,
-                        doc=UnicodeDocstrings.__le__.__doc__),
-    __gt__ = interp2app(W_UnicodeObject.descr_gt,
-                        doc=UnicodeDocstrings.__gt__.__doc__),
-    __ge__ = interp2app(W_UnicodeObject.descr_ge,
-                        doc=UnicodeDocstrings.__ge__.__doc__),
-
-    __len__ = interp2app(W_UnicodeObject.descr_len,
-                         doc=UnicodeDocstrings.__len__.__doc__),
-    __contains__ = interp2app(W_UnicodeObject.descr_contains,
-                              doc=UnicodeDocstrings.__contains__.__doc__),
-
-    __add__ = interp2app(W_UnicodeObject.descr_add,
-                         doc=UnicodeDocstrings.__add__.__doc__),
-    __mul__ = interp2app(W_UnicodeObject.descr_mul,
-                         doc=UnicodeDocstrings.__mul__.__doc__),
-    __rmul__ = interp2app(W_UnicodeObject.descr_mul,
-                          doc=UnicodeDocstrings.__rmul__.__doc__),
-
-    __getitem__ = interp2app(W_UnicodeObject.descr_getitem,
-                             doc=UnicodeDocstrings.__getitem__.__doc__),
-    __getslice__ = interp2app(W_UnicodeObject.descr_getslice,
-                              doc=UnicodeDocstrings.__getslice__.__doc__),
-
-    capitalize = interp2app(W_UnicodeObject.descr_capitalize,
-                            doc=UnicodeDocstrings.capitalize.__doc__),
-    center = interp2app(W_UnicodeObject.descr_center,
-                        doc=UnicodeDocstrings.center.__doc__),
-    count = interp2app(W_UnicodeObject.descr_count,
-                       doc=UnicodeDocstrings.count.__doc__),
-    decode = interp2app(W_UnicodeObject.descr_decode,
-                        doc=UnicodeDocstrings.decode.__doc__),
-    encode = interp2app(W_UnicodeObject.descr_encode,
-                        doc=UnicodeDocstrings.encode.__doc__),
-    expandtabs = interp2app(W_UnicodeObject.descr_expandtabs,
-                            doc=UnicodeDocstrings.expandtabs.__doc__),
-    find = interp2app(W_UnicodeObject.descr_find,
-                      doc=UnicodeDocstrings.find.__doc__),
-    rfind = interp2app(W_UnicodeObject.descr_rfind,
-                       doc=UnicodeDocstrings.rfind.__doc__),
-    index = interp2app(W_UnicodeObject.descr_index,
-                       doc=UnicodeDocstrings.index.__doc__),
-    rindex = interp2app(W_UnicodeObject.descr_rindex,
-                        doc=UnicodeDocstrings.rindex.__doc__),
-    isalnum = interp2app(W_UnicodeObject.descr_isalnum,
-                         doc=UnicodeDocstrings.isalnum.__doc__),
-    isalpha = interp2app(W_UnicodeObject.descr_isalpha,
-                         doc=UnicodeDocstrings.isalpha.__doc__),
-    isdecimal = interp2app(W_UnicodeObject.descr_isdecimal,
-                           doc=UnicodeDocstrings.isdecimal.__doc__),
-    isdigit = interp2app(W_UnicodeObject.descr_isdigit,
-                         doc=UnicodeDocstrings.isdigit.__doc__),
-    islower = interp2app(W_UnicodeObject.descr_islower,
-                         doc=UnicodeDocstrings.islower.__doc__),
-    isnumeric = interp2app(W_UnicodeObject.descr_isnumeric,
-                           doc=UnicodeDocstrings.isnumeric.__doc__),
-    isspace = interp2app(W_UnicodeObject.descr_isspace,
-                         doc=UnicodeDocstrings.isspace.__doc__),
-    istitle = interp2app(W_UnicodeObject.descr_istitle,
-                         doc=UnicodeDocstrings.istitle.__doc__),
-    isupper = interp2app(W_UnicodeObject.descr_isupper,
-                         doc=UnicodeDocstrings.isupper.__doc__),
-    join = interp2app(W_UnicodeObject.descr_join,
-                      doc=UnicodeDocstrings.join.__doc__),
-    ljust = interp2app(W_UnicodeObject.descr_ljust,
-                       doc=UnicodeDocstrings.ljust.__doc__),
-    rjust = interp2app(W_UnicodeObject.descr_rjust,
-                       doc=UnicodeDocstrings.rjust.__doc__),
-    lower = interp2app(W_UnicodeObject.descr_lower,
-                       doc=UnicodeDocstrings.lower.__doc__),
-    partition = interp2app(W_UnicodeObject.descr_partition,
-                           doc=UnicodeDocstrings.partition.__doc__),
-    rpartition = interp2app(W_UnicodeObject.descr_rpartition,
-                            doc=UnicodeDocstrings.rpartition.__doc__),
-    replace = interp2app(W_UnicodeObject.descr_replace,
-                         doc=UnicodeDocstrings.replace.__doc__),
-    split = interp2app(W_UnicodeObject.descr_split,
-                       doc=UnicodeDocstrings.split.__doc__),
-    rsplit = interp2app(W_UnicodeObject.descr_rsplit,
-                        doc=UnicodeDocstrings.rsplit.__doc__),
-    splitlines = interp2app(W_UnicodeObject.descr_splitlines,
-                            doc=UnicodeDocstrings.splitlines.__doc__),
-    startswith = interp2app(W_UnicodeObject.descr_startswith,
-                            doc=UnicodeDocstrings.startswith.__doc__),
-    endswith = interp2app(W_UnicodeObject.descr_endswith,
-                          doc=UnicodeDocstrings.endswith.__doc__),
-    strip = interp2app(W_UnicodeObject.descr_strip,
-                       doc=UnicodeDocstrings.strip.__doc__),
-    lstrip = interp2app(W_UnicodeObject.descr_lstrip,
-                        doc=UnicodeDocstrings.lstrip.__doc__),
-    rstrip = interp2app(W_UnicodeObject.descr_rstrip,
-                        doc=UnicodeDocstrings.rstrip.__doc__),
-    swapcase = interp2app(W_UnicodeObject.descr_swapcase,
-                          doc=UnicodeDocstrings.swapcase.__doc__),
-    title = interp2app(W_UnicodeObject.descr_title,
-                       doc=UnicodeDocstrings.title.__doc__),
-    translate = interp2app(W_UnicodeObject.descr_translate,
-                           doc=UnicodeDocstrings.translate.__doc__),
-    upper = interp2app(W_UnicodeObject.descr_upper,
-                       doc=UnicodeDocstrings.upper.__doc__),
-    zfill = interp2app(W_UnicodeObject.descr_zfill,
-                       doc=UnicodeDocstrings.zfill.__doc__),
-
-    format = interp2app(W_UnicodeObject.descr_format,
-                        doc=UnicodeDocstrings.format.__doc__),
-    __format__ = interp2app(W_UnicodeObject.descr__format__,
-                            doc=UnicodeDocstrings.__format__.__doc__),
-    __mod__ = interp2app(W_UnicodeObject.descr_mod,
-                         doc=UnicodeDocstrings.__mod__.__doc__),
-    __getnewargs__ = interp2app(W_UnicodeObject.descr_getnewargs,
-                                doc=UnicodeDocstrings.__getnewargs__.__doc__),
-    _formatter_parser = interp2app(W_UnicodeObject.descr_formatter_parser),
-    _formatter_field_name_split =
-        interp2app(W_UnicodeObject.descr_formatter_field_name_split),
+    __repr__ = interpindirect2app(W_AbstractUnicodeObject.descr_repr,
+                                  doc=UnicodeDocstrings.__repr__.__doc__),
+    __str__ = interpindirect2app(W_AbstractUnicodeObject.descr_str,
+                                 doc=UnicodeDocstrings.__str__.__doc__),
+    __hash__ = interpindirect2app(W_AbstractUnicodeObject.descr_hash,
+                                  doc=UnicodeDocstrings.__hash__.__doc__),
+
+    __eq__ = interpindirect2app(W_AbstractUnicodeObject.descr_eq,
+                                doc=UnicodeDocstrings.__eq__.__doc__),
+    __ne__ = interpindirect2app(W_AbstractUnicodeObject.descr_ne,
+                                doc=UnicodeDocstrings.__ne__.__doc__),
+    __lt__ = interpindirect2app(W_AbstractUnicodeObject.descr_lt,
+                                doc=UnicodeDocstrings.__lt__.__doc__),
+    __le__ = interpindirect2app(W_AbstractUnicodeObject.descr_le,
+                                doc=UnicodeDocstrings.__le__.__doc__),
+    __gt__ = interpindirect2app(W_AbstractUnicodeObject.descr_gt,
+                                doc=UnicodeDocstrings.__gt__.__doc__),
+    __ge__ = interpindirect2app(W_AbstractUnicodeObject.descr_ge,
+                                doc=UnicodeDocstrings.__ge__.__doc__),
+
+    __len__ = interpindirect2app(W_AbstractUnicodeObject.descr_len,
+                                 doc=UnicodeDocstrings.__len__.__doc__),
+    __contains__ = interpindirect2app(
+        W_AbstractUnicodeObject.descr_contains,
+        doc=UnicodeDocstrings.__contains__.__doc__),
+
+    __add__ = interpindirect2app(W_AbstractUnicodeObject.descr_add,
+                                 doc=UnicodeDocstrings.__add__.__doc__),
+    __mul__ = interpindirect2app(W_AbstractUnicodeObject.descr_mul,
+                                 doc=UnicodeDocstrings.__mul__.__doc__),
+    __rmul__ = interpindirect2app(W_AbstractUnicodeObject.descr_mul,
+                                  doc=UnicodeDocstrings.__rmul__.__doc__),
+
+    __getitem__ = interpindirect2app(
+        W_AbstractUnicodeObject.descr_getitem,
+        doc=UnicodeDocstrings.__getitem__.__doc__),
+    __getslice__ = interpindirect2app(
+        W_AbstractUnicodeObject.descr_getslice,
+        doc=UnicodeDocstrings.__getslice__.__doc__),
+
+    capitalize = interpindirect2app(W_AbstractUnicodeObject.descr_capitalize,
+                                    doc=UnicodeDocstrings.capitalize.__doc__),
+    center = interpindirect2app(W_AbstractUnicodeObject.descr_center,
+                                doc=UnicodeDocstrings.center.__doc__),
+    count = interpindirect2app(W_AbstractUnicodeObject.descr_count,
+                               doc=UnicodeDocstrings.count.__doc__),
+    decode = interpindirect2app(W_AbstractUnicodeObject.descr_decode,
+                                doc=UnicodeDocstrings.decode.__doc__),
+    encode = interpindirect2app(W_AbstractUnicodeObject.descr_encode,
+                                doc=UnicodeDocstrings.encode.__doc__),
+    expandtabs = interpindirect2app(W_AbstractUnicodeObject.descr_expandtabs,
+                                    doc=UnicodeDocstrings.expandtabs.__doc__),
+    find = interpindirect2app(W_AbstractUnicodeObject.descr_find,
+                              doc=UnicodeDocstrings.find.__doc__),
+    rfind = interpindirect2app(W_AbstractUnicodeObject.descr_rfind,
+                               doc=UnicodeDocstrings.rfind.__doc__),
+    index = interpindirect2app(W_AbstractUnicodeObject.descr_index,
+                               doc=UnicodeDocstrings.index.__doc__),
+    rindex = interpindirect2app(W_AbstractUnicodeObject.descr_rindex,
+                                doc=UnicodeDocstrings.rindex.__doc__),
+    isalnum = interpindirect2app(W_AbstractUnicodeObject.descr_isalnum,
+                                 doc=UnicodeDocstrings.isalnum.__doc__),
+    isalpha = interpindirect2app(W_AbstractUnicodeObject.descr_isalpha,
+                                 doc=UnicodeDocstrings.isalpha.__doc__),
+    isdecimal = interpindirect2app(W_AbstractUnicodeObject.descr_isdecimal,
+                                   doc=UnicodeDocstrings.isdecimal.__doc__),
+    isdigit = interpindirect2app(W_AbstractUnicodeObject.descr_isdigit,
+                                 doc=UnicodeDocstrings.isdigit.__doc__),
+    islower = interpindirect2app(W_AbstractUnicodeObject.descr_islower,
+                                 doc=UnicodeDocstrings.islower.__doc__),
+    isnumeric = interpindirect2app(W_AbstractUnicodeObject.descr_isnumeric,
+                                   doc=UnicodeDocstrings.isnumeric.__doc__),
+    isspace = interpindirect2app(W_AbstractUnicodeObject.descr_isspace,
+                                 doc=UnicodeDocstrings.isspace.__doc__),
+    istitle = interpindirect2app(W_AbstractUnicodeObject.descr_istitle,
+                                 doc=UnicodeDocstrings.istitle.__doc__),
+    isupper = interpindirect2app(W_AbstractUnicodeObject.descr_isupper,
+                                 doc=UnicodeDocstrings.isupper.__doc__),
+    join = interpindirect2app(W_AbstractUnicodeObject.descr_join,
+                              doc=UnicodeDocstrings.join.__doc__),
+    ljust = interpindirect2app(W_AbstractUnicodeObject.descr_ljust,
+                               doc=UnicodeDocstrings.ljust.__doc__),
+    rjust = interpindirect2app(W_AbstractUnicodeObject.descr_rjust,
+                               doc=UnicodeDocstrings.rjust.__doc__),
+    lower = interpindirect2app(W_AbstractUnicodeObject.descr_lower,
+                               doc=UnicodeDocstrings.lower.__doc__),
+    partition = interpindirect2app(W_AbstractUnicodeObject.descr_partition,
+                                   doc=UnicodeDocstrings.partition.__doc__),
+    rpartition = interpindirect2app(W_AbstractUnicodeObject.descr_rpartition,
+                                    doc=UnicodeDocstrings.rpartition.__doc__),
+    replace = interpindirect2app(W_AbstractUnicodeObject.descr_replace,
+                                 doc=UnicodeDocstrings.replace.__doc__),
+    split = interpindirect2app(W_AbstractUnicodeObject.descr_split,
+                               doc=UnicodeDocstrings.split.__doc__),
+    rsplit = interpindirect2app(W_AbstractUnicodeObject.descr_rsplit,
+                                doc=UnicodeDocstrings.rsplit.__doc__),
+    splitlines = interpindirect2app(W_AbstractUnicodeObject.descr_splitlines,
+                                    doc=UnicodeDocstrings.splitlines.__doc__),
+    startswith = interpindirect2app(W_AbstractUnicodeObject.descr_startswith,
+                                    doc=UnicodeDocstrings.startswith.__doc__),
+    endswith = interpindirect2app(W_AbstractUnicodeObject.descr_endswith,
+                                  doc=UnicodeDocstrings.endswith.__doc__),
+    strip = interpindirect2app(W_AbstractUnicodeObject.descr_strip,
+                               doc=UnicodeDocstrings.strip.__doc__),
+    lstrip = interpindirect2app(W_AbstractUnicodeObject.descr_lstrip,
+                                doc=UnicodeDocstrings.lstrip.__doc__),
+    rstrip = interpindirect2app(W_AbstractUnicodeObject.descr_rstrip,
+                                doc=UnicodeDocstrings.rstrip.__doc__),
+    swapcase = interpindirect2app(W_AbstractUnicodeObject.descr_swapcase,
+                                  doc=UnicodeDocstrings.swapcase.__doc__),
+    title = interpindirect2app(W_AbstractUnicodeObject.descr_title,
+                               doc=UnicodeDocstrings.title.__doc__),
+    translate = interpindirect2app(W_AbstractUnicodeObject.descr_translate,
+                                   doc=UnicodeDocstrings.translate.__doc__),
+    upper = interpindirect2app(W_AbstractUnicodeObject.descr_upper,
+                               doc=UnicodeDocstrings.upper.__doc__),
+    zfill = interpindirect2app(W_AbstractUnicodeObject.descr_zfill,
+                               doc=UnicodeDocstrings.zfill.__doc__),
+
+    format = interpindirect2app(W_AbstractUnicodeObject.descr_format,
+                                doc=UnicodeDocstrings.format.__doc__),
+    __format__ = interpindirect2app(W_AbstractUnicodeObject.descr__format__,
+                                    doc=UnicodeDocstrings.__format__.__doc__),
+    __mod__ = interpindirect2app(W_AbstractUnicodeObject.descr_mod,
+                                 doc=UnicodeDocstrings.__mod__.__doc__),
+    __getnewargs__ = interpindirect2app(
+        W_AbstractUnicodeObject.descr_getnewargs,
+        doc=UnicodeDocstrings.__getnewargs__.__doc__),
+    _formatter_parser = interpindirect2app(
+        W_AbstractUnicodeObject.descr_formatter_parser),
+    _formatter_field_name_split = interpindirect2app(
+        W_AbstractUnicodeObject.descr_formatter_field_name_split),
 )
 W_UnicodeObject.typedef.flag_sequence_bug_compat = True
 
@@ -1082,9 +1291,9 @@ W_UnicodeObject.EMPTY = W_UnicodeObject(u'')
 
 # Helper for converting int/long
 def unicode_to_decimal_w(space, w_unistr):
-    if not isinstance(w_unistr, W_UnicodeObject):
+    if not isinstance(w_unistr, W_AbstractUnicodeObject):
         raise oefmt(space.w_TypeError, "expected unicode, got '%T'", w_unistr)
-    unistr = w_unistr._value
+    unistr = space.unicode_w(w_unistr)
     result = ['\0'] * len(unistr)
     digits = ['0', '1', '2', '3', '4',
               '5', '6', '7', '8', '9']
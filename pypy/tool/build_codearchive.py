@@ -0,0 +1,91 @@
+#! /usr/bin/env pypy
+"""
+Compiles all the pure Python modules of a virtualenv into a single code
+archive, to be put in front of sys.path.  Importing from the archive costs
+a dict lookup per module instead of a stat() per module and per sys.path
+entry.  C extension modules are not archived and are still imported from
+the virtualenv.
+
+Syntax:  build_codearchive.py  [options]  <virtualenv or directory>  [<archive>]
+
+Options:
+  --pyc     write .pyc files next to the sources instead of an archive
+  -j N      compile with N processes (default: one per cpu)
+  -v        print the compilation time of every module
+
+Must be run with the pypy that will use the archive: it is compiled
+for the bytecode of that interpreter, and refused by the others.  By
+default, the archive is written as site-packages.pyarchive in the
+virtualenv.  The output does not depend on the number of processes.
+"""
+import sys, os, glob, time
+
+
+def find_site_packages(path):
+    for pattern in ['site-packages', 'lib/python*/site-packages',
+                    'lib/pypy*/site-packages']:
+        found = glob.glob(os.path.join(path, pattern))
+        if found:
+            return found[0]
+    return path
+
+
+def main(argv):
+    try:
+        import _codearchive
+    except ImportError:
+        print >> sys.stderr, 'this pypy has no _codearchive module'
+        return 1
+    pyc = False
+    verbose = False
+    processes = 0
+    args = []
+    argv = argv[1:]
+    while argv:
+        arg = argv.pop(0)
+        if arg == '--pyc':
+            pyc = True
+        elif arg == '-v':
+            verbose = True
+        elif arg == '-j' and argv and argv[0].isdigit():
+            processes = int(argv.pop(0))
+        elif arg.startswith('-'):
+            print >> sys.stderr, __doc__
+            return 2
+        else:
+            args.append(arg)
+    if len(args) not in (1, 2) or (pyc and len(args) != 1):
+        print >> sys.stderr, __doc__
+        return 2
+    directory = find_site_packages(args[0])
+    if pyc:
+        archive = None
+    elif len(args) == 2:
+        archive = args[1]
+    else:
+        archive = os.path.join(args[0],
+                               'site-packages' + _codearchive.ARCHIVE_EXT)
+    start = time.time()
+    report = _codearchive.compile_tree([directory], archive, processes)
+    total = time.time() - start
+    failed = 0
+    for modname, filename, seconds, error in report:
+        if error is not None:
+            failed += 1
+            print >> sys.stderr, '%s: %s' % (filename, error)
+        elif verbose:
+            print '%8.3fs  %s' % (seconds, modname)
+    compiled = len(report) - failed
+    if archive is None:
+        print '%d modules from %s compiled in %.2fs' % (compiled, directory,
+                                                        total)
+    else:
+        print '%d modules from %s written to %s in %.2fs' % (
+            compiled, directory, archive, total)
+    if failed:
+        print '%d modules could not be compiled' % (failed,)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -141,6 +141,7 @@ if _CYGWIN:
     _, c_free_safe = external('free', [PTR], lltype.Void, macro=True)
 
 c_memmove, _ = external('memmove', [PTR, PTR, size_t], lltype.Void)
+_, c_memchr_safe = external('memchr', [PTR, rffi.INT, size_t], PTR)
 
 if _POSIX:
     has_mremap = cConfig['has_mremap']
@@ -432,6 +433,19 @@ class MMap(object):
                 return -1   # failure
             p += step
 
+    def find_byte(self, char, start, end):
+        """Return the index of the first 'char' in [start, end), or -1.
+        Unlike find(), 'start' and 'end' must be within the map."""
+        assert 0 <= start <= end <= self.size
+        if start == end:
+            return -1
+        p = c_memchr_safe(self.getptr(start), rffi.cast(rffi.INT, ord(char)),
+                          end - start)
+        if not p:
+            return -1
+        return start + (rffi.cast(lltype.Signed, p) -
+                        rffi.cast(lltype.Signed, self.getptr(start)))
+
     def seek(self, pos, whence=0):
         dist = pos
         how = whence
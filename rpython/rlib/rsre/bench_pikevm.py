@@ -0,0 +1,47 @@
+""" Compares the backtracking sre_match() and the Pike VM of rsre_pikevm,
+on typical patterns and on pathological ones.  Runs untranslated, on top
+of CPython or PyPy: only the ratio between the two engines is meaningful.
+"""
+
+import os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', '..'))
+from rpython.rlib.rsre import rsre_core, rsre_pikevm
+from rpython.rlib.rsre.rpy import get_code
+
+def count_operation(name, function, repeat=1):
+    t0 = time.time()
+    for i in xrange(repeat):
+        retval = function()
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    return retval
+
+def make_ctx(code, string):
+    ctx = rsre_core.StrMatchContext(code, string, 0, len(string), 0)
+    ctx.required = rsre_core.find_required_literal(code)
+    return ctx
+
+def bench(pattern, string, repeat):
+    code = get_code(pattern)
+    program = rsre_pikevm.compile_program(code, always=True)
+    print '%r on %d characters:' % (pattern, len(string))
+    found1 = count_operation('  backtracking',
+        lambda: rsre_core.search_context(make_ctx(code, string)), repeat)
+    found2 = count_operation('  Pike VM     ',
+        lambda: rsre_pikevm.search_context(make_ctx(code, string), program),
+        repeat)
+    assert found1 == found2
+
+def main():
+    line = 'GET /index.html HTTP/1.1 200 ' + 'x' * 200
+    bench(r'(\w+\s)+HTTP/(\d\.\d) (\d+)', line, 100)
+    bench(r'(?:(\d+)\.)+(\d+)', 'version ' + '1.' * 30 + '2', 100)
+    bench(r'(a|b|ab)*c', 'ab' * 100 + 'c', 100)
+    # the 'b' at the end defeats the required literal prefilter
+    for n in [10, 14, 18]:
+        bench(r'(a+)+b', 'a' * n + 'Xb', 1)
+        bench(r'(a|aa)*b', 'a' * n + 'Xb', 1)
+
+if __name__ == '__main__':
+    main()
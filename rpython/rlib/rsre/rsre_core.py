@@ -89,6 +89,8 @@ class AbstractMatchContext(object):
     match_end = 0
     match_marks = None
     match_marks_flat = None
+    required = None    # a RequiredLiteral, set by the caller if wanted
+    program = None     # an rsre_pikevm.Program, set by the caller if wanted
 
     def __init__(self, pattern, match_start, end, flags):
         # 'match_start' and 'end' must be known to be non-negative
@@ -192,8 +194,11 @@ class BufMatchContext(AbstractMatchContext):
         return rsre_char.getlower(c, self.flags)
 
     def fresh_copy(self, start):
-        return BufMatchContext(self.pattern, self._buffer, start,
-                               self.end, self.flags)
+        ctx = BufMatchContext(self.pattern, self._buffer, start,
+                              self.end, self.flags)
+        ctx.required = self.required
+        ctx.program = self.program
+        return ctx
 
 class StrMatchContext(AbstractMatchContext):
     """Concrete subclass for matching in a plain string."""
@@ -215,8 +220,11 @@ class StrMatchContext(AbstractMatchContext):
         return rsre_char.getlower(c, self.flags)
 
     def fresh_copy(self, start):
-        return StrMatchContext(self.pattern, self._string, start,
-                               self.end, self.flags)
+        ctx = StrMatchContext(self.pattern, self._string, start,
+                              self.end, self.flags)
+        ctx.required = self.required
+        ctx.program = self.program
+        return ctx
 
 class UnicodeMatchContext(AbstractMatchContext):
     """Concrete subclass for matching in a unicode string."""
@@ -236,8 +244,11 @@ class UnicodeMatchContext(AbstractMatchContext):
         return rsre_char.getlower(c, self.flags)
 
     def fresh_copy(self, start):
-        return UnicodeMatchContext(self.pattern, self._unicodestr, start,
-                                   self.end, self.flags)
+        ctx = UnicodeMatchContext(self.pattern, self._unicodestr, start,
+                                  self.end, self.flags)
+        ctx.required = self.required
+        ctx.program = self.program
+        return ctx
 
 # ____________________________________________________________
 
@@ -1040,6 +1051,12 @@ def search_context(ctx):
         else:
             charset = (flags & rsre_char.SRE_INFO_CHARSET)
         base += 1 + ctx.pat(1)
+    required = ctx.required
+    if required is not None:
+        if required.max_offset >= 0:
+            return required_search(ctx, base)
+        if find_required(ctx, ctx.match_start + required.min_offset) < 0:
+            return False
     if ctx.pat(base) == OPCODE_LITERAL:
         return literal_search(ctx, base)
     if charset:
@@ -1101,6 +1118,58 @@ def charset_search(ctx, base):
         start += 1
     return False
 
+install_jitdriver_spec("RequiredSearch",
+                       greens=['base', 'ctx.pattern'],
+                       reds=['start', 'stop', 'ctx'],
+                       debugprint=(1, 0))
+@specializectx
+def required_search(ctx, base):
+    # the required literal is at a bounded distance after the start of any
+    # match: only the positions from which one of its occurrences is at
+    # the right distance are tried
+    required = ctx.required
+    start = ctx.match_start
+    while True:
+        found = find_required(ctx, start + required.min_offset)
+        if found < 0:
+            return False
+        stop = found - required.min_offset
+        if start < found - required.max_offset:
+            start = found - required.max_offset
+        assert start >= 0
+        while start <= stop:
+            ctx.jitdriver_RequiredSearch.jit_merge_point(ctx=ctx, start=start,
+                                                         stop=stop, base=base)
+            if sre_match(ctx, base, start, None) is not None:
+                ctx.match_start = start
+                return True
+            start += 1
+
+@specializectx
+@jit.dont_look_inside
+def find_required(ctx, start):
+    """Return the first position from 'start' where the required literal
+    of 'ctx' is found, or -1.  Boyer-Moore-Horspool search."""
+    required = ctx.required
+    chars = required.chars
+    skip = required.skip
+    m = len(chars)
+    last = chars[m - 1]
+    i = start + m - 1
+    while i < ctx.end:
+        assert i >= 0
+        c = ctx.str(i)
+        if c == last:
+            pos = i - m + 1
+            assert pos >= 0
+            j = m - 2
+            while j >= 0 and ctx.str(pos + j) == chars[j]:
+                j -= 1
+            if j < 0:
+                return pos
+        i += skip[c & 0xff]
+    return -1
+
 install_jitdriver_spec('FastSearch',
                        greens=['i', 'prefix_len', 'ctx.pattern'],
                        reds=['string_position', 'ctx'],
@@ -1151,3 +1220,99 @@ def fast_search(ctx):
         string_position += 1
         if string_position >= ctx.end:
             return False
+
+# ____________________________________________________________
+
+class RequiredLiteral(object):
+    """A string of characters which is part of every match of a pattern,
+    at least 'min_offset' and at most 'max_offset' characters after its
+    start ('max_offset' is -1 if there is no limit)."""
+    _immutable_ = True
+
+    def __init__(self, chars, min_offset, max_offset):
+        self.chars = chars
+        self.min_offset = min_offset
+        self.max_offset = max_offset
+        # Horspool's table, giving how far a window can move when it
+        # ends with the character 'c'; it is indexed by 'c & 0xff', and
+        # the characters that collide get the smallest of their shifts
+        m = len(chars)
+        skip = [m] * 256
+        for i in range(m - 1):
+            skip[chars[i] & 0xff] = m - 1 - i
+        self.skip = skip
+
+def find_required_literal(pattern):
+    """Return the RequiredLiteral of the longest run of LITERAL opcodes
+    in the top-level sequence of 'pattern', or None.  The patterns that
+    start with a literal prefix are already handled by fast_search()."""
+    i = 0
+    if pattern[0] == OPCODE_INFO:
+        if pattern[2] & rsre_char.SRE_INFO_PREFIX and pattern[5] > 1:
+            return None
+        i = 1 + pattern[1]
+    best = []
+    best_min = best_max = 0
+    run = []
+    run_min = run_max = 0
+    min_width = max_width = 0    # of what comes before 'i'
+    while i < len(pattern):
+        op = pattern[i]
+        if op == OPCODE_LITERAL:
+            if not run:
+                run_min = min_width
+                run_max = max_width
+            run.append(pattern[i + 1])
+            if len(run) > len(best):
+                best = run[:]
+                best_min = run_min
+                best_max = run_max
+            lo = hi = 1
+            i += 2
+        elif op == OPCODE_MARK or op == OPCODE_AT:
+            # zero-width, and the run of literals goes on
+            i += 2
+            continue
+        else:
+            run = []
+            if op == OPCODE_ANY or op == OPCODE_ANY_ALL:
+                lo = hi = 1
+                i += 1
+            elif (op == OPCODE_NOT_LITERAL or op == OPCODE_LITERAL_IGNORE or
+                  op == OPCODE_NOT_LITERAL_IGNORE or op == OPCODE_CATEGORY):
+                lo = hi = 1
+                i += 2
+            elif op == OPCODE_IN or op == OPCODE_IN_IGNORE:
+                lo = hi = 1
+                i += 1 + pattern[i + 1]
+            elif op == OPCODE_REPEAT_ONE or op == OPCODE_MIN_REPEAT_ONE:
+                lo = pattern[i + 2]
+                hi = pattern[i + 3]
+                if hi == rsre_char.MAXREPEAT:
+                    hi = -1
+                i += 1 + pattern[i + 1]
+            elif op == OPCODE_ASSERT or op == OPCODE_ASSERT_NOT:
+                lo = hi = 0
+                i += 1 + pattern[i + 1]
+            elif op == OPCODE_BRANCH:
+                i += 1
+                while pattern[i] != 0:
+                    i += pattern[i]
+                i += 1
+                lo = 0
+                hi = -1
+            elif op == OPCODE_REPEAT:
+                # skip to the MAX_UNTIL or MIN_UNTIL, and after it
+                i += 2 + pattern[i + 1]
+                lo = 0
+                hi = -1
+            else:
+                break
+        min_width += lo
+        if hi < 0:
+            max_width = -1
+        elif max_width >= 0:
+            max_width += hi
+    if not best:
+        return None
+    return RequiredLiteral(best, best_min, best_max)
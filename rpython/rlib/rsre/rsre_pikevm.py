@@ -0,0 +1,366 @@
+"""
+A Pike VM for the patterns without backreferences or lookarounds.
+
+The opcodes of the pattern are compiled into a small program of
+instructions, which is run on all the possible threads in parallel, one
+character of the string after the other.  There are at most as many
+threads as instructions, so the time taken is linear in the length of
+the string, whereas the backtracking sre_match() can take exponential
+time on patterns with nested repetitions like '(a|aa)*b' or '(a+)+b'.
+The threads are kept in priority order, which gives the same match and
+the same groups as the backtracking engine.
+
+The repetitions with counts are unrolled, and the repetitions whose body
+can match the empty string are not supported: sre_match() has special
+rules for them.
+"""
+
+from rpython.rlib import jit
+from rpython.rlib.unroll import unrolling_iterable
+from rpython.rlib.rsre import rsre_char
+from rpython.rlib.rsre.rsre_core import (specializectx, sre_at, Mark,
+    find_required, unroll_char_checker,
+    OPCODE_ANY, OPCODE_ANY_ALL, OPCODE_AT, OPCODE_BRANCH, OPCODE_IN,
+    OPCODE_IN_IGNORE, OPCODE_INFO, OPCODE_JUMP, OPCODE_LITERAL,
+    OPCODE_LITERAL_IGNORE, OPCODE_MARK, OPCODE_MAX_UNTIL, OPCODE_MIN_UNTIL,
+    OPCODE_MIN_REPEAT_ONE, OPCODE_NOT_LITERAL, OPCODE_NOT_LITERAL_IGNORE,
+    OPCODE_REPEAT, OPCODE_REPEAT_ONE, OPCODE_SUCCESS)
+
+INSTR_CHAR  = 0    # <arg=position of a single-character opcode in the pattern>
+INSTR_AT    = 1    # <arg=AT code>
+INSTR_SAVE  = 2    # <arg=mark number>
+INSTR_SPLIT = 3    # <arg=preferred target> <arg2=other target>
+INSTR_JUMP  = 4    # <arg=target>
+INSTR_MATCH = 5
+
+# above this number of instructions, we use the backtracking engine
+MAX_PROGRAM_SIZE = 5000
+
+CHAR_OPCODES = unrolling_iterable([
+    OPCODE_ANY, OPCODE_ANY_ALL, OPCODE_IN, OPCODE_IN_IGNORE, OPCODE_LITERAL,
+    OPCODE_LITERAL_IGNORE, OPCODE_NOT_LITERAL, OPCODE_NOT_LITERAL_IGNORE])
+
+def is_char_opcode(op):
+    for op1 in CHAR_OPCODES:
+        if op1 == op:
+            return True
+    return False
+
+
+class Unsupported(Exception):
+    pass
+
+
+class Program(object):
+    _immutable_ = True
+
+    def __init__(self, ops, args, args2, num_marks):
+        self.ops = ops
+        self.args = args
+        self.args2 = args2
+        self.num_marks = num_marks
+
+
+class Compiler(object):
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.ops = []
+        self.args = []
+        self.args2 = []
+        self.num_marks = 0
+        self.has_repeat = False
+
+    def emit(self, op, arg=0, arg2=0):
+        if len(self.ops) >= MAX_PROGRAM_SIZE:
+            raise Unsupported
+        self.ops.append(op)
+        self.args.append(arg)
+        self.args2.append(arg2)
+        return len(self.ops) - 1
+
+    def compile(self):
+        ppos = 0
+        if self.pattern[0] == OPCODE_INFO:
+            ppos = 1 + self.pattern[1]
+        ppos = self.compile_sequence(ppos)
+        if self.pattern[ppos] != OPCODE_SUCCESS:
+            raise Unsupported
+        self.emit(INSTR_MATCH)
+
+    def compile_sequence(self, ppos):
+        """Compile the opcodes starting at 'ppos', up to the one that ends
+        the sequence, whose position is returned."""
+        pattern = self.pattern
+        while True:
+            op = pattern[ppos]
+            if is_char_opcode(op):
+                self.emit(INSTR_CHAR, ppos)
+                if op == OPCODE_ANY or op == OPCODE_ANY_ALL:
+                    ppos += 1
+                elif op == OPCODE_IN or op == OPCODE_IN_IGNORE:
+                    ppos += 1 + pattern[ppos + 1]
+                else:
+                    ppos += 2
+            elif op == OPCODE_AT:
+                self.emit(INSTR_AT, pattern[ppos + 1])
+                ppos += 2
+            elif op == OPCODE_MARK:
+                gid = pattern[ppos + 1]
+                if gid >= self.num_marks:
+                    self.num_marks = gid + 1
+                self.emit(INSTR_SAVE, gid)
+                ppos += 2
+            elif op == OPCODE_BRANCH:
+                ppos = self.compile_branch(ppos)
+            elif op == OPCODE_REPEAT_ONE or op == OPCODE_MIN_REPEAT_ONE:
+                # <REPEAT_ONE> <skip> <1=min> <2=max> item <SUCCESS> tail
+                if not is_char_opcode(pattern[ppos + 4]):
+                    raise Unsupported
+                self.compile_repeat(ppos + 4, False, pattern[ppos + 2],
+                                    pattern[ppos + 3],
+                                    op == OPCODE_REPEAT_ONE)
+                ppos += 1 + pattern[ppos + 1]
+            elif op == OPCODE_REPEAT:
+                # <REPEAT> <skip> <1=min> <2=max> item <UNTIL> tail
+                self.has_repeat = True
+                until = ppos + 1 + pattern[ppos + 1]
+                self.compile_repeat(ppos + 4, True, pattern[ppos + 2],
+                                    pattern[ppos + 3],
+                                    pattern[until] == OPCODE_MAX_UNTIL)
+                ppos = until + 1
+            elif (op == OPCODE_SUCCESS or op == OPCODE_JUMP or
+                  op == OPCODE_MAX_UNTIL or op == OPCODE_MIN_UNTIL):
+                return ppos
+            else:
+                # backreferences, lookarounds, FAILURE...
+                raise Unsupported
+
+    def compile_branch(self, ppos):
+        # <BRANCH> <0=skip> code <JUMP> ... <NULL>
+        pattern = self.pattern
+        alternatives = []
+        ppos += 1
+        while pattern[ppos] != 0:
+            alternatives.append(ppos + 1)
+            ppos += pattern[ppos]
+        jumps = []
+        for i in range(len(alternatives)):
+            split = -1
+            if i < len(alternatives) - 1:
+                split = self.emit(INSTR_SPLIT)
+                self.args[split] = split + 1
+            end = self.compile_sequence(alternatives[i])
+            if pattern[end] != OPCODE_JUMP:
+                raise Unsupported
+            jumps.append(self.emit(INSTR_JUMP))
+            if split >= 0:
+                self.args2[split] = len(self.ops)
+        for jump in jumps:
+            self.args[jump] = len(self.ops)
+        return ppos + 1
+
+    def compile_body(self, ppos, general):
+        if general:
+            start = len(self.ops)
+            end = self.compile_sequence(ppos)
+            if (self.pattern[end] != OPCODE_MAX_UNTIL and
+                self.pattern[end] != OPCODE_MIN_UNTIL):
+                raise Unsupported
+            if self.nullable(start, len(self.ops)):
+                raise Unsupported
+        else:
+            self.emit(INSTR_CHAR, ppos)
+
+    def compile_repeat(self, ppos, general, mincount, maxcount, greedy):
+        if maxcount == rsre_char.MAXREPEAT:
+            count = mincount + 1
+        else:
+            count = maxcount
+        if count > MAX_PROGRAM_SIZE:
+            raise Unsupported
+        for i in range(mincount):
+            self.compile_body(ppos, general)
+        if maxcount == rsre_char.MAXREPEAT:
+            loop = self.emit(INSTR_SPLIT)
+            self.compile_body(ppos, general)
+            self.emit(INSTR_JUMP, loop)
+            self.set_split(loop, len(self.ops), greedy)
+        else:
+            splits = []
+            for i in range(maxcount - mincount):
+                splits.append(self.emit(INSTR_SPLIT))
+                self.compile_body(ppos, general)
+            for split in splits:
+                self.set_split(split, len(self.ops), greedy)
+
+    def set_split(self, split, exit, greedy):
+        if greedy:
+            self.args[split] = split + 1
+            self.args2[split] = exit
+        else:
+            self.args[split] = exit
+            self.args2[split] = split + 1
+
+    def nullable(self, start, end):
+        """Can the instructions from 'start' reach 'end' without reading
+        any character?"""
+        seen = {}
+        pending = [start]
+        while pending:
+            pc = pending.pop()
+            if pc == end:
+                return True
+            if pc in seen:
+                continue
+            seen[pc] = None
+            op = self.ops[pc]
+            if op == INSTR_JUMP:
+                pending.append(self.args[pc])
+            elif op == INSTR_SPLIT:
+                pending.append(self.args[pc])
+                pending.append(self.args2[pc])
+            elif op == INSTR_SAVE or op == INSTR_AT:
+                pending.append(pc + 1)
+        return False
+
+
+def compile_program(pattern, always=False):
+    """Return the Program for 'pattern', or None if it is not supported.
+    Unless 'always' is True, None is also returned for the patterns that
+    have no repetition of a subpattern, on which the backtracking engine
+    is fast enough."""
+    compiler = Compiler(pattern)
+    try:
+        compiler.compile()
+    except Unsupported:
+        return None
+    if not always and not compiler.has_repeat:
+        return None
+    return Program(compiler.ops[:], compiler.args[:], compiler.args2[:],
+                   compiler.num_marks)
+
+# ____________________________________________________________
+
+@specializectx
+def check_char(ctx, ptr, ppos):
+    assert ppos >= 0
+    op = ctx.pat(ppos)
+    for op1, checkerfn in unroll_char_checker:
+        if op1 == op:
+            return checkerfn(ctx, ptr, ppos)
+    return False
+
+@specializectx
+def add_thread(ctx, program, visited, ptr, list_pc, list_caps, pc, caps):
+    # add the thread at 'pc' and the ones it leads to without reading a
+    # character, in priority order.  'visited[pc] == ptr' if the thread
+    # at 'pc' was already added by a thread of higher priority.
+    stack_pc = []
+    stack_caps = []
+    while True:
+        if visited[pc] != ptr:
+            visited[pc] = ptr
+            op = program.ops[pc]
+            if op == INSTR_JUMP:
+                pc = program.args[pc]
+                continue
+            elif op == INSTR_SPLIT:
+                stack_pc.append(program.args2[pc])
+                stack_caps.append(caps)
+                pc = program.args[pc]
+                continue
+            elif op == INSTR_SAVE:
+                gid = program.args[pc]
+                caps = caps[:]
+                caps[gid] = ptr
+                caps[program.num_marks] = gid     # the last mark
+                pc += 1
+                continue
+            elif op == INSTR_AT:
+                if sre_at(ctx, program.args[pc], ptr):
+                    pc += 1
+                    continue
+            else:
+                list_pc.append(pc)
+                list_caps.append(caps)
+        if not stack_pc:
+            return
+        pc = stack_pc.pop()
+        caps = stack_caps.pop()
+
+@specializectx
+@jit.dont_look_inside
+def pike_run(ctx, program, anchored):
+    end = ctx.end
+    num_marks = program.num_marks
+    visited = [-1] * len(program.ops)
+    ptr = ctx.match_start
+    # the captures of a thread: the marks, the last mark, and the start
+    caps = [-1] * (num_marks + 2)
+    caps[num_marks + 1] = ptr
+    clist_pc = []
+    clist_caps = []
+    add_thread(ctx, program, visited, ptr, clist_pc, clist_caps, 0, caps)
+    found_caps = None
+    found_end = -1
+    while True:
+        nlist_pc = []
+        nlist_caps = []
+        for i in range(len(clist_pc)):
+            pc = clist_pc[i]
+            if program.ops[pc] == INSTR_MATCH:
+                # the threads of lower priority are dropped
+                found_caps = clist_caps[i]
+                found_end = ptr
+                break
+            if ptr < end and check_char(ctx, ptr, program.args[pc]):
+                add_thread(ctx, program, visited, ptr + 1, nlist_pc,
+                           nlist_caps, pc + 1, clist_caps[i])
+        if ptr >= end:
+            break
+        if not anchored and found_caps is None:
+            # start a new match at the next position, with the lowest
+            # priority
+            caps = [-1] * (num_marks + 2)
+            caps[num_marks + 1] = ptr + 1
+            add_thread(ctx, program, visited, ptr + 1, nlist_pc, nlist_caps,
+                       0, caps)
+        elif not nlist_pc:
+            break
+        clist_pc = nlist_pc
+        clist_caps = nlist_caps
+        ptr += 1
+    if found_caps is None:
+        return False
+    marks = None
+    last = found_caps[num_marks]
+    for gid in range(num_marks):
+        if found_caps[gid] >= 0 and gid != last:
+            marks = Mark(gid, found_caps[gid], marks)
+    if last >= 0:
+        marks = Mark(last, found_caps[last], marks)
+    match_start = found_caps[num_marks + 1]
+    assert match_start >= 0
+    assert found_end >= 0
+    ctx.match_start = match_start
+    ctx.match_end = found_end
+    ctx.match_marks = marks
+    ctx.match_marks_flat = None
+    return True
+
+def match_context(ctx, program):
+    ctx.original_pos = ctx.match_start
+    if ctx.end < ctx.match_start:
+        return False
+    return pike_run(ctx, program, True)
+
+def search_context(ctx, program):
+    ctx.original_pos = ctx.match_start
+    if ctx.end < ctx.match_start:
+        return False
+    required = ctx.required
+    if required is not None:
+        if find_required(ctx, ctx.match_start + required.min_offset) < 0:
+            return False
+    return pike_run(ctx, program, False)
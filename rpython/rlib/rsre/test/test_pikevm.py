@@ -0,0 +1,91 @@
+import re, time
+from rpython.rlib.rsre import rsre_core, rsre_pikevm
+from rpython.rlib.rsre.rpy import get_code
+
+
+def pike_ctx(code, string, start=0):
+    program = rsre_pikevm.compile_program(code, always=True)
+    assert program is not None
+    ctx = rsre_core.StrMatchContext(code, string, start, len(string), 0)
+    ctx.required = rsre_core.find_required_literal(code)
+    return ctx, program
+
+def groups(ctx, num_groups):
+    return [ctx.span(i) for i in range(num_groups + 1)]
+
+def compare(pattern, strings):
+    code = get_code(pattern)
+    r = re.compile(pattern)
+    for string in strings:
+        for start in range(min(len(string), 3) + 1):
+            for method in ['match', 'search']:
+                ctx, program = pike_ctx(code, string, start)
+                if method == 'match':
+                    found = rsre_pikevm.match_context(ctx, program)
+                    m = r.match(string, start)
+                else:
+                    found = rsre_pikevm.search_context(ctx, program)
+                    m = r.search(string, start)
+                assert found == (m is not None), (pattern, string, method)
+                if m is not None:
+                    if m.lastindex is not None:
+                        assert ctx.match_marks.gid // 2 + 1 == m.lastindex
+                    expected = [m.span(i) for i in range(r.groups + 1)]
+                    assert groups(ctx, r.groups) == expected, (
+                        pattern, string, start, method)
+
+
+class TestPikeVM:
+
+    def test_simple(self):
+        compare(r'abc', ['abc', 'xabcx', 'ab', ''])
+        compare(r'a.c|b[xy]+', ['abc', 'a\nc', 'bxyyx', 'cbyc', ''])
+        compare(r'(?i)ab[c-e]', ['ABD', 'xaBe', 'abf'])
+        compare(r'[^a]b', ['ab', 'bb', 'b'])
+
+    def test_repeat_one(self):
+        compare(r'a*b', ['aaab', 'b', 'aaa', 'xaab'])
+        compare(r'a*?b', ['aaab', 'b', 'aaa'])
+        compare(r'x(a{2,3})(a*)', ['xaaaaa', 'xa', 'xaa'])
+        compare(r'x(a{2,3}?)(a*?)y', ['xaaaaay', 'xaay', 'xay'])
+
+    def test_groups(self):
+        compare(r'(a)(b)?(c)?', ['ab', 'ac', 'a', 'abc'])
+        compare(r'(?:(a)|b)*', ['ab', 'ba', 'abab', ''])
+        compare(r'((a)|(b))+', ['ab', 'ba', 'aab'])
+        compare(r'(a|ab)(c|bcd)(d*)', ['abcd', 'abc', 'acd'])
+
+    def test_repeat(self):
+        compare(r'(ab)*c', ['ababc', 'c', 'abab', 'xabcab'])
+        compare(r'(ab)*?c', ['ababc', 'c'])
+        compare(r'(a|b){2,3}c', ['abc', 'ababc', 'ac', 'bbbbc'])
+        compare(r'(a|aa)+?b', ['aaab', 'ab', 'aa'])
+        compare(r'(\w+\s)+x', ['ab cd x', 'ab cd y', 'x'])
+        compare(r'(?:a(b|c)d)+', ['abdacd', 'abdaxd'])
+
+    def test_at(self):
+        compare(r'^(a|b)+$', ['abab', 'abc', ''])
+        compare(r'\b(\w+)\b', ['  hello world', '!!'])
+        compare(r'(?m)^(ab)+$', ['x\nabab\n', 'ab'])
+        compare(r'(a+)+\Z', ['aaa', 'aab'])
+
+    def test_unsupported(self):
+        for pattern in [r'(a)\1', r'(?=a)a', r'(?!a)b', r'(?<=a)b',
+                        r'(a)?(?(1)b|c)', r'(a*)*b', r'(a|)+b', r'(a?b?)*']:
+            code = get_code(pattern)
+            assert rsre_pikevm.compile_program(code, always=True) is None
+        code = get_code(r'(ab){2000}')
+        assert rsre_pikevm.compile_program(code, always=True) is None
+
+    def test_only_for_repeats(self):
+        assert rsre_pikevm.compile_program(get_code(r'a+b')) is None
+        assert rsre_pikevm.compile_program(get_code(r'(ab)+')) is not None
+
+    def test_pathological(self):
+        string = 'a' * 30
+        for pattern in [r'(a|aa)*b', r'(a+)+b', r'(a|a)*b', r'(\w+\s?)+$!']:
+            code = get_code(pattern)
+            t0 = time.time()
+            ctx, program = pike_ctx(code, string)
+            assert not rsre_pikevm.search_context(ctx, program)
+            assert time.time() - t0 < 10.0
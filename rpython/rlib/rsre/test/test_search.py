@@ -209,3 +209,46 @@ class TestSearch:
                 else:
                     assert match is None
                     assert res is None
+
+    def test_find_required_literal(self):
+        def required(pattern):
+            lit = rsre_core.find_required_literal(get_code(pattern))
+            if lit is None:
+                return None
+            return (''.join(map(chr, lit.chars)), lit.min_offset,
+                    lit.max_offset)
+        assert required(r'.*ERROR: (\d+)') == ('ERROR: ', 0, -1)
+        assert required(r'\w+@example\.com') == ('@example.com', 1, -1)
+        assert required(r'[ab]x?(cd)ef') == ('cdef', 1, 2)
+        assert required(r'\bab\b(?=c)cd') == ('ab', 0, 0)
+        assert required(r'(ab|c)xyz(?:ab)*') == ('xyz', 0, -1)
+        assert required(r'a(?:b)+cde') == ('cde', 1, -1)
+        assert required(r'abc') is None        # uses fast_search()
+        assert required(r'(?i)abc') is None
+        assert required(r'\d+') is None
+        assert required(r'(a)\1xyz') == ('a', 0, 0)
+
+    def test_required_search(self):
+        strings = ['', 'x' * 50, 'ab ERROR: 42 xx', 'ERROR: ERROR: 7',
+                   'mail bob@example.com, eve@example.org', 'xycdefabcdefa',
+                   'aabxcdefbcdef', 'cdcdef' * 3, 'ab abcd abcdc', 'b' * 20,
+                   'cabxyz bxyz', 'bbbbc xxxxcdef']
+        for pattern in [r'.*ERROR: (\d+)', r'\w+@example\.com',
+                        r'[ab]x?(cd)ef', r'\bab\b(?=c)cd', r'(ab|b)xyz',
+                        r'x{2,4}cdef', r'ab?cde?f', r'[a-c]d', r'b{3}c']:
+            code = get_code(pattern)
+            required = rsre_core.find_required_literal(code)
+            assert required is not None
+            r = re.compile(pattern)
+            for string in strings:
+                for start in [0, 1, 5]:
+                    match = r.search(string, start)
+                    ctx = rsre_core.StrMatchContext(code, string,
+                                                    min(start, len(string)),
+                                                    len(string), 0)
+                    ctx.required = required
+                    if match is None:
+                        assert not rsre_core.search_context(ctx)
+                    else:
+                        assert rsre_core.search_context(ctx)
+                        assert ctx.span() == match.span()
@@ -34,7 +34,7 @@ an outout-buffering stream.
 # where r_longlong values end up: as argument to seek() and truncate() and
 # return value of tell(), but not as argument to read().
 
-import os, sys, errno
+import os, sys, errno, stat
 from rpython.rlib.objectmodel import specialize, we_are_translated
 from rpython.rlib.rarithmetic import r_longlong, intmask
 from rpython.rlib import rposix, nonconst, _rsocket_rffi as _c
@@ -150,8 +150,19 @@ def decode_mode(mode):
     return flag, universal, reading, writing, basemode, binary
 
 
+# the 'buffering' that asks for a file that is read through an MMapFile;
+# it is ignored when writing or when the file cannot be mapped
+MMAP_BUFFERING = -2
+
 def construct_stream_tower(stream, buffering, universal, reading, writing,
                            binary):
+    if buffering == MMAP_BUFFERING:
+        buffering = -1
+        if reading and not writing:
+            mmapped = mmap_fd(stream.try_to_find_file_descriptor())
+            if mmapped is not None:
+                stream = mmapped
+                buffering = 0   # reads come directly from the mapping
     if buffering == 0:   # no buffering
         pass
     elif buffering == 1:   # line-buffering
@@ -388,104 +399,154 @@ class DiskFile(Stream):
 # next class is not RPython
 
 class MMapFile(Stream):
-    """Standard I/O basis stream using mmap."""
+    """Standard I/O basis stream using mmap.  The data returned by read()
+    and readline() is sliced directly from the mapping, without any read
+    syscall.  The file is mapped again if it grew since it was mapped."""
 
     def __init__(self, fd, mmapaccess):
-        """NOT_RPYTHON"""
         self.fd = fd
         self.access = mmapaccess
         self.pos = 0
+        self.mm = None
         self.remapfile()
 
     def remapfile(self):
-        import mmap
-        size = os.fstat(self.fd).st_size
-        self.mm = mmap.mmap(self.fd, size, access=self.access)
+        from rpython.rlib import rmmap
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        if self.filesize() > 0:
+            try:
+                self.mm = rmmap.mmap(self.fd, 0, access=self.access)
+            except rmmap.RMMapError, e:
+                raise StreamError(e.message)
+
+    def filesize(self):
+        return os.fstat(self.fd)[stat.ST_SIZE]
+
+    def mapsize(self):
+        if self.mm is None:
+            return 0
+        return self.mm.size
+
+    def remap_if_grown(self):
+        # Actual file size, may be more than mapped
+        if self.filesize() > self.mapsize():
+            self.remapfile()
+        return self.mapsize()
 
     def close1(self, closefileno):
-        self.mm.close()
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
         if closefileno:
             os.close(self.fd)
 
     def tell(self):
-        return self.pos
+        return r_longlong(self.pos)
 
     def seek(self, offset, whence):
         if whence == 0:
-            self.pos = max(0, offset)
+            pos = offset
         elif whence == 1:
-            self.pos = max(0, self.pos + offset)
+            pos = self.pos + offset
         elif whence == 2:
-            self.pos = max(0, self.mm.size() + offset)
+            pos = self.remap_if_grown() + offset
         else:
             raise StreamError("seek(): whence must be 0, 1 or 2")
+        if pos < 0:
+            pos = 0
+        if pos > sys.maxint:
+            raise StreamError("seek(): position too large for mmap")
+        self.pos = intmask(pos)
+
+    def _slice(self, end):
+        # the data between self.pos and 'end', which may be past the end
+        # of the mapping; moves the position to the end of the data
+        size = self.mapsize()
+        if end > size:
+            end = size
+        start = self.pos
+        if end <= start:
+            return ''
+        self.pos = end
+        return self.mm.getslice(start, end - start)
 
     def readall(self):
-        filesize = self.mm.size() # Actual file size, may be more than mapped
-        n = filesize - self.pos
-        data = self.mm[self.pos:]
-        if len(data) < n:
-            del data
-            # File grew since opened; remap to get the new data
-            self.remapfile()
-            data = self.mm[self.pos:]
-        self.pos += len(data)
-        return data
+        return self._slice(self.remap_if_grown())
 
     def read(self, n):
         assert isinstance(n, int)
         end = self.pos + n
-        data = self.mm[self.pos:end]
-        if not data:
+        if end > self.mapsize():
             # is there more data to read?
-            filesize = self.mm.size() #Actual file size, may be more than mapped
-            if filesize > self.pos:
-                # File grew since opened; remap to get the new data
-                self.remapfile()
-                data = self.mm[self.pos:end]
-        self.pos += len(data)
-        return data
+            self.remap_if_grown()
+        return self._slice(end)
 
     def readline(self):
-        hit = self.mm.find("\n", self.pos) + 1
-        if not hit:
-            # is there more data to read?
-            filesize = self.mm.size() #Actual file size, may be more than mapped
-            if filesize > len(self.mm):
-                # File grew since opened; remap to get the new data
-                self.remapfile()
-                hit = self.mm.find("\n", self.pos) + 1
-        if hit:
+        return self.readline_limit(-1)
+
+    def readline_limit(self, limit):
+        """Read a line of at most 'limit' bytes, if 'limit' >= 0."""
+        size = self.mapsize()
+        if self.pos >= size:
+            size = self.remap_if_grown()
+        end = size
+        if 0 <= limit < end - self.pos:
+            end = self.pos + limit
+        if self.pos >= end:
+            return ''
+        hit = self.mm.find_byte('\n', self.pos, end)
+        if hit >= 0:
             # Got a whole line
-            data = self.mm[self.pos:hit]
-            self.pos = hit
-        else:
-            # Read whatever we've got -- may be empty
-            data = self.mm[self.pos:]
-            self.pos += len(data)
-        return data
+            return self._slice(hit + 1)
+        if end == size and end < self.remap_if_grown():
+            # the line continues in the part of the file that grew
+            return self.readline_limit(limit)
+        # Read whatever we've got
+        return self._slice(end)
 
     def write(self, data):
+        from rpython.rlib import rmmap
         end = self.pos + len(data)
         try:
-            self.mm[self.pos:end] = data
-            # This can raise IndexError on Windows, ValueError on Unix
-        except (IndexError, ValueError):
-            # XXX On Unix, this resize() call doesn't work
-            self.mm.resize(end)
-            self.mm[self.pos:end] = data
+            if self.mm is None or end > self.mm.size:
+                raise StreamError("write past the end of the mmap")
+            self.mm.check_writeable()
+        except rmmap.RMMapError, e:
+            raise StreamError(e.message)
+        self.mm.setslice(self.pos, data)
         self.pos = end
 
     def flush(self):
-        self.mm.flush()
+        if self.mm is not None:
+            self.mm.flush()
 
     def flushable(self):
-        import mmap
-        return self.access == mmap.ACCESS_WRITE
+        from rpython.rlib import rmmap
+        return self.access == rmmap.ACCESS_WRITE
 
     def try_to_find_file_descriptor(self):
         return self.fd
 
+def mmap_fd(fd):
+    """Return an MMapFile for reading the regular file 'fd' from its
+    current position, or None if it cannot be mapped.  The file
+    descriptor is not duplicated: close1(True) closes it."""
+    from rpython.rlib import rmmap
+    if fd < 0:
+        return None
+    try:
+        st = os.fstat(fd)
+        if not stat.S_ISREG(st[stat.ST_MODE]):
+            return None
+        pos = os.lseek(fd, 0, 1)
+        mmapped = MMapFile(fd, rmmap.ACCESS_READ)
+    except (OSError, StreamError):
+        return None
+    mmapped.seek(pos, 0)
+    return mmapped
+
 # ____________________________________________________________
 
 STREAM_METHODS = dict([
@@ -205,6 +205,26 @@ class TestMMap:
         interpret(func, [f.fileno()])
         f.close()
 
+    def test_find_byte(self):
+        f = open(self.tmpname + "g2", "w+")
+        f.write("foo\nbar\nbaz")
+        f.flush()
+
+        def func(no):
+            m = mmap.mmap(no, 11)
+            assert m.find_byte("\n", 0, 11) == 3
+            assert m.find_byte("\n", 3, 11) == 3
+            assert m.find_byte("\n", 4, 11) == 7
+            assert m.find_byte("\n", 8, 11) == -1
+            assert m.find_byte("\n", 4, 7) == -1
+            assert m.find_byte("f", 0, 0) == -1
+            assert m.find_byte("z", 0, 11) == 10
+            m.close()
+
+        func(f.fileno())
+        interpret(func, [f.fileno()])
+        f.close()
+
     def test_is_modifiable(self):
         f = open(self.tmpname + "h", "w+")
         
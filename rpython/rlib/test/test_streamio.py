@@ -697,6 +697,36 @@ class TestMMapFile(BaseTestBufferingInputStreamTests):
         self.fd = os.open(self.tfn, filemode)
         return streamio.MMapFile(self.fd, mmapmode)
 
+    def test_readline_limit(self):
+        file = self.makeStream()
+        lines = []
+        while True:
+            line = file.readline_limit(3)
+            if not line:
+                break
+            assert len(line) <= 3
+            lines.append(line)
+        assert "".join(lines) == "".join(self.packets)
+
+    def test_file_grows(self):
+        file = self.makeStream()
+        assert file.readall() == "".join(self.packets)
+        f = open(self.tfn, "ab")
+        f.write("more\nlines\n")
+        f.close()
+        assert file.readline() == "more\n"
+        assert file.read(100) == "lines\n"
+        assert file.read(100) == ""
+
+    def test_empty_file(self):
+        self.packets = []
+        file = self.makeStream()
+        assert file.read(10) == ""
+        assert file.readline() == ""
+        assert file.readall() == ""
+        file.seek(0, 2)
+        assert file.tell() == 0
+
     def test_write(self):
         if os.name == "posix" or os.name == 'nt':
             return # write() does't work on Unix nor on win32:-(
@@ -713,6 +743,51 @@ class TestMMapFile(BaseTestBufferingInputStreamTests):
         assert file.tell() == len("BooHoo\nBarf\na\nb\nc\n")
 
 
+class TestMMapBuffering:
+    def setup_method(self, method):
+        self.tfn = str(udir.join('streamio_mmapbuffering'))
+        f = open(self.tfn, "wb")
+        f.write("hello\nworld\n")
+        f.close()
+
+    def test_open_reading(self):
+        file = streamio.open_file_as_stream(
+            self.tfn, "rb", streamio.MMAP_BUFFERING)
+        assert isinstance(file, streamio.MMapFile)
+        assert file.readline() == "hello\n"
+        assert file.tell() == 6
+        assert file.readall() == "world\n"
+        file.close()
+
+    def test_open_universal(self):
+        file = streamio.open_file_as_stream(
+            self.tfn, "rU", streamio.MMAP_BUFFERING)
+        assert isinstance(file.base, streamio.MMapFile)
+        assert file.readall() == "hello\nworld\n"
+        file.close()
+
+    def test_fdopen_keeps_position(self):
+        fd = os.open(self.tfn, os.O_RDONLY)
+        os.lseek(fd, 6, 0)
+        file = streamio.fdopen_as_stream(fd, "rb", streamio.MMAP_BUFFERING)
+        assert file.readall() == "world\n"
+        file.close()
+
+    def test_fallback(self):
+        file = streamio.open_file_as_stream(
+            self.tfn, "r+b", streamio.MMAP_BUFFERING)
+        assert not isinstance(file, streamio.MMapFile)
+        file.close()
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, "data")
+        os.close(write_fd)
+        file = streamio.fdopen_as_stream(read_fd, "rb",
+                                         streamio.MMAP_BUFFERING)
+        assert not isinstance(file, streamio.MMapFile)
+        assert file.readall() == "data"
+        file.close()
+
+
 class BaseTestBufferingInputOutputStreamTests(BaseRtypingTest):
 
     def test_write(self):